@@ -7,7 +7,7 @@ import uuid
 import structlog
 from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query
 from typing import AsyncGenerator, Optional, Iterator, Any, List, Literal, Dict
 from pydantic import BaseModel, Field, validator
 from sse_starlette.sse import ServerSentEvent, EventSourceResponse
@@ -52,6 +52,10 @@ USE_TASK_QUEUE = bool(settings.REDIS_URL) and os.getenv("USE_TASK_QUEUE", "false
 # 支持格式：AAPL, 000001.SZ, 600000.SH, 00700.HK
 SYMBOL_PATTERN = re.compile(r'^[A-Z0-9]{1,10}(\.(SH|SZ|HK))?$', re.IGNORECASE)
 
+# SSE 推送参数
+SSE_HEARTBEAT_SECONDS = 15  # 无新事件时的心跳间隔
+SSE_MAX_STREAM_SECONDS = 600  # 单个连接最长保持 10 分钟
+
 
 async def async_stream_wrapper(sync_iterator: Iterator[Any]) -> AsyncGenerator[Any, None]:
     """将同步迭代器包装为异步生成器，避免阻塞事件循环。
@@ -173,6 +177,7 @@ async def run_analysis_task(
             symbol, trade_date, market=market, historical_reflection=historical_reflection
         )
         args = ta.propagator.get_graph_args()
+        ta.tool_memo.begin_run(symbol, trade_date)
 
         agent_reports = {}
 
@@ -233,6 +238,7 @@ async def run_analysis_task(
 
         # 计算耗时
         elapsed_seconds = round(time.time() - start_time, 2)
+        ta.tool_memo.log_stats()
 
         # 构建合成上下文
         historical_cases_count = None
@@ -500,8 +506,15 @@ async def trigger_analysis(
 
 
 @router.get("/stream/{task_id}")
-async def stream_analysis(task_id: str):
-    """SSE 流式获取分析进度（支持分布式）"""
+async def stream_analysis(
+    task_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """SSE 流式获取分析进度（支持分布式）
+
+    新事件由缓存层通知即时推送，空闲时发送心跳；
+    事件 id 为其在事件日志中的偏移，断线重连时浏览器携带 Last-Event-ID 从下一条续传。
+    """
     # 检查任务是否存在
     sse_data = await cache_service.get_sse_events(task_id)
     if not sse_data:
@@ -510,28 +523,47 @@ async def stream_analysis(task_id: str):
         if not cached_task:
             raise HTTPException(status_code=404, detail="Task not found")
 
+    start_index = 0
+    if last_event_id is not None:
+        try:
+            start_index = max(int(last_event_id) + 1, 0)
+        except ValueError:
+            logger.warning("Invalid Last-Event-ID ignored", task_id=task_id, last_event_id=last_event_id)
+
     async def event_generator() -> AsyncGenerator:
-        sent_count = 0
-        max_wait_cycles = 600  # 最多等待 10 分钟 (600 * 1s)
-        wait_cycles = 0
-
-        while wait_cycles < max_wait_cycles:
-            sse_data = await cache_service.get_sse_events(task_id, from_index=sent_count)
-            if not sse_data:
-                break
-
-            # Send new events
-            for event in sse_data["events"]:
-                yield ServerSentEvent(event=event["event"], data=json.dumps(event["data"]))
-                sent_count += 1
-
-            if sse_data["status"] in ["completed", "failed"]:
-                # 任务完成，延迟清理 SSE 事件（允许客户端重连获取最终结果）
-                # 清理由 TTL 自动处理
-                break
-
-            await asyncio.sleep(1)
-            wait_cycles += 1
+        sent_count = start_index
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SSE_MAX_STREAM_SECONDS
+
+        await cache_service.watch_sse_events(task_id)
+        try:
+            while loop.time() < deadline:
+                # 先取版本号再读取，读取期间到达的事件不会被漏掉
+                version = await cache_service.get_sse_events_version(task_id)
+                sse_data = await cache_service.get_sse_events(task_id, from_index=sent_count)
+                if not sse_data:
+                    break
+
+                # Send new events
+                for event in sse_data["events"]:
+                    yield ServerSentEvent(
+                        event=event["event"],
+                        data=json.dumps(event["data"]),
+                        id=str(sent_count),
+                    )
+                    sent_count += 1
+
+                if sse_data["status"] in ["completed", "failed"]:
+                    # 任务完成，延迟清理 SSE 事件（允许客户端重连获取最终结果）
+                    # 清理由 TTL 自动处理
+                    break
+
+                timeout = min(SSE_HEARTBEAT_SECONDS, max(deadline - loop.time(), 0))
+                notified = await cache_service.wait_sse_events(task_id, version, timeout=timeout)
+                if not notified:
+                    yield ServerSentEvent(comment="heartbeat")
+        finally:
+            await cache_service.unwatch_sse_events(task_id)
 
     return EventSourceResponse(event_generator())
 
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, Query
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sse_starlette.sse import EventSourceResponse
 from typing import List
+from config.settings import settings
 from services.data_router import MarketRouter
 from services.models import StockPrice, KlineData
+from services.quote_stream import quote_stream
 import structlog
 
 router = APIRouter(prefix="/market", tags=["Market"])
@@ -77,3 +82,38 @@ async def get_global_indices():
         {"name": "SSE Composite", "value": 3045.67, "change": 5.6, "percent": 0.18},
         {"name": "Hang Seng", "value": 16789.01, "change": 123.4, "percent": 0.74}
     ]
+
+
+@router.get("/quotes/stream")
+async def stream_quotes(
+    symbols: str = Query(..., description="逗号分隔的股票或指数代码，如 AAPL,600519.SH,^GSPC"),
+):
+    """实时行情推送（SSE）
+
+    首条 snapshot 事件包含已知的完整行情，之后的 delta 事件只包含发生变化的字段。
+    所有连接共享同一个刷新循环，客户端无需再轮询价格与指数接口。
+    """
+    codes = [s for s in symbols.split(",") if s.strip()]
+    if not codes:
+        raise HTTPException(status_code=400, detail="symbols 不能为空")
+    if len(codes) > settings.QUOTE_STREAM_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多订阅 {settings.QUOTE_STREAM_MAX_SYMBOLS} 个代码",
+        )
+
+    async def event_generator():
+        subscription = quote_stream.subscribe(codes)
+        try:
+            async for message in quote_stream.listen(subscription):
+                yield {"event": message["type"], "data": json.dumps(message)}
+        finally:
+            quote_stream.unsubscribe(subscription)
+
+    return EventSourceResponse(event_generator())
+
+
+@router.get("/quotes/stream/stats")
+async def get_quote_stream_stats():
+    """行情推送状态：订阅数、刷新次数、推送消息数"""
+    return quote_stream.get_stats()
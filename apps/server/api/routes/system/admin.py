@@ -1,12 +1,15 @@
 import os
 import structlog
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 
 from services.scheduler import watchlist_scheduler
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 logger = structlog.get_logger()
 
+# 按模式清除缓存时每批删除的键数
+CACHE_DELETE_BATCH = 500
+
 
 @router.post("/trigger-daily-analysis")
 async def trigger_daily_analysis(background_tasks: BackgroundTasks):
@@ -111,3 +114,47 @@ async def get_observability_summary():
     except Exception as e:
         logger.error("Failed to get observability summary", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============ 缓存管理端点 ============
+
+@router.get("/cache/keys")
+async def list_cache_keys(
+    pattern: str = Query("*", description="键匹配模式，如 market:price:*"),
+    limit: int = Query(200, ge=1, le=5000, description="最多返回的键数"),
+):
+    """列出匹配的缓存键（SCAN 遍历，不阻塞 Redis）"""
+    from services.cache_service import cache_service
+
+    keys = []
+    truncated = False
+    async for key in cache_service.scan_iter(pattern):
+        if len(keys) >= limit:
+            truncated = True
+            break
+        keys.append(key)
+    return {"pattern": pattern, "count": len(keys), "truncated": truncated, "keys": keys}
+
+
+@router.delete("/cache")
+async def clear_cache_keys(
+    pattern: str = Query(..., min_length=1, description="要清除的键匹配模式，如 market:*"),
+):
+    """按模式批量清除缓存（SCAN 遍历 + 分批删除）"""
+    from services.cache_service import cache_service
+
+    if pattern.strip("*") == "":
+        raise HTTPException(status_code=400, detail="Refusing to clear every cache key")
+
+    deleted = 0
+    batch = []
+    async for key in cache_service.scan_iter(pattern):
+        batch.append(key)
+        if len(batch) >= CACHE_DELETE_BATCH:
+            deleted += await cache_service.delete_many(batch)
+            batch = []
+    if batch:
+        deleted += await cache_service.delete_many(batch)
+
+    logger.info("Cache cleared by pattern", pattern=pattern, deleted=deleted)
+    return {"pattern": pattern, "deleted": deleted}
@@ -14,6 +14,7 @@ from api.schemas.health import (
     SystemUptimeResponse
 )
 from services.api_metrics import api_metrics
+from services.cache_metrics import cache_metrics
 
 router = APIRouter(prefix="/health", tags=["Health Monitor"])
 logger = structlog.get_logger()
@@ -277,6 +278,45 @@ async def reset_api_metrics():
     return {"status": "success", "message": "API metrics reset"}
 
 
+@router.get("/cache-metrics")
+async def get_cache_metrics():
+    """
+    获取缓存指标
+
+    按键前缀返回命中率、get/set 延迟直方图、读写字节数、淘汰与过期次数，
+    并附带当前缓存后端的全局统计。用于调整各类缓存的 TTL 与容量。
+    """
+    from services.cache_service import cache_service
+
+    return {
+        **cache_metrics.get_metrics(),
+        "backend": cache_service.get_stats(),
+    }
+
+
+@router.delete("/cache-metrics")
+async def reset_cache_metrics():
+    """
+    重置缓存指标
+    """
+    cache_metrics.reset()
+    return {"status": "success", "message": "Cache metrics reset"}
+
+
+@router.get("/rate-limits")
+async def get_rate_limit_metrics():
+    """
+    获取数据源限流指标
+
+    按数据源返回限流后端（redis 为跨进程共享预算，local 为进程内令牌桶）、
+    获取/拒绝次数与等待时间；search 为搜索网关按引擎的请求数、缓存命中与限流等待。
+    """
+    from tradingagents.dataflows.retry_utils import get_limiter_stats
+    from tradingagents.dataflows.search_gateway import get_search_stats
+
+    return {"vendors": get_limiter_stats(), "search": get_search_stats()}
+
+
 @router.post("/reset-circuit-breaker/{provider}")
 async def reset_circuit_breaker(provider: str):
     """
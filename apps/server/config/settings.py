@@ -52,6 +52,25 @@ class Settings(BaseSettings):
     FRED_API_KEY: Optional[str] = os.getenv("FRED_API_KEY")  # Federal Reserve Economic Data
     FINNHUB_API_KEY: Optional[str] = os.getenv("FINNHUB_API_KEY")  # Finnhub Stock API
 
+    # A 股全市场行情快照刷新间隔（秒）
+    MARKET_SNAPSHOT_INTERVAL: int = int(os.getenv("MARKET_SNAPSHOT_INTERVAL", "30"))
+
+    # 实时行情推送：共享刷新循环间隔（秒）、单个订阅的积压上限与代码数上限
+    QUOTE_STREAM_INTERVAL: float = float(os.getenv("QUOTE_STREAM_INTERVAL", "3"))
+    QUOTE_STREAM_QUEUE_SIZE: int = int(os.getenv("QUOTE_STREAM_QUEUE_SIZE", "100"))
+    QUOTE_STREAM_MAX_SYMBOLS: int = int(os.getenv("QUOTE_STREAM_MAX_SYMBOLS", "50"))
+
+    # 对冲请求：主数据源超过其 p90 延迟仍未返回时，并发请求下一个数据源并采用先返回的结果
+    PROVIDER_HEDGING_ENABLED: bool = os.getenv("PROVIDER_HEDGING_ENABLED", "true").lower() == "true"
+    PROVIDER_HEDGE_DEFAULT_DELAY: float = float(os.getenv("PROVIDER_HEDGE_DEFAULT_DELAY", "1.0"))  # 延迟样本不足时的对冲等待（秒）
+    PROVIDER_HEDGE_MIN_DELAY: float = float(os.getenv("PROVIDER_HEDGE_MIN_DELAY", "0.1"))  # 对冲等待下限（秒）
+
+    # 交易日历临时休市（如 "CN:2026-02-13,US:2026-01-09"），补充内置的交易所休市安排
+    TRADING_CALENDAR_EXTRA_HOLIDAYS: str = os.getenv("TRADING_CALENDAR_EXTRA_HOLIDAYS", "")
+
+    # 自适应排序：按数据源在各市场的 EWMA 延迟与错误率调整降级链顺序
+    PROVIDER_RANKING_ENABLED: bool = os.getenv("PROVIDER_RANKING_ENABLED", "true").lower() == "true"
+
     # Database - Dual Mode Support (sqlite / postgresql)
     DATABASE_MODE: str = os.getenv("DATABASE_MODE", "sqlite")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./db/trading.db")
@@ -66,9 +85,30 @@ class Settings(BaseSettings):
     # ChromaDB
     CHROMA_DB_PATH: str = os.getenv("CHROMA_DB_PATH", "./db/chroma")
 
+    # 本地日线存储（按股票代码分区的列式文件）
+    OHLCV_STORE_DIR: str = os.getenv("OHLCV_STORE_DIR", "./db/ohlcv")
+    OHLCV_STORE_MAX_MB: int = int(os.getenv("OHLCV_STORE_MAX_MB", "1024"))
+
     # Redis (可选，未配置时使用内存缓存)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
 
+    # 内存缓存容量（Redis 未配置时使用）
+    MEMORY_CACHE_MAX_ENTRIES: int = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000"))
+    MEMORY_CACHE_MAX_BYTES: int = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    MEMORY_CACHE_SWEEP_INTERVAL: int = int(os.getenv("MEMORY_CACHE_SWEEP_INTERVAL", "60"))
+
+    # 两级缓存：Redis 前置进程内 L1，通过 Pub/Sub 跨进程失效
+    CACHE_L1_ENABLED: bool = os.getenv("CACHE_L1_ENABLED", "true").lower() == "true"
+    CACHE_L1_MAX_ENTRIES: int = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2000"))
+    CACHE_L1_MAX_BYTES: int = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_L1_TTL: int = int(os.getenv("CACHE_L1_TTL", "30"))  # L1 最长保留秒数
+    CACHE_L1_PREFIXES: str = os.getenv("CACHE_L1_PREFIXES", "market:")  # 逗号分隔，留空表示全部键
+
+    # Redis 大值透明压缩（zstd > lz4 > zlib，按安装情况自动选择）
+    CACHE_COMPRESSION_ENABLED: bool = os.getenv("CACHE_COMPRESSION_ENABLED", "true").lower() == "true"
+    CACHE_COMPRESSION_THRESHOLD: int = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "8192"))  # 字节
+    CACHE_COMPRESSION_CODEC: str = os.getenv("CACHE_COMPRESSION_CODEC", "auto")  # auto / zstd / lz4 / zlib
+
     # Prompt Config
     PROMPTS_YAML_PATH: str = os.getenv("PROMPTS_YAML_PATH", "./config/prompts.yaml")
 
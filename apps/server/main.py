@@ -1,3 +1,4 @@
+import asyncio
 import os
 import structlog
 from fastapi import FastAPI, Request, Depends
@@ -9,10 +10,13 @@ from dotenv import load_dotenv
 
 from config.settings import settings
 from api.exceptions import AppException
+from services.cache_revalidate import set_refresh_loop
 from services.data_router import close_http_client
+from tradingagents.dataflows import http_pool
 from services.cache_service import cache_service
 from services.task_queue import task_queue
 from services.scheduler import watchlist_scheduler
+from services.quote_stream import quote_stream
 from db.models import init_db
 
 # Load environment variables
@@ -107,11 +111,21 @@ async def lifespan(app: FastAPI):
     initialize_database()
     # Initialize Scheduler, etc.
     watchlist_scheduler.start()
+    # 软过期缓存的后台刷新统一在主事件循环中执行
+    set_refresh_loop(asyncio.get_running_loop())
+    # 主事件循环长期存在，直接在其上持有 HTTP 连接池
+    http_pool.bind_loop(asyncio.get_running_loop())
+    # 缓存失效与键变更通知的 Redis 订阅只在主事件循环上维护一份
+    cache_service.bind_loop(asyncio.get_running_loop())
     yield
     # Shutdown logic
     logger.info("Shutting down API")
+    set_refresh_loop(None)
+    cache_service.bind_loop(None)
     watchlist_scheduler.shutdown()
+    await quote_stream.stop()
     await close_http_client()
+    await http_pool.aclose()
     await cache_service.close()
     await task_queue.close()
 
@@ -0,0 +1,104 @@
+"""
+DataFrame 到模型转换的基准测试：iterrows() 逐行构建 vs frame_convert 按列构建
+
+使用约 5000 行的全市场规模解禁数据（列名与 ak.stock_restricted_release_summary_em 一致）：
+  python scripts/benchmark_frame_convert.py             # 默认 5000 行，重复 5 次
+  python scripts/benchmark_frame_convert.py 20000 3     # 指定行数与重复次数
+"""
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 确保 apps/server 在 sys.path 中
+SERVER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVER_DIR))
+
+from services.frame_convert import (  # noqa: E402
+    build_models, cn_symbols, datetime_column, numeric_column, text_column, to_dates,
+)
+from services.unlock_service import UnlockStock  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    start = date.today()
+    return pd.DataFrame({
+        "代码": [f"{rng.choice([600000, 0, 300000]) + i % 1000:06d}" for i in range(rows)],
+        "名称": [f"股票{i}" for i in range(rows)],
+        "解禁日期": [str(start + timedelta(days=int(d))) for d in rng.integers(0, 60, rows)],
+        "解禁数量": rng.uniform(1e3, 1e9, rows),
+        "解禁市值": rng.uniform(1e3, 1e13, rows),
+        "解禁比例": rng.uniform(0, 30, rows),
+        "占流通股比例": rng.uniform(0, 50, rows),
+        "限售股类型": rng.choice(["首发原股东限售股份", "定向增发机构配售股份", "股权激励限售股份"], rows),
+    })
+
+
+def convert_iterrows(df: pd.DataFrame) -> list:
+    result = []
+    for _, row in df.iterrows():
+        code = str(row.get("代码", ""))
+        unlock_shares = float(row.get("解禁数量", 0) or 0)
+        unlock_value = float(row.get("解禁市值", 0) or 0)
+        if unlock_shares > 1e8:
+            unlock_shares = unlock_shares / 1e4
+        if unlock_value > 1e12:
+            unlock_value = unlock_value / 1e8
+        result.append(UnlockStock(
+            symbol=f"{code}.SH" if code.startswith("6") else f"{code}.SZ",
+            name=str(row.get("名称", "")),
+            unlock_date=pd.to_datetime(row.get("解禁日期")).date(),
+            unlock_shares=unlock_shares,
+            unlock_value=unlock_value,
+            unlock_ratio=float(row.get("解禁比例", 0) or 0),
+            circulating_ratio=float(row.get("占流通股比例", 0) or 0),
+            unlock_type=str(row.get("限售股类型", "未知")),
+        ))
+    return result
+
+
+def convert_vectorized(df: pd.DataFrame) -> list:
+    shares = numeric_column(df, "解禁数量")
+    value = numeric_column(df, "解禁市值")
+    return build_models(UnlockStock, pd.DataFrame({
+        "symbol": cn_symbols(text_column(df, "代码")),
+        "name": text_column(df, "名称"),
+        "unlock_date": to_dates(datetime_column(df, "解禁日期")),
+        "unlock_shares": shares.where(shares <= 1e8, shares / 1e4),
+        "unlock_value": value.where(value <= 1e12, value / 1e8),
+        "unlock_ratio": numeric_column(df, "解禁比例"),
+        "circulating_ratio": numeric_column(df, "占流通股比例"),
+        "unlock_type": text_column(df, "限售股类型", default="未知"),
+    }))
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    df = make_frame(rows)
+
+    assert convert_iterrows(df) == convert_vectorized(df), "两种转换结果不一致"
+
+    slow = best_of(convert_iterrows, df, repeat)
+    fast = best_of(convert_vectorized, df, repeat)
+    print(f"rows={rows} repeat={repeat}")
+    print(f"iterrows:   {slow * 1000:8.1f} ms")
+    print(f"vectorized: {fast * 1000:8.1f} ms")
+    print(f"speedup:    {slow / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -67,8 +67,7 @@ class AccuracyTracker:
         # 获取当前价格作为入场价
         if entry_price is None:
             try:
-                price_data = await self.market_router.get_price(symbol)
-                entry_price = price_data.get("current_price")
+                entry_price = (await self.market_router.get_stock_price(symbol)).price
             except Exception as e:
                 logger.warning("Failed to get entry price", symbol=symbol, error=str(e))
 
@@ -155,12 +154,14 @@ class AccuracyTracker:
         self,
         prediction_id: int,
         evaluation_days: int = DEFAULT_EVALUATION_DAYS,
+        actual_price: Optional[float] = None,
     ) -> Optional[PredictionOutcome]:
         """评估单条预测的准确性
 
         Args:
             prediction_id: 预测记录 ID
             evaluation_days: 评估周期（天数）
+            actual_price: 当前价格（批量评估时预先获取；为空则单独查询）
 
         Returns:
             更新后的 PredictionOutcome，若评估失败返回 None
@@ -188,16 +189,16 @@ class AccuracyTracker:
                 return None
 
             # 获取当前价格
-            try:
-                price_data = await self.market_router.get_price(prediction.symbol)
-                actual_price = price_data.get("current_price")
-            except Exception as e:
-                logger.warning(
-                    "Failed to get actual price",
-                    symbol=prediction.symbol,
-                    error=str(e),
-                )
-                return None
+            if actual_price is None:
+                try:
+                    actual_price = (await self.market_router.get_stock_price(prediction.symbol)).price
+                except Exception as e:
+                    logger.warning(
+                        "Failed to get actual price",
+                        symbol=prediction.symbol,
+                        error=str(e),
+                    )
+                    return None
 
             if actual_price is None or prediction.entry_price is None:
                 logger.warning(
@@ -278,9 +279,17 @@ class AccuracyTracker:
             )
             pending = session.exec(statement).all()
 
+        # 一次批量获取所有涉及股票的当前价格
+        batch = await self.market_router.get_stock_prices([p.symbol for p in pending])
+        for symbol, error in batch.errors.items():
+            logger.warning("Failed to get actual price", symbol=symbol, error=error)
+
         evaluated = []
         for prediction in pending:
-            result = await self.evaluate_prediction(prediction.id, evaluation_days)
+            price = batch.prices.get(prediction.symbol)
+            if price is None:
+                continue
+            result = await self.evaluate_prediction(prediction.id, evaluation_days, actual_price=price.price)
             if result:
                 evaluated.append(result)
 
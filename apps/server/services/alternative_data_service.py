@@ -8,8 +8,11 @@ import time
 import hashlib
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import pandas as pd
 import structlog
 
+from services.frame_convert import build_records, numeric_column, text_column
+
 logger = structlog.get_logger(__name__)
 
 # ============ 缓存 ============
@@ -68,35 +71,25 @@ class AHPremiumService:
             if df is None or df.empty:
                 return {"error": "No AH premium data available", "stocks": []}
 
-            stocks = []
-            for _, row in df.iterrows():
-                try:
-                    a_code = str(row.get("A股代码", ""))
-                    h_code = str(row.get("H股代码", ""))
-                    name = str(row.get("名称", ""))
-                    a_price = float(row.get("A股价格", 0))
-                    h_price = float(row.get("H股价格", 0))
-
-                    # 计算溢价率
-                    # AH 溢价率 = (A股价格 / H股价格 * 汇率 - 1) * 100
-                    # AkShare 通常已经提供了溢价率
-                    premium_rate = float(row.get("比价(A/H)", 0))
-                    if premium_rate == 0 and h_price > 0:
-                        # 简化计算（不含汇率）
-                        premium_rate = round(a_price / h_price, 4)
-
-                    stocks.append({
-                        "a_code": a_code,
-                        "h_code": h_code,
-                        "name": name,
-                        "a_price": a_price,
-                        "h_price": h_price,
-                        "premium_rate": premium_rate,
-                        "premium_pct": round((premium_rate - 1) * 100, 2) if premium_rate > 0 else 0,
-                    })
-                except (ValueError, TypeError) as e:
-                    logger.debug("Skipping invalid AH row", error=str(e))
-                    continue
+            a_price = numeric_column(df, "A股价格")
+            h_price = numeric_column(df, "H股价格")
+
+            # 计算溢价率
+            # AH 溢价率 = (A股价格 / H股价格 * 汇率 - 1) * 100
+            # AkShare 通常已经提供了溢价率，缺失时简化计算（不含汇率）
+            premium_rate = numeric_column(df, "比价(A/H)")
+            fallback = (premium_rate == 0) & (h_price > 0)
+            premium_rate = premium_rate.where(~fallback, (a_price / h_price.where(h_price > 0)).round(4))
+
+            stocks = build_records(pd.DataFrame({
+                "a_code": text_column(df, "A股代码"),
+                "h_code": text_column(df, "H股代码"),
+                "name": text_column(df, "名称"),
+                "a_price": a_price,
+                "h_price": h_price,
+                "premium_rate": premium_rate,
+                "premium_pct": ((premium_rate - 1) * 100).round(2).where(premium_rate > 0, 0.0),
+            }))
 
             # 排序
             if sort_by == "premium_rate":
@@ -179,15 +172,11 @@ class AHPremiumService:
             if df is None or df.empty:
                 return []
 
-            history = []
-            for _, row in df.tail(60).iterrows():  # 最近 60 个交易日
-                try:
-                    history.append({
-                        "date": str(row.get("date", "")),
-                        "ratio": float(row.get("比价", row.get("ratio", 0))),
-                    })
-                except (ValueError, TypeError):
-                    continue
+            df = df.tail(60)  # 最近 60 个交易日
+            history = build_records(pd.DataFrame({
+                "date": text_column(df, "date"),
+                "ratio": numeric_column(df, "比价", "ratio"),
+            }))
 
             return history
 
@@ -339,22 +328,17 @@ class PatentService:
     def _search_patents(self, company_name: str) -> List[Dict[str, Any]]:
         """搜索公司专利信息"""
         try:
-            from duckduckgo_search import DDGS
-            ddgs = DDGS()
+            from tradingagents.dataflows import search_gateway
 
-            # 多语言搜索
+            # 多语言搜索（并行执行，单个查询失败时返回空结果）
             queries = [
                 f"{company_name} patent filing 2024 2025",
                 f"{company_name} 专利 申请 技术",
             ]
 
             all_results = []
-            for q in queries:
-                try:
-                    results = list(ddgs.text(q, max_results=5, timelimit="y"))
-                    all_results.extend(results)
-                except Exception:
-                    continue
+            for results in search_gateway.search_many("text", queries, max_results=5, timelimit="y"):
+                all_results.extend(results)
 
             formatted = []
             seen = set()
@@ -381,11 +365,10 @@ class PatentService:
     def _search_tech_trends(self, company_name: str) -> List[Dict[str, Any]]:
         """搜索公司技术趋势"""
         try:
-            from duckduckgo_search import DDGS
-            ddgs = DDGS()
+            from tradingagents.dataflows import search_gateway
 
             query = f"{company_name} R&D technology innovation research"
-            results = list(ddgs.text(query, max_results=5, timelimit="y"))
+            results = search_gateway.search("text", query, max_results=5, timelimit="y")
 
             return [
                 {
@@ -18,6 +18,7 @@ except ImportError:
     np = None
 
 from services.data_router import MarketRouter
+from services.ohlcv_store import ohlcv_store
 
 logger = structlog.get_logger(__name__)
 
@@ -280,22 +281,15 @@ class BacktestEngine:
             日期 -> 收盘价的映射
         """
         try:
-            # 尝试使用 yfinance 获取历史数据
-            import yfinance as yf
-
-            # 转换股票代码
-            ticker = self._convert_symbol_for_yfinance(symbol)
-
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
-
-            if hist.empty:
+            # 本地 OHLCV 存储只获取缺失的日期段
+            data = await ohlcv_store.aget_slice(symbol, start_date, end_date)
+            if len(data) == 0:
                 return None
 
-            return {
-                date.strftime("%Y-%m-%d"): float(row["Close"])
-                for date, row in hist.iterrows()
-            }
+            return dict(zip(
+                np.datetime_as_string(data.dates, unit="D").tolist(),
+                data.columns["close"].tolist(),
+            ))
 
         except Exception as e:
             logger.warning("Failed to get historical prices", symbol=symbol, error=str(e))
@@ -0,0 +1,165 @@
+"""
+缓存值透明压缩
+
+超过阈值的字符串值在写入 Redis 前压缩，读取时按头部自动解压：
+
+    "\\x00" + 编解码器标识（1 个字符） + base64(压缩数据)
+
+- 未压缩的旧值（JSON 文本）不会以 "\\x00" 开头，按原样返回，升级前写入的缓存仍可读取
+- Redis 客户端以 decode_responses=True 工作，压缩数据经 base64 编码后仍以字符串存储
+- 编解码器优先级：zstd（zstandard）> lz4 > zlib（标准库，始终可用）
+"""
+import base64
+import time
+import zlib
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from config.settings import settings
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+HEADER = "\x00"
+
+
+def _zstd_codec() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    compressor = zstandard.ZstdCompressor(level=3)
+    decompressor = zstandard.ZstdDecompressor()
+    return compressor.compress, decompressor.decompress
+
+
+def _lz4_codec() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _zlib_codec() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return (lambda data: zlib.compress(data, 6)), zlib.decompress
+
+
+# 名称 -> (头部标识, 是否可用, 构造函数)
+_CODECS: Dict[str, Tuple[str, bool, Callable]] = {
+    "zstd": ("z", ZSTD_AVAILABLE, _zstd_codec),
+    "lz4": ("4", LZ4_AVAILABLE, _lz4_codec),
+    "zlib": ("d", True, _zlib_codec),
+}
+
+
+class CacheCompressor:
+    """按阈值压缩缓存字符串，并统计压缩率与 CPU 耗时"""
+
+    def __init__(
+        self,
+        threshold: Optional[int] = None,
+        codec: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.enabled = enabled if enabled is not None else settings.CACHE_COMPRESSION_ENABLED
+        self.threshold = threshold if threshold is not None else settings.CACHE_COMPRESSION_THRESHOLD
+        self.codec = self._select_codec(codec or settings.CACHE_COMPRESSION_CODEC)
+        self._tag = _CODECS[self.codec][0]
+        self._compress, _ = _CODECS[self.codec][2]()
+        # 解压需支持所有已安装的编解码器（其他进程可能使用不同配置）
+        self._decompressors: Dict[str, Callable[[bytes], bytes]] = {
+            tag: factory()[1] for tag, available, factory in _CODECS.values() if available
+        }
+
+        self._lock = Lock()
+        self.compressed = 0
+        self.skipped = 0
+        self.decompressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_cpu_seconds = 0.0
+        self.decompress_cpu_seconds = 0.0
+
+    @staticmethod
+    def _select_codec(name: str) -> str:
+        name = name.lower()
+        if name != "auto":
+            if name not in _CODECS:
+                raise ValueError(f"Unknown cache compression codec: {name}")
+            if _CODECS[name][1]:
+                return name
+            logger.warning("Cache compression codec not installed, falling back", codec=name)
+        return next(n for n, (_, available, _) in _CODECS.items() if available)
+
+    def encode(self, value: Any) -> Any:
+        """超过阈值的字符串压缩后加头部返回，其余原样返回"""
+        if not self.enabled or not isinstance(value, str):
+            return value
+        raw = value.encode("utf-8")
+        if len(raw) < self.threshold:
+            with self._lock:
+                self.skipped += 1
+            return value
+
+        start = time.thread_time()
+        payload = base64.b64encode(self._compress(raw)).decode("ascii")
+        elapsed = time.thread_time() - start
+
+        encoded = f"{HEADER}{self._tag}{payload}"
+        if len(encoded) >= len(raw):
+            # 不可压缩的数据保持原样
+            with self._lock:
+                self.skipped += 1
+            return value
+
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(raw)
+            self.bytes_out += len(encoded)
+            self.compress_cpu_seconds += elapsed
+        return encoded
+
+    def decode(self, value: Any) -> Any:
+        """按头部解压；未压缩的值原样返回，无法解压时返回 None（视为未命中）"""
+        if not isinstance(value, str) or not value.startswith(HEADER):
+            return value
+
+        decompress = self._decompressors.get(value[1:2])
+        if decompress is None:
+            logger.warning("Cached value uses unavailable compression codec", tag=value[1:2])
+            return None
+
+        start = time.thread_time()
+        try:
+            result = decompress(base64.b64decode(value[2:])).decode("utf-8")
+        except Exception as e:
+            logger.warning("Cached value decompression failed", error=str(e))
+            return None
+        elapsed = time.thread_time() - start
+
+        with self._lock:
+            self.decompressed += 1
+            self.decompress_cpu_seconds += elapsed
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "codec": self.codec,
+                "threshold_bytes": self.threshold,
+                "compressed": self.compressed,
+                "skipped": self.skipped,
+                "decompressed": self.decompressed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else 0,
+                "compress_cpu_ms": round(self.compress_cpu_seconds * 1000, 2),
+                "decompress_cpu_ms": round(self.decompress_cpu_seconds * 1000, 2),
+            }
@@ -0,0 +1,220 @@
+"""
+缓存性能指标收集
+
+按键前缀（如 market:history、sse_events、task）聚合缓存指标：
+命中/未命中、get/set 延迟直方图、读写字节数、淘汰与过期次数，
+用于根据实际数据调整各类缓存的 TTL 与容量
+"""
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import List, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+# 延迟直方图桶上界（毫秒），最后一个桶收纳所有更慢的操作
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0)
+
+# 前缀数量上限，超出后归入 OVERFLOW_PREFIX，避免动态键导致无限增长
+MAX_PREFIXES = 200
+OVERFLOW_PREFIX = "_other"
+
+# 无冒号键末尾的动态片段（日期、天数等），如 daily_lhb_20240102、north_money_history_30
+_DYNAMIC_SUFFIX = re.compile(r"_[^_]*\d[^_]*$")
+
+
+def key_prefix(key: str) -> str:
+    """
+    提取键前缀
+
+    - market:history:AAPL -> market:history
+    - sse_events:task_1:log -> sse_events
+    - task:abc -> task
+    - daily_lhb_20240102 -> daily_lhb
+    """
+    parts = key.split(":")
+    # 第二段含数字时视为动态 ID（任务 ID 等），只保留第一段
+    if len(parts) >= 3 and not any(c.isdigit() for c in parts[1]):
+        return f"{parts[0]}:{parts[1]}"
+    if len(parts) >= 2:
+        return parts[0]
+    return _DYNAMIC_SUFFIX.sub("", key) or key
+
+
+@dataclass
+class LatencyHistogram:
+    """固定桶延迟直方图"""
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, duration_ms: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, pct: float) -> float:
+        """按桶上界估算分位数（落在最后一个桶时返回最大值）"""
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * pct / 100
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= threshold:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+@dataclass
+class PrefixMetrics:
+    """单个键前缀的聚合指标"""
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    deletes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    get_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    set_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total * 100 if total > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(self.hit_rate, 2),
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": round(self.bytes_written / self.sets) if self.sets else 0,
+            "get_latency": self.get_latency.to_dict(),
+            "set_latency": self.set_latency.to_dict(),
+        }
+
+
+def _payload_size(value) -> Optional[int]:
+    """序列化后的字节数；内存后端中的对象未序列化，不计入"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return None
+
+
+class CacheMetricsService:
+    """缓存指标收集服务（单例）"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._start_time = datetime.now()
+        self._prefixes: dict[str, PrefixMetrics] = {}
+
+    def _metrics_for(self, key: str) -> PrefixMetrics:
+        """调用方需持有 _lock"""
+        prefix = key_prefix(key)
+        metrics = self._prefixes.get(prefix)
+        if metrics is None:
+            if len(self._prefixes) >= MAX_PREFIXES:
+                prefix = OVERFLOW_PREFIX
+                metrics = self._prefixes.get(prefix)
+            if metrics is None:
+                metrics = self._prefixes[prefix] = PrefixMetrics()
+        return metrics
+
+    def record_get(self, key: str, value, duration_ms: Optional[float] = None):
+        """记录一次读取（value 为 None 视为未命中）"""
+        with self._lock:
+            metrics = self._metrics_for(key)
+            if value is None:
+                metrics.misses += 1
+            else:
+                metrics.hits += 1
+                size = _payload_size(value)
+                if size:
+                    metrics.bytes_read += size
+            if duration_ms is not None:
+                metrics.get_latency.observe(duration_ms)
+
+    def record_set(self, key: str, value, duration_ms: Optional[float] = None):
+        """记录一次写入"""
+        with self._lock:
+            metrics = self._metrics_for(key)
+            metrics.sets += 1
+            size = _payload_size(value)
+            if size:
+                metrics.bytes_written += size
+            if duration_ms is not None:
+                metrics.set_latency.observe(duration_ms)
+
+    def record_delete(self, key: str):
+        with self._lock:
+            self._metrics_for(key).deletes += 1
+
+    def record_eviction(self, key: str):
+        """容量淘汰（LRU）"""
+        with self._lock:
+            self._metrics_for(key).evictions += 1
+
+    def record_expiration(self, key: str):
+        """TTL 过期清理"""
+        with self._lock:
+            self._metrics_for(key).expirations += 1
+
+    def get_metrics(self) -> dict:
+        """获取按前缀聚合的指标"""
+        with self._lock:
+            hits = sum(m.hits for m in self._prefixes.values())
+            misses = sum(m.misses for m in self._prefixes.values())
+            total = hits + misses
+            return {
+                "since": self._start_time.isoformat(),
+                "global": {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate_pct": round(hits / total * 100, 2) if total else 0,
+                    "evictions": sum(m.evictions for m in self._prefixes.values()),
+                    "bytes_written": sum(m.bytes_written for m in self._prefixes.values()),
+                },
+                "by_prefix": {
+                    prefix: metrics.to_dict()
+                    for prefix, metrics in sorted(self._prefixes.items())
+                },
+            }
+
+    def reset(self):
+        """重置所有指标"""
+        with self._lock:
+            self._prefixes.clear()
+            self._start_time = datetime.now()
+        logger.info("Cache metrics reset")
+
+
+# 全局单例
+cache_metrics = CacheMetricsService()
@@ -0,0 +1,395 @@
+"""
+软过期缓存（stale-while-revalidate + refresh-ahead）
+
+与具体数据源无关的缓存读取辅助，供行情路由与北向资金、龙虎榜等服务共用：
+- get_revalidating：新鲜期内直接返回，临近过期或软过期窗口内返回旧值并后台刷新
+- coalesce_request：同一事件循环内合并并发的相同请求
+- 跨进程单飞：缓存锁保证整个部署中同一键只有一个进程访问数据源
+- 指定市场时，新鲜期由交易日历决定（休市期间持续到下一次开盘）
+
+后台刷新统一在 set_refresh_loop 登记的应用主事件循环中执行。
+"""
+import asyncio
+import time
+import uuid
+import weakref
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from services.cache_service import cache_service
+from services.trading_calendar import DEFAULT_SETTLE, trading_calendar
+
+logger = structlog.get_logger()
+
+# 提前刷新：剩余寿命低于 TTL 的该比例时，读取会触发后台刷新
+_REFRESH_AHEAD_RATIO = 0.2
+
+# 请求去重：按事件循环分组的进行中请求 {loop: {key: asyncio.Future}}
+# 工具层经 asyncio.run 在临时事件循环中调用服务，Future 不能跨循环共享；
+# 弱引用键不会阻止临时循环被回收
+_pending_requests: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# 后台刷新所在的长生命周期事件循环（应用启动时登记）
+_refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# 后台刷新任务（持有引用，防止任务在完成前被回收）
+_background_refreshes: Set[asyncio.Task] = set()
+
+# 跨进程单飞：同一缓存键只有持锁的进程访问数据源，其余进程等待其写入的结果
+_FLIGHT_LOCK_PREFIX = "lock:flight:"
+_FLIGHT_LOCK_TTL = 30          # 锁自动释放时间（秒），防止持有者崩溃后永久占用
+_FLIGHT_WAIT_TIMEOUT = 15.0    # 等待其他进程结果的上限（秒），超时后自行获取
+
+
+def set_refresh_loop(loop: Optional[asyncio.AbstractEventLoop]):
+    """
+    登记后台刷新使用的事件循环
+
+    应用启动时登记主事件循环，关闭时传入 None。其他事件循环（如工具层
+    asyncio.run 创建的临时循环）中触发的刷新会转交到该循环执行，
+    避免刷新任务随临时循环结束被取消。
+    """
+    global _refresh_loop
+    _refresh_loop = loop
+
+
+def _loop_pending() -> Dict[str, asyncio.Future]:
+    """当前事件循环的进行中请求表"""
+    loop = asyncio.get_running_loop()
+    pending = _pending_requests.get(loop)
+    if pending is None:
+        pending = _pending_requests[loop] = {}
+    return pending
+
+
+async def coalesce_request(key: str, fetch_func, *args, **kwargs):
+    """
+    请求去重：多个并发请求同一数据时，只执行一次实际请求
+
+    只在同一事件循环内合并；不同事件循环的请求各自执行，
+    跨进程与跨循环的重复由 _fetch_and_store 的缓存锁兜底。
+
+    Args:
+        key: 请求唯一标识（如 "price:AAPL"）
+        fetch_func: 实际获取数据的协程函数
+        *args, **kwargs: 传递给 fetch_func 的参数
+
+    Returns:
+        获取的数据
+
+    Example:
+        # 多个并发调用只会触发一次实际请求
+        price = await coalesce_request(f"price:{symbol}", _fetch_price_impl, symbol)
+    """
+    pending = _loop_pending()
+
+    # 检查与登记之间没有 await，同一循环内无需加锁
+    future = pending.get(key)
+    if future is not None:
+        logger.debug("Coalescing request, waiting for pending", key=key)
+    else:
+        # 创建新的 Future 并注册
+        future = asyncio.get_running_loop().create_future()
+        pending[key] = future
+
+        # 在后台执行实际请求
+        async def execute_and_resolve():
+            try:
+                result = await fetch_func(*args, **kwargs)
+                future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                # 清理 pending 请求
+                pending.pop(key, None)
+
+        asyncio.create_task(execute_and_resolve())
+
+    # 等待结果
+    return await future
+
+
+async def _read_entry(key: str) -> Optional[Dict[str, Any]]:
+    entry = await cache_service.get_object(key)
+    if not isinstance(entry, dict) or "fetched_at" not in entry:
+        return None
+    return entry
+
+
+async def read_revalidating(key: str) -> Optional[Tuple[Any, float]]:
+    """
+    读取软过期缓存条目
+
+    Returns:
+        (缓存值, 已缓存秒数)；不存在或格式不符时返回 None
+    """
+    entry = await _read_entry(key)
+    if entry is None:
+        return None
+    return entry["value"], time.time() - entry["fetched_at"]
+
+
+async def _read_entries_many(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    return {
+        key: entry
+        for key, entry in (await cache_service.get_many_objects(keys)).items()
+        if isinstance(entry, dict) and "fetched_at" in entry
+    }
+
+
+async def read_revalidating_many(keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+    """批量读取软过期缓存条目（一次往返），只返回命中的键"""
+    now = time.time()
+    return {
+        key: (entry["value"], now - entry["fetched_at"])
+        for key, entry in (await _read_entries_many(keys)).items()
+    }
+
+
+async def read_fresh_many(keys: List[str], ttl: int) -> Dict[str, Any]:
+    """批量读取仍在新鲜期内的缓存值（一次往返），只返回命中的键"""
+    now = time.time()
+    return {
+        key: entry["value"]
+        for key, entry in (await _read_entries_many(keys)).items()
+        if _is_fresh(entry, ttl, now)
+    }
+
+
+def _fresh_ttl(ttl: int, market: Optional[str], settle: timedelta) -> int:
+    """条目的新鲜期：指定市场时由交易日历决定（休市期间持续到下一次开盘）"""
+    if market is None:
+        return ttl
+    return trading_calendar.cache_ttl(market, ttl, settle=settle)
+
+
+def _is_fresh(entry: Dict[str, Any], ttl: int, now: Optional[float] = None) -> bool:
+    """条目是否仍在新鲜期内（写入时记录的新鲜期优先）"""
+    return (now or time.time()) - entry["fetched_at"] < entry.get("ttl", ttl)
+
+
+async def write_revalidating(
+    key: str,
+    value: Any,
+    ttl: int,
+    stale_ttl: int,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+):
+    """写入软过期缓存条目，物理过期时间为新鲜期 + stale_ttl"""
+    fresh = _fresh_ttl(ttl, market, settle)
+    await cache_service.set_object(
+        key, {"value": value, "fetched_at": time.time(), "ttl": fresh}, ttl=fresh + stale_ttl
+    )
+
+
+async def write_revalidating_many(
+    mapping: Dict[str, Any],
+    ttl: int,
+    stale_ttl: int,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+):
+    """批量写入软过期缓存条目（一次往返），并通知等待这些键的进程"""
+    if not mapping:
+        return
+    fetched_at = time.time()
+    fresh = _fresh_ttl(ttl, market, settle)
+    await cache_service.set_many_objects(
+        {key: {"value": value, "fetched_at": fetched_at, "ttl": fresh} for key, value in mapping.items()},
+        ttl=fresh + stale_ttl,
+    )
+    await asyncio.gather(*(cache_service.notify(key) for key in mapping))
+
+
+async def _fetch_and_store(
+    key: str,
+    fetch_func,
+    args: tuple,
+    kwargs: dict,
+    ttl: int,
+    stale_ttl: int,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+):
+    """
+    获取数据并写入缓存（跨进程单飞）
+
+    coalesce_request 只在本进程内去重；这里再通过缓存锁保证整个部署中
+    同一键只有一个进程访问数据源。未抢到锁的进程等待该键的变更通知，
+    读到比开始等待时更新的条目即返回；持锁方失败释放锁后由等待方接手，
+    等待超过 _FLIGHT_WAIT_TIMEOUT 则自行获取。
+    """
+    watching = False
+    try:
+        lock_key = f"{_FLIGHT_LOCK_PREFIX}{key}"
+        token = uuid.uuid4().hex
+        entry = await _read_entry(key)
+        seen_at = entry["fetched_at"] if entry else None
+        deadline = time.monotonic() + _FLIGHT_WAIT_TIMEOUT
+
+        while True:
+            if await cache_service.acquire_lock(lock_key, token, _FLIGHT_LOCK_TTL):
+                try:
+                    value = await fetch_func(*args, **kwargs)
+                    await write_revalidating(key, value, ttl, stale_ttl, market, settle)
+                    return value
+                finally:
+                    await cache_service.release_lock(lock_key, token)
+                    await cache_service.notify(key)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            # 先登记通知版本再读取，不会错过两者之间写入的结果
+            if watching:
+                version = await cache_service.get_notify_version(key)
+            else:
+                version = await cache_service.watch_notify(key)
+                watching = True
+            entry = await _read_entry(key)
+            if entry and entry["fetched_at"] != seen_at:
+                logger.debug("Single-flight result received from another process", key=key)
+                return entry["value"]
+            await cache_service.wait_notify(key, version, timeout=remaining)
+
+        logger.warning("Single-flight wait timed out, fetching directly", key=key)
+        value = await fetch_func(*args, **kwargs)
+        await write_revalidating(key, value, ttl, stale_ttl, market, settle)
+        return value
+    finally:
+        # 本次单飞结束，取消对该键的关注
+        if watching:
+            await cache_service.discard_notify(key)
+
+
+def _start_refresh(
+    key: str,
+    fetch_func,
+    args: tuple,
+    kwargs: dict,
+    ttl: int,
+    stale_ttl: int,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+):
+    """在当前事件循环中启动后台刷新（同一 key 已有请求在进行时不重复发起）"""
+    if key in _loop_pending():
+        return
+
+    async def refresh():
+        try:
+            await coalesce_request(
+                key, _fetch_and_store, key, fetch_func, args, kwargs, ttl, stale_ttl, market, settle
+            )
+        except Exception as e:
+            logger.warning("Background cache refresh failed, serving stale value", key=key, error=str(e))
+
+    task = asyncio.create_task(refresh())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+def _schedule_refresh(
+    key: str,
+    fetch_func,
+    args: tuple,
+    kwargs: dict,
+    ttl: int,
+    stale_ttl: int,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+) -> bool:
+    """
+    后台刷新缓存
+
+    刷新只在登记的主事件循环中执行：当前就在主循环时直接启动，
+    在其他循环中则转交给主循环。未登记主循环（脚本、CLI 等）时不刷新。
+
+    Returns:
+        是否已安排刷新
+    """
+    loop = _refresh_loop
+    if loop is None or loop.is_closed() or not loop.is_running():
+        return False
+
+    refresh_args = (key, fetch_func, args, kwargs, ttl, stale_ttl, market, settle)
+    if loop is asyncio.get_running_loop():
+        _start_refresh(*refresh_args)
+    else:
+        try:
+            loop.call_soon_threadsafe(_start_refresh, *refresh_args)
+        except RuntimeError:
+            # 主循环已关闭
+            return False
+    return True
+
+
+async def get_revalidating(
+    key: str,
+    fetch_func,
+    *args,
+    ttl: int,
+    stale_ttl: int,
+    refresh_ahead: Optional[float] = None,
+    market: Optional[str] = None,
+    settle: timedelta = DEFAULT_SETTLE,
+    **kwargs,
+):
+    """
+    软过期缓存读取（stale-while-revalidate + refresh-ahead）
+
+    - 缓存年龄 < ttl - refresh_ahead：直接返回
+    - 临近过期或已过期但仍在 stale_ttl 窗口内：立即返回旧值，后台刷新
+    - 无缓存：同步获取并写入
+
+    后台刷新在 set_refresh_loop 登记的主事件循环中执行；未登记时
+    临近过期的条目照常返回，已过期的条目改为同步获取。
+
+    刷新与首次获取都经过 coalesce_request（进程内）与缓存锁（跨进程），
+    同一 key 在整个部署中同时只有一个请求在执行；
+    后台刷新失败时继续返回旧值，直至软过期窗口结束。
+
+    Args:
+        key: 缓存键，同时作为请求去重标识
+        fetch_func: 实际获取数据的协程函数，失败时应抛出异常
+        ttl: 新鲜期（秒）
+        stale_ttl: 过期后仍可返回旧值的时长（秒）
+        refresh_ahead: 提前刷新窗口（秒），默认 ttl * _REFRESH_AHEAD_RATIO
+        market: 数据所属市场（CN/HK/US）；指定时新鲜期由交易日历决定，
+            休市期间持续到下一次开盘，避免周末与节假日重复获取不会变化的数据
+        settle: 收盘后数据仍可能更新的窗口，仅在指定 market 时生效
+
+    Example:
+        price = await get_revalidating(
+            "market:price:AAPL", _fetch_price_impl, "AAPL", ttl=30, stale_ttl=300
+        )
+    """
+    if refresh_ahead is None:
+        refresh_ahead = ttl * _REFRESH_AHEAD_RATIO
+
+    entry = await _read_entry(key)
+    if entry is not None:
+        age = time.time() - entry["fetched_at"]
+        fresh = entry.get("ttl", ttl)
+        stale = age >= fresh
+        if age < fresh - refresh_ahead:
+            return entry["value"]
+        if _schedule_refresh(key, fetch_func, args, kwargs, ttl, stale_ttl, market, settle):
+            logger.debug("Serving cached value, refreshing in background", key=key, age=round(age, 1), stale=stale)
+            return entry["value"]
+        if not stale:
+            return entry["value"]
+        # 无法后台刷新（未登记主循环）且已过期：同步获取
+
+    return await coalesce_request(
+        key, _fetch_and_store, key, fetch_func, args, kwargs, ttl, stale_ttl, market, settle
+    )
@@ -0,0 +1,152 @@
+"""
+缓存对象序列化
+
+把 Pydantic 模型、dataclass、Enum 以及它们组成的 dict/list 编码为带类型标签的 JSON，
+使对象缓存（get_object/set_object）可以存放在 Redis 等只接受字符串的后端，
+并在 API 进程与 worker 进程之间共享。
+
+编码格式：
+- 基础类型（str/int/float/bool/None）原样输出
+- 带类型的值编码为 {"__type__": 标签, "__value__": 数据}
+- 标签为类的 "模块.限定名"；解码时优先查注册表，未注册的类仅允许从第一方模块按需导入
+
+安装了 orjson 时用它做 JSON 编解码，否则回退到标准库 json。
+"""
+import dataclasses
+import importlib
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+TYPE_KEY = "__type__"
+VALUE_KEY = "__value__"
+
+# 允许按需导入的第一方模块前缀（防止缓存内容驱动任意模块导入）
+_IMPORTABLE_PREFIXES = ("services.", "api.", "db.", "tradingagents.")
+
+
+class CacheSerializationError(Exception):
+    """缓存对象无法编码或解码"""
+
+
+class CacheSerializer:
+    """带类型注册表的缓存序列化器"""
+
+    def __init__(self):
+        self._types: Dict[str, Type] = {}
+
+    @staticmethod
+    def type_tag(cls: Type) -> str:
+        return f"{cls.__module__}.{cls.__qualname__}"
+
+    def register(self, cls: Type, tag: Optional[str] = None) -> Type:
+        """注册可缓存类型（Pydantic 模型、dataclass 或 Enum），可作装饰器使用"""
+        if not (
+            (isinstance(cls, type) and issubclass(cls, (BaseModel, Enum)))
+            or dataclasses.is_dataclass(cls)
+        ):
+            raise TypeError(f"Unsupported cache type: {cls!r}")
+        self._types[tag or self.type_tag(cls)] = cls
+        return cls
+
+    def _resolve(self, tag: str) -> Type:
+        cls = self._types.get(tag)
+        if cls is not None:
+            return cls
+
+        # 嵌套类等无法按 "模块.类名" 定位的类型需显式 register
+        module_name, _, qualname = tag.rpartition(".")
+        if not module_name.startswith(_IMPORTABLE_PREFIXES):
+            raise CacheSerializationError(f"Unknown cache type: {tag}")
+        try:
+            cls = getattr(importlib.import_module(module_name), qualname)
+            return self.register(cls, tag)
+        except (ImportError, AttributeError, TypeError) as e:
+            raise CacheSerializationError(f"Cannot resolve cache type {tag}: {e}") from e
+
+    # -------------------------------------------------------------------------
+    # 编码
+    # -------------------------------------------------------------------------
+
+    def _encode(self, obj: Any) -> Any:
+        # str/int 派生的 Enum 需先于基础类型判断
+        if isinstance(obj, Enum):
+            self._types.setdefault(self.type_tag(type(obj)), type(obj))
+            return {TYPE_KEY: self.type_tag(type(obj)), VALUE_KEY: obj.value}
+        if obj is None or isinstance(obj, (str, bool, int, float)):
+            return obj
+        if isinstance(obj, BaseModel):
+            self._types.setdefault(self.type_tag(type(obj)), type(obj))
+            return {TYPE_KEY: self.type_tag(type(obj)), VALUE_KEY: obj.model_dump(mode="json")}
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            self._types.setdefault(self.type_tag(type(obj)), type(obj))
+            fields = {f.name: self._encode(getattr(obj, f.name)) for f in dataclasses.fields(obj) if f.init}
+            return {TYPE_KEY: self.type_tag(type(obj)), VALUE_KEY: fields}
+        # datetime 是 date 的子类，需先判断
+        if isinstance(obj, datetime):
+            return {TYPE_KEY: "datetime", VALUE_KEY: obj.isoformat()}
+        if isinstance(obj, date):
+            return {TYPE_KEY: "date", VALUE_KEY: obj.isoformat()}
+        if isinstance(obj, dict):
+            return {str(k): self._encode(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._encode(v) for v in obj]
+        if isinstance(obj, tuple):
+            return {TYPE_KEY: "tuple", VALUE_KEY: [self._encode(v) for v in obj]}
+        if isinstance(obj, (set, frozenset)):
+            return {TYPE_KEY: "set", VALUE_KEY: [self._encode(v) for v in obj]}
+        raise CacheSerializationError(f"Unsupported cache value type: {type(obj).__name__}")
+
+    def dumps(self, obj: Any) -> str:
+        """编码为 JSON 字符串"""
+        encoded = self._encode(obj)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(encoded).decode("utf-8")
+        return json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+
+    # -------------------------------------------------------------------------
+    # 解码
+    # -------------------------------------------------------------------------
+
+    def _decode(self, obj: Any) -> Any:
+        if isinstance(obj, list):
+            return [self._decode(v) for v in obj]
+        if not isinstance(obj, dict):
+            return obj
+        if TYPE_KEY not in obj or VALUE_KEY not in obj:
+            return {k: self._decode(v) for k, v in obj.items()}
+
+        tag, value = obj[TYPE_KEY], obj[VALUE_KEY]
+        if tag == "datetime":
+            return datetime.fromisoformat(value)
+        if tag == "date":
+            return date.fromisoformat(value)
+        if tag == "tuple":
+            return tuple(self._decode(v) for v in value)
+        if tag == "set":
+            return {self._decode(v) for v in value}
+
+        cls = self._resolve(tag)
+        if issubclass(cls, Enum):
+            return cls(value)
+        if issubclass(cls, BaseModel):
+            return cls.model_validate(value)
+        return cls(**{k: self._decode(v) for k, v in value.items()})
+
+    def loads(self, data: str) -> Any:
+        """从 JSON 字符串解码"""
+        raw = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        return self._decode(raw)
+
+
+# 全局单例
+cache_serializer = CacheSerializer()
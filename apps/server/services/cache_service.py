@@ -11,24 +11,114 @@
 - 异步操作
 """
 import json
+import sys
+import time
+import uuid
 import asyncio
 import threading
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Any, Dict
+from typing import Optional, Any, AsyncIterator, Awaitable, Callable, Dict
 from abc import ABC, abstractmethod
 import structlog
 
 from config.settings import settings
+from services.cache_serializer import cache_serializer, CacheSerializationError
+from services.cache_metrics import cache_metrics
+from services.cache_compression import CacheCompressor
 
 logger = structlog.get_logger()
 
 
+class _LocalNotifier:
+    """
+    进程内键变更通知
+
+    每个被关注的键维护一个递增版本号，等待方先记录版本号再读取数据，
+    然后等待版本号变化，因此不会丢失读取与等待之间发生的通知。
+    关注按引用计数：每次 watch 对应一次 discard，最后一个关注方离开时才释放版本号，
+    其他关注方处于读取与等待之间时不会因此丢失通知。
+
+    工具层会在工作线程中用 asyncio.run 临时创建事件循环调用服务，
+    因此通知可能来自任意线程或事件循环：每个等待方在自己的循环上持有一个 asyncio.Event，
+    跨循环的通知通过 call_soon_threadsafe 投递到等待方所属的循环。
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._watchers: Dict[str, int] = {}
+        self._waiters: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, key: str) -> int:
+        """登记关注键（关注方计数加一），返回当前版本号"""
+        with self._lock:
+            self._watchers[key] = self._watchers.get(key, 0) + 1
+            return self._versions.setdefault(key, 0)
+
+    def version(self, key: str) -> int:
+        """获取键的当前版本号（不登记关注）"""
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    async def notify(self, key: str) -> None:
+        """键发生变更，唤醒所有等待方（无人关注的键直接忽略）"""
+        with self._lock:
+            if key not in self._versions:
+                return
+            self._versions[key] += 1
+            waiters = list(self._waiters.get(key, ()))
+
+        current = asyncio.get_running_loop()
+        for loop, event in waiters:
+            if loop is current:
+                event.set()
+                continue
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 等待方所在的循环已关闭
+                pass
+
+    async def wait(self, key: str, version: int, timeout: float) -> bool:
+        """等待键版本号偏离 version，超时返回 False（键需已通过 watch 登记关注）"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return True
+            self._waiters.setdefault(key, set()).add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(key)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[key]
+
+    def discard(self, key: str) -> None:
+        """取消一次关注，最后一个关注方离开时释放版本号"""
+        with self._lock:
+            count = self._watchers.get(key, 0) - 1
+            if count > 0:
+                self._watchers[key] = count
+                return
+            self._watchers.pop(key, None)
+            self._versions.pop(key, None)
+
+
 class CacheBackend(ABC):
     """缓存后端抽象基类"""
 
     def __init__(self):
         self.hits = 0
         self.misses = 0
+        self._notifier = _LocalNotifier()
 
     @abstractmethod
     async def get(self, key: str) -> Optional[str]:
@@ -55,6 +145,82 @@ class CacheBackend(ABC):
         """获取匹配模式的所有键"""
         pass
 
+    @abstractmethod
+    async def expire(self, key: str, ttl: int) -> bool:
+        """刷新键的 TTL，键不存在返回 False"""
+        pass
+
+    async def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        """批量获取，只返回命中的键（默认逐个读取，后端可覆盖为单次往返）"""
+        result = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """批量设置（共用同一个 TTL），全部成功返回 True"""
+        results = [await self.set(key, value, ttl) for key, value in mapping.items()]
+        return all(results)
+
+    async def delete_many(self, keys: list[str]) -> int:
+        """批量删除，返回实际删除的键数"""
+        return sum([await self.delete(key) for key in keys])
+
+    async def scan_iter(self, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        """按游标迭代匹配的键（默认基于 keys）"""
+        for key in await self.keys(pattern):
+            yield key
+
+    @abstractmethod
+    async def append_log(self, key: str, value: str, ttl: Optional[int] = None) -> int:
+        """向事件日志追加一条记录（O(1)），返回追加后的日志长度"""
+        pass
+
+    @abstractmethod
+    async def read_log(self, key: str, start: int = 0, end: int = -1) -> list[str]:
+        """按偏移读取事件日志 [start, end]（end=-1 表示读到末尾）"""
+        pass
+
+    @abstractmethod
+    async def log_length(self, key: str) -> int:
+        """获取事件日志长度，不存在返回 0"""
+        pass
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        """尝试获取互斥锁（不阻塞），ttl 秒后自动释放；已被占用返回 False"""
+        pass
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str) -> bool:
+        """释放互斥锁，仅当锁仍由 token 持有时生效"""
+        pass
+
+    async def notify(self, key: str) -> None:
+        """广播键变更通知（默认仅进程内）"""
+        await self._notifier.notify(key)
+
+    async def watch_notify(self, key: str) -> int:
+        """登记关注键的变更通知并返回版本号，结束时需调用一次 discard_notify"""
+        return self._notifier.watch(key)
+
+    async def get_notify_version(self, key: str) -> int:
+        """获取已关注键的通知版本号，需在读取数据之前调用"""
+        return self._notifier.version(key)
+
+    async def wait_notify(self, key: str, version: int, timeout: float) -> bool:
+        """等待键在 version 之后发生变更，超时返回 False"""
+        return await self._notifier.wait(key, version, timeout)
+
+    async def discard_notify(self, key: str) -> None:
+        """取消一次关注，最后一个关注方离开时释放版本号记录"""
+        self._notifier.discard(key)
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """登记应用主事件循环（默认无需处理）"""
+
     @abstractmethod
     async def close(self) -> None:
         """关闭连接"""
@@ -72,63 +238,201 @@ class CacheBackend(ABC):
         }
 
 
+def _estimate_size(value: Any) -> int:
+    """
+    估算缓存值占用的内存字节数
+
+    字符串直接取 sys.getsizeof；对象图（Pydantic 模型、dict、list 等）做一次
+    迭代遍历累加，自带 __sizeof__ 的对象（如 DataFrame）不再向下展开。
+    """
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+
+    total = 0
+    seen: set[int] = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None), datetime, type)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif type(obj).__sizeof__ is object.__sizeof__:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
 class MemoryCacheBackend(CacheBackend):
     """
     内存缓存后端
 
-    适用于单进程开发环境
+    适用于单进程开发环境。容量有界：
+    - 条目数与字节预算超限时按 LRU 淘汰
+    - 后台线程定期清理过期键，不依赖再次读取
+    - 同步（get_sync/set_sync）与异步路径共用同一把线程锁，
+      临界区内不含 await，不会阻塞事件循环
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+    ):
         super().__init__()
-        self._cache: Dict[str, tuple[str, Optional[datetime]]] = {}
-        self._lock = asyncio.Lock()
-        self._sync_lock = threading.Lock()
+        self.max_entries = max_entries if max_entries is not None else settings.MEMORY_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.MEMORY_CACHE_MAX_BYTES
+        self.sweep_interval = sweep_interval if sweep_interval is not None else settings.MEMORY_CACHE_SWEEP_INTERVAL
+
+        # 按访问顺序排列，队首为最久未使用
+        self._cache: "OrderedDict[str, tuple[Any, Optional[datetime]]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        # 事件日志：key -> (记录列表, 过期时间)，追加与按偏移读取均不复制整个日志
+        self._logs: Dict[str, tuple[list[str], Optional[datetime]]] = {}
+        # 互斥锁：key -> (持有者 token, 过期时间)
+        self._locks: Dict[str, tuple[str, datetime]] = {}
+        self._lock = threading.RLock()
+
+        self.evictions = 0
+        self.expirations = 0
+
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    # -------------------------------------------------------------------------
+    # 内部操作（调用方需持有 _lock）
+    # -------------------------------------------------------------------------
+
+    def _remove(self, key: str) -> None:
+        self._cache.pop(key, None)
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at and datetime.now() > expires_at:
+            self._remove(key)
+            self.expirations += 1
+            cache_metrics.record_expiration(key)
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _store(self, key: str, value: Any, ttl: Optional[int]) -> bool:
+        size = _estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            logger.warning("Cache value exceeds memory budget, not cached", key=key, size=size)
+            self._remove(key)
+            return False
 
-    def get_sync(self, key: str) -> Optional[str]:
+        self._remove(key)
+        expires_at = datetime.now() + timedelta(seconds=ttl) if ttl else None
+        self._cache[key] = (value, expires_at)
+        self._sizes[key] = size
+        self._total_bytes += size
+        self._evict_overflow()
+        self._ensure_sweeper()
+        return True
+
+    def _evict_overflow(self) -> None:
+        """淘汰最久未使用的条目直至满足容量约束"""
+        while self._cache and (
+            (self.max_entries and len(self._cache) > self.max_entries)
+            or (self.max_bytes and self._total_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._cache))
+            self._remove(oldest)
+            self.evictions += 1
+            cache_metrics.record_eviction(oldest)
+
+    def _purge_expired(self) -> int:
+        now = datetime.now()
+        expired = [k for k, (_, exp) in self._cache.items() if exp and now > exp]
+        for k in expired:
+            self._remove(k)
+            cache_metrics.record_expiration(k)
+        expired_logs = [k for k, (_, exp) in self._logs.items() if exp and now > exp]
+        for k in expired_logs:
+            del self._logs[k]
+        # 持有者崩溃未释放的锁
+        for k in [k for k, (_, exp) in self._locks.items() if now > exp]:
+            del self._locks[k]
+        self.expirations += len(expired) + len(expired_logs)
+        return len(expired) + len(expired_logs)
+
+    # -------------------------------------------------------------------------
+    # 后台过期清理
+    # -------------------------------------------------------------------------
+
+    def _ensure_sweeper(self) -> None:
+        if not self.sweep_interval or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, name="memory-cache-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._sweeper_stop.wait(self.sweep_interval):
+            self.sweep()
+
+    def sweep(self) -> int:
+        """清理所有过期键，返回清理数量"""
+        with self._lock:
+            return self._purge_expired()
+
+    # -------------------------------------------------------------------------
+    # 同步接口
+    # -------------------------------------------------------------------------
+
+    def get_sync(self, key: str) -> Optional[Any]:
         """线程安全的同步读取（用于非异步上下文）"""
-        with self._sync_lock:
-            if key not in self._cache:
-                self.misses += 1
-                return None
-            value, expires_at = self._cache[key]
-            if expires_at and datetime.now() > expires_at:
-                del self._cache[key]
-                self.misses += 1
-                return None
-            self.hits += 1
-            return value
+        with self._lock:
+            return self._lookup(key)
 
-    def set_sync(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+    def set_sync(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """线程安全的同步写入（用于非异步上下文）"""
-        with self._sync_lock:
-            expires_at = datetime.now() + timedelta(seconds=ttl) if ttl else None
-            self._cache[key] = (value, expires_at)
-            return True
+        with self._lock:
+            return self._store(key, value, ttl)
+
+    # -------------------------------------------------------------------------
+    # 异步接口
+    # -------------------------------------------------------------------------
 
     async def get(self, key: str) -> Optional[str]:
-        async with self._lock:
-            if key not in self._cache:
-                self.misses += 1
-                return None
-            value, expires_at = self._cache[key]
-            if expires_at and datetime.now() > expires_at:
-                del self._cache[key]
-                self.misses += 1
-                return None
-            self.hits += 1
-            return value
+        with self._lock:
+            return self._lookup(key)
 
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
-        async with self._lock:
-            expires_at = datetime.now() + timedelta(seconds=ttl) if ttl else None
-            self._cache[key] = (value, expires_at)
-            return True
+        with self._lock:
+            return self._store(key, value, ttl)
 
     async def delete(self, key: str) -> bool:
-        async with self._lock:
+        with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
+                return True
+            if key in self._logs:
+                del self._logs[key]
                 return True
             return False
 
@@ -136,23 +440,140 @@ class MemoryCacheBackend(CacheBackend):
         value = await self.get(key)
         return value is not None
 
+    async def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for key in keys:
+                value = self._lookup(key)
+                if value is not None:
+                    result[key] = value
+            return result
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        with self._lock:
+            results = [self._store(key, value, ttl) for key, value in mapping.items()]
+        return all(results)
+
+    async def delete_many(self, keys: list[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._remove(key)
+                    deleted += 1
+                elif key in self._logs:
+                    del self._logs[key]
+                    deleted += 1
+        return deleted
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        with self._lock:
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=ttl)
+            if key in self._cache:
+                value, old_expires = self._cache[key]
+                if old_expires and now > old_expires:
+                    self._remove(key)
+                    self.expirations += 1
+                    return False
+                self._cache[key] = (value, expires_at)
+                return True
+            records = self._get_live_log(key)
+            if records is not None:
+                self._logs[key] = (records, expires_at)
+                return True
+            return False
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        with self._lock:
+            now = datetime.now()
+            holder = self._locks.get(key)
+            if holder is not None and now <= holder[1]:
+                return False
+            self._locks[key] = (token, now + timedelta(seconds=ttl))
+            return True
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is None or holder[0] != token:
+                return False
+            del self._locks[key]
+            return True
+
+    def _get_live_log(self, key: str) -> Optional[list[str]]:
+        """获取未过期的事件日志（调用方需持有锁）"""
+        entry = self._logs.get(key)
+        if entry is None:
+            return None
+        records, expires_at = entry
+        if expires_at and datetime.now() > expires_at:
+            del self._logs[key]
+            self.expirations += 1
+            return None
+        return records
+
+    async def append_log(self, key: str, value: str, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            records = self._get_live_log(key)
+            if records is None:
+                records = []
+            records.append(value)
+            expires_at = datetime.now() + timedelta(seconds=ttl) if ttl else None
+            self._logs[key] = (records, expires_at)
+            length = len(records)
+            self._ensure_sweeper()
+        await self.notify(key)
+        return length
+
+    async def read_log(self, key: str, start: int = 0, end: int = -1) -> list[str]:
+        with self._lock:
+            records = self._get_live_log(key)
+            if records is None:
+                return []
+            stop = None if end == -1 else end + 1
+            return records[start:stop]
+
+    async def log_length(self, key: str) -> int:
+        with self._lock:
+            records = self._get_live_log(key)
+            return len(records) if records is not None else 0
+
     async def keys(self, pattern: str) -> list[str]:
-        """简单的模式匹配（仅支持 prefix*）"""
-        async with self._lock:
+        """简单的模式匹配（仅支持 prefix*），包含普通键与事件日志键"""
+        with self._lock:
             # 清理过期键
-            now = datetime.now()
-            expired = [k for k, (_, exp) in self._cache.items() if exp and now > exp]
-            for k in expired:
-                del self._cache[k]
+            self._purge_expired()
 
             # 模式匹配
+            all_keys = list(self._cache.keys()) + list(self._logs.keys())
             if pattern.endswith("*"):
                 prefix = pattern[:-1]
-                return [k for k in self._cache.keys() if k.startswith(prefix)]
-            return [k for k in self._cache.keys() if k == pattern]
+                return [k for k in all_keys if k.startswith(prefix)]
+            return [k for k in all_keys if k == pattern]
 
     async def close(self) -> None:
-        self._cache.clear()
+        self._sweeper_stop.set()
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self._logs.clear()
+            self._locks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "event_logs": len(self._logs),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            })
+        return stats
 
 
 class RedisCacheBackend(CacheBackend):
@@ -160,36 +581,102 @@ class RedisCacheBackend(CacheBackend):
     Redis 缓存后端
 
     适用于生产环境，支持分布式
+
+    redis.asyncio 的连接绑定在创建它的事件循环上，而工具层会在临时事件循环
+    （asyncio.run / run_until_complete）上调用服务，因此客户端按事件循环分别维护，
+    已关闭循环的客户端在下次创建客户端时丢弃。
+
+    Pub/Sub 监听任务只运行一份：登记了应用主事件循环（bind_loop）时统一在主循环上启动，
+    工具层临时事件循环上的调用也视其为有效，不再各自订阅
     """
 
+    # 键变更通知频道：消息体为发生变更的键
+    NOTIFY_CHANNEL = "cache:notify"
+
+    # 单条 MGET / DEL 命令携带的键数上限，避免超大命令阻塞 Redis
+    BATCH_SIZE = 500
+
+    # 仅当锁仍由调用方持有时才删除，避免误删超时后被他人重新获取的锁
+    _RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
     def __init__(self, redis_url: str):
         super().__init__()
         self._redis_url = redis_url
-        self._client: Optional[Any] = None
+        # 大值透明压缩（读取时按头部识别，未压缩的旧值原样返回）
+        self._compressor = CacheCompressor()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        self._pubsub: Optional[Any] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._listener_starting: Optional[asyncio.Future] = None
+        self._listener_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 频道 -> 消息处理函数，由唯一的监听任务分发
+        self._channel_handlers: Dict[str, Callable[[str], Awaitable[None]]] = {
+            self.NOTIFY_CHANNEL: self._notifier.notify,
+        }
+
+    def add_channel_handler(self, channel: str, handler: Callable[[str], Awaitable[None]]) -> None:
+        """注册 Pub/Sub 频道处理函数（需在监听任务启动前调用）"""
+        self._channel_handlers[channel] = handler
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """登记承载通知监听任务的应用主事件循环（关闭时传入 None）"""
+        self._listener_loop = loop
+
+    @property
+    def listener_active(self) -> bool:
+        """通知监听任务是否在运行（登记的主循环上，或未登记时当前事件循环上）"""
+        task = self._listener_task
+        if task is None or task.done():
+            return False
+        loop = task.get_loop()
+        if loop is self._listener_loop:
+            return loop.is_running()
+        try:
+            return loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
 
     async def _get_client(self):
-        """延迟初始化 Redis 客户端"""
-        if self._client is None:
-            try:
-                import redis.asyncio as aioredis
-                self._client = aioredis.from_url(
-                    self._redis_url,
-                    encoding="utf-8",
-                    decode_responses=True
-                )
-                logger.info("Redis connection established", url=self._redis_url)
-            except ImportError:
-                logger.error("redis package not installed")
-                raise
-            except Exception as e:
-                logger.error("Redis connection failed", error=str(e))
-                raise
-        return self._client
+        """获取当前事件循环的 Redis 客户端（延迟初始化）"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is not None:
+            return client
+
+        try:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(
+                self._redis_url,
+                encoding="utf-8",
+                decode_responses=True
+            )
+        except ImportError:
+            logger.error("redis package not installed")
+            raise
+        except Exception as e:
+            logger.error("Redis connection failed", error=str(e))
+            raise
+
+        with self._clients_lock:
+            # 临时事件循环结束后其客户端不可再用，释放引用以便连接随循环回收
+            for closed in [other for other in self._clients.keys() if other.is_closed()]:
+                del self._clients[closed]
+            first = not self._clients
+            client = self._clients.setdefault(loop, client)
+        if first:
+            logger.info("Redis connection established", url=self._redis_url)
+        return client
 
     async def get(self, key: str) -> Optional[str]:
         try:
             client = await self._get_client()
-            value = await client.get(key)
+            value = self._compressor.decode(await client.get(key))
             if value is not None:
                 self.hits += 1
             else:
@@ -199,9 +686,28 @@ class RedisCacheBackend(CacheBackend):
             logger.warning("Redis get failed", key=key, error=str(e))
             return None
 
+    async def get_with_ttl(self, key: str) -> tuple[Optional[str], Optional[int]]:
+        """在一次往返中读取值与剩余 TTL（秒，无过期时为 None）"""
+        try:
+            client = await self._get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                value, ttl = await pipe.execute()
+            value = self._compressor.decode(value)
+            if value is None:
+                self.misses += 1
+                return None, None
+            self.hits += 1
+            return value, (ttl if ttl is not None and ttl >= 0 else None)
+        except Exception as e:
+            logger.warning("Redis get failed", key=key, error=str(e))
+            return None, None
+
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
         try:
             client = await self._get_client()
+            value = self._compressor.encode(value)
             if ttl:
                 await client.setex(key, ttl, value)
             else:
@@ -229,17 +735,483 @@ class RedisCacheBackend(CacheBackend):
             return False
 
     async def keys(self, pattern: str) -> list[str]:
+        """基于 SCAN 收集匹配的键，不使用会阻塞服务器的 KEYS"""
+        return [key async for key in self.scan_iter(pattern)]
+
+    async def scan_iter(self, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        try:
+            client = await self._get_client()
+            async for key in client.scan_iter(match=pattern, count=count):
+                yield key
+        except Exception as e:
+            logger.warning("Redis scan failed", pattern=pattern, error=str(e))
+
+    async def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
         try:
             client = await self._get_client()
-            return await client.keys(pattern)
+            result = {}
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                chunk = keys[i:i + self.BATCH_SIZE]
+                for key, value in zip(chunk, await client.mget(chunk)):
+                    value = self._compressor.decode(value)
+                    if value is not None:
+                        result[key] = value
+            self.hits += len(result)
+            self.misses += len(keys) - len(result)
+            return result
         except Exception as e:
-            logger.warning("Redis keys failed", pattern=pattern, error=str(e))
+            logger.warning("Redis get_many failed", count=len(keys), error=str(e))
+            return {}
+
+    async def get_many_with_ttl(self, keys: list[str]) -> Dict[str, tuple[str, Optional[int]]]:
+        """一次 pipeline 读取多个键的值与剩余 TTL，只返回命中的键"""
+        if not keys:
+            return {}
+        try:
+            client = await self._get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                    pipe.ttl(key)
+                replies = await pipe.execute()
+            result = {}
+            for i, key in enumerate(keys):
+                value, ttl = self._compressor.decode(replies[2 * i]), replies[2 * i + 1]
+                if value is not None:
+                    result[key] = (value, ttl if ttl is not None and ttl >= 0 else None)
+            self.hits += len(result)
+            self.misses += len(keys) - len(result)
+            return result
+        except Exception as e:
+            logger.warning("Redis get_many failed", count=len(keys), error=str(e))
+            return {}
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        if not mapping:
+            return True
+        try:
+            client = await self._get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, self._compressor.encode(value), ex=ttl or None)
+                results = await pipe.execute()
+            return all(results)
+        except Exception as e:
+            logger.warning("Redis set_many failed", count=len(mapping), error=str(e))
+            return False
+
+    async def delete_many(self, keys: list[str]) -> int:
+        if not keys:
+            return 0
+        try:
+            client = await self._get_client()
+            deleted = 0
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                deleted += await client.delete(*keys[i:i + self.BATCH_SIZE])
+            return deleted
+        except Exception as e:
+            logger.warning("Redis delete_many failed", count=len(keys), error=str(e))
+            return 0
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        try:
+            client = await self._get_client()
+            return bool(await client.expire(key, ttl))
+        except Exception as e:
+            logger.warning("Redis expire failed", key=key, error=str(e))
+            return False
+
+    async def append_log(self, key: str, value: str, ttl: Optional[int] = None) -> int:
+        """RPUSH + EXPIRE 在同一个 pipeline 中执行，原子且只传输新记录"""
+        try:
+            client = await self._get_client()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.rpush(key, value)
+                if ttl:
+                    pipe.expire(key, ttl)
+                pipe.publish(self.NOTIFY_CHANNEL, key)
+                results = await pipe.execute()
+            return int(results[0])
+        except Exception as e:
+            logger.warning("Redis append_log failed", key=key, error=str(e))
+            return 0
+
+    async def read_log(self, key: str, start: int = 0, end: int = -1) -> list[str]:
+        try:
+            client = await self._get_client()
+            return await client.lrange(key, start, end)
+        except Exception as e:
+            logger.warning("Redis read_log failed", key=key, error=str(e))
             return []
 
+    async def log_length(self, key: str) -> int:
+        try:
+            client = await self._get_client()
+            return await client.llen(key)
+        except Exception as e:
+            logger.warning("Redis log_length failed", key=key, error=str(e))
+            return 0
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        """SET NX PX 获取锁；Redis 不可用时返回 True，退化为不加锁"""
+        try:
+            client = await self._get_client()
+            return bool(await client.set(key, token, nx=True, px=max(1, int(ttl * 1000))))
+        except Exception as e:
+            logger.warning("Redis acquire_lock failed", key=key, error=str(e))
+            return True
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        try:
+            client = await self._get_client()
+            return bool(await client.eval(self._RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.warning("Redis release_lock failed", key=key, error=str(e))
+            return False
+
+    async def notify(self, key: str) -> None:
+        """通过 Pub/Sub 广播，所有进程（含本进程）的监听任务负责唤醒本地等待方"""
+        try:
+            client = await self._get_client()
+            await client.publish(self.NOTIFY_CHANNEL, key)
+        except Exception as e:
+            logger.warning("Redis notify failed", key=key, error=str(e))
+            await self._notifier.notify(key)
+
+    async def watch_notify(self, key: str) -> int:
+        # 先确保已订阅，再返回版本号，避免错过订阅建立前的通知
+        await self._ensure_listener()
+        return self._notifier.watch(key)
+
+    async def get_notify_version(self, key: str) -> int:
+        await self._ensure_listener()
+        return self._notifier.version(key)
+
+    async def _ensure_listener(self) -> None:
+        """延迟启动进程内唯一的通知监听任务（登记了主循环时转交主循环启动）"""
+        if self.listener_active:
+            return
+        loop = self._listener_loop
+        if loop is None or loop is asyncio.get_running_loop():
+            await self._start_listener()
+            return
+        if loop.is_closed() or not loop.is_running():
+            # 主循环已停止：不在临时循环上订阅，L1 不回填，等待方按超时轮询
+            return
+        try:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._start_listener(), loop))
+        except Exception as e:
+            logger.warning("Redis notify subscription failed", error=str(e))
+
+    async def _start_listener(self) -> None:
+        """在当前事件循环上订阅并启动监听任务，替换旧任务（并发调用只订阅一次）"""
+        if self.listener_active:
+            return
+        current = asyncio.get_running_loop()
+        starting = self._listener_starting
+        if starting is not None and not starting.done() and starting.get_loop() is current:
+            await asyncio.shield(starting)
+            return
+
+        starting = self._listener_starting = current.create_future()
+        try:
+            await self._stop_listener()
+            client = await self._get_client()
+            pubsub = client.pubsub()
+            await pubsub.subscribe(*self._channel_handlers)
+            self._pubsub = pubsub
+            self._listener_task = asyncio.create_task(self._listen(pubsub))
+        except Exception as e:
+            # 订阅失败时等待方会退化为按超时轮询
+            logger.warning("Redis notify subscription failed", error=str(e))
+        finally:
+            starting.set_result(None)
+
+    async def _stop_listener(self) -> None:
+        """取消监听任务并关闭其订阅连接（在任务所属的事件循环上执行）"""
+        task, pubsub = self._listener_task, self._pubsub
+        self._listener_task = self._pubsub = None
+        if task is None and pubsub is None:
+            return
+
+        async def stop():
+            if task is not None:
+                task.cancel()
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+        loop = task.get_loop() if task is not None else asyncio.get_running_loop()
+        if loop is asyncio.get_running_loop():
+            await stop()
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(stop(), loop)
+        # 所属循环已停止时，任务与连接随该循环一同释放
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                handler = self._channel_handlers.get(message.get("channel"))
+                if handler is not None:
+                    await handler(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Redis notify listener stopped", error=str(e))
+
     async def close(self) -> None:
-        if self._client:
-            await self._client.close()
-            self._client = None
+        await self._stop_listener()
+        with self._clients_lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+
+        current = asyncio.get_running_loop()
+        for loop, client in clients:
+            if loop is current:
+                await client.close()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["compression"] = self._compressor.get_stats()
+        return stats
+
+
+class TieredCacheBackend(CacheBackend):
+    """
+    两级缓存后端：进程内 L1（MemoryCacheBackend）+ Redis L2
+
+    - 读：L1 命中直接返回；未命中读 L2 并回填 L1（TTL 取 L1 上限与 L2 剩余 TTL 的较小值）
+    - 写/删：先写 L2，再更新本地 L1，并通过 Pub/Sub 通知其他进程失效对应 L1 键
+    - 只有匹配 l1_prefixes 的键进入 L1；事件日志与通知直接使用 L2
+    - 失效监听未就绪时不回填 L1，避免错过其他进程的失效消息
+    """
+
+    INVALIDATE_CHANNEL = "cache:invalidate"
+
+    def __init__(
+        self,
+        redis_url: str,
+        l1_max_entries: Optional[int] = None,
+        l1_max_bytes: Optional[int] = None,
+        l1_ttl: Optional[int] = None,
+        l1_prefixes: Optional[list[str]] = None,
+    ):
+        super().__init__()
+        self.l2 = RedisCacheBackend(redis_url)
+        self.l1 = MemoryCacheBackend(
+            max_entries=l1_max_entries if l1_max_entries is not None else settings.CACHE_L1_MAX_ENTRIES,
+            max_bytes=l1_max_bytes if l1_max_bytes is not None else settings.CACHE_L1_MAX_BYTES,
+        )
+        self.l1_ttl = l1_ttl if l1_ttl is not None else settings.CACHE_L1_TTL
+        if l1_prefixes is None:
+            l1_prefixes = [p.strip() for p in settings.CACHE_L1_PREFIXES.split(",") if p.strip()]
+        self.l1_prefixes = tuple(l1_prefixes)
+        # 本进程标识，忽略自己发出的失效消息
+        self._origin = uuid.uuid4().hex
+        self.l1_hits = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        self.l2.add_channel_handler(self.INVALIDATE_CHANNEL, self._on_invalidate)
+
+    def _l1_eligible(self, key: str) -> bool:
+        # 未配置前缀时所有键都进入 L1
+        return not self.l1_prefixes or key.startswith(self.l1_prefixes)
+
+    async def _on_invalidate(self, message: str) -> None:
+        origin, _, key = message.partition("|")
+        if origin == self._origin or not key:
+            return
+        self.invalidations_received += 1
+        await self.l1.delete(key)
+
+    async def _publish_invalidation(self, key: str) -> None:
+        if not self._l1_eligible(key):
+            return
+        try:
+            client = await self.l2._get_client()
+            await client.publish(self.INVALIDATE_CHANNEL, f"{self._origin}|{key}")
+            self.invalidations_sent += 1
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed", key=key, error=str(e))
+
+    async def _publish_invalidations(self, keys: list[str]) -> None:
+        """批量广播失效（同一个 pipeline）"""
+        keys = [key for key in keys if self._l1_eligible(key)]
+        if not keys:
+            return
+        try:
+            client = await self.l2._get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.publish(self.INVALIDATE_CHANNEL, f"{self._origin}|{key}")
+                await pipe.execute()
+            self.invalidations_sent += len(keys)
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed", count=len(keys), error=str(e))
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self._l1_eligible(key):
+            value = await self.l2.get(key)
+        else:
+            value = await self.l1.get(key)
+            if value is not None:
+                self.l1_hits += 1
+                self.hits += 1
+                return value
+
+            await self.l2._ensure_listener()
+            value, remaining = await self.l2.get_with_ttl(key)
+            if value is not None and self.l2.listener_active:
+                l1_ttl = min(self.l1_ttl, remaining) if remaining else self.l1_ttl
+                if l1_ttl > 0:
+                    await self.l1.set(key, value, ttl=l1_ttl)
+
+        if value is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        ok = await self.l2.set(key, value, ttl)
+        if self._l1_eligible(key):
+            await self.l2._ensure_listener()
+            if ok and self.l2.listener_active:
+                l1_ttl = min(self.l1_ttl, ttl) if ttl else self.l1_ttl
+                await self.l1.set(key, value, ttl=l1_ttl)
+            else:
+                await self.l1.delete(key)
+            await self._publish_invalidation(key)
+        return ok
+
+    async def delete(self, key: str) -> bool:
+        await self.l1.delete(key)
+        result = await self.l2.delete(key)
+        await self._publish_invalidation(key)
+        return result
+
+    async def exists(self, key: str) -> bool:
+        if self._l1_eligible(key) and await self.l1.get(key) is not None:
+            return True
+        return await self.l2.exists(key)
+
+    async def keys(self, pattern: str) -> list[str]:
+        return await self.l2.keys(pattern)
+
+    async def scan_iter(self, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        async for key in self.l2.scan_iter(pattern, count):
+            yield key
+
+    async def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            if self._l1_eligible(key):
+                value = await self.l1.get(key)
+                if value is not None:
+                    self.l1_hits += 1
+                    result[key] = value
+                    continue
+            missing.append(key)
+
+        if missing:
+            eligible = [key for key in missing if self._l1_eligible(key)]
+            if eligible:
+                await self.l2._ensure_listener()
+            fetched = await self.l2.get_many_with_ttl(missing)
+            fill_l1 = bool(eligible) and self.l2.listener_active
+            for key, (value, remaining) in fetched.items():
+                result[key] = value
+                if fill_l1 and self._l1_eligible(key):
+                    l1_ttl = min(self.l1_ttl, remaining) if remaining else self.l1_ttl
+                    if l1_ttl > 0:
+                        await self.l1.set(key, value, ttl=l1_ttl)
+
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        ok = await self.l2.set_many(mapping, ttl)
+        eligible = {key: value for key, value in mapping.items() if self._l1_eligible(key)}
+        if eligible:
+            await self.l2._ensure_listener()
+            if ok and self.l2.listener_active:
+                l1_ttl = min(self.l1_ttl, ttl) if ttl else self.l1_ttl
+                await self.l1.set_many(eligible, ttl=l1_ttl)
+            else:
+                await self.l1.delete_many(list(eligible))
+            await self._publish_invalidations(list(eligible))
+        return ok
+
+    async def delete_many(self, keys: list[str]) -> int:
+        await self.l1.delete_many(keys)
+        deleted = await self.l2.delete_many(keys)
+        await self._publish_invalidations(keys)
+        return deleted
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        return await self.l2.expire(key, ttl)
+
+    async def append_log(self, key: str, value: str, ttl: Optional[int] = None) -> int:
+        return await self.l2.append_log(key, value, ttl)
+
+    async def read_log(self, key: str, start: int = 0, end: int = -1) -> list[str]:
+        return await self.l2.read_log(key, start, end)
+
+    async def log_length(self, key: str) -> int:
+        return await self.l2.log_length(key)
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        return await self.l2.acquire_lock(key, token, ttl)
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        return await self.l2.release_lock(key, token)
+
+    async def notify(self, key: str) -> None:
+        await self.l2.notify(key)
+
+    async def watch_notify(self, key: str) -> int:
+        return await self.l2.watch_notify(key)
+
+    async def get_notify_version(self, key: str) -> int:
+        return await self.l2.get_notify_version(key)
+
+    async def wait_notify(self, key: str, version: int, timeout: float) -> bool:
+        return await self.l2.wait_notify(key, version, timeout)
+
+    async def discard_notify(self, key: str) -> None:
+        await self.l2.discard_notify(key)
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        self.l2.bind_loop(loop)
+
+    async def close(self) -> None:
+        await self.l1.close()
+        await self.l2.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            "l1_hits": self.l1_hits,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "l1": self.l1.get_stats(),
+            "l2": self.l2.get_stats(),
+        })
+        return stats
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
 
 
 class CacheService:
@@ -247,13 +1219,25 @@ class CacheService:
     统一缓存服务
 
     自动选择后端：
-    - 配置了 REDIS_URL 且可用时使用 Redis
+    - 配置了 REDIS_URL 且可用时使用 Redis（CACHE_L1_ENABLED 时前置进程内 L1）
     - 否则使用内存缓存
     """
 
     def __init__(self):
         self._backend: Optional[CacheBackend] = None
         self._initialized = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        登记应用主事件循环（应用启动时调用，关闭时传入 None）
+
+        Redis 的通知监听任务统一在该循环上运行；工具层 asyncio.run 创建的临时循环
+        复用这一份订阅，不再各自订阅并随临时循环泄漏
+        """
+        self._loop = loop
+        if self._backend is not None:
+            self._backend.bind_loop(loop)
 
     async def _ensure_initialized(self):
         """确保后端已初始化"""
@@ -264,10 +1248,15 @@ class CacheService:
 
         if redis_url:
             try:
-                self._backend = RedisCacheBackend(redis_url)
+                if settings.CACHE_L1_ENABLED:
+                    self._backend = TieredCacheBackend(redis_url)
+                else:
+                    self._backend = RedisCacheBackend(redis_url)
+                self._backend.bind_loop(self._loop)
                 # 测试连接
-                await self._backend.set("_test_", "1", ttl=1)
-                logger.info("Using Redis cache backend")
+                if not await self._backend.set("_test_", "1", ttl=1):
+                    raise ConnectionError("Redis test write failed")
+                logger.info("Using Redis cache backend", l1_enabled=settings.CACHE_L1_ENABLED)
             except Exception as e:
                 logger.warning("Redis unavailable, falling back to memory", error=str(e))
                 self._backend = MemoryCacheBackend()
@@ -280,19 +1269,44 @@ class CacheService:
     async def get(self, key: str) -> Optional[str]:
         """获取缓存"""
         await self._ensure_initialized()
-        return await self._backend.get(key)
+        start = time.perf_counter()
+        value = await self._backend.get(key)
+        cache_metrics.record_get(key, value, _elapsed_ms(start))
+        return value
 
-    def get_sync(self, key: str) -> Optional[str]:
+    def get_sync(self, key: str) -> Optional[Any]:
         """
-        同步获取缓存（仅限内存后端）
-        警告：如果当前后端是 Redis，此方法将返回 None 并记录警告
+        同步获取缓存（仅限内存后端，用于无法 await 的同步上下文）
+        异步代码中缓存对象请使用 get_object，它在所有后端上都可用
         """
         if not self._initialized or not isinstance(self._backend, MemoryCacheBackend):
             if self._initialized:
                 logger.warning("get_sync called but backend is not MemoryCacheBackend")
             return None
 
-        return self._backend.get_sync(key)
+        start = time.perf_counter()
+        value = self._backend.get_sync(key)
+        cache_metrics.record_get(key, value, _elapsed_ms(start))
+        return value
+
+    async def get_object(self, key: str) -> Optional[Any]:
+        """
+        获取缓存对象（Pydantic 模型、dataclass 及其容器）
+
+        内存后端直接返回缓存的对象；其他后端按类型标签反序列化
+        """
+        await self._ensure_initialized()
+        if isinstance(self._backend, MemoryCacheBackend):
+            return self.get_sync(key)
+
+        value = await self.get(key)
+        if value is None:
+            return None
+        try:
+            return cache_serializer.loads(value)
+        except (CacheSerializationError, ValueError) as e:
+            logger.warning("Cached object decode failed", key=key, error=str(e))
+            return None
 
     async def get_json(self, key: str) -> Optional[Any]:
         """获取 JSON 缓存"""
@@ -307,16 +1321,41 @@ class CacheService:
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
         """设置缓存"""
         await self._ensure_initialized()
-        return await self._backend.set(key, value, ttl)
+        start = time.perf_counter()
+        ok = await self._backend.set(key, value, ttl)
+        cache_metrics.record_set(key, value, _elapsed_ms(start))
+        return ok
 
-    def set_sync(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+    def set_sync(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
-        同步设置缓存（仅限内存后端）
+        同步设置缓存（仅限内存后端，用于无法 await 的同步上下文）
+        异步代码中缓存对象请使用 set_object
         """
         if not self._initialized or not isinstance(self._backend, MemoryCacheBackend):
             return False
 
-        return self._backend.set_sync(key, value, ttl)
+        start = time.perf_counter()
+        ok = self._backend.set_sync(key, value, ttl)
+        cache_metrics.record_set(key, value, _elapsed_ms(start))
+        return ok
+
+    async def set_object(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        设置缓存对象
+
+        内存后端直接保存对象引用；其他后端用带类型标签的序列化器编码，
+        因此 API 进程与 worker 进程可以共享同一份对象缓存
+        """
+        await self._ensure_initialized()
+        if isinstance(self._backend, MemoryCacheBackend):
+            return self.set_sync(key, value, ttl)
+
+        try:
+            payload = cache_serializer.dumps(value)
+        except CacheSerializationError as e:
+            logger.warning("Cache object encode failed", key=key, error=str(e))
+            return False
+        return await self.set(key, payload, ttl)
 
     async def set_json(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """设置 JSON 缓存"""
@@ -325,6 +1364,7 @@ class CacheService:
     async def delete(self, key: str) -> bool:
         """删除缓存"""
         await self._ensure_initialized()
+        cache_metrics.record_delete(key)
         return await self._backend.delete(key)
 
     async def exists(self, key: str) -> bool:
@@ -337,6 +1377,135 @@ class CacheService:
         await self._ensure_initialized()
         return await self._backend.keys(pattern)
 
+    async def scan_iter(self, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        """按游标迭代匹配的键（Redis 使用 SCAN，不阻塞服务器）"""
+        await self._ensure_initialized()
+        async for key in self._backend.scan_iter(pattern, count):
+            yield key
+
+    async def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        """批量获取（Redis 使用 MGET），只返回命中的键"""
+        await self._ensure_initialized()
+        start = time.perf_counter()
+        values = await self._backend.get_many(keys)
+        # 批量操作的耗时按键均摊
+        per_key_ms = _elapsed_ms(start) / len(keys) if keys else 0.0
+        for key in keys:
+            cache_metrics.record_get(key, values.get(key), per_key_ms)
+        return values
+
+    async def get_many_json(self, keys: list[str]) -> Dict[str, Any]:
+        """批量获取 JSON 缓存，跳过无法解析的值"""
+        result = {}
+        for key, value in (await self.get_many(keys)).items():
+            try:
+                result[key] = json.loads(value)
+            except (TypeError, json.JSONDecodeError):
+                continue
+        return result
+
+    async def get_many_objects(self, keys: list[str]) -> Dict[str, Any]:
+        """批量获取缓存对象（与 get_object 对应）"""
+        values = await self.get_many(keys)
+        if isinstance(self._backend, MemoryCacheBackend):
+            return values
+
+        result = {}
+        for key, value in values.items():
+            try:
+                result[key] = cache_serializer.loads(value)
+            except (CacheSerializationError, ValueError) as e:
+                logger.warning("Cached object decode failed", key=key, error=str(e))
+        return result
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """批量设置（Redis 使用单个 pipeline）"""
+        await self._ensure_initialized()
+        start = time.perf_counter()
+        ok = await self._backend.set_many(mapping, ttl)
+        per_key_ms = _elapsed_ms(start) / len(mapping) if mapping else 0.0
+        for key, value in mapping.items():
+            cache_metrics.record_set(key, value, per_key_ms)
+        return ok
+
+    async def set_many_objects(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """批量设置缓存对象（与 set_object 对应，无法编码的值跳过）"""
+        if not mapping:
+            return True
+        await self._ensure_initialized()
+        if isinstance(self._backend, MemoryCacheBackend):
+            return await self.set_many(mapping, ttl)
+
+        payloads = {}
+        for key, value in mapping.items():
+            try:
+                payloads[key] = cache_serializer.dumps(value)
+            except CacheSerializationError as e:
+                logger.warning("Cache object encode failed", key=key, error=str(e))
+        return await self.set_many(payloads, ttl) and len(payloads) == len(mapping)
+
+    async def delete_many(self, keys: list[str]) -> int:
+        """批量删除，返回删除的键数"""
+        await self._ensure_initialized()
+        for key in keys:
+            cache_metrics.record_delete(key)
+        return await self._backend.delete_many(keys)
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        """刷新键的 TTL"""
+        await self._ensure_initialized()
+        return await self._backend.expire(key, ttl)
+
+    async def append_log(self, key: str, value: str, ttl: Optional[int] = None) -> int:
+        """追加事件日志记录"""
+        await self._ensure_initialized()
+        return await self._backend.append_log(key, value, ttl)
+
+    async def read_log(self, key: str, start: int = 0, end: int = -1) -> list[str]:
+        """按偏移读取事件日志"""
+        await self._ensure_initialized()
+        return await self._backend.read_log(key, start, end)
+
+    async def log_length(self, key: str) -> int:
+        """获取事件日志长度"""
+        await self._ensure_initialized()
+        return await self._backend.log_length(key)
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        """尝试获取互斥锁（Redis 后端跨进程生效）"""
+        await self._ensure_initialized()
+        return await self._backend.acquire_lock(key, token, ttl)
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        """释放互斥锁"""
+        await self._ensure_initialized()
+        return await self._backend.release_lock(key, token)
+
+    async def notify(self, key: str) -> None:
+        """广播键变更通知"""
+        await self._ensure_initialized()
+        await self._backend.notify(key)
+
+    async def watch_notify(self, key: str) -> int:
+        """登记关注键的变更通知，返回版本号（每次调用对应一次 discard_notify）"""
+        await self._ensure_initialized()
+        return await self._backend.watch_notify(key)
+
+    async def get_notify_version(self, key: str) -> int:
+        """获取已关注键的通知版本号（读取数据前调用）"""
+        await self._ensure_initialized()
+        return await self._backend.get_notify_version(key)
+
+    async def wait_notify(self, key: str, version: int, timeout: float) -> bool:
+        """等待键变更通知"""
+        await self._ensure_initialized()
+        return await self._backend.wait_notify(key, version, timeout)
+
+    async def discard_notify(self, key: str) -> None:
+        """取消一次关注"""
+        if self._backend:
+            await self._backend.discard_notify(key)
+
     async def close(self) -> None:
         """关闭连接"""
         if self._backend:
@@ -379,71 +1548,113 @@ class CacheService:
         return await self.delete(f"{self.TASK_PREFIX}{task_id}")
 
     async def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
-        """获取所有任务"""
-        keys = await self.keys(f"{self.TASK_PREFIX}*")
-        tasks = {}
-        for key in keys:
-            task_id = key.replace(self.TASK_PREFIX, "")
-            task = await self.get_task(task_id)
-            if task:
-                tasks[task_id] = task
-        return tasks
+        """获取所有任务（SCAN 遍历键 + 一次批量读取）"""
+        keys = [key async for key in self.scan_iter(f"{self.TASK_PREFIX}*")]
+        values = await self.get_many_json(keys)
+        return {
+            key[len(self.TASK_PREFIX):]: task
+            for key, task in values.items()
+            if task
+        }
 
     # =========================================================================
     # SSE 事件管理（支持分布式）
+    #
+    # 每个任务拆成两个键：
+    # - sse_events:{task_id}      元数据（status / symbol），体积固定
+    # - sse_events:{task_id}:log  只追加的事件日志，偏移即事件序号
+    # 推送事件只追加一条记录，不再读改写整个事件文档
+    #
+    # 事件日志追加和状态变更都会在日志键上发出通知，
+    # 订阅方通过 watch_sse_events 登记关注，每次读取前用 get_sse_events_version 取版本号，
+    # 再经 wait_sse_events 被即时唤醒，无需轮询；流结束时 unwatch_sse_events
     # =========================================================================
 
+    SSE_LOG_SUFFIX = ":log"
+
+    def _sse_meta_key(self, task_id: str) -> str:
+        return f"{self.SSE_EVENT_PREFIX}{task_id}"
+
+    def _sse_log_key(self, task_id: str) -> str:
+        return f"{self.SSE_EVENT_PREFIX}{task_id}{self.SSE_LOG_SUFFIX}"
+
     async def init_sse_task(self, task_id: str, symbol: str) -> bool:
         """初始化 SSE 任务事件队列"""
+        # 任务重试时重新初始化，丢弃上一次执行残留的事件
+        await self.delete(self._sse_log_key(task_id))
         data = {
             "status": "running",
             "symbol": symbol,
-            "events": [],
-            "event_count": 0
         }
-        return await self.set_json(f"{self.SSE_EVENT_PREFIX}{task_id}", data, self.SSE_EVENT_TTL)
+        return await self.set_json(self._sse_meta_key(task_id), data, self.SSE_EVENT_TTL)
 
     async def push_sse_event(self, task_id: str, event_type: str, event_data: Any) -> bool:
-        """推送 SSE 事件"""
-        key = f"{self.SSE_EVENT_PREFIX}{task_id}"
-        task = await self.get_json(key)
-        if not task:
+        """推送 SSE 事件（O(1) 追加）"""
+        # 续期元数据的同时确认任务存在，长时间分析不会中途过期
+        if not await self.expire(self._sse_meta_key(task_id), self.SSE_EVENT_TTL):
             return False
 
-        task["events"].append({
-            "event": event_type,
-            "data": event_data
-        })
-        task["event_count"] = len(task["events"])
-        return await self.set_json(key, task, self.SSE_EVENT_TTL)
+        record = json.dumps({"event": event_type, "data": event_data}, default=str)
+        length = await self.append_log(self._sse_log_key(task_id), record, self.SSE_EVENT_TTL)
+        return length > 0
 
     async def get_sse_events(self, task_id: str, from_index: int = 0) -> Optional[Dict[str, Any]]:
         """获取 SSE 事件（从指定索引开始）"""
-        key = f"{self.SSE_EVENT_PREFIX}{task_id}"
-        task = await self.get_json(key)
+        task = await self.get_json(self._sse_meta_key(task_id))
         if not task:
             return None
 
+        records = await self.read_log(self._sse_log_key(task_id), start=from_index)
+        events = []
+        for record in records:
+            try:
+                events.append(json.loads(record))
+            except json.JSONDecodeError:
+                logger.warning("Corrupted SSE event skipped", task_id=task_id)
+
+        total_events = from_index + len(records)
+        if not records and from_index > 0:
+            total_events = await self.log_length(self._sse_log_key(task_id))
+
         return {
             "status": task.get("status", "unknown"),
             "symbol": task.get("symbol"),
-            "events": task.get("events", [])[from_index:],
-            "total_events": task.get("event_count", 0)
+            "events": events,
+            "total_events": total_events,
         }
 
     async def set_sse_status(self, task_id: str, status: str) -> bool:
         """设置 SSE 任务状态"""
-        key = f"{self.SSE_EVENT_PREFIX}{task_id}"
+        key = self._sse_meta_key(task_id)
         task = await self.get_json(key)
         if not task:
             return False
 
         task["status"] = status
-        return await self.set_json(key, task, self.SSE_EVENT_TTL)
+        result = await self.set_json(key, task, self.SSE_EVENT_TTL)
+        await self.notify(self._sse_log_key(task_id))
+        return result
+
+    async def watch_sse_events(self, task_id: str) -> int:
+        """登记关注 SSE 任务（每个流一次），返回通知版本号"""
+        return await self.watch_notify(self._sse_log_key(task_id))
+
+    async def get_sse_events_version(self, task_id: str) -> int:
+        """获取已关注 SSE 任务的通知版本号（需在 get_sse_events 之前调用）"""
+        return await self.get_notify_version(self._sse_log_key(task_id))
+
+    async def wait_sse_events(self, task_id: str, version: int, timeout: float) -> bool:
+        """等待新事件或状态变更，超时返回 False"""
+        return await self.wait_notify(self._sse_log_key(task_id), version, timeout)
+
+    async def unwatch_sse_events(self, task_id: str) -> None:
+        """SSE 流结束时取消关注（与 watch_sse_events 一一对应）"""
+        await self.discard_notify(self._sse_log_key(task_id))
 
     async def cleanup_sse_task(self, task_id: str) -> bool:
         """清理 SSE 任务（任务完成后延迟清理）"""
-        return await self.delete(f"{self.SSE_EVENT_PREFIX}{task_id}")
+        await self.delete(self._sse_log_key(task_id))
+        return await self.delete(self._sse_meta_key(task_id))
 
 
 # 全局单例
@@ -1,16 +1,26 @@
 import re
 import asyncio
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
+from collections import deque
 from functools import lru_cache
 import httpx
 import yfinance as yf
 import akshare as ak
 import time
 import random
-from services.models import StockPrice, KlineData, CompanyFundamentals, NewsItem
+from services.models import StockPrice, StockPriceBatch, KlineData, CompanyFundamentals, NewsItem
 from services.cache_service import cache_service
+from services.cache_revalidate import (
+    get_revalidating,
+    read_fresh_many,
+    read_revalidating,
+    write_revalidating,
+    write_revalidating_many,
+)
+from services.market_snapshot import market_snapshot
+from services.ohlcv_store import ohlcv_store
 from config.settings import settings
 from api.exceptions import DataSourceError
 import structlog
@@ -19,7 +29,7 @@ logger = structlog.get_logger()
 
 # 缓存 Key 规范
 CACHE_KEY_PRICE = "market:price:{symbol}"
-CACHE_KEY_HISTORY = "market:history:{symbol}"
+CACHE_KEY_HISTORY = "market:history:{symbol}:{period}"
 CACHE_KEY_FUNDAMENTALS = "market:fundamentals:{symbol}"
 
 # 分级缓存 TTL（秒）
@@ -27,9 +37,21 @@ _CACHE_TTL_PRICE = 30          # 价格缓存 30 秒
 _CACHE_TTL_HISTORY = 5 * 60    # 历史数据缓存 5 分钟
 _CACHE_TTL_FUNDAMENTALS = 24 * 60 * 60  # 基本面缓存 1 天
 
-# 请求去重：正在进行中的请求 {key: asyncio.Future}
-_pending_requests: Dict[str, asyncio.Future] = {}
-_pending_lock = asyncio.Lock()
+# 历史 K 线周期 -> 回看时长
+_HISTORY_PERIODS = {
+    "5d": timedelta(days=5),
+    "1mo": timedelta(days=30),
+    "3mo": timedelta(days=91),
+    "6mo": timedelta(days=182),
+    "1y": timedelta(days=365),
+    "2y": timedelta(days=730),
+    "5y": timedelta(days=5 * 365),
+}
+
+# 软过期窗口（秒）：TTL 到期后仍先返回旧值、同时后台刷新的时长
+_CACHE_STALE_PRICE = 5 * 60
+_CACHE_STALE_HISTORY = 60 * 60
+_CACHE_STALE_FUNDAMENTALS = 7 * 24 * 60 * 60
 
 # 复用的 HTTP 客户端（避免每次请求创建新连接）
 _http_client: Optional[httpx.AsyncClient] = None
@@ -42,11 +64,32 @@ _http_client: Optional[httpx.AsyncClient] = None
 #   "successful_requests": 成功请求数,
 #   "failed_requests": 失败请求数,
 #   "total_latency": 总延迟(秒),
-#   "last_error": 错误信息
+#   "last_error": 错误信息,
+#   "latencies": 最近成功请求的延迟样本(秒),
+#   "hedged_requests": 超过 p90 延迟未返回、触发对冲的次数,
+#   "hedge_wins": 作为对冲请求先于主请求返回的次数
 # }}
 _provider_stats: Dict[str, Dict[str, Any]] = {}
 _FAILURE_THRESHOLD = 5      # 连续失败次数阈值
 _FAILURE_COOLDOWN = 60.0    # 熔断冷却时间（秒）
+_LATENCY_WINDOW = 100       # 计算 p90 的延迟样本窗口
+_HEDGE_MIN_SAMPLES = 10     # 样本不足时使用默认对冲等待
+
+# 自适应排序：按 (数据源, 市场, 操作) 统计的 EWMA 延迟与错误率
+# 结构: { (provider, market, operation): {
+#   "ewma_latency": 延迟 EWMA(秒),
+#   "ewma_error": 错误率 EWMA(0~1),
+#   "samples": 样本数
+# }}
+_route_stats: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+# 最近一次排序决策: { (market, operation): {"default": [...], "ranked": [...], "decided_at": datetime} }
+_route_decisions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_RANKING_EWMA_ALPHA = 0.2       # EWMA 平滑系数
+_RANKING_MIN_SAMPLES = 5        # 样本不足的数据源不参与调序
+_RANKING_LATENCY_SCALE = 1.0    # 延迟评分参考尺度（秒）
+_RANKING_SWITCH_MARGIN = 0.2    # 评分领先超过该比例才调序，避免来回抖动
+_RECOVERY_RAMP_SECONDS = 120.0  # 熔断恢复后流量逐步回切的时长（秒）
+_RECOVERY_MIN_WEIGHT = 0.1      # 回切开始时分配到原位置的流量比例
 
 
 def _init_provider_stats(provider: str):
@@ -59,7 +102,11 @@ def _init_provider_stats(provider: str):
             "successful_requests": 0,
             "failed_requests": 0,
             "total_latency": 0.0,
-            "last_error": None
+            "last_error": None,
+            "latencies": deque(maxlen=_LATENCY_WINDOW),
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "recovered_at": None,
         }
 
 
@@ -79,52 +126,6 @@ async def close_http_client():
         _http_client = None
 
 
-async def coalesce_request(key: str, fetch_func, *args, **kwargs):
-    """
-    请求去重：多个并发请求同一数据时，只执行一次实际请求
-
-    Args:
-        key: 请求唯一标识（如 "price:AAPL"）
-        fetch_func: 实际获取数据的协程函数
-        *args, **kwargs: 传递给 fetch_func 的参数
-
-    Returns:
-        获取的数据
-
-    Example:
-        # 多个并发调用只会触发一次实际请求
-        price = await coalesce_request(f"price:{symbol}", _fetch_price_impl, symbol)
-    """
-    global _pending_requests
-
-    async with _pending_lock:
-        # 检查是否有正在进行的相同请求
-        if key in _pending_requests:
-            future = _pending_requests[key]
-            logger.debug("Coalescing request, waiting for pending", key=key)
-        else:
-            # 创建新的 Future 并注册
-            future = asyncio.get_event_loop().create_future()
-            _pending_requests[key] = future
-
-            # 在后台执行实际请求
-            async def execute_and_resolve():
-                try:
-                    result = await fetch_func(*args, **kwargs)
-                    future.set_result(result)
-                except Exception as e:
-                    future.set_exception(e)
-                finally:
-                    # 清理 pending 请求
-                    async with _pending_lock:
-                        _pending_requests.pop(key, None)
-
-            asyncio.create_task(execute_and_resolve())
-
-    # 等待结果
-    return await future
-
-
 def _is_provider_available(provider: str) -> bool:
     """检查数据源是否可用（未被熔断）"""
     _init_provider_stats(provider)
@@ -145,6 +146,7 @@ def _is_provider_available(provider: str) -> bool:
                 cooldown_seconds=_FAILURE_COOLDOWN
             )
             stats["count"] = 0
+            stats["recovered_at"] = datetime.now()
             return True
 
     logger.warning(
@@ -156,22 +158,27 @@ def _is_provider_available(provider: str) -> bool:
     return False
 
 
-def _record_provider_success(provider: str, latency: float = 0.0):
-    """记录数据源成功"""
+def _record_provider_success(provider: str, latency: float = 0.0, route: Optional[Tuple[str, str]] = None):
+    """记录数据源成功（route 为 (市场, 操作)，提供时同时更新自适应排序统计）"""
     _init_provider_stats(provider)
     stats = _provider_stats[provider]
     stats["count"] = 0
     stats["total_requests"] += 1
     stats["successful_requests"] += 1
     stats["total_latency"] += latency
+    stats["latencies"].append(latency)
+    if route:
+        _record_route(provider, route, latency, success=True)
 
     # 同步到健康监控历史
     from services.health_monitor import health_monitor
     health_monitor.record_provider_call(provider, latency * 1000, success=True)
 
 
-def _record_provider_failure(provider: str, error: Exception, latency: float = 0.0):
-    """记录数据源失败"""
+def _record_provider_failure(
+    provider: str, error: Exception, latency: float = 0.0, route: Optional[Tuple[str, str]] = None
+):
+    """记录数据源失败（route 为 (市场, 操作)，提供时同时更新自适应排序统计）"""
     _init_provider_stats(provider)
     stats = _provider_stats[provider]
     stats["count"] += 1
@@ -180,6 +187,8 @@ def _record_provider_failure(provider: str, error: Exception, latency: float = 0
     stats["failed_requests"] += 1
     stats["total_latency"] += latency
     stats["last_error"] = str(error)
+    if route:
+        _record_route(provider, route, latency, success=False)
 
     # 同步到健康监控历史
     from services.health_monitor import health_monitor
@@ -193,6 +202,195 @@ def _record_provider_failure(provider: str, error: Exception, latency: float = 0
     )
 
 
+def _record_route(provider: str, route: Tuple[str, str], latency: float, success: bool):
+    """更新 (数据源, 市场, 操作) 的 EWMA 延迟与错误率，首个样本直接作为初值"""
+    key = (provider, *route)
+    stats = _route_stats.get(key)
+    error = 0.0 if success else 1.0
+    if stats is None:
+        _route_stats[key] = {"ewma_latency": latency, "ewma_error": error, "samples": 1}
+        return
+    alpha = _RANKING_EWMA_ALPHA
+    stats["ewma_latency"] += alpha * (latency - stats["ewma_latency"])
+    stats["ewma_error"] += alpha * (error - stats["ewma_error"])
+    stats["samples"] += 1
+
+
+def _route_score(provider: str, route: Tuple[str, str]) -> Optional[float]:
+    """健康评分（0~1，越高越好）：成功率按延迟折算，样本不足时返回 None"""
+    stats = _route_stats.get((provider, *route))
+    if stats is None or stats["samples"] < _RANKING_MIN_SAMPLES:
+        return None
+    return (1 - stats["ewma_error"]) / (1 + stats["ewma_latency"] / _RANKING_LATENCY_SCALE)
+
+
+def _recovery_weight(provider: str) -> float:
+    """熔断恢复后的流量回切权重：从下限线性增长到 1"""
+    _init_provider_stats(provider)
+    stats = _provider_stats[provider]
+    recovered_at = stats["recovered_at"]
+    if recovered_at is None:
+        return 1.0
+    elapsed = (datetime.now() - recovered_at).total_seconds()
+    if elapsed >= _RECOVERY_RAMP_SECONDS:
+        stats["recovered_at"] = None
+        return 1.0
+    return _RECOVERY_MIN_WEIGHT + (1 - _RECOVERY_MIN_WEIGHT) * elapsed / _RECOVERY_RAMP_SECONDS
+
+
+def _rank_providers(providers: List[str], market: str, operation: str) -> List[str]:
+    """
+    按健康评分调整数据源顺序
+
+    - 以默认优先级为基准，相邻数据源的评分领先超过 _RANKING_SWITCH_MARGIN 时才交换位置
+    - 样本不足的数据源保持默认位置
+    - 熔断刚恢复的数据源按回切权重分流：命中时回到默认位置（忽略恢复前的评分），
+      否则排到末尾仅作兜底；回切完成后按评分参与排序
+    """
+    if not settings.PROVIDER_RANKING_ENABLED:
+        return list(providers)
+
+    route = (market, operation)
+    weights = {provider: _recovery_weight(provider) for provider in providers}
+    recovering = {provider for provider, weight in weights.items() if weight < 1.0}
+
+    ranked = list(providers)
+    swapped = True
+    while swapped:
+        swapped = False
+        for i in range(len(ranked) - 1):
+            ahead, behind = ranked[i], ranked[i + 1]
+            if ahead in recovering or behind in recovering:
+                continue
+            ahead_score, behind_score = _route_score(ahead, route), _route_score(behind, route)
+            if ahead_score is None or behind_score is None:
+                continue
+            if behind_score > ahead_score * (1 + _RANKING_SWITCH_MARGIN):
+                ranked[i], ranked[i + 1] = behind, ahead
+                swapped = True
+
+    demoted = [provider for provider in ranked if provider in recovering and random.random() >= weights[provider]]
+    ranked = [provider for provider in ranked if provider not in demoted] + demoted
+
+    previous = _route_decisions.get(route)
+    if ranked != (previous["ranked"] if previous else list(providers)):
+        logger.info(
+            "Provider ranking changed",
+            market=market,
+            operation=operation,
+            default=providers,
+            ranked=ranked,
+            recovering=sorted(recovering),
+        )
+    _route_decisions[route] = {"default": list(providers), "ranked": ranked, "decided_at": datetime.now()}
+    return ranked
+
+
+def _provider_p90(provider: str) -> Optional[float]:
+    """最近成功请求延迟的 p90（秒），样本不足时返回 None"""
+    _init_provider_stats(provider)
+    samples = sorted(_provider_stats[provider]["latencies"])
+    if len(samples) < _HEDGE_MIN_SAMPLES:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+
+
+def _hedge_delay(provider: str) -> float:
+    """对冲等待时间：数据源的 p90 延迟（不低于下限），样本不足时使用默认值"""
+    p90 = _provider_p90(provider)
+    if p90 is None:
+        return settings.PROVIDER_HEDGE_DEFAULT_DELAY
+    return max(p90, settings.PROVIDER_HEDGE_MIN_DELAY)
+
+
+async def _hedged_fetch(
+    providers: List[str], call, route: Optional[Tuple[str, str]] = None, **log_context
+) -> Tuple[str, Any]:
+    """
+    按优先级请求数据源，慢请求触发对冲
+
+    - 最近发起的请求超过该数据源的 p90 延迟仍未返回时，并发请求下一个数据源
+    - 采用最先成功的结果，其余进行中的请求被取消（取消不计入失败；
+      先于胜出请求发起的被取消请求以已耗时计入自适应排序的延迟统计）
+    - 请求失败时立即由下一个数据源接替；熔断中的数据源被跳过
+
+    Args:
+        providers: 按优先级排列的数据源
+        call: 以数据源名称为参数、执行一次请求的协程函数
+        route: (市场, 操作)，用于更新自适应排序统计
+
+    Returns:
+        (胜出的数据源, 结果)
+
+    Raises:
+        DataSourceError: 所有数据源失败或均被熔断
+    """
+    queue = list(providers)
+    running: Dict[asyncio.Task, Tuple[str, float, bool]] = {}  # task -> (数据源, 开始时间, 是否为对冲请求)
+    last_error: Optional[DataSourceError] = None
+
+    def launch(is_hedge: bool) -> Optional[str]:
+        while queue:
+            provider = queue.pop(0)
+            if not _is_provider_available(provider):
+                logger.debug("Skipping circuit-broken provider", provider=provider, **log_context)
+                continue
+            running[asyncio.create_task(call(provider))] = (provider, time.time(), is_hedge)
+            return provider
+        return None
+
+    winner_start: Optional[float] = None
+    leader = launch(is_hedge=False)
+    try:
+        while running:
+            delay = _hedge_delay(leader) if settings.PROVIDER_HEDGING_ENABLED and queue else None
+            done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                hedge = launch(is_hedge=True)
+                if hedge is not None:
+                    _provider_stats[leader]["hedged_requests"] += 1
+                    logger.info(
+                        "Provider slower than p90, hedging",
+                        slow_provider=leader, hedge_provider=hedge, delay=round(delay, 3), **log_context
+                    )
+                    leader = hedge
+                continue
+
+            for task in done:
+                provider, start_time, is_hedge = running.pop(task)
+                latency = time.time() - start_time
+                try:
+                    result = task.result()
+                except Exception as e:
+                    _record_provider_failure(provider, e, latency, route)
+                    logger.warning("Data source failed, trying next", provider=provider, error=str(e), **log_context)
+                    last_error = e if isinstance(e, DataSourceError) else DataSourceError(provider, str(e))
+                    continue
+
+                _record_provider_success(provider, latency, route)
+                if is_hedge:
+                    _provider_stats[provider]["hedge_wins"] += 1
+                winner_start = start_time
+                return provider, result
+
+            # 失败的请求立即由下一个数据源接替
+            leader = launch(is_hedge=bool(running)) or leader
+    finally:
+        now = time.time()
+        for task, (provider, start_time, _) in running.items():
+            if not task.done():
+                task.cancel()
+                # 先于胜出请求发起、被对冲取消的慢请求：以已耗时作为延迟样本（真实延迟的下界），
+                # 否则慢数据源只会留下偶尔的快样本，自适应排序无法察觉其变慢
+                if route is not None and winner_start is not None and start_time <= winner_start:
+                    _record_route(provider, route, now - start_time, success=True)
+            elif not task.cancelled():
+                task.exception()  # 同时完成的落选请求：取走异常，避免未检索告警
+
+    raise last_error or DataSourceError("all", "No available data provider")
+
+
 async def _call_with_retry(
     coro_func,
     provider: str,
@@ -300,50 +498,38 @@ class MarketRouter:
 
     @staticmethod
     async def _get_cached_price(symbol: str) -> Optional[StockPrice]:
-        """从缓存获取价格"""
+        """从缓存获取价格（含软过期窗口内的旧值）"""
         key = CACHE_KEY_PRICE.format(symbol=symbol)
-        data = await cache_service.get_json(key)
-        if data:
+        cached = await read_revalidating(key)
+        if cached:
             logger.debug("Using cached price", symbol=symbol)
-            # 处理 datetime 转换
-            if isinstance(data.get('timestamp'), str):
-                data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-            return StockPrice(**data)
+            return cached[0]
         return None
 
     @staticmethod
-    async def _set_cached_price(symbol: str, price: StockPrice):
-        """设置价格缓存"""
+    async def get_cached_prices(symbols: List[str]) -> Dict[str, StockPrice]:
+        """批量读取仍在新鲜期内的缓存价格（一次缓存往返）"""
+        keys = {CACHE_KEY_PRICE.format(symbol=symbol): symbol for symbol in symbols}
+        return {
+            keys[key]: value
+            for key, value in (await read_fresh_many(list(keys), _CACHE_TTL_PRICE)).items()
+        }
+
+    @classmethod
+    async def _set_cached_price(cls, symbol: str, price: StockPrice):
+        """设置价格缓存（休市期间有效至下一次开盘）"""
         key = CACHE_KEY_PRICE.format(symbol=symbol)
-        await cache_service.set_json(key, price.dict(), ttl=_CACHE_TTL_PRICE)
+        await write_revalidating(key, price, _CACHE_TTL_PRICE, _CACHE_STALE_PRICE, cls.get_market(symbol))
 
     @classmethod
     async def _get_price_akshare(cls, symbol: str) -> StockPrice:
-        """通过 AkShare 获取 A 股价格"""
-        try:
-            df = ak.stock_zh_a_spot_em()
-            code = symbol.split('.')[0]
-            row = df[df['代码'] == code]
-
-            if row.empty:
-                raise DataSourceError("akshare", f"Symbol {symbol} not found")
-
-            return StockPrice(
-                symbol=symbol,
-                price=float(row['最新价'].values[0]),
-                change=float(row['涨跌额'].values[0]),
-                change_percent=float(row['涨跌幅'].values[0]),
-                volume=int(row['成交量'].values[0]),
-                timestamp=datetime.now(),
-                market="CN"
-            )
-        except Exception as e:
-            raise DataSourceError("akshare", str(e))
+        """通过 AkShare 获取 A 股价格（读取共享的全市场快照）"""
+        return await market_snapshot.get_quote(symbol)
 
     @classmethod
     async def _get_price_yfinance(cls, symbol: str, market: str) -> StockPrice:
-        """通过 yfinance 获取价格"""
-        try:
+        """通过 yfinance 获取价格（fast_info 为阻塞调用，在线程中执行，不阻塞事件循环与对冲计时）"""
+        def fetch() -> StockPrice:
             # yfinance 对上交所使用 .SS 后缀（非 .SH）
             yf_symbol = re.sub(r'\.SH$', '.SS', symbol, flags=re.IGNORECASE)
             ticker = yf.Ticker(yf_symbol)
@@ -361,6 +547,9 @@ class MarketRouter:
                 timestamp=datetime.now(),
                 market=market
             )
+
+        try:
+            return await asyncio.to_thread(fetch)
         except Exception as e:
             raise DataSourceError("yfinance", str(e))
 
@@ -413,188 +602,288 @@ class MarketRouter:
         特性：
         - 请求去重：多个并发请求同一股票只发起一次实际请求
         - 熔断保护：连续失败 5 次后跳过该数据源 60 秒
-        - 失败时尝试使用缓存数据
+        - 自适应排序：按各数据源在该市场的 EWMA 延迟与错误率调整优先级
+        - 对冲请求：主数据源超过其 p90 延迟未返回时并发请求下一个数据源，采用先返回的结果
+        - 软过期：缓存过期后先返回旧值并后台刷新，刷新失败时继续使用旧值
+        - 交易日历：休市期间缓存有效至下一次开盘
         """
-        # 1. 先检查缓存
-        cached = await cls._get_cached_price(symbol)
-        if cached:
-            return cached
-
-        # 2. 使用请求去重获取数据
-        return await coalesce_request(
-            f"price:{symbol}",
+        return await get_revalidating(
+            CACHE_KEY_PRICE.format(symbol=symbol),
             cls._fetch_stock_price_impl,
-            symbol
+            symbol,
+            ttl=_CACHE_TTL_PRICE,
+            stale_ttl=_CACHE_STALE_PRICE,
+            market=cls.get_market(symbol),
         )
 
     @classmethod
-    async def _fetch_stock_price_impl(cls, symbol: str) -> StockPrice:
-        """实际获取股票价格的实现（内部方法）"""
-        market = cls.get_market(symbol)
-        providers = cls._get_providers_for_market(market)
+    async def get_stock_prices(cls, symbols: List[str]) -> StockPriceBatch:
+        """
+        批量获取股票价格
 
-        logger.info("Fetching stock price", symbol=symbol, market=market, providers=providers)
+        - 一次批量读取缓存，仍新鲜的价格直接返回
+        - 其余按市场分组：A 股读取全市场快照，港股/美股一次 yf.download
+        - 批量获取的结果一次写入缓存
+        - 批量未覆盖的股票逐只走 get_stock_price（降级数据源与软过期旧值）
 
-        last_error = None
-        attempted_providers = []
+        单只股票失败不影响其他股票，错误记录在返回结果的 errors 中。
+        """
+        unique = list(dict.fromkeys(symbols))
+        result = StockPriceBatch(prices=await cls.get_cached_prices(unique))
+
+        missing = [symbol for symbol in unique if symbol not in result.prices]
+        fetched = await cls._fetch_prices_batch(missing)
+        by_market: Dict[str, Dict[str, StockPrice]] = {}
+        for symbol, price in fetched.items():
+            by_market.setdefault(cls.get_market(symbol), {})[CACHE_KEY_PRICE.format(symbol=symbol)] = price
+        await asyncio.gather(*(
+            write_revalidating_many(mapping, _CACHE_TTL_PRICE, _CACHE_STALE_PRICE, market)
+            for market, mapping in by_market.items()
+        ))
+        result.prices.update(fetched)
+
+        remaining = [symbol for symbol in missing if symbol not in fetched]
+        outcomes = await asyncio.gather(
+            *(cls.get_stock_price(symbol) for symbol in remaining), return_exceptions=True
+        )
+        for symbol, outcome in zip(remaining, outcomes):
+            if isinstance(outcome, BaseException):
+                result.errors[symbol] = str(outcome)
+            else:
+                result.prices[symbol] = outcome
+
+        logger.info(
+            "Batch prices resolved",
+            requested=len(unique),
+            batch_fetched=len(fetched),
+            per_symbol=len(remaining),
+            failed=len(result.errors),
+        )
+        return result
 
-        for provider in providers:
-            # 检查熔断状态
-            if not _is_provider_available(provider):
-                logger.debug(
-                    "Skipping circuit-broken provider",
-                    symbol=symbol,
-                    provider=provider
-                )
-                continue
+    @classmethod
+    async def _fetch_prices_batch(cls, symbols: List[str]) -> Dict[str, StockPrice]:
+        """按市场分组批量获取（A 股快照与 yf.download 并发进行）"""
+        cn = [symbol for symbol in symbols if cls.get_market(symbol) == "CN"]
+        others = [symbol for symbol in symbols if cls.get_market(symbol) != "CN"]
+
+        results = await asyncio.gather(
+            cls._fetch_batch_from("akshare", market_snapshot.get_quotes, cn),
+            cls._fetch_batch_from("yfinance", cls._get_prices_yfinance_batch, others),
+        )
+        return {symbol: price for prices in results for symbol, price in prices.items()}
 
-            attempted_providers.append(provider)
+    @staticmethod
+    async def _fetch_batch_from(provider: str, fetch_func, symbols: List[str]) -> Dict[str, StockPrice]:
+        """调用单个数据源的批量接口（计入熔断统计，失败返回空结果由逐只获取兜底）"""
+        if not symbols or not _is_provider_available(provider):
+            return {}
 
-            start_time = time.time()
-            try:
-                if provider == "akshare":
-                    price = await cls._get_price_akshare(symbol)
-                elif provider == "yfinance":
-                    price = await cls._get_price_yfinance(symbol, market)
-                elif provider == "alpha_vantage":
-                    price = await cls._get_price_alpha_vantage(symbol)
-                else:
-                    continue
+        start_time = time.time()
+        try:
+            prices = await fetch_func(symbols)
+        except Exception as e:
+            _record_provider_failure(provider, e, time.time() - start_time)
+            logger.warning("Batch price fetch failed", provider=provider, count=len(symbols), error=str(e))
+            return {}
 
-                latency = time.time() - start_time
-                _record_provider_success(provider, latency)
-                # 成功获取，记录成功并缓存
-                await cls._set_cached_price(symbol, price)
-                logger.info("Price fetched successfully", symbol=symbol, provider=provider)
-                return price
+        _record_provider_success(provider, time.time() - start_time)
+        return prices
 
-            except DataSourceError as e:
-                latency = time.time() - start_time
-                _record_provider_failure(provider, e, latency)
-                logger.warning("Data source failed, trying next", symbol=symbol, source=e.source, error=str(e))
-                last_error = e
-                continue
-            except Exception as e:
-                latency = time.time() - start_time
-                _record_provider_failure(provider, e, latency)
-                logger.warning("Unexpected error, trying next provider", symbol=symbol, provider=provider, error=str(e))
-                last_error = DataSourceError(provider, str(e))
+    @classmethod
+    async def _get_prices_yfinance_batch(cls, symbols: List[str]) -> Dict[str, StockPrice]:
+        """通过 yf.download 一次获取多只股票的最近行情"""
+        yf_symbols = {re.sub(r'\.SH$', '.SS', symbol, flags=re.IGNORECASE): symbol for symbol in symbols}
+        try:
+            df = await asyncio.wait_for(
+                asyncio.to_thread(
+                    yf.download,
+                    list(yf_symbols),
+                    period="5d",
+                    group_by="ticker",
+                    auto_adjust=False,
+                    progress=False,
+                    threads=True,
+                ),
+                timeout=30.0,
+            )
+        except Exception as e:
+            raise DataSourceError("yfinance", str(e))
+
+        if df is None or df.empty:
+            return {}
+
+        prices = {}
+        now = datetime.now()
+        for yf_symbol, symbol in yf_symbols.items():
+            if isinstance(df.columns, pd.MultiIndex):
+                if yf_symbol not in df.columns.get_level_values(0):
+                    continue
+                frame = df[yf_symbol]
+            else:
+                frame = df
+
+            closes = frame["Close"].dropna()
+            if closes.empty:
                 continue
+            last = float(closes.iloc[-1])
+            prev_close = float(closes.iloc[-2]) if len(closes) > 1 else last
+            volume = frame["Volume"].get(closes.index[-1]) if "Volume" in frame else None
 
-        # 所有数据源都失败，尝试使用缓存（即使已过期，作为降级方案）
-        # 注意：cache_service.get 会自动处理 TTL，如果需要 stale cache，
-        # 可能需要 cache_service 支持获取过期数据，或者这里直接返回失败。
-        # 目前 cache_service 不支持获取过期数据，所以这里如果缓存失效就真的失效了。
-        cached = await cls._get_cached_price(symbol)
-        if cached:
-            logger.warning(
-                "All providers failed, using cache",
+            prices[symbol] = StockPrice(
                 symbol=symbol,
-                attempted=attempted_providers
+                price=last,
+                change=last - prev_close,
+                change_percent=((last / prev_close) - 1) * 100 if prev_close else 0.0,
+                volume=0 if volume is None or pd.isna(volume) else int(volume),
+                timestamp=now,
+                market=cls.get_market(symbol),
             )
-            return cached
+        return prices
+
+    @classmethod
+    async def _fetch_stock_price_impl(cls, symbol: str) -> StockPrice:
+        """实际获取股票价格的实现（内部方法）"""
+        market = cls.get_market(symbol)
+        providers = _rank_providers(cls._get_providers_for_market(market), market, "price")
+
+        logger.info("Fetching stock price", symbol=symbol, market=market, providers=providers)
+
+        async def fetch_from(provider: str) -> StockPrice:
+            if provider == "akshare":
+                return await cls._get_price_akshare(symbol)
+            if provider == "yfinance":
+                return await cls._get_price_yfinance(symbol, market)
+            if provider == "alpha_vantage":
+                return await cls._get_price_alpha_vantage(symbol)
+            raise DataSourceError(provider, "Unsupported provider")
 
-        # 完全失败
-        raise last_error or Exception(f"All data sources failed for {symbol}")
+        try:
+            provider, price = await _hedged_fetch(providers, fetch_from, route=(market, "price"), symbol=symbol)
+        except DataSourceError:
+            # 所有数据源都失败：软过期窗口内的旧值由 get_revalidating 继续提供，
+            # 这里不再回读缓存，避免把旧值当作新数据重新写入
+            logger.warning("All providers failed", symbol=symbol, providers=providers)
+            raise
+
+        logger.info("Price fetched successfully", symbol=symbol, provider=provider)
+        return price
 
     @classmethod
     async def get_history(cls, symbol: str, period: str = "1mo") -> List[KlineData]:
-        """获取历史 K 线数据（带降级和熔断机制）"""
-        # 1. 检查缓存
-        key = CACHE_KEY_HISTORY.format(symbol=symbol)
-        cached = await cache_service.get_json(key)
-        if cached:
-            logger.debug("Using cached history", symbol=symbol)
-            return [KlineData(**item) for item in cached]
+        """获取历史 K 线数据（带降级、熔断与软过期缓存，休市期间有效至下一次开盘）"""
+        return await get_revalidating(
+            CACHE_KEY_HISTORY.format(symbol=symbol, period=period),
+            cls._fetch_history_impl,
+            symbol,
+            period,
+            ttl=_CACHE_TTL_HISTORY,
+            stale_ttl=_CACHE_STALE_HISTORY,
+            market=cls.get_market(symbol),
+        )
 
-        # 2. 获取数据
-        market = cls.get_market(symbol)
-        result = None
+    @classmethod
+    async def _fetch_history_impl(cls, symbol: str, period: str) -> List[KlineData]:
+        """实际获取历史 K 线的实现（内部方法）：读取本地 OHLCV 存储，只补齐缺失的日期段"""
+        start = datetime.now() - _HISTORY_PERIODS.get(period, _HISTORY_PERIODS["1mo"])
+        try:
+            df = await ohlcv_store.aget_range(symbol, start)
+        except DataSourceError:
+            raise
+        except Exception as e:
+            raise DataSourceError("all", f"History unavailable for {symbol}: {e}")
 
-        # 尝试主数据源（A 股用 AkShare）
-        if market == "CN" and _is_provider_available("akshare"):
-            start_time = time.time()
-            try:
-                result = await cls._get_history_akshare(symbol)
-                latency = time.time() - start_time
-                _record_provider_success("akshare", latency)
-            except Exception as e:
-                latency = time.time() - start_time
-                _record_provider_failure("akshare", e, latency)
-                logger.warning("AkShare history failed, trying yfinance", symbol=symbol, error=str(e))
+        if df.empty:
+            raise DataSourceError("all", f"All history sources unavailable for {symbol}")
+
+        return [
+            KlineData(datetime=dt, open=o, high=h, low=l, close=c, volume=v)
+            for dt, o, h, l, c, v in zip(
+                df.index, df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]
+            )
+        ]
+
+    @classmethod
+    def fetch_ohlcv_range(cls, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """
+        按数据源优先级获取日线区间（OHLCV 存储的数据源，同步调用）
+
+        - CN: akshare（前复权）-> yfinance
+        - HK/US: yfinance
+        """
+        market = cls.get_market(symbol)
+        route = (market, "history")
+        providers = _rank_providers(["akshare", "yfinance"] if market == "CN" else ["yfinance"], *route)
+        last_error = None
 
-        # 降级到 yfinance
-        if not result and _is_provider_available("yfinance"):
+        for provider in providers:
+            if not _is_provider_available(provider):
+                continue
             start_time = time.time()
             try:
-                result = await cls._get_history_yfinance(symbol, period)
-                latency = time.time() - start_time
-                _record_provider_success("yfinance", latency)
+                if provider == "akshare":
+                    df = cls._get_ohlcv_akshare(symbol, start, end)
+                else:
+                    df = cls._get_ohlcv_yfinance(symbol, start, end)
+                _record_provider_success(provider, time.time() - start_time, route)
+                return df
             except Exception as e:
-                latency = time.time() - start_time
-                _record_provider_failure("yfinance", e, latency)
-                logger.error("yfinance history failed", symbol=symbol, error=str(e))
-
-        if result:
-            # 写入缓存
-            await cache_service.set_json(key, [item.dict() for item in result], ttl=_CACHE_TTL_HISTORY)
-            return result
+                _record_provider_failure(provider, e, time.time() - start_time, route)
+                logger.warning("History source failed, trying next", symbol=symbol, provider=provider, error=str(e))
+                last_error = e
 
-        raise DataSourceError("all", f"All history sources unavailable for {symbol}")
+        raise DataSourceError("all", f"All history sources unavailable for {symbol}: {last_error}")
 
     @classmethod
-    async def _get_history_akshare(cls, symbol: str) -> List[KlineData]:
-        """通过 AkShare 获取 A 股历史数据"""
-        code = symbol.split('.')[0]
-        df = ak.stock_zh_a_hist(symbol=code, period="daily", adjust="qfq")
-
-        klines = []
-        for _, row in df.tail(30).iterrows():
-            klines.append(KlineData(
-                datetime=pd.to_datetime(row['日期']),
-                open=row['开盘'],
-                high=row['最高'],
-                low=row['最低'],
-                close=row['收盘'],
-                volume=row['成交量']
-            ))
-        return klines
+    def _get_ohlcv_akshare(cls, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """通过 AkShare 获取 A 股日线（前复权）"""
+        df = ak.stock_zh_a_hist(
+            symbol=symbol.split('.')[0],
+            period="daily",
+            start_date=start.strftime("%Y%m%d"),
+            end_date=end.strftime("%Y%m%d"),
+            adjust="qfq",
+        )
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "Open": df["开盘"].to_numpy(),
+                "High": df["最高"].to_numpy(),
+                "Low": df["最低"].to_numpy(),
+                "Close": df["收盘"].to_numpy(),
+                "Volume": df["成交量"].to_numpy(),
+            },
+            index=pd.to_datetime(df["日期"]),
+        )
 
     @classmethod
-    async def _get_history_yfinance(cls, symbol: str, period: str) -> List[KlineData]:
-        """通过 yfinance 获取历史数据"""
+    def _get_ohlcv_yfinance(cls, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """通过 yfinance 获取日线（yfinance 的 end 不含当天，需加一天）"""
         yf_symbol = re.sub(r'\.SH$', '.SS', symbol, flags=re.IGNORECASE)
-        ticker = yf.Ticker(yf_symbol)
-        hist = ticker.history(period=period)
-
-        klines = []
-        for dt, row in hist.iterrows():
-            klines.append(KlineData(
-                datetime=dt,
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                volume=row['Volume']
-            ))
-        return klines
+        if yf_symbol.upper().endswith(".HK"):
+            # 港股代码需补足 4 位
+            yf_symbol = f"{yf_symbol[:-3].zfill(4)}.HK"
+        return yf.Ticker(yf_symbol).history(start=start, end=end + timedelta(days=1))
 
     @classmethod
     async def get_fundamentals(cls, symbol: str) -> CompanyFundamentals:
-        """获取公司基本面数据"""
-        # 1. 检查缓存
-        key = CACHE_KEY_FUNDAMENTALS.format(symbol=symbol)
-        cached = await cache_service.get_json(key)
-        if cached:
-            logger.debug("Using cached fundamentals", symbol=symbol)
-            return CompanyFundamentals(**cached)
+        """获取公司基本面数据（软过期缓存）"""
+        return await get_revalidating(
+            CACHE_KEY_FUNDAMENTALS.format(symbol=symbol),
+            cls._fetch_fundamentals_impl,
+            symbol,
+            ttl=_CACHE_TTL_FUNDAMENTALS,
+            stale_ttl=_CACHE_STALE_FUNDAMENTALS,
+        )
 
-        # 2. 获取数据
-        market = cls.get_market(symbol)
+    @classmethod
+    async def _fetch_fundamentals_impl(cls, symbol: str) -> CompanyFundamentals:
+        """实际获取基本面数据的实现（内部方法）"""
         ticker = yf.Ticker(symbol)
         info = ticker.info
 
-        result = CompanyFundamentals(
+        return CompanyFundamentals(
             symbol=symbol,
             name=info.get('longName', symbol),
             sector=info.get('sector'),
@@ -607,18 +896,13 @@ class MarketRouter:
             description=info.get('longBusinessSummary')
         )
 
-        # 3. 写入缓存
-        await cache_service.set_json(key, result.dict(), ttl=_CACHE_TTL_FUNDAMENTALS)
-        return result
-
     @classmethod
     async def clear_cache(cls):
         """清除所有数据缓存"""
-        # 清除匹配模式的键
+        # SCAN 遍历匹配的键后批量删除
         for pattern in ["market:price:*", "market:history:*", "market:fundamentals:*"]:
-            keys = await cache_service.keys(pattern)
-            for key in keys:
-                await cache_service.delete(key)
+            keys = [key async for key in cache_service.scan_iter(pattern)]
+            await cache_service.delete_many(keys)
         logger.info("All data caches cleared")
 
     @staticmethod
@@ -631,8 +915,29 @@ class MarketRouter:
             is_available = _is_provider_available(provider)
             
             avg_latency = 0
+            hedge_rate = 0
             if stats["total_requests"] > 0:
                 avg_latency = (stats["total_latency"] / stats["total_requests"]) * 1000 # 转为毫秒
+                hedge_rate = stats["hedged_requests"] / stats["total_requests"] * 100
+            p90 = _provider_p90(provider)
+
+            # 各 (市场, 操作) 上的排序依据与最近一次排序位置
+            routes = {}
+            for (route_provider, market, operation), route_stats in _route_stats.items():
+                if route_provider != provider:
+                    continue
+                score = _route_score(provider, (market, operation))
+                decision = _route_decisions.get((market, operation))
+                routes[f"{market}:{operation}"] = {
+                    "ewma_latency_ms": round(route_stats["ewma_latency"] * 1000, 2),
+                    "error_rate": round(route_stats["ewma_error"], 4),
+                    "samples": route_stats["samples"],
+                    "health_score": round(score, 4) if score is not None else None,
+                    "rank": decision["ranked"].index(provider) + 1
+                    if decision and provider in decision["ranked"] else None,
+                    "default_rank": decision["default"].index(provider) + 1
+                    if decision and provider in decision["default"] else None,
+                }
 
             status[provider] = {
                 "available": is_available,
@@ -644,6 +949,12 @@ class MarketRouter:
                 "successful_requests": stats["successful_requests"],
                 "failed_requests": stats["failed_requests"],
                 "avg_latency_ms": round(avg_latency, 2),
+                "p90_latency_ms": round(p90 * 1000, 2) if p90 is not None else 0.0,
+                "hedged_requests": stats["hedged_requests"],
+                "hedge_wins": stats["hedge_wins"],
+                "hedge_rate_pct": round(hedge_rate, 2),
+                "recovery_weight": round(_recovery_weight(provider), 3),
+                "routes": routes,
                 "last_error": stats["last_error"]
             }
         return status
@@ -654,6 +965,7 @@ class MarketRouter:
         if provider in _provider_stats:
             _provider_stats[provider]["count"] = 0
             _provider_stats[provider]["last_failure"] = None
+            _provider_stats[provider]["recovered_at"] = None
             logger.info("Provider reset", provider=provider)
 
     @staticmethod
@@ -662,4 +974,7 @@ class MarketRouter:
         for provider in _provider_stats:
             _provider_stats[provider]["count"] = 0
             _provider_stats[provider]["last_failure"] = None
+            _provider_stats[provider]["recovered_at"] = None
+        _route_stats.clear()
+        _route_decisions.clear()
         logger.info("All providers reset")
@@ -0,0 +1,94 @@
+"""
+DataFrame 到模型的向量化转换
+
+AkShare 返回的 DataFrame 逐行 iterrows() 会为每行分配一个 Series，
+在全市场规模（约 5000 行）的表上是主要开销。这里的函数按列整体完成
+列名选择、类型转换与缺失值处理，再通过 to_dict("records") 一次性构建模型：
+
+    frame = pd.DataFrame({
+        "symbol": cn_symbols(text_column(df, "代码")),
+        "net_buy": numeric_column(df, "净买额", scale=1e-8),
+    })
+    stocks = build_models(NorthMoneyTopStock, frame)
+
+列名按候选顺序取第一个存在的列（与 row.get(a, row.get(b, default)) 语义一致），
+数值列无法解析的值按 default 处理。
+"""
+from functools import lru_cache
+from typing import Any, List, Optional, Type, TypeVar
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def pick_column(df: pd.DataFrame, *names: str) -> Optional[str]:
+    """返回第一个存在的候选列名"""
+    for name in names:
+        if name in df.columns:
+            return name
+    return None
+
+
+def numeric_column(df: pd.DataFrame, *names: str, default: float = 0.0, scale: float = 1.0) -> pd.Series:
+    """数值列（无法解析或缺失的值取 default，再乘以 scale）"""
+    name = pick_column(df, *names)
+    if name is None:
+        return pd.Series(default * scale, index=df.index, dtype=float)
+    values = pd.to_numeric(df[name], errors="coerce").astype(float).fillna(default)
+    return values * scale if scale != 1.0 else values
+
+
+def text_column(df: pd.DataFrame, *names: str, default: str = "") -> pd.Series:
+    """字符串列（缺失值取 default）"""
+    name = pick_column(df, *names)
+    if name is None:
+        return pd.Series(default, index=df.index, dtype=object)
+    column = df[name]
+    return column.astype(str).where(column.notna(), default)
+
+
+def datetime_column(df: pd.DataFrame, *names: str) -> pd.Series:
+    """日期时间列（datetime64；无法解析的值为 NaT，比较运算结果为 False，可直接用于过滤）"""
+    name = pick_column(df, *names)
+    if name is None:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    return pd.to_datetime(df[name], errors="coerce")
+
+
+def to_dates(values: pd.Series) -> pd.Series:
+    """datetime64 列转为 datetime.date（NaT 为 None）"""
+    return pd.Series(np.where(values.notna(), values.dt.date, None), index=values.index, dtype=object)
+
+
+def cn_symbols(codes: pd.Series, six_digit_only: bool = False) -> pd.Series:
+    """A 股代码补交易所后缀：6 开头为 .SH，其余为 .SZ
+
+    six_digit_only 为 True 时，非 6 位代码原样保留
+    """
+    codes = codes.astype(str)
+    suffixed = codes + np.where(codes.str.startswith("6"), ".SH", ".SZ")
+    if six_digit_only:
+        return suffixed.where(codes.str.len() == 6, codes)
+    return suffixed
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def build_models(model: Type[ModelT], frame: pd.DataFrame) -> List[ModelT]:
+    """按列名（即模型字段名）把 DataFrame 一次性校验为模型列表"""
+    if frame.empty:
+        return []
+    return _list_adapter(model).validate_python(frame.to_dict("records"))
+
+
+def build_records(frame: pd.DataFrame) -> List[dict[str, Any]]:
+    """不需要模型的批量接口直接返回字典列表"""
+    if frame.empty:
+        return []
+    return frame.to_dict("records")
@@ -22,10 +22,12 @@ class GraphExecutionResult:
         agent_reports: Dict[str, str],
         elapsed_seconds: float,
         final_state: Optional[Dict[str, Any]] = None,
+        tool_stats: Optional[Dict[str, Any]] = None,
     ):
         self.agent_reports = agent_reports
         self.elapsed_seconds = elapsed_seconds
         self.final_state = final_state or {}
+        self.tool_stats = tool_stats or {}  # 本次运行的工具结果复用统计
 
 
 async def execute_trading_graph(
@@ -93,7 +95,8 @@ async def execute_trading_graph(
         historical_reflection=historical_reflection,
     )
 
-    # 执行图
+    # 执行图（工具结果在本次运行内跨分析师复用）
+    ta.tool_memo.begin_run(symbol, trade_date)
     args = ta.propagator.get_graph_args()
     agent_reports = {}
     final_state = {}
@@ -125,11 +128,13 @@ async def execute_trading_graph(
         elapsed_seconds=elapsed_seconds,
         reports_collected=len(agent_reports),
     )
+    ta.tool_memo.log_stats()
 
     return GraphExecutionResult(
         agent_reports=agent_reports,
         elapsed_seconds=elapsed_seconds,
         final_state=final_state,
+        tool_stats=ta.tool_memo.get_stats(),
     )
 
 
@@ -61,6 +61,12 @@ class ProviderStatus(BaseModel):
     successful_requests: int
     failed_requests: int
     avg_latency_ms: float
+    p90_latency_ms: float = 0.0
+    hedged_requests: int = 0
+    hedge_wins: int = 0
+    hedge_rate_pct: float = 0.0
+    recovery_weight: float = 1.0
+    routes: Dict[str, Dict[str, Any]] = {}
     last_error: Optional[str] = None
 
 
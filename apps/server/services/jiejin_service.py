@@ -11,9 +11,12 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 import structlog
 import akshare as ak
+import numpy as np
 import pandas as pd
 import asyncio
 
+from services.frame_convert import build_models, cn_symbols, datetime_column, numeric_column, text_column, to_dates
+
 logger = structlog.get_logger(__name__)
 
 
@@ -104,6 +107,15 @@ class JiejinService:
             return "中"
         return "低"
 
+    @staticmethod
+    def _pressure_levels(jiejin_ratio: pd.Series, jiejin_market_value: pd.Series) -> np.ndarray:
+        """按列评估解禁压力等级（阈值同 _evaluate_pressure）"""
+        return np.select(
+            [(jiejin_ratio > 10) | (jiejin_market_value > 50), (jiejin_ratio > 5) | (jiejin_market_value > 10)],
+            ["高", "中"],
+            default="低",
+        )
+
     async def get_upcoming_jiejin(self, days: int = 30) -> List[JiejinStock]:
         """获取近期解禁股票
 
@@ -123,52 +135,26 @@ class JiejinService:
                 logger.warning("No jiejin data available")
                 return []
 
-            result = []
             today = DateType.today()
             end_date = today + timedelta(days=days)
 
-            for _, row in df.iterrows():
-                try:
-                    # 解析日期
-                    jiejin_date_str = str(row.get('解禁日期', row.get('上市日期', '')))
-                    if not jiejin_date_str:
-                        continue
-
-                    jiejin_date = pd.to_datetime(jiejin_date_str).date()
-
-                    # 筛选日期范围
-                    if jiejin_date < today or jiejin_date > end_date:
-                        continue
-
-                    # 解析数值
-                    code = str(row.get('股票代码', row.get('代码', '')))
-                    jiejin_shares = float(row.get('解禁数量', row.get('解禁股数', 0)) or 0)
-                    jiejin_market_value = float(row.get('解禁市值', 0) or 0) / 10000  # 转为亿元
-                    jiejin_ratio = float(row.get('解禁比例', row.get('占总股本比例', 0)) or 0)
-
-                    # 确保股票代码格式正确
-                    if len(code) == 6:
-                        symbol = f"{code}.SH" if code.startswith('6') else f"{code}.SZ"
-                    else:
-                        symbol = code
-
-                    pressure = self._evaluate_pressure(jiejin_ratio, jiejin_market_value)
-
-                    stock = JiejinStock(
-                        symbol=symbol,
-                        name=str(row.get('股票简称', row.get('名称', ''))),
-                        jiejin_date=jiejin_date,
-                        jiejin_shares=jiejin_shares,
-                        jiejin_market_value=jiejin_market_value,
-                        jiejin_ratio=jiejin_ratio,
-                        jiejin_type=str(row.get('限售股类型', row.get('解禁类型', '定增解禁'))),
-                        pressure_level=pressure,
-                    )
-                    result.append(stock)
-
-                except Exception as e:
-                    logger.debug("Failed to parse jiejin row", error=str(e))
-                    continue
+            # 筛选日期范围（无法解析的日期为 NaT，比较结果为 False）
+            dates = datetime_column(df, '解禁日期', '上市日期')
+            in_range = (dates >= pd.Timestamp(today)) & (dates <= pd.Timestamp(end_date))
+            df, dates = df[in_range], dates[in_range]
+
+            jiejin_ratio = numeric_column(df, '解禁比例', '占总股本比例')
+            jiejin_market_value = numeric_column(df, '解禁市值', scale=1e-4)  # 转为亿元
+            result = build_models(JiejinStock, pd.DataFrame({
+                "symbol": cn_symbols(text_column(df, '股票代码', '代码'), six_digit_only=True),
+                "name": text_column(df, '股票简称', '名称'),
+                "jiejin_date": to_dates(dates),
+                "jiejin_shares": numeric_column(df, '解禁数量', '解禁股数'),
+                "jiejin_market_value": jiejin_market_value,
+                "jiejin_ratio": jiejin_ratio,
+                "jiejin_type": text_column(df, '限售股类型', '解禁类型', default='定增解禁'),
+                "pressure_level": self._pressure_levels(jiejin_ratio, jiejin_market_value),
+            }))
 
             # 按日期排序
             result.sort(key=lambda x: x.jiejin_date)
@@ -237,34 +223,24 @@ class JiejinService:
                 return None
 
             today = DateType.today()
-            upcoming = []
-            past = []
-
-            for _, row in df.iterrows():
-                try:
-                    jiejin_date = pd.to_datetime(row.get('解禁日期', '')).date()
-                    jiejin_shares = float(row.get('解禁数量', 0) or 0)
-                    jiejin_market_value = float(row.get('解禁市值', 0) or 0) / 10000
-                    jiejin_ratio = float(row.get('占总股本比例', 0) or 0)
-
-                    stock = JiejinStock(
-                        symbol=symbol,
-                        name=str(row.get('股票简称', '')),
-                        jiejin_date=jiejin_date,
-                        jiejin_shares=jiejin_shares,
-                        jiejin_market_value=jiejin_market_value,
-                        jiejin_ratio=jiejin_ratio,
-                        jiejin_type=str(row.get('限售股类型', '定增解禁')),
-                        pressure_level=self._evaluate_pressure(jiejin_ratio, jiejin_market_value),
-                    )
-
-                    if jiejin_date >= today:
-                        upcoming.append(stock)
-                    else:
-                        past.append(stock)
-
-                except Exception:
-                    continue
+
+            dates = datetime_column(df, '解禁日期')
+            df, dates = df[dates.notna()], dates[dates.notna()]
+
+            jiejin_ratio = numeric_column(df, '占总股本比例')
+            jiejin_market_value = numeric_column(df, '解禁市值', scale=1e-4)
+            stocks = build_models(JiejinStock, pd.DataFrame({
+                "symbol": symbol,
+                "name": text_column(df, '股票简称'),
+                "jiejin_date": to_dates(dates),
+                "jiejin_shares": numeric_column(df, '解禁数量'),
+                "jiejin_market_value": jiejin_market_value,
+                "jiejin_ratio": jiejin_ratio,
+                "jiejin_type": text_column(df, '限售股类型', default='定增解禁'),
+                "pressure_level": self._pressure_levels(jiejin_ratio, jiejin_market_value),
+            }))
+            upcoming = [stock for stock in stocks if stock.jiejin_date >= today]
+            past = [stock for stock in stocks if stock.jiejin_date < today]
 
             # 排序
             upcoming.sort(key=lambda x: x.jiejin_date)
@@ -16,9 +16,26 @@ import pandas as pd
 import asyncio
 
 from services.cache_service import cache_service
+from services.cache_revalidate import get_revalidating
+from services.trading_calendar import trading_calendar
+from services.frame_convert import (
+    build_models,
+    datetime_column,
+    numeric_column,
+    pick_column,
+    text_column,
+    to_dates,
+)
 
 logger = structlog.get_logger(__name__)
 
+# 软过期窗口（秒）：缓存过期后仍可先返回旧值、后台刷新的时长
+_STALE_TTL = 60 * 60
+
+# 龙虎榜在收盘后的傍晚发布：交易日收盘后至当天结束仍按常规 TTL 刷新，
+# 之后至下一次 A 股开盘缓存保持有效
+_SETTLE = timedelta(hours=9)
+
 
 # ============ 数据模型 ============
 
@@ -287,101 +304,106 @@ class LHBService:
         )
 
     async def get_daily_lhb(self, trade_date: str = None) -> List[LHBStock]:
-        """获取每日龙虎榜
+        """获取每日龙虎榜（软过期缓存）
 
         Args:
             trade_date: 交易日期，格式 YYYYMMDD，默认最近交易日
         """
-        cache_key = f"daily_lhb_{trade_date or 'latest'}"
-        cached = cache_service.get_sync(cache_key)
-        if cached:
-            return cached
-
         try:
-            # 获取龙虎榜汇总数据
-            if trade_date:
-                df = await asyncio.to_thread(
-                    ak.stock_lhb_detail_em,
-                    start_date=trade_date,
-                    end_date=trade_date
+            return await get_revalidating(
+                f"daily_lhb_{trade_date or 'latest'}", self._fetch_daily_lhb, trade_date,
+                ttl=600, stale_ttl=_STALE_TTL, market="CN", settle=_SETTLE,
+            )
+        except Exception as e:
+            logger.error("Failed to fetch daily LHB", error=str(e))
+            return []
+
+    async def _fetch_daily_lhb(self, trade_date: Optional[str]) -> List[LHBStock]:
+        """从 AkShare 获取每日龙虎榜"""
+        # 获取龙虎榜汇总数据
+        if trade_date:
+            df = await asyncio.to_thread(
+                ak.stock_lhb_detail_em,
+                start_date=trade_date,
+                end_date=trade_date
+            )
+        else:
+            # 获取最近的龙虎榜
+            df = await asyncio.to_thread(ak.stock_lhb_detail_em)
+
+        if df.empty:
+            # 不缓存空结果：龙虎榜傍晚才发布，空表写入后会在整个新鲜期内掩盖随后发布的数据
+            raise ValueError("No LHB data available")
+
+        result = []
+        # 席位列整体转换一次，分组内直接按列迭代（不同 API 返回格式可能不同，可能没有席位数据）
+        has_seats = pick_column(df, '买入营业部', '营业部名称') is not None
+        df = df.assign(
+            _seat=text_column(df, '买入营业部', '营业部名称'),
+            _buy=numeric_column(df, '买入金额'),
+            _sell=numeric_column(df, '卖出金额'),
+        )
+        # 按股票代码分组
+        grouped = df.groupby('代码') if '代码' in df.columns else df.groupby(df.columns[0])
+
+        for code, group in grouped:
+            try:
+                first_row = group.iloc[0]
+
+                # 解析买入席位
+                buy_seats = []
+                sell_seats = []
+
+                if has_seats:
+                    for seat_name, buy_amt, sell_amt in zip(group['_seat'], group['_buy'], group['_sell']):
+                        if buy_amt > 0:
+                            buy_seats.append(self._parse_seat_data(seat_name, float(buy_amt), float(sell_amt)))
+                        if sell_amt > 0:
+                            sell_seats.append(self._parse_seat_data(seat_name, float(buy_amt), float(sell_amt)))
+
+                # 计算机构净买入
+                inst_buy = sum(s.buy_amount for s in buy_seats if s.seat_type == "机构")
+                inst_sell = sum(s.sell_amount for s in sell_seats if s.seat_type == "机构")
+
+                # 检查是否有知名游资
+                hot_money = any(s.hot_money_name for s in buy_seats + sell_seats)
+
+                total_buy = sum(s.buy_amount for s in buy_seats)
+                total_sell = sum(s.sell_amount for s in sell_seats)
+
+                stock = LHBStock(
+                    symbol=f"{code}.SH" if str(code).startswith('6') else f"{code}.SZ",
+                    name=str(first_row.get('名称', first_row.get('股票名称', ''))),
+                    close_price=float(first_row.get('收盘价', 0) or 0),
+                    change_percent=float(first_row.get('涨跌幅', 0) or 0),
+                    turnover_rate=float(first_row.get('换手率', 0) or 0),
+                    lhb_net_buy=total_buy - total_sell,
+                    lhb_buy_amount=total_buy,
+                    lhb_sell_amount=total_sell,
+                    reason=str(first_row.get('上榜原因', first_row.get('解读', '未知'))),
+                    buy_seats=buy_seats[:5],  # 只保留前 5 个
+                    sell_seats=sell_seats[:5],
+                    institution_net=inst_buy - inst_sell,
+                    hot_money_involved=hot_money,
                 )
-            else:
-                # 获取最近的龙虎榜
-                df = await asyncio.to_thread(ak.stock_lhb_detail_em)
+                result.append(stock)
+            except Exception as e:
+                logger.debug("Failed to parse LHB stock", code=code, error=str(e))
+                continue
 
-            if df.empty:
-                logger.warning("No LHB data available", trade_date=trade_date)
-                return []
+        if not result:
+            raise ValueError("No LHB stocks parsed")
 
-            result = []
-            # 按股票代码分组
-            grouped = df.groupby('代码') if '代码' in df.columns else df.groupby(df.columns[0])
-
-            for code, group in grouped:
-                try:
-                    first_row = group.iloc[0]
-
-                    # 解析买入席位
-                    buy_seats = []
-                    sell_seats = []
-
-                    # 尝试解析席位数据（不同 API 返回格式可能不同）
-                    for _, row in group.iterrows():
-                        if '买入营业部' in row or '营业部名称' in row:
-                            seat_name = str(row.get('买入营业部', row.get('营业部名称', '')))
-                            buy_amt = float(row.get('买入金额', 0) or 0)
-                            sell_amt = float(row.get('卖出金额', 0) or 0)
-
-                            if buy_amt > 0:
-                                buy_seats.append(self._parse_seat_data(seat_name, buy_amt, sell_amt))
-                            if sell_amt > 0:
-                                sell_seats.append(self._parse_seat_data(seat_name, buy_amt, sell_amt))
-
-                    # 计算机构净买入
-                    inst_buy = sum(s.buy_amount for s in buy_seats if s.seat_type == "机构")
-                    inst_sell = sum(s.sell_amount for s in sell_seats if s.seat_type == "机构")
-
-                    # 检查是否有知名游资
-                    hot_money = any(s.hot_money_name for s in buy_seats + sell_seats)
-
-                    total_buy = sum(s.buy_amount for s in buy_seats)
-                    total_sell = sum(s.sell_amount for s in sell_seats)
-
-                    stock = LHBStock(
-                        symbol=f"{code}.SH" if str(code).startswith('6') else f"{code}.SZ",
-                        name=str(first_row.get('名称', first_row.get('股票名称', ''))),
-                        close_price=float(first_row.get('收盘价', 0) or 0),
-                        change_percent=float(first_row.get('涨跌幅', 0) or 0),
-                        turnover_rate=float(first_row.get('换手率', 0) or 0),
-                        lhb_net_buy=total_buy - total_sell,
-                        lhb_buy_amount=total_buy,
-                        lhb_sell_amount=total_sell,
-                        reason=str(first_row.get('上榜原因', first_row.get('解读', '未知'))),
-                        buy_seats=buy_seats[:5],  # 只保留前 5 个
-                        sell_seats=sell_seats[:5],
-                        institution_net=inst_buy - inst_sell,
-                        hot_money_involved=hot_money,
-                    )
-                    result.append(stock)
-                except Exception as e:
-                    logger.debug("Failed to parse LHB stock", code=code, error=str(e))
-                    continue
-
-            # 按净买入排序
-            result.sort(key=lambda x: x.lhb_net_buy, reverse=True)
-
-            cache_service.set_sync(cache_key, result, ttl=600)
-            logger.info("Fetched daily LHB", count=len(result), date=trade_date)
-            return result
+        # 按净买入排序
+        result.sort(key=lambda x: x.lhb_net_buy, reverse=True)
 
-        except Exception as e:
-            logger.error("Failed to fetch daily LHB", error=str(e))
-            return []
+        logger.info("Fetched daily LHB", count=len(result), date=trade_date)
+        return result
 
     async def get_stock_lhb_history(self, symbol: str, days: int = 30) -> List[LHBRecord]:
         """获取个股龙虎榜历史"""
         cache_key = f"stock_lhb_{symbol}_{days}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -392,21 +414,24 @@ class LHBService:
             if df.empty:
                 return []
 
-            result = []
-            for _, row in df.head(days).iterrows():
-                try:
-                    result.append(LHBRecord(
-                        date=pd.to_datetime(row.get('上榜日期', row.get('日期', datetime.now()))).date(),
-                        reason=str(row.get('上榜原因', '未知')),
-                        net_buy=float(row.get('龙虎榜净买额', 0) or 0),
-                        buy_amount=float(row.get('龙虎榜买入额', 0) or 0),
-                        sell_amount=float(row.get('龙虎榜卖出额', 0) or 0),
-                        institution_net=float(row.get('机构净买额', 0) or 0),
-                    ))
-                except Exception:
-                    continue
-
-            cache_service.set_sync(cache_key, result, ttl=600)
+            df = df.head(days)
+            if pick_column(df, '上榜日期', '日期') is None:
+                dates = pd.Series(pd.Timestamp.now(), index=df.index)
+            else:
+                dates = datetime_column(df, '上榜日期', '日期')
+            frame = pd.DataFrame({
+                "date": to_dates(dates),
+                "reason": text_column(df, '上榜原因', default='未知'),
+                "net_buy": numeric_column(df, '龙虎榜净买额'),
+                "buy_amount": numeric_column(df, '龙虎榜买入额'),
+                "sell_amount": numeric_column(df, '龙虎榜卖出额'),
+                "institution_net": numeric_column(df, '机构净买额'),
+            })[dates.notna()]
+            result = build_models(LHBRecord, frame)
+
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 600, settle=_SETTLE)
+            )
             return result
 
         except Exception as e:
@@ -416,7 +441,7 @@ class LHBService:
     async def get_hot_money_activity(self, days: int = 5) -> List[HotMoneySeat]:
         """获取知名游资近期活动"""
         cache_key = f"hot_money_{days}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -459,7 +484,9 @@ class LHBService:
                     win_rate=None,  # 需要历史数据计算
                 ))
 
-            cache_service.set_sync(cache_key, result, ttl=600)
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 600, settle=_SETTLE)
+            )
             return result
 
         except Exception as e:
@@ -502,7 +529,7 @@ class LHBService:
             游资完整画像，包含历史统计和操作特征
         """
         cache_key = f"hot_money_profile_{alias}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -566,7 +593,9 @@ class LHBService:
                 success_stocks=[],
             )
 
-            cache_service.set_sync(cache_key, profile, ttl=600)
+            await cache_service.set_object(
+                cache_key, profile, ttl=trading_calendar.cache_ttl("CN", 600, settle=_SETTLE)
+            )
             return profile
 
         except Exception as e:
@@ -583,7 +612,7 @@ class LHBService:
             游资画像列表
         """
         cache_key = f"all_hot_money_profiles_{tier or 'all'}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -606,7 +635,9 @@ class LHBService:
             tier_order = {"一线": 0, "二线": 1, "新锐": 2, "未知": 3}
             result.sort(key=lambda x: (tier_order.get(x.tier, 99), -x.total_appearances))
 
-            cache_service.set_sync(cache_key, result, ttl=600)
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 600, settle=_SETTLE)
+            )
             return result
 
         except Exception as e:
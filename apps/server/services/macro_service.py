@@ -179,7 +179,7 @@ class MacroDataService:
         """获取宏观经济概览"""
 
         # 检查缓存
-        cached = cache_service.get_sync("macro_overview")
+        cached = await cache_service.get_object("macro_overview")
         if cached:
             logger.debug("Using cached macro overview")
             return cached
@@ -216,7 +216,7 @@ class MacroDataService:
         overview.summary = cls._generate_summary(overview)
 
         # 缓存结果
-        cache_service.set_sync("macro_overview", overview, ttl=3600)
+        await cache_service.set_object("macro_overview", overview, ttl=3600)
 
         return overview
 
@@ -0,0 +1,173 @@
+"""
+A 股全市场行情快照
+
+ak.stock_zh_a_spot_em() 每次返回全部约 5000 只 A 股，按单只股票调用会重复下载整张表。
+本服务每个刷新周期只拉取一次全表，转换为按代码索引的列式结构：
+
+- 各数值列存为 numpy 数组，代码 -> 行号 的字典提供 O(1) 查找
+- 并发请求共享同一次刷新（asyncio.Lock 双重检查）
+- 单只与批量报价均直接从快照读取，不再逐只过滤 DataFrame
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import akshare as ak
+import numpy as np
+import pandas as pd
+import structlog
+
+from api.exceptions import DataSourceError
+from config.settings import settings
+from services.models import StockPrice
+
+logger = structlog.get_logger()
+
+# 全表拉取超时（秒）
+_FETCH_TIMEOUT = 20.0
+
+# 快照保留的数值列：字段名 -> 东方财富列名
+_NUMERIC_COLUMNS = {
+    "price": "最新价",
+    "change": "涨跌额",
+    "change_percent": "涨跌幅",
+    "volume": "成交量",
+}
+
+
+@dataclass
+class SpotSnapshot:
+    """按代码索引的列式行情快照"""
+    codes: List[str]
+    names: List[str]
+    columns: Dict[str, np.ndarray]
+    index: Dict[str, int]
+    fetched_at: datetime = field(default_factory=datetime.now)
+    fetched_monotonic: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "SpotSnapshot":
+        codes = df["代码"].astype(str).tolist()
+        names = df["名称"].astype(str).tolist() if "名称" in df.columns else [""] * len(codes)
+        columns = {
+            name: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            if col in df.columns else np.full(len(codes), np.nan)
+            for name, col in _NUMERIC_COLUMNS.items()
+        }
+        return cls(
+            codes=codes,
+            names=names,
+            columns=columns,
+            index={code: i for i, code in enumerate(codes)},
+        )
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_monotonic
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def quote(self, symbol: str) -> Optional[StockPrice]:
+        """按代码查询报价；代码不存在或停牌（无最新价）时返回 None"""
+        i = self.index.get(symbol.split(".")[0])
+        if i is None:
+            return None
+        price = self.columns["price"][i]
+        if np.isnan(price):
+            return None
+
+        change = self.columns["change"][i]
+        change_percent = self.columns["change_percent"][i]
+        volume = self.columns["volume"][i]
+        return StockPrice(
+            symbol=symbol,
+            price=float(price),
+            change=0.0 if np.isnan(change) else float(change),
+            change_percent=0.0 if np.isnan(change_percent) else float(change_percent),
+            volume=0 if np.isnan(volume) else int(volume),
+            timestamp=self.fetched_at,
+            market="CN",
+        )
+
+
+class MarketSnapshotService:
+    """A 股全市场快照服务（单例）"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval if interval is not None else settings.MARKET_SNAPSHOT_INTERVAL
+        self._snapshot: Optional[SpotSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._refresh_count = 0
+
+    def _is_fresh(self, snapshot: Optional[SpotSnapshot]) -> bool:
+        return snapshot is not None and snapshot.age < self.interval
+
+    async def get_snapshot(self) -> SpotSnapshot:
+        """获取快照，过期时刷新（并发调用只触发一次全表拉取）"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            return await self._refresh()
+
+    async def _refresh(self) -> SpotSnapshot:
+        start = time.time()
+        try:
+            df = await asyncio.wait_for(asyncio.to_thread(ak.stock_zh_a_spot_em), timeout=_FETCH_TIMEOUT)
+            snapshot = SpotSnapshot.from_dataframe(df)
+        except asyncio.TimeoutError:
+            raise DataSourceError("akshare", "A-share spot snapshot timed out")
+        except Exception as e:
+            raise DataSourceError("akshare", f"A-share spot snapshot failed: {e}")
+
+        self._snapshot = snapshot
+        self._refresh_count += 1
+        logger.info(
+            "A-share spot snapshot refreshed",
+            rows=len(snapshot),
+            latency_ms=round((time.time() - start) * 1000),
+        )
+        return snapshot
+
+    async def get_quote(self, symbol: str) -> StockPrice:
+        """单只股票报价"""
+        snapshot = await self.get_snapshot()
+        price = snapshot.quote(symbol)
+        if price is None:
+            raise DataSourceError("akshare", f"Symbol {symbol} not found")
+        return price
+
+    async def get_quotes(self, symbols: Iterable[str]) -> Dict[str, StockPrice]:
+        """批量报价，只返回快照中存在的股票"""
+        snapshot = await self.get_snapshot()
+        quotes = {}
+        for symbol in symbols:
+            price = snapshot.quote(symbol)
+            if price is not None:
+                quotes[symbol] = price
+        return quotes
+
+    def invalidate(self):
+        """丢弃当前快照，下次读取时重新拉取"""
+        self._snapshot = None
+
+    def get_stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "interval_seconds": self.interval,
+            "refresh_count": self._refresh_count,
+            "rows": len(snapshot) if snapshot else 0,
+            "age_seconds": round(snapshot.age, 1) if snapshot else None,
+            "fetched_at": snapshot.fetched_at.isoformat() if snapshot else None,
+        }
+
+
+# 全局单例
+market_snapshot = MarketSnapshotService()
@@ -234,7 +234,7 @@ class MarketWatcherService:
         Returns:
             市场指数列表
         """
-        cached_dict = cache_service.get_sync("indices")
+        cached_dict = await cache_service.get_object("indices")
         if not force_refresh and cached_dict:
             return list(cached_dict.values())
 
@@ -248,17 +248,17 @@ class MarketWatcherService:
 
         # 更新缓存
         indices_dict = {idx.code: idx for idx in all_indices}
-        cache_service.set_sync("indices", indices_dict, ttl=60)
+        await cache_service.set_object("indices", indices_dict, ttl=60)
 
         logger.info("Market indices refreshed", count=len(all_indices))
         return all_indices
 
     async def get_index(self, code: str) -> Optional[MarketIndex]:
         """获取单个指数"""
-        cached_dict = cache_service.get_sync("indices")
+        cached_dict = await cache_service.get_object("indices")
         if not cached_dict:
             await self.get_all_indices()
-            cached_dict = cache_service.get_sync("indices") or {}
+            cached_dict = await cache_service.get_object("indices") or {}
 
         return cached_dict.get(code)
 
@@ -16,6 +16,12 @@ class StockPrice(BaseModel):
     market: str  # CN, HK, US
 
 
+class StockPriceBatch(BaseModel):
+    """批量报价结果：成功的价格与逐只的错误信息"""
+    prices: Dict[str, StockPrice] = Field(default_factory=dict)
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+
 class KlineData(BaseModel):
     datetime: datetime
     open: float
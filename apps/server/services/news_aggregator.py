@@ -14,18 +14,11 @@ except ImportError:
     FEEDPARSER_AVAILABLE = False
 
 try:
-    import finnhub
+    from tradingagents.dataflows import http_pool
     FINNHUB_AVAILABLE = True
 except ImportError:
     FINNHUB_AVAILABLE = False
-    finnhub = None
-
-try:
-    import httpx
-    HTTPX_AVAILABLE = True
-except ImportError:
-    HTTPX_AVAILABLE = False
-    httpx = None
+    http_pool = None
 
 from config.settings import settings
 from services.cache_service import cache_service
@@ -113,6 +106,30 @@ RSS_FEEDS = {
 }
 
 
+class FinnhubClient:
+    """Finnhub REST 客户端（经共享连接池异步请求，接口与 finnhub SDK 的同名方法一致）"""
+
+    BASE_URL = "https://finnhub.io/api/v1"
+
+    def __init__(self, api_key: str):
+        self._headers = {"X-Finnhub-Token": api_key}
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Any:
+        response = await http_pool.aget(
+            f"{self.BASE_URL}{path}", params=params, headers=self._headers, timeout=15.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def general_news(self, category: str, min_id: int = 0) -> List[Dict[str, Any]]:
+        """市场新闻"""
+        return await self._get("/news", {"category": category, "minId": min_id})
+
+    async def company_news(self, symbol: str, _from: str, to: str) -> List[Dict[str, Any]]:
+        """个股新闻（日期格式 YYYY-MM-DD）"""
+        return await self._get("/company-news", {"symbol": symbol, "from": _from, "to": to})
+
+
 class NewsAggregatorService:
     """
     新闻聚合服务
@@ -141,7 +158,7 @@ class NewsAggregatorService:
             # 初始化 Finnhub 客户端
             if FINNHUB_AVAILABLE and settings.FINNHUB_API_KEY:
                 try:
-                    self._finnhub_client = finnhub.Client(api_key=settings.FINNHUB_API_KEY)
+                    self._finnhub_client = FinnhubClient(api_key=settings.FINNHUB_API_KEY)
                     logger.info("Finnhub client initialized")
                 except Exception as e:
                     logger.warning("Failed to initialize Finnhub client", error=str(e))
@@ -219,7 +236,7 @@ class NewsAggregatorService:
 
         try:
             # 获取市场新闻
-            news = self._finnhub_client.general_news(category, min_id=0)
+            news = await self._finnhub_client.general_news(category, min_id=0)
 
             for item in news[:30]:  # 取前 30 条
                 try:
@@ -278,7 +295,7 @@ class NewsAggregatorService:
             from_date = (now - timedelta(days=7)).strftime('%Y-%m-%d')
             to_date = now.strftime('%Y-%m-%d')
 
-            news = self._finnhub_client.company_news(symbol, _from=from_date, to=to_date)
+            news = await self._finnhub_client.company_news(symbol, _from=from_date, to=to_date)
 
             for item in news[:20]:
                 try:
@@ -322,7 +339,7 @@ class NewsAggregatorService:
         Returns:
             新闻列表（按时间倒序）
         """
-        news_dict: Dict[str, NewsItem] = cache_service.get_sync("all_news") or {}
+        news_dict: Dict[str, NewsItem] = await cache_service.get_object("all_news") or {}
         if not force_refresh and news_dict:
             return sorted(
                 news_dict.values(),
@@ -349,7 +366,7 @@ class NewsAggregatorService:
             if v.published_at > cutoff
         }
 
-        cache_service.set_sync("all_news", news_dict, ttl=300)
+        await cache_service.set_object("all_news", news_dict, ttl=300)
 
         logger.info("News aggregated", total=len(news_dict))
 
@@ -373,10 +390,10 @@ class NewsAggregatorService:
         # 如果缓存中没有足够的相关新闻，单独获取
         if len(cached_news) < 5:
             stock_news = await self._fetch_stock_news(symbol)
-            news_dict: Dict[str, NewsItem] = cache_service.get_sync("all_news") or {}
+            news_dict: Dict[str, NewsItem] = await cache_service.get_object("all_news") or {}
             for news in stock_news:
                 news_dict[news.id] = news
-            cache_service.set_sync("all_news", news_dict, ttl=300)
+            await cache_service.set_object("all_news", news_dict, ttl=300)
             cached_news = [n for n in news_dict.values() if symbol in n.symbols]
 
         return sorted(cached_news, key=lambda x: x.published_at, reverse=True)
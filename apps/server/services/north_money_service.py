@@ -10,7 +10,7 @@
 - 历史数据持久化存储
 - 北向资金与指数相关性分析
 """
-from datetime import datetime, date as DateType, time as TimeType
+from datetime import datetime, date as DateType, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 import json
@@ -25,9 +25,25 @@ import statistics
 from sqlmodel import Session, select
 from db.models import NorthMoneyHistoryRecord, engine
 from services.cache_service import cache_service
+from services.cache_revalidate import get_revalidating
+from services.trading_calendar import trading_calendar
+from services.frame_convert import (
+    build_models,
+    cn_symbols,
+    datetime_column,
+    numeric_column,
+    text_column,
+    to_dates,
+)
 
 logger = structlog.get_logger(__name__)
 
+# 软过期窗口（秒）：缓存过期后仍可先返回旧值、后台刷新的时长
+_STALE_TTL = 30 * 60
+
+# 收盘后北向数据仍会修正的窗口；之后至下一次 A 股开盘缓存保持有效
+_SETTLE = timedelta(minutes=30)
+
 
 # ============ 数据模型 ============
 
@@ -198,50 +214,12 @@ class NorthMoneyService:
         pass
 
     async def get_north_money_flow(self) -> NorthMoneyFlow:
-        """获取当日北向资金流向"""
-        cache_key = "north_money_flow"
-        cached = cache_service.get_sync(cache_key)
-        if cached:
-            return cached
-
+        """获取当日北向资金流向（软过期缓存：过期后先返回旧值并后台刷新）"""
         try:
-            # 使用 AkShare 获取北向资金数据（stock_hsgt_fund_flow_summary_em 替代已废弃的 stock_hsgt_north_net_flow_in_em）
-            df = await asyncio.wait_for(
-                asyncio.to_thread(ak.stock_hsgt_fund_flow_summary_em),
-                timeout=15.0
+            return await get_revalidating(
+                "north_money_flow", self._fetch_north_money_flow,
+                ttl=300, stale_ttl=_STALE_TTL, market="CN", settle=_SETTLE,
             )
-
-            if df.empty:
-                raise ValueError("No north money data available")
-
-            # 筛选北向资金行（沪股通 + 深股通）
-            sh_row = df[(df['板块'] == '沪股通') & (df['资金方向'] == '北向')]
-            sz_row = df[(df['板块'] == '深股通') & (df['资金方向'] == '北向')]
-
-            sh_net = float(sh_row['成交净买额'].values[0]) if not sh_row.empty else 0
-            sz_net = float(sz_row['成交净买额'].values[0]) if not sz_row.empty else 0
-            total = sh_net + sz_net
-            if total > 50:
-                sentiment = "Strong Inflow"
-            elif total > 0:
-                sentiment = "Inflow"
-            elif total > -50:
-                sentiment = "Outflow"
-            else:
-                sentiment = "Strong Outflow"
-
-            flow = NorthMoneyFlow(
-                date=datetime.now().date(),
-                sh_connect=sh_net,
-                sz_connect=sz_net,
-                total=total,
-                market_sentiment=sentiment,
-            )
-
-            cache_service.set_sync(cache_key, flow, ttl=300)
-            logger.info("Fetched north money flow", total=total, sentiment=sentiment)
-            return flow
-
         except Exception as e:
             logger.error("Failed to fetch north money flow", error=str(e))
             # 返回空数据
@@ -253,54 +231,87 @@ class NorthMoneyService:
                 market_sentiment="Unknown",
             )
 
-    async def get_north_money_history(self, days: int = 30) -> List[NorthMoneyHistory]:
-        """获取北向资金历史数据"""
-        cache_key = f"north_money_history_{days}"
-        cached = cache_service.get_sync(cache_key)
-        if cached:
-            return cached
-
-        try:
-            # 分别获取沪股通和深股通历史数据，合并为北向资金总量
-            df_sh = await asyncio.wait_for(
-                asyncio.to_thread(ak.stock_hsgt_hist_em, symbol="沪股通"),
-                timeout=15.0
-            )
-            df_sz = await asyncio.wait_for(
-                asyncio.to_thread(ak.stock_hsgt_hist_em, symbol="深股通"),
-                timeout=15.0
-            )
+    async def _fetch_north_money_flow(self) -> NorthMoneyFlow:
+        """从 AkShare 获取当日北向资金流向"""
+        # 使用 AkShare 获取北向资金数据（stock_hsgt_fund_flow_summary_em 替代已废弃的 stock_hsgt_north_net_flow_in_em）
+        df = await asyncio.wait_for(
+            asyncio.to_thread(ak.stock_hsgt_fund_flow_summary_em),
+            timeout=15.0
+        )
 
-            if df_sh.empty and df_sz.empty:
-                return []
+        if df.empty:
+            raise ValueError("No north money data available")
+
+        # 筛选北向资金行（沪股通 + 深股通）
+        sh_row = df[(df['板块'] == '沪股通') & (df['资金方向'] == '北向')]
+        sz_row = df[(df['板块'] == '深股通') & (df['资金方向'] == '北向')]
+
+        sh_net = float(sh_row['成交净买额'].values[0]) if not sh_row.empty else 0
+        sz_net = float(sz_row['成交净买额'].values[0]) if not sz_row.empty else 0
+        total = sh_net + sz_net
+        if total > 50:
+            sentiment = "Strong Inflow"
+        elif total > 0:
+            sentiment = "Inflow"
+        elif total > -50:
+            sentiment = "Outflow"
+        else:
+            sentiment = "Strong Outflow"
 
-            # 按日期对齐合并
-            df_sh = df_sh[['日期', '当日成交净买额']].rename(columns={'当日成交净买额': 'sh'}).tail(days)
-            df_sz = df_sz[['日期', '当日成交净买额']].rename(columns={'当日成交净买额': 'sz'}).tail(days)
-            df = pd.merge(df_sh, df_sz, on='日期', how='outer').fillna(0)
-            df = df.tail(days)
-
-            history = []
-            for _, row in df.iterrows():
-                try:
-                    sh_val = float(row.get('sh', 0) or 0)
-                    sz_val = float(row.get('sz', 0) or 0)
-                    history.append(NorthMoneyHistory(
-                        date=pd.to_datetime(row['日期']).date(),
-                        total=sh_val + sz_val,
-                        sh_connect=sh_val,
-                        sz_connect=sz_val,
-                    ))
-                except Exception:
-                    continue
+        flow = NorthMoneyFlow(
+            date=datetime.now().date(),
+            sh_connect=sh_net,
+            sz_connect=sz_net,
+            total=total,
+            market_sentiment=sentiment,
+        )
 
-            cache_service.set_sync(cache_key, history, ttl=300)
-            return history
+        logger.info("Fetched north money flow", total=total, sentiment=sentiment)
+        return flow
 
+    async def get_north_money_history(self, days: int = 30) -> List[NorthMoneyHistory]:
+        """获取北向资金历史数据（软过期缓存）"""
+        try:
+            return await get_revalidating(
+                f"north_money_history_{days}", self._fetch_north_money_history, days,
+                ttl=300, stale_ttl=_STALE_TTL, market="CN", settle=_SETTLE,
+            )
         except Exception as e:
             logger.error("Failed to fetch north money history", error=str(e))
             return []
 
+    async def _fetch_north_money_history(self, days: int) -> List[NorthMoneyHistory]:
+        """从 AkShare 获取北向资金历史数据"""
+        # 分别获取沪股通和深股通历史数据，合并为北向资金总量
+        df_sh = await asyncio.wait_for(
+            asyncio.to_thread(ak.stock_hsgt_hist_em, symbol="沪股通"),
+            timeout=15.0
+        )
+        df_sz = await asyncio.wait_for(
+            asyncio.to_thread(ak.stock_hsgt_hist_em, symbol="深股通"),
+            timeout=15.0
+        )
+
+        if df_sh.empty and df_sz.empty:
+            raise ValueError("No north money history available")
+
+        # 按日期对齐合并
+        df_sh = df_sh[['日期', '当日成交净买额']].rename(columns={'当日成交净买额': 'sh'}).tail(days)
+        df_sz = df_sz[['日期', '当日成交净买额']].rename(columns={'当日成交净买额': 'sz'}).tail(days)
+        df = pd.merge(df_sh, df_sz, on='日期', how='outer').fillna(0)
+        df = df.tail(days)
+
+        dates = datetime_column(df, '日期')
+        sh_val = numeric_column(df, 'sh')
+        sz_val = numeric_column(df, 'sz')
+        frame = pd.DataFrame({
+            "date": to_dates(dates),
+            "total": sh_val + sz_val,
+            "sh_connect": sh_val,
+            "sz_connect": sz_val,
+        })[dates.notna()]
+        return build_models(NorthMoneyHistory, frame)
+
     async def get_stock_north_holding(self, symbol: str) -> Optional[StockNorthHolding]:
         """获取个股北向持仓变化"""
         try:
@@ -344,10 +355,28 @@ class NorthMoneyService:
             logger.error("Failed to fetch stock north holding", symbol=symbol, error=str(e))
             return None
 
+    @staticmethod
+    def _net_buy_column(df: pd.DataFrame) -> pd.Series:
+        """净买额（亿元），为 0 或缺失时取今日增持市值"""
+        net_buy = numeric_column(df, '净买额')
+        return net_buy.where(net_buy != 0, numeric_column(df, '今日增持市值')) / 1e8
+
+    @classmethod
+    def _top_stock_frame(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """北向持股排行 -> NorthMoneyTopStock 字段列"""
+        return pd.DataFrame({
+            "symbol": cn_symbols(text_column(df, '代码')),
+            "name": text_column(df, '名称'),
+            "net_buy": cls._net_buy_column(df),
+            "buy_amount": numeric_column(df, '买入金额', scale=1e-8),
+            "sell_amount": numeric_column(df, '卖出金额', scale=1e-8),
+            "holding_ratio": numeric_column(df, '持股占比'),
+        })
+
     async def get_top_north_buys(self, limit: int = 20) -> List[NorthMoneyTopStock]:
         """获取北向资金净买入 TOP"""
         cache_key = f"top_north_buys_{limit}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -367,23 +396,11 @@ class NorthMoneyService:
             elif '今日增持市值' in df.columns:
                 df = df.sort_values('今日增持市值', ascending=False)
 
-            df = df.head(limit)
-
-            result = []
-            for _, row in df.iterrows():
-                try:
-                    result.append(NorthMoneyTopStock(
-                        symbol=f"{row.get('代码', '')}.SH" if str(row.get('代码', '')).startswith('6') else f"{row.get('代码', '')}.SZ",
-                        name=str(row.get('名称', '')),
-                        net_buy=float(row.get('净买额', 0) or row.get('今日增持市值', 0) or 0) / 1e8,
-                        buy_amount=float(row.get('买入金额', 0) or 0) / 1e8,
-                        sell_amount=float(row.get('卖出金额', 0) or 0) / 1e8,
-                        holding_ratio=float(row.get('持股占比', 0) or 0),
-                    ))
-                except Exception:
-                    continue
+            result = build_models(NorthMoneyTopStock, self._top_stock_frame(df.head(limit)))
 
-            cache_service.set_sync(cache_key, result, ttl=300)
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 300, settle=_SETTLE)
+            )
             return result
 
         except Exception as e:
@@ -393,7 +410,7 @@ class NorthMoneyService:
     async def get_top_north_sells(self, limit: int = 20) -> List[NorthMoneyTopStock]:
         """获取北向资金净卖出 TOP"""
         cache_key = f"top_north_sells_{limit}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -413,27 +430,13 @@ class NorthMoneyService:
             elif '今日增持市值' in df.columns:
                 df = df.sort_values('今日增持市值', ascending=True)
 
-            df = df.head(limit)
-
-            result = []
-            for _, row in df.iterrows():
-                try:
-                    net_buy = float(row.get('净买额', 0) or row.get('今日增持市值', 0) or 0) / 1e8
-                    if net_buy >= 0:
-                        continue  # 跳过净买入的
-
-                    result.append(NorthMoneyTopStock(
-                        symbol=f"{row.get('代码', '')}.SH" if str(row.get('代码', '')).startswith('6') else f"{row.get('代码', '')}.SZ",
-                        name=str(row.get('名称', '')),
-                        net_buy=net_buy,
-                        buy_amount=float(row.get('买入金额', 0) or 0) / 1e8,
-                        sell_amount=float(row.get('卖出金额', 0) or 0) / 1e8,
-                        holding_ratio=float(row.get('持股占比', 0) or 0),
-                    ))
-                except Exception:
-                    continue
+            frame = self._top_stock_frame(df.head(limit))
+            # 跳过净买入的
+            result = build_models(NorthMoneyTopStock, frame[frame["net_buy"] < 0])
 
-            cache_service.set_sync(cache_key, result, ttl=300)
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 300, settle=_SETTLE)
+            )
             return result
 
         except Exception as e:
@@ -506,7 +509,7 @@ class NorthMoneyService:
         基于个股北向持仓变化，聚合到板块级别。
         """
         cache_key = "sector_flow"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -524,10 +527,7 @@ class NorthMoneyService:
             # 聚合到板块
             sector_data: Dict[str, Dict] = {}
 
-            for _, row in df.iterrows():
-                stock_name = str(row.get('名称', ''))
-                net_buy = float(row.get('净买额', 0) or row.get('今日增持市值', 0) or 0) / 1e8
-
+            for stock_name, net_buy in zip(text_column(df, '名称'), self._net_buy_column(df)):
                 # 识别板块
                 matched_sector = self._match_sector(stock_name)
                 if matched_sector not in sector_data:
@@ -568,7 +568,9 @@ class NorthMoneyService:
             # 按净买入排序
             result.sort(key=lambda x: x.net_buy, reverse=True)
 
-            cache_service.set_sync(cache_key, result, ttl=300)
+            await cache_service.set_object(
+                cache_key, result, ttl=trading_calendar.cache_ttl("CN", 300, settle=_SETTLE)
+            )
             logger.info("Calculated sector flow", sectors=len(result))
             return result
 
@@ -962,45 +964,45 @@ class NorthMoneyService:
             from sqlmodel import Session
             from db.models import NorthMoneySectorRecord, engine
 
+            names = text_column(df, "板块名称", "行业")
+            rows = zip(
+                names,
+                numeric_column(df, "净买入", "净流入", scale=1e-8),
+                numeric_column(df, "买入金额", scale=1e-8),
+                numeric_column(df, "卖出金额", scale=1e-8),
+            )
+
             with Session(engine) as session:
-                for _, row in df.iterrows():
-                    try:
-                        sector_name = str(row.get("板块名称", row.get("行业", "")))
-                        if not sector_name:
-                            continue
-
-                        net_inflow = float(row.get("净买入", row.get("净流入", 0)) or 0) / 1e8
-                        buy_amount = float(row.get("买入金额", 0) or 0) / 1e8
-                        sell_amount = float(row.get("卖出金额", 0) or 0) / 1e8
-
-                        # 检查是否已存在
-                        from sqlmodel import select
-                        existing = session.exec(
-                            select(NorthMoneySectorRecord)
-                            .where(NorthMoneySectorRecord.date == today)
-                            .where(NorthMoneySectorRecord.sector_name == sector_name)
-                        ).first()
-
-                        if existing:
-                            existing.net_inflow = net_inflow
-                            existing.buy_amount = buy_amount
-                            existing.sell_amount = sell_amount
-                        else:
-                            record = NorthMoneySectorRecord(
-                                date=today,
-                                sector_name=sector_name,
-                                net_inflow=net_inflow,
-                                buy_amount=buy_amount,
-                                sell_amount=sell_amount,
-                                top_stocks_json="[]",
-                            )
-                            session.add(record)
-
-                        saved_count += 1
-                    except Exception as row_err:
-                        logger.warning("Failed to save sector row", error=str(row_err))
+                # 一次查询当天已有记录，避免逐行查询
+                existing_records = {
+                    record.sector_name: record
+                    for record in session.exec(
+                        select(NorthMoneySectorRecord).where(NorthMoneySectorRecord.date == today)
+                    ).all()
+                }
+
+                for sector_name, net_inflow, buy_amount, sell_amount in rows:
+                    if not sector_name:
                         continue
 
+                    existing = existing_records.get(sector_name)
+                    if existing:
+                        existing.net_inflow = float(net_inflow)
+                        existing.buy_amount = float(buy_amount)
+                        existing.sell_amount = float(sell_amount)
+                    else:
+                        existing_records[sector_name] = NorthMoneySectorRecord(
+                            date=today,
+                            sector_name=sector_name,
+                            net_inflow=float(net_inflow),
+                            buy_amount=float(buy_amount),
+                            sell_amount=float(sell_amount),
+                            top_stocks_json="[]",
+                        )
+                        session.add(existing_records[sector_name])
+
+                    saved_count += 1
+
                 session.commit()
 
             logger.info("Sector data saved", date=today, count=saved_count)
@@ -1012,24 +1014,9 @@ class NorthMoneyService:
 
     # ============ 盘中实时流向 ============
 
-    def _is_trading_hours(self) -> bool:
-        """判断当前是否在交易时段"""
-        now = datetime.now()
-        # 交易日判断（简化：非周末）
-        if now.weekday() >= 5:
-            return False
-
-        current_time = now.time()
-        # 上午盘 9:30 - 11:30，下午盘 13:00 - 15:00
-        morning_start = TimeType(9, 30)
-        morning_end = TimeType(11, 30)
-        afternoon_start = TimeType(13, 0)
-        afternoon_end = TimeType(15, 0)
-
-        return (
-            (morning_start <= current_time <= morning_end) or
-            (afternoon_start <= current_time <= afternoon_end)
-        )
+    def _is_trading_hours(self, at: Optional[datetime] = None) -> bool:
+        """判断是否在 A 股交易时段（交易日历：含节假日与午休）"""
+        return trading_calendar.is_open("CN", at)
 
     async def get_intraday_flow(self) -> IntradayFlowSummary:
         """获取盘中分时北向资金流向
@@ -1038,7 +1025,7 @@ class NorthMoneyService:
         """
         cache_key = "intraday_flow"
         # 盘中数据缓存时间较短（1分钟）
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -1050,26 +1037,20 @@ class NorthMoneyService:
             )
 
             flow_points = []
-            cumulative = 0.0
-
             if df is not None and not df.empty:
-                for _, row in df.iterrows():
-                    try:
-                        time_str = str(row.get('时间', ''))[-5:]  # 取 HH:MM
-                        sh = float(row.get('沪股通', 0) or 0)
-                        sz = float(row.get('深股通', 0) or 0)
-                        total = sh + sz
-                        cumulative = float(row.get('北向资金', cumulative) or cumulative)
-
-                        flow_points.append(IntradayFlowPoint(
-                            time=time_str,
-                            sh_connect=round(sh, 2),
-                            sz_connect=round(sz, 2),
-                            total=round(total, 2),
-                            cumulative_total=round(cumulative, 2),
-                        ))
-                    except Exception:
-                        continue
+                sh = numeric_column(df, '沪股通')
+                sz = numeric_column(df, '深股通')
+                # 北向资金累计值缺失（或为 0）时沿用上一个时点
+                cumulative = numeric_column(df, '北向资金', default=np.nan)
+                cumulative = cumulative.where(cumulative != 0).ffill().fillna(0.0)
+
+                flow_points = build_models(IntradayFlowPoint, pd.DataFrame({
+                    "time": text_column(df, '时间').str[-5:],  # 取 HH:MM
+                    "sh_connect": sh.round(2),
+                    "sz_connect": sz.round(2),
+                    "total": (sh + sz).round(2),
+                    "cumulative_total": cumulative.round(2),
+                }))
 
             # 计算统计指标
             if flow_points:
@@ -1108,7 +1089,7 @@ class NorthMoneyService:
                 momentum=momentum,
             )
 
-            cache_service.set_sync(cache_key, result, ttl=60)
+            await cache_service.set_object(cache_key, result, ttl=trading_calendar.cache_ttl("CN", 60))
             return result
 
         except Exception as e:
@@ -0,0 +1,535 @@
+"""
+本地列式 OHLCV 存储
+
+按股票代码分区保存日线数据，每列一个 .npy 文件，读取时内存映射：
+
+    <root>/<SYMBOL>/meta.json            覆盖区间与当前版本
+    <root>/<SYMBOL>/v<版本>/date.npy     datetime64[D]
+    <root>/<SYMBOL>/v<版本>/close.npy    float64（open/high/low/volume 同理）
+
+- 只向数据源请求覆盖区间之外缺失的日期段，与已有数据合并后写入新的版本目录，
+  再原子替换 meta.json，其他进程不会读到写了一半的数据
+- 同一股票的读-改-写由进程内锁加文件锁（<root>/.locks/<SYMBOL>.lock，fcntl.flock）保护，
+  API 进程与分析 worker 进程之间不会互相删除对方刚写入的版本
+- 读取使用 np.load(mmap_mode="r")，按日期二分查找得到的切片不复制数据
+- 复权价格会因分红送转整体变化：向后追加时与已有数据重叠一个交易日，
+  收盘价不一致则整段重新获取
+- 当天的 K 线在盘中持续变化，超过 _INTRADAY_REFRESH 后重新获取；按交易日历判断，
+  收盘结算后已写入过一次的当天 K 线不再刷新，周末与节假日也不会重复获取（避免无意义的新版本
+  让依赖版本号的指标缓存重算）
+- 总大小超过 OHLCV_STORE_MAX_MB 时按最近访问时间淘汰整只股票的数据（meta.json 的 mtime
+  记录最近访问），写入后最多每 _GC_INTERVAL 秒检查一次；同时清理中断写入残留的临时目录
+  与未被 meta.json 引用的旧版本目录
+"""
+import asyncio
+import contextlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from config.settings import settings
+from services.trading_calendar import DEFAULT_SETTLE, trading_calendar
+
+try:
+    import fcntl
+except ImportError:  # Windows：仅进程内加锁
+    fcntl = None
+
+logger = structlog.get_logger()
+
+# 列名 -> DataFrame 列名（与 yfinance 一致，stockstats 可直接使用）
+COLUMNS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+
+# 当天数据的重新获取间隔（秒）
+_INTRADAY_REFRESH = 15 * 60
+
+# 重叠交易日收盘价的相对误差阈值，超过视为复权因子变化
+_ADJUST_TOLERANCE = 1e-4
+
+# 最近访问时间的更新粒度（秒），避免每次读取都写文件系统
+_ACCESS_TOUCH_INTERVAL = 3600
+
+# 写入后触发容量检查的最小间隔（秒）
+_GC_INTERVAL = 600
+
+# 超过该时长且未被 meta.json 引用的 .tmp-* / v* 目录视为中断写入的残留（秒）
+_STALE_TMP_AGE = 3600
+
+DateLike = Union[str, date, pd.Timestamp]
+
+# 数据源：(symbol, start, end) -> 以日期为索引、含 Open/High/Low/Close/Volume 列的 DataFrame（end 含当天）
+Fetcher = Callable[[str, date, date], pd.DataFrame]
+
+
+def _to_date(value: DateLike) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _market_of(symbol: str) -> str:
+    # 延迟导入避免循环依赖
+    from services.data_router import MarketRouter
+    return MarketRouter.get_market(symbol)
+
+
+def _bar_settled(market: str, updated_at: float) -> bool:
+    """
+    上次写入后当天 K 线是否已不会再变化
+
+    当前不在交易时段（含收盘结算窗口）、上次写入也不在交易时段内，
+    且上次写入之后没有新的时段开盘，即上次写入时已是收盘后的最终数据
+    """
+    if trading_calendar.is_open(market, settle=DEFAULT_SETTLE):
+        return False
+    written = datetime.fromtimestamp(updated_at).astimezone()
+    if trading_calendar.is_open(market, written, settle=DEFAULT_SETTLE):
+        return False
+    next_open = trading_calendar.next_open(market, written)
+    return next_open is None or next_open > datetime.now().astimezone()
+
+
+def _normalize(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """统一为按日期升序、无时区的 float64 OHLCV 表"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=list(COLUMNS.values()), index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = pd.DataFrame(
+        {
+            name: pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+            if name in df.columns else np.zeros(len(df))
+            for name in COLUMNS.values()
+        },
+        index=index.normalize().rename("Date"),
+    )
+    frame = frame[frame["Close"].notna()]
+    return frame[~frame.index.duplicated(keep="last")].sort_index()
+
+
+@dataclass
+class OhlcvSlice:
+    """日线列式切片（列为内存映射数组的视图）"""
+    symbol: str
+    dates: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    @classmethod
+    def empty(cls, symbol: str) -> "OhlcvSlice":
+        return cls(
+            symbol=symbol,
+            dates=np.empty(0, dtype="datetime64[D]"),
+            columns={name: np.empty(0) for name in COLUMNS},
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def slice(self, start: date, end: date) -> "OhlcvSlice":
+        """按日期闭区间切片（二分查找，不复制数据）"""
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        return OhlcvSlice(
+            symbol=self.symbol,
+            dates=self.dates[lo:hi],
+            columns={name: values[lo:hi] for name, values in self.columns.items()},
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为以 Date 为索引的 DataFrame（会复制数据）"""
+        return pd.DataFrame(
+            {label: np.asarray(self.columns[name]) for name, label in COLUMNS.items()},
+            index=pd.DatetimeIndex(np.asarray(self.dates), name="Date"),
+        )
+
+
+class OhlcvStore:
+    """本地 OHLCV 存储（单例）"""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        fetcher: Optional[Fetcher] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.root = Path(root or settings.OHLCV_STORE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.OHLCV_STORE_MAX_MB * 1024 * 1024
+        self._fetcher = fetcher
+        self._last_gc = 0.0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+        self.rows_fetched = 0
+        self.full_refetches = 0
+        self.evictions = 0
+
+    @property
+    def fetcher(self) -> Fetcher:
+        if self._fetcher is None:
+            # 延迟导入避免循环依赖：默认按 MarketRouter 的数据源优先级与熔断状态获取
+            from services.data_router import MarketRouter
+            return MarketRouter.fetch_ohlcv_range
+        return self._fetcher
+
+    @staticmethod
+    def _key(symbol: str) -> str:
+        """股票代码对应的目录名，同时作为进程内锁与文件锁的键"""
+        return re.sub(r"[^A-Za-z0-9._^-]", "_", symbol.upper())
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / self._key(symbol)
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @contextlib.contextmanager
+    def _symbol_lock(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        """
+        进程内锁 + 跨进程文件锁（锁文件不在股票目录内，目录被淘汰后仍然有效）
+
+        Args:
+            key: _key() 得到的目录名
+            blocking: False 时锁被占用立即返回，产出 False
+        """
+        lock = self._lock_for(key)
+        if not lock.acquire(blocking=blocking):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            lock_dir = self.root / ".locks"
+            lock_dir.mkdir(parents=True, exist_ok=True)
+            with open(lock_dir / f"{key}.lock", "a") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            lock.release()
+
+    # -------------------------------------------------------------------------
+    # 读取
+    # -------------------------------------------------------------------------
+
+    def coverage(self, symbol: str) -> Optional[dict]:
+        """覆盖区间元数据；没有本地数据时返回 None"""
+        try:
+            return json.loads((self._symbol_dir(symbol) / "meta.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _load(self, symbol: str, meta: dict) -> Optional[OhlcvSlice]:
+        version_dir = self._symbol_dir(symbol) / f"v{meta['version']}"
+        try:
+            return OhlcvSlice(
+                symbol=symbol,
+                dates=np.load(version_dir / "date.npy", mmap_mode="r"),
+                columns={name: np.load(version_dir / f"{name}.npy", mmap_mode="r") for name in COLUMNS},
+            )
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _read(self, symbol: str) -> Tuple[Optional[dict], Optional[OhlcvSlice]]:
+        # 读取 meta 与数据之间可能被其他进程替换为新版本，重读一次即可
+        for _ in range(2):
+            meta = self.coverage(symbol)
+            if meta is None:
+                return None, None
+            data = self._load(symbol, meta)
+            if data is not None:
+                return meta, data
+        return None, None
+
+    # -------------------------------------------------------------------------
+    # 增量获取
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _missing_ranges(
+        meta: Optional[dict], data: Optional[OhlcvSlice], start: date, end: date, today: date, market: str
+    ) -> List[Tuple[date, date]]:
+        """需要从数据源获取的日期段"""
+        if meta is None:
+            return [(start, end)]
+
+        covered_start = date.fromisoformat(meta["start"])
+        covered_end = date.fromisoformat(meta["end"])
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start - timedelta(days=1)))
+
+        intraday_stale = (
+            end >= today and covered_end >= today
+            and time.time() - meta["updated_at"] > _INTRADAY_REFRESH
+            and not _bar_settled(market, meta["updated_at"])
+        )
+        if end > covered_end or intraday_stale:
+            # 从最后一根已存 K 线开始取，重叠部分用于检测复权变化
+            last_bar = pd.Timestamp(data.dates[-1]).date() if data is not None and len(data) else covered_end
+            ranges.append((min(last_bar, covered_end), max(end, covered_end)))
+        return ranges
+
+    @staticmethod
+    def _adjustment_changed(existing: pd.DataFrame, fetched: List[pd.DataFrame], today: date) -> bool:
+        """重叠的已收盘交易日收盘价不一致，说明复权因子已变化"""
+        cutoff = pd.Timestamp(today)
+        for frame in fetched:
+            overlap = existing.index.intersection(frame.index)
+            overlap = overlap[overlap < cutoff]
+            if overlap.empty:
+                continue
+            old = existing.loc[overlap, "Close"].to_numpy()
+            new = frame.loc[overlap, "Close"].to_numpy()
+            if np.any(np.abs(new - old) > _ADJUST_TOLERANCE * np.maximum(np.abs(old), 1e-9)):
+                return True
+        return False
+
+    def _fetch(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        frame = _normalize(self.fetcher(symbol, start, end))
+        with self._stats_lock:
+            self.fetches += 1
+            self.rows_fetched += len(frame)
+        return frame
+
+    def _write(
+        self, symbol: str, frame: pd.DataFrame, start: date, end: date, previous: Optional[dict] = None
+    ) -> dict:
+        """
+        写入新版本目录后原子替换 meta.json，再删除被替换的版本
+
+        只删除 previous（调用方在锁内读到的 meta）记录的版本；中断写入等原因残留的
+        其他版本目录由 gc 按存在时长清理。
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        symbol_dir.mkdir(parents=True, exist_ok=True)
+        version = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+        tmp_dir = symbol_dir / f".tmp-{version}"
+        tmp_dir.mkdir()
+        np.save(tmp_dir / "date.npy", frame.index.values.astype("datetime64[D]"))
+        for name, label in COLUMNS.items():
+            np.save(tmp_dir / f"{name}.npy", frame[label].to_numpy(dtype=float))
+        os.replace(tmp_dir, symbol_dir / f"v{version}")
+
+        meta = {
+            "symbol": symbol,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rows": len(frame),
+            "version": version,
+            "updated_at": time.time(),
+        }
+        tmp_meta = symbol_dir / f".meta-{version}.json"
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, symbol_dir / "meta.json")
+
+        # 已打开的内存映射在文件删除后仍然有效
+        if previous is not None and previous.get("version") != version:
+            shutil.rmtree(symbol_dir / f"v{previous['version']}", ignore_errors=True)
+        return meta
+
+    def _update(
+        self,
+        symbol: str,
+        meta: Optional[dict],
+        data: Optional[OhlcvSlice],
+        ranges: List[Tuple[date, date]],
+        start: date,
+        end: date,
+        today: date,
+    ) -> Optional[OhlcvSlice]:
+        if meta is not None:
+            start = min(start, date.fromisoformat(meta["start"]))
+            end = max(end, date.fromisoformat(meta["end"]))
+
+        existing = data.to_frame() if data is not None and len(data) else None
+        try:
+            fetched = [self._fetch(symbol, s, e) for s, e in ranges]
+            if existing is not None and self._adjustment_changed(existing, fetched, today):
+                logger.info("Adjusted prices changed, refetching full range", symbol=symbol)
+                with self._stats_lock:
+                    self.full_refetches += 1
+                existing, fetched = None, [self._fetch(symbol, start, end)]
+        except Exception as e:
+            if data is None:
+                raise
+            logger.warning("OHLCV fetch failed, serving stored bars", symbol=symbol, error=str(e))
+            return data
+
+        merged = pd.concat(([existing] if existing is not None else []) + fetched)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        if merged.empty:
+            # 数据源未返回任何数据（代码无效或被限流），不记录覆盖区间
+            return None
+
+        meta = self._write(symbol, merged, start, end, previous=meta)
+        logger.debug("OHLCV store updated", symbol=symbol, rows=meta["rows"], ranges=len(ranges))
+        if time.time() - self._last_gc > _GC_INTERVAL:
+            self.gc(keep=symbol)
+        return self._load(symbol, meta)
+
+    # -------------------------------------------------------------------------
+    # 容量回收
+    # -------------------------------------------------------------------------
+
+    def _touch(self, symbol: str):
+        """记录最近访问时间（meta.json 的 mtime）"""
+        meta_path = self._symbol_dir(symbol) / "meta.json"
+        try:
+            if time.time() - meta_path.stat().st_mtime > _ACCESS_TOUCH_INTERVAL:
+                os.utime(meta_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        size = 0
+        for f in path.rglob("*"):
+            try:
+                if f.is_file():
+                    size += f.stat().st_size
+            except OSError:
+                pass
+        return size
+
+    @staticmethod
+    def _current_version_dir(symbol_dir: Path) -> Optional[str]:
+        try:
+            return f"v{json.loads((symbol_dir / 'meta.json').read_text())['version']}"
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def gc(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> dict:
+        """
+        按最近访问时间淘汰股票数据，直到总大小不超过 max_bytes
+
+        Args:
+            max_bytes: 容量上限，默认 OHLCV_STORE_MAX_MB
+            keep: 不淘汰的股票（刚写入的数据）
+        """
+        self._last_gc = time.time()
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if not self.root.exists():
+            return {"bytes": 0, "evicted": []}
+
+        entries = []
+        now = time.time()
+        for symbol_dir in self.root.iterdir():
+            # .locks 等以点开头的目录不是股票数据
+            if not symbol_dir.is_dir() or symbol_dir.name.startswith("."):
+                continue
+            current = self._current_version_dir(symbol_dir)
+            for leftover in list(symbol_dir.glob(".tmp-*")) + list(symbol_dir.glob("v*")):
+                if leftover.name == current:
+                    continue
+                try:
+                    if now - leftover.stat().st_mtime > _STALE_TMP_AGE:
+                        shutil.rmtree(leftover, ignore_errors=True)
+                except OSError:
+                    pass
+            try:
+                accessed = (symbol_dir / "meta.json").stat().st_mtime
+            except OSError:
+                accessed = 0.0
+            entries.append((accessed, symbol_dir, self._dir_size(symbol_dir)))
+
+        total = sum(size for _, _, size in entries)
+        evicted = []
+        keep_dir = self._symbol_dir(keep) if keep else None
+        for _, symbol_dir, size in sorted(entries, key=lambda e: e[0]):
+            if total <= max_bytes:
+                break
+            if symbol_dir == keep_dir:
+                continue
+            # 正在被本进程或其他进程读写的股票跳过（也避免与持有其他股票锁的线程互相等待）
+            with self._symbol_lock(symbol_dir.name, blocking=False) as acquired:
+                if not acquired:
+                    continue
+                # 已打开的内存映射在目录删除后仍然有效
+                shutil.rmtree(symbol_dir, ignore_errors=True)
+            total -= size
+            evicted.append(symbol_dir.name)
+
+        if evicted:
+            with self._stats_lock:
+                self.evictions += len(evicted)
+            logger.info("OHLCV store evicted symbols", count=len(evicted), bytes=total, max_bytes=max_bytes)
+        return {"bytes": total, "evicted": evicted}
+
+    # -------------------------------------------------------------------------
+    # 对外接口
+    # -------------------------------------------------------------------------
+
+    def get_slice(self, symbol: str, start: DateLike, end: Optional[DateLike] = None) -> OhlcvSlice:
+        """获取 [start, end] 区间日线（先补齐本地缺失的日期段），返回零拷贝切片"""
+        today = date.today()
+        start = _to_date(start)
+        end = min(_to_date(end), today) if end is not None else today
+
+        with self._symbol_lock(self._key(symbol)):
+            meta, data = self._read(symbol)
+            ranges = self._missing_ranges(meta, data, start, end, today, _market_of(symbol))
+            if ranges:
+                data = self._update(symbol, meta, data, ranges, start, end, today)
+            else:
+                self._touch(symbol)
+                with self._stats_lock:
+                    self.hits += 1
+
+        if data is None:
+            return OhlcvSlice.empty(symbol)
+        return data.slice(start, end)
+
+    def get_range(self, symbol: str, start: DateLike, end: Optional[DateLike] = None) -> pd.DataFrame:
+        """获取 [start, end] 区间日线 DataFrame（Date 索引，Open/High/Low/Close/Volume 列）"""
+        return self.get_slice(symbol, start, end).to_frame()
+
+    async def aget_slice(self, symbol: str, start: DateLike, end: Optional[DateLike] = None) -> OhlcvSlice:
+        return await asyncio.to_thread(self.get_slice, symbol, start, end)
+
+    async def aget_range(self, symbol: str, start: DateLike, end: Optional[DateLike] = None) -> pd.DataFrame:
+        return await asyncio.to_thread(self.get_range, symbol, start, end)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "root": str(self.root),
+                "hits": self.hits,
+                "fetches": self.fetches,
+                "rows_fetched": self.rows_fetched,
+                "full_refetches": self.full_refetches,
+                "evictions": self.evictions,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# 全局单例
+ohlcv_store = OhlcvStore()
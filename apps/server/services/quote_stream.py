@@ -0,0 +1,207 @@
+"""
+实时行情推送
+
+前端原本按固定间隔轮询价格与指数接口，每个客户端每次轮询都会走一遍缓存与数据源路径。
+本服务改为服务端推送：
+
+- 客户端订阅一组代码（股票或 MARKET_INDICES 中的指数）
+- 单个共享刷新循环按所有订阅的并集批量获取行情，与上一次推送的 tick 比较
+- 只推送发生变化的字段（delta），新订阅者先收到一次完整快照
+- 消费过慢的订阅者丢弃积压消息，改为在下一次读取时重新下发快照
+
+没有订阅者时刷新循环自动停止。
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import structlog
+
+from config.settings import settings
+from services.data_router import MarketRouter
+from services.market_watcher import MARKET_INDICES, market_watcher
+
+logger = structlog.get_logger()
+
+# 每次推送都会变化、不参与比较的字段
+_VOLATILE_FIELDS = {"timestamp", "updated_at"}
+
+
+def _tick(model) -> Dict[str, Any]:
+    """将行情模型转换为可比较的 tick（去除时间戳字段）"""
+    data = model.model_dump(mode="json")
+    return {k: v for k, v in data.items() if k not in _VOLATILE_FIELDS}
+
+
+def diff_tick(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """计算相对上一次 tick 发生变化的字段，无上一次 tick 时返回完整 tick"""
+    if previous is None:
+        return dict(current)
+    return {k: v for k, v in current.items() if previous.get(k) != v}
+
+
+@dataclass
+class QuoteSubscription:
+    """单个客户端的订阅"""
+    symbols: Set[str]
+    queue: asyncio.Queue
+    resync: bool = False
+    created_at: float = field(default_factory=time.time)
+
+    def offer(self, message: Dict[str, Any]):
+        """投递消息；队列已满时清空积压并标记需要重新下发快照"""
+        if self.resync:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resync = True
+
+
+class QuoteStream:
+    """行情推送服务（单例）"""
+
+    def __init__(self, interval: Optional[float] = None, queue_size: Optional[int] = None):
+        self.interval = interval if interval is not None else settings.QUOTE_STREAM_INTERVAL
+        self.queue_size = queue_size if queue_size is not None else settings.QUOTE_STREAM_QUEUE_SIZE
+        self._subscriptions: List[QuoteSubscription] = []
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_count = 0
+        self._messages_sent = 0
+        self._resyncs = 0
+
+    # ------------------------------------------------------------------
+    # 订阅管理
+    # ------------------------------------------------------------------
+
+    def subscribe(self, symbols: Iterable[str]) -> QuoteSubscription:
+        """订阅一组代码，并确保刷新循环在运行"""
+        subscription = QuoteSubscription(
+            symbols={s.strip().upper() for s in symbols if s.strip()},
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self._subscriptions.append(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        logger.debug("Quote stream subscribed", symbols=len(subscription.symbols), subscribers=len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        # 不再被任何订阅引用的代码无需保留 tick
+        active = self._active_symbols()
+        for symbol in [s for s in self._last if s not in active]:
+            del self._last[symbol]
+
+    def _active_symbols(self) -> Set[str]:
+        return set().union(*(sub.symbols for sub in self._subscriptions)) if self._subscriptions else set()
+
+    def snapshot(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """当前已知的完整 tick"""
+        return {s: dict(self._last[s]) for s in symbols if s in self._last}
+
+    async def listen(self, subscription: QuoteSubscription):
+        """
+        逐条产出推送给该订阅者的消息
+
+        首条为 snapshot（已有 tick 时立即下发），之后为 delta；
+        积压被丢弃后会先补发一次 snapshot。
+        """
+        yield {"type": "snapshot", "quotes": self.snapshot(subscription.symbols), "ts": time.time()}
+        while True:
+            if subscription.resync:
+                subscription.resync = False
+                self._resyncs += 1
+                yield {"type": "snapshot", "quotes": self.snapshot(subscription.symbols), "ts": time.time()}
+                continue
+            message = await subscription.queue.get()
+            self._messages_sent += 1
+            yield message
+
+    # ------------------------------------------------------------------
+    # 刷新循环
+    # ------------------------------------------------------------------
+
+    async def _run(self):
+        logger.info("Quote stream refresh loop started", interval=self.interval)
+        try:
+            while self._subscriptions:
+                started = time.monotonic()
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning("Quote stream refresh failed", error=str(e))
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            logger.info("Quote stream refresh loop stopped")
+
+    async def _fetch(self, symbols: Set[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取订阅代码的最新 tick（均经由现有缓存路径）"""
+        index_codes = {s for s in symbols if s in MARKET_INDICES}
+        stock_symbols = sorted(symbols - index_codes)
+
+        ticks: Dict[str, Dict[str, Any]] = {}
+        if index_codes:
+            for index in await market_watcher.get_all_indices():
+                if index.code in index_codes:
+                    ticks[index.code] = _tick(index)
+        if stock_symbols:
+            batch = await MarketRouter.get_stock_prices(stock_symbols)
+            for symbol, price in batch.prices.items():
+                ticks[symbol] = _tick(price)
+        return ticks
+
+    async def refresh(self):
+        """执行一次刷新：获取行情、计算 delta 并分发给相关订阅者"""
+        symbols = self._active_symbols()
+        if not symbols:
+            return
+
+        ticks = await self._fetch(symbols)
+        self._refresh_count += 1
+
+        deltas: Dict[str, Dict[str, Any]] = {}
+        for symbol, tick in ticks.items():
+            delta = diff_tick(self._last.get(symbol), tick)
+            if delta:
+                deltas[symbol] = delta
+                self._last[symbol] = tick
+        if not deltas:
+            return
+
+        now = time.time()
+        for subscription in list(self._subscriptions):
+            changed = {s: deltas[s] for s in subscription.symbols if s in deltas}
+            if changed:
+                subscription.offer({"type": "delta", "quotes": changed, "ts": now})
+
+    async def stop(self):
+        """停止刷新循环（应用关闭时调用）"""
+        self._subscriptions.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "subscribers": len(self._subscriptions),
+            "symbols": len(self._active_symbols()),
+            "refresh_count": self._refresh_count,
+            "messages_sent": self._messages_sent,
+            "resyncs": self._resyncs,
+        }
+
+
+# 全局单例
+quote_stream = QuoteStream()
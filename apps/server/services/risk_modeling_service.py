@@ -9,6 +9,7 @@ import structlog
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from services.data_router import MarketRouter
+from services.ohlcv_store import ohlcv_store
 
 logger = structlog.get_logger()
 
@@ -317,9 +318,6 @@ class RiskModelingService:
         Returns:
             shape (T, N) 的收益率矩阵，T=交易日数，N=股票数
         """
-        import yfinance as yf
-        import pandas as pd
-
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=int(lookback_days * 1.5))  # 多取一些以应对非交易日
@@ -329,15 +327,15 @@ class RiskModelingService:
 
             for symbol in symbols:
                 try:
-                    # 尝试 yfinance
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(start=start_date, end=end_date)
+                    # 本地 OHLCV 存储只获取缺失的日期段
+                    data = await ohlcv_store.aget_slice(symbol, start_date, end_date)
 
-                    if hist is None or hist.empty or len(hist) < 30:
-                        logger.warning("Insufficient data for symbol", symbol=symbol, rows=len(hist) if hist is not None else 0)
+                    if len(data) < 30:
+                        logger.warning("Insufficient data for symbol", symbol=symbol, rows=len(data))
                         return None
 
-                    returns = hist["Close"].pct_change().dropna().values
+                    closes = np.asarray(data.columns["close"])
+                    returns = closes[1:] / closes[:-1] - 1
                     all_returns.append(returns)
 
                     if min_length is None or len(returns) < min_length:
@@ -12,6 +12,7 @@ from sqlmodel import Session, select
 from config.settings import settings
 from db.models import Watchlist, AnalysisResult, engine
 from services.data_router import MarketRouter
+from services.trading_calendar import DEFAULT_SETTLE, MARKETS, trading_calendar
 
 logger = structlog.get_logger()
 
@@ -22,16 +23,20 @@ class WatchlistScheduler:
         self._analysis_running = False
 
     async def update_market_indices(self):
-        """定时更新全球市场指数"""
+        """定时更新全球市场指数（各市场均休市时不强制刷新，仅在缓存缺失时获取）"""
         try:
             from services.market_watcher import market_watcher
+            if not trading_calendar.any_open(MARKETS):
+                await market_watcher.get_all_indices(force_refresh=False)
+                logger.debug("All markets closed, skipping market indices refresh")
+                return
             indices = await market_watcher.get_all_indices(force_refresh=True)
             logger.info("Market indices updated", count=len(indices))
         except Exception as e:
             logger.error("Failed to update market indices", error=str(e))
 
     async def update_watchlist_prices(self):
-        """定时更新关注列表中所有股票的价格（批量并发）"""
+        """定时更新关注列表中所有股票的价格（批量并发，跳过休市市场的股票）"""
         logger.info("Starting scheduled watchlist price update")
         with Session(engine) as session:
             statement = select(Watchlist)
@@ -41,26 +46,25 @@ class WatchlistScheduler:
                 logger.info("No stocks in watchlist")
                 return
 
-            # 批量并发获取价格，使用 asyncio.gather
-            async def fetch_price(item):
-                try:
-                    price_info = await MarketRouter.get_stock_price(item.symbol)
-                    logger.info("Updated price for watchlist item", symbol=item.symbol, price=price_info.price)
-                    return {"symbol": item.symbol, "success": True, "price": price_info.price}
-                except Exception as e:
-                    logger.error("Failed to update price for watchlist item", symbol=item.symbol, error=str(e))
-                    return {"symbol": item.symbol, "success": False, "error": str(e)}
+            # 休市市场的价格在下一次开盘前不会变化，缓存已按交易日历延长有效期
+            symbols = [
+                item.symbol for item in items
+                if trading_calendar.is_open(MarketRouter.get_market(item.symbol), settle=DEFAULT_SETTLE)
+            ]
+            if not symbols:
+                logger.info("All watchlist markets closed, skipping price update", total=len(items))
+                return
 
-            # 并发获取所有价格（无需 sleep，MarketRouter 内部有缓存和限流）
-            results = await asyncio.gather(*[fetch_price(item) for item in items], return_exceptions=True)
+            # 批量获取：缓存一次读取，A 股共用全市场快照，港美股一次 yf.download
+            batch = await MarketRouter.get_stock_prices(symbols)
+            for symbol, error in batch.errors.items():
+                logger.error("Failed to update price for watchlist item", symbol=symbol, error=error)
 
-            # 统计结果
-            success_count = sum(1 for r in results if isinstance(r, dict) and r.get("success"))
             logger.info(
                 "Watchlist price update completed",
-                total=len(items),
-                success=success_count,
-                failed=len(items) - success_count
+                total=len(symbols),
+                success=len(batch.prices),
+                failed=len(batch.errors)
             )
 
     async def run_daily_analysis(self):
@@ -10,6 +10,8 @@ from dataclasses import dataclass, asdict, field
 from enum import Enum
 import structlog
 
+from tradingagents.dataflows import search_gateway
+
 try:
     from duckduckgo_search import DDGS
 except ImportError:
@@ -246,8 +248,7 @@ class SentimentAggregator:
         max_posts: int,
     ) -> List[SentimentPost]:
         """通过搜索获取新闻"""
-        ddgs = self._get_ddgs()
-        if ddgs is None:
+        if self._get_ddgs() is None:
             return []
 
         posts = []
@@ -260,7 +261,10 @@ class SentimentAggregator:
             else:
                 query = f"{symbol} stock news"
 
-            results = list(ddgs.news(query, max_results=max_posts, timelimit=f"w{min(days_back // 7 + 1, 4)}"))
+            results = await search_gateway.asearch(
+                "news", query, max_results=max_posts,
+                timelimit=f"w{min(days_back // 7 + 1, 4)}",
+            )
 
             for item in results[:max_posts]:
                 title = item.get("title", "")
@@ -287,8 +291,7 @@ class SentimentAggregator:
 
     async def _fetch_eastmoney_guba(self, symbol: str, max_posts: int) -> List[SentimentPost]:
         """获取东财股吧数据（通过搜索模拟）"""
-        ddgs = self._get_ddgs()
-        if ddgs is None:
+        if self._get_ddgs() is None:
             return []
 
         posts = []
@@ -297,7 +300,7 @@ class SentimentAggregator:
             code = symbol.replace(".SZ", "").replace(".SH", "")
             query = f"site:guba.eastmoney.com {code}"
 
-            results = list(ddgs.text(query, max_results=max_posts))
+            results = await search_gateway.asearch("text", query, max_results=max_posts)
 
             for item in results[:max_posts]:
                 title = item.get("title", "")
@@ -320,8 +323,7 @@ class SentimentAggregator:
 
     async def _fetch_xueqiu(self, symbol: str, market: str, max_posts: int) -> List[SentimentPost]:
         """获取雪球数据（通过搜索模拟）"""
-        ddgs = self._get_ddgs()
-        if ddgs is None:
+        if self._get_ddgs() is None:
             return []
 
         posts = []
@@ -335,7 +337,7 @@ class SentimentAggregator:
                 xq_symbol = symbol
 
             query = f"site:xueqiu.com {xq_symbol}"
-            results = list(ddgs.text(query, max_results=max_posts))
+            results = await search_gateway.asearch("text", query, max_results=max_posts)
 
             for item in results[:max_posts]:
                 title = item.get("title", "")
@@ -358,14 +360,13 @@ class SentimentAggregator:
 
     async def _fetch_reddit(self, symbol: str, company_name: str, max_posts: int) -> List[SentimentPost]:
         """获取 Reddit 数据（通过搜索模拟）"""
-        ddgs = self._get_ddgs()
-        if ddgs is None:
+        if self._get_ddgs() is None:
             return []
 
         posts = []
         try:
             query = f"site:reddit.com {symbol} OR {company_name} stock"
-            results = list(ddgs.text(query, max_results=max_posts))
+            results = await search_gateway.asearch("text", query, max_results=max_posts)
 
             for item in results[:max_posts]:
                 title = item.get("title", "")
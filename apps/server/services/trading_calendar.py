@@ -0,0 +1,240 @@
+"""
+交易日历
+
+A 股、港股、美股的交易时段与休市日，供缓存与定时任务判断"数据在什么时候之前不会变化"：
+
+- 交易时段（含收盘后的结算窗口）内，缓存使用常规 TTL
+- 休市期间（午休、夜间、周末、节假日），缓存有效期延长到下一次开盘
+- 定时任务在相关市场全部休市时跳过
+
+休市日为各交易所公布的工作日休市安排（周末自动视为休市），可通过
+TRADING_CALENDAR_EXTRA_HOLIDAYS 追加临时休市（如 "CN:2026-02-13,US:2026-01-09"）。
+半日市按全天处理。
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time as TimeType, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+import structlog
+
+from config.settings import settings
+
+logger = structlog.get_logger()
+
+# 向前查找下一个交易日的上限（天），覆盖最长的节假日
+_MAX_LOOKAHEAD_DAYS = 30
+
+# 收盘后数据仍可能更新的默认窗口（收盘集合竞价、数据源延迟）
+DEFAULT_SETTLE = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class MarketSessions:
+    """单个市场的交易时段（交易所当地时间）"""
+    timezone: ZoneInfo
+    sessions: Tuple[Tuple[TimeType, TimeType], ...]
+    holidays: FrozenSet[date]
+
+
+def _dates(*values: str) -> FrozenSet[date]:
+    return frozenset(date.fromisoformat(value) for value in values)
+
+
+# 工作日休市日（周末不列出）
+_CN_HOLIDAYS = _dates(
+    # 2025
+    "2025-01-01", "2025-01-28", "2025-01-29", "2025-01-30", "2025-01-31", "2025-02-03", "2025-02-04",
+    "2025-04-04", "2025-05-01", "2025-05-02", "2025-05-05", "2025-06-02",
+    "2025-10-01", "2025-10-02", "2025-10-03", "2025-10-06", "2025-10-07", "2025-10-08",
+    # 2026
+    "2026-01-01", "2026-01-02", "2026-02-16", "2026-02-17", "2026-02-18", "2026-02-19", "2026-02-20",
+    "2026-02-23", "2026-04-06", "2026-05-01", "2026-05-04", "2026-05-05", "2026-06-19",
+    "2026-09-25", "2026-10-01", "2026-10-02", "2026-10-05", "2026-10-06", "2026-10-07",
+    # 2027（按法定节假日推算，国务院办公厅公布放假安排后核对调休日）
+    "2027-01-01", "2027-02-05", "2027-02-08", "2027-02-09", "2027-02-10", "2027-02-11", "2027-02-12",
+    "2027-04-05", "2027-05-03", "2027-05-04", "2027-05-05", "2027-06-09",
+    "2027-09-15", "2027-10-01", "2027-10-04", "2027-10-05", "2027-10-06", "2027-10-07",
+)
+
+_HK_HOLIDAYS = _dates(
+    # 2025
+    "2025-01-01", "2025-01-29", "2025-01-30", "2025-01-31", "2025-04-04", "2025-04-18", "2025-04-21",
+    "2025-05-01", "2025-05-05", "2025-07-01", "2025-10-01", "2025-10-07", "2025-10-29",
+    "2025-12-25", "2025-12-26",
+    # 2026
+    "2026-01-01", "2026-02-17", "2026-02-18", "2026-02-19", "2026-04-03", "2026-04-06", "2026-04-07",
+    "2026-05-01", "2026-05-25", "2026-06-19", "2026-07-01", "2026-10-01", "2026-10-19",
+    "2026-12-25",
+    # 2027
+    "2027-01-01", "2027-02-08", "2027-02-09", "2027-03-26", "2027-03-29", "2027-04-05", "2027-05-13",
+    "2027-06-09", "2027-07-01", "2027-09-16", "2027-10-01", "2027-10-08", "2027-12-27",
+)
+
+_US_HOLIDAYS = _dates(
+    # 2025
+    "2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26", "2025-06-19",
+    "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25",
+    # 2026
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+    "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+    # 2027
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18",
+    "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+)
+
+_MARKETS: Dict[str, MarketSessions] = {
+    "CN": MarketSessions(
+        timezone=ZoneInfo("Asia/Shanghai"),
+        sessions=((TimeType(9, 30), TimeType(11, 30)), (TimeType(13, 0), TimeType(15, 0))),
+        holidays=_CN_HOLIDAYS,
+    ),
+    "HK": MarketSessions(
+        timezone=ZoneInfo("Asia/Hong_Kong"),
+        sessions=((TimeType(9, 30), TimeType(12, 0)), (TimeType(13, 0), TimeType(16, 0))),
+        holidays=_HK_HOLIDAYS,
+    ),
+    "US": MarketSessions(
+        timezone=ZoneInfo("America/New_York"),
+        sessions=((TimeType(9, 30), TimeType(16, 0)),),
+        holidays=_US_HOLIDAYS,
+    ),
+}
+
+MARKETS: List[str] = list(_MARKETS)
+
+# 各市场休市日表覆盖到的最后一年；之后的日期只能按周末判断
+_LAST_LISTED_YEAR: Dict[str, int] = {
+    market: max(day.year for day in config.holidays) for market, config in _MARKETS.items()
+}
+
+
+def _parse_extra_holidays(raw: str) -> Dict[str, Set[date]]:
+    """解析 "CN:2026-02-13,US:2026-01-09" 格式的临时休市配置"""
+    extra: Dict[str, Set[date]] = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        try:
+            market, day = item.split(":", 1)
+            holiday = date.fromisoformat(day.strip())
+        except ValueError:
+            logger.warning("Invalid extra holiday entry ignored", entry=item)
+            continue
+        extra.setdefault(market.strip().upper(), set()).add(holiday)
+    return extra
+
+
+class TradingCalendar:
+    """
+    交易日历服务
+
+    所有时间参数可传入 naive（按本机时区解释）或带时区的 datetime，默认为当前时间。
+    未知市场按始终开市处理，相关缓存退化为常规 TTL。
+    """
+
+    def __init__(self, extra_holidays: str = ""):
+        self._extra = _parse_extra_holidays(extra_holidays)
+        self._warned: Set[str] = set()
+
+    def _market(self, market: str) -> Optional[MarketSessions]:
+        return _MARKETS.get(market.upper()) if market else None
+
+    def _local(self, config: MarketSessions, at: Optional[datetime]) -> datetime:
+        return (at or datetime.now().astimezone()).astimezone(config.timezone)
+
+    def is_trading_day(self, market: str, day: date) -> bool:
+        """是否为交易日"""
+        config = self._market(market)
+        if config is None:
+            return True
+        market = market.upper()
+        last_year = _LAST_LISTED_YEAR[market]
+        if day.year > last_year and market not in self._warned:
+            self._warned.add(market)
+            logger.warning(
+                "Holiday table outdated, treating weekdays as trading days",
+                market=market,
+                year=day.year,
+                last_listed_year=last_year,
+            )
+        return (
+            day.weekday() < 5
+            and day not in config.holidays
+            and day not in self._extra.get(market, ())
+        )
+
+    def _session_bounds(self, config: MarketSessions, day: date) -> Iterable[Tuple[datetime, datetime]]:
+        for start, end in config.sessions:
+            yield (
+                datetime.combine(day, start, tzinfo=config.timezone),
+                datetime.combine(day, end, tzinfo=config.timezone),
+            )
+
+    def is_open(self, market: str, at: Optional[datetime] = None, settle: timedelta = timedelta(0)) -> bool:
+        """
+        是否处于交易时段
+
+        Args:
+            settle: 每个时段收盘后仍视为开市的窗口（数据结算延迟）
+        """
+        config = self._market(market)
+        if config is None:
+            return True
+        now = self._local(config, at)
+        if not self.is_trading_day(market, now.date()):
+            return False
+        return any(start <= now < end + settle for start, end in self._session_bounds(config, now.date()))
+
+    def next_open(self, market: str, at: Optional[datetime] = None) -> Optional[datetime]:
+        """下一个时段的开盘时间（当前正处于时段内时返回之后的时段）"""
+        config = self._market(market)
+        if config is None:
+            return None
+        now = self._local(config, at)
+        for offset in range(_MAX_LOOKAHEAD_DAYS + 1):
+            day = now.date() + timedelta(days=offset)
+            if not self.is_trading_day(market, day):
+                continue
+            for start, _ in self._session_bounds(config, day):
+                if start > now:
+                    return start
+        return None
+
+    def seconds_until_open(self, market: str, at: Optional[datetime] = None) -> Optional[float]:
+        """距下一次开盘的秒数，未知市场返回 None"""
+        next_open = self.next_open(market, at)
+        if next_open is None:
+            return None
+        return (next_open - self._local(self._market(market), at)).total_seconds()
+
+    def cache_ttl(
+        self,
+        market: str,
+        open_ttl: int,
+        at: Optional[datetime] = None,
+        settle: timedelta = DEFAULT_SETTLE,
+    ) -> int:
+        """
+        交易日历感知的缓存 TTL（秒）
+
+        - 交易时段内及收盘后 settle 窗口内：open_ttl
+        - 休市期间：到下一次开盘为止（不低于 open_ttl），期间数据不会变化
+
+        Args:
+            market: CN / HK / US
+            open_ttl: 交易时段内的常规 TTL
+            settle: 收盘后数据仍可能更新的窗口，收盘后才发布的数据（如龙虎榜）应传入更长的窗口
+        """
+        if self.is_open(market, at, settle=settle):
+            return open_ttl
+        remaining = self.seconds_until_open(market, at)
+        if remaining is None:
+            return open_ttl
+        return max(open_ttl, int(remaining))
+
+    def any_open(self, markets: Iterable[str], at: Optional[datetime] = None, settle: timedelta = DEFAULT_SETTLE) -> bool:
+        """任一市场处于交易时段（含结算窗口）"""
+        return any(self.is_open(market, at, settle=settle) for market in markets)
+
+
+# 全局单例
+trading_calendar = TradingCalendar(settings.TRADING_CALENDAR_EXTRA_HOLIDAYS)
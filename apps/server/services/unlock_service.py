@@ -16,6 +16,7 @@ import pandas as pd
 import asyncio
 
 from services.cache_service import cache_service
+from services.frame_convert import build_models, cn_symbols, datetime_column, numeric_column, text_column, to_dates
 
 logger = structlog.get_logger(__name__)
 
@@ -77,6 +78,16 @@ class UnlockService:
     def __init__(self):
         pass
 
+    @staticmethod
+    def _unlock_shares(values: pd.Series) -> pd.Series:
+        """解禁股数统一为万股（超过 1e8 视为以股为单位）"""
+        return values.where(values <= 1e8, values / 1e4)
+
+    @staticmethod
+    def _unlock_value(values: pd.Series) -> pd.Series:
+        """解禁市值统一为亿元（超过 1e12 视为以元为单位）"""
+        return values.where(values <= 1e12, values / 1e8)
+
     async def get_unlock_calendar(self, start_date: date = None, end_date: date = None) -> List[UnlockCalendar]:
         """获取解禁日历
 
@@ -90,7 +101,7 @@ class UnlockService:
             end_date = start_date + timedelta(days=30)
 
         cache_key = f"unlock_calendar_{start_date}_{end_date}"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -102,49 +113,26 @@ class UnlockService:
                 logger.warning("No unlock data available")
                 return []
 
+            # 过滤日期范围（无法解析的日期为 NaT，比较结果为 False）
+            dates = datetime_column(df, '解禁日期', '解除限售日期')
+            in_range = (dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))
+            df, dates = df[in_range], dates[in_range]
+
+            stocks = build_models(UnlockStock, pd.DataFrame({
+                "symbol": cn_symbols(text_column(df, '代码', '股票代码')),
+                "name": text_column(df, '名称', '股票名称'),
+                "unlock_date": to_dates(dates),
+                "unlock_shares": self._unlock_shares(numeric_column(df, '解禁数量', '解禁股数')),
+                "unlock_value": self._unlock_value(numeric_column(df, '解禁市值')),
+                "unlock_ratio": numeric_column(df, '解禁比例', '占总股本比例'),
+                "circulating_ratio": numeric_column(df, '占流通股比例'),
+                "unlock_type": text_column(df, '限售股类型', '解禁类型', default='未知'),
+            }))
+
             # 按日期分组
             calendar_data: Dict[date, List[UnlockStock]] = {}
-
-            for _, row in df.iterrows():
-                try:
-                    unlock_date_str = row.get('解禁日期', row.get('解除限售日期', ''))
-                    if not unlock_date_str:
-                        continue
-
-                    unlock_date = pd.to_datetime(unlock_date_str).date()
-
-                    # 过滤日期范围
-                    if unlock_date < start_date or unlock_date > end_date:
-                        continue
-
-                    code = str(row.get('代码', row.get('股票代码', '')))
-                    unlock_shares = float(row.get('解禁数量', row.get('解禁股数', 0)) or 0)
-                    unlock_value = float(row.get('解禁市值', 0) or 0)
-
-                    # 转换单位
-                    if unlock_shares > 1e8:
-                        unlock_shares = unlock_shares / 1e4  # 股 -> 万股
-                    if unlock_value > 1e12:
-                        unlock_value = unlock_value / 1e8  # 元 -> 亿元
-
-                    stock = UnlockStock(
-                        symbol=f"{code}.SH" if code.startswith('6') else f"{code}.SZ",
-                        name=str(row.get('名称', row.get('股票名称', ''))),
-                        unlock_date=unlock_date,
-                        unlock_shares=unlock_shares,
-                        unlock_value=unlock_value,
-                        unlock_ratio=float(row.get('解禁比例', row.get('占总股本比例', 0)) or 0),
-                        circulating_ratio=float(row.get('占流通股比例', 0) or 0),
-                        unlock_type=str(row.get('限售股类型', row.get('解禁类型', '未知'))),
-                    )
-
-                    if unlock_date not in calendar_data:
-                        calendar_data[unlock_date] = []
-                    calendar_data[unlock_date].append(stock)
-
-                except Exception as e:
-                    logger.debug("Failed to parse unlock row", error=str(e))
-                    continue
+            for stock in stocks:
+                calendar_data.setdefault(stock.unlock_date, []).append(stock)
 
             # 构建日历
             result = []
@@ -158,7 +146,7 @@ class UnlockService:
                     stocks=sorted(stocks, key=lambda x: x.unlock_value, reverse=True),
                 ))
 
-            cache_service.set_sync(cache_key, result, ttl=3600)
+            await cache_service.set_object(cache_key, result, ttl=3600)
             logger.info("Fetched unlock calendar", days=len(result), total_stocks=sum(c.total_stocks for c in result))
             return result
 
@@ -184,40 +172,23 @@ class UnlockService:
             if df.empty:
                 return []
 
-            result = []
-            for _, row in df.iterrows():
-                try:
-                    unlock_date_str = row.get('解禁日期', '')
-                    if not unlock_date_str:
-                        continue
-
-                    unlock_date = pd.to_datetime(unlock_date_str).date()
-
-                    # 只返回未来的解禁
-                    if unlock_date < datetime.now().date():
-                        continue
-
-                    unlock_shares = float(row.get('解禁数量', 0) or 0)
-                    if unlock_shares > 1e8:
-                        unlock_shares = unlock_shares / 1e4
-
-                    unlock_value = float(row.get('解禁市值', 0) or 0)
-                    if unlock_value > 1e12:
-                        unlock_value = unlock_value / 1e8
-
-                    result.append(UnlockStock(
-                        symbol=symbol,
-                        name=str(row.get('股票名称', '')),
-                        unlock_date=unlock_date,
-                        unlock_shares=unlock_shares,
-                        unlock_value=unlock_value,
-                        unlock_ratio=float(row.get('占总股本比例', 0) or 0),
-                        circulating_ratio=float(row.get('占流通股比例', 0) or 0),
-                        unlock_type=str(row.get('限售股类型', '未知')),
-                        cost_price=float(row.get('定增价格', row.get('成本价', 0)) or 0) or None,
-                    ))
-                except Exception:
-                    continue
+            # 只返回未来的解禁
+            dates = datetime_column(df, '解禁日期')
+            upcoming = dates >= pd.Timestamp(datetime.now().date())
+            df, dates = df[upcoming], dates[upcoming]
+
+            cost_price = numeric_column(df, '定增价格', '成本价')
+            result = build_models(UnlockStock, pd.DataFrame({
+                "symbol": symbol,
+                "name": text_column(df, '股票名称'),
+                "unlock_date": to_dates(dates),
+                "unlock_shares": self._unlock_shares(numeric_column(df, '解禁数量')),
+                "unlock_value": self._unlock_value(numeric_column(df, '解禁市值')),
+                "unlock_ratio": numeric_column(df, '占总股本比例'),
+                "circulating_ratio": numeric_column(df, '占流通股比例'),
+                "unlock_type": text_column(df, '限售股类型', default='未知'),
+                "cost_price": cost_price.astype(object).where(cost_price != 0, None),
+            }))
 
             # 按日期排序
             result.sort(key=lambda x: x.unlock_date)
@@ -338,7 +309,7 @@ class UnlockService:
     async def get_market_unlock_overview(self) -> MarketUnlockOverview:
         """获取市场解禁概览"""
         cache_key = "market_unlock_overview"
-        cached = cache_service.get_sync(cache_key)
+        cached = await cache_service.get_object(cache_key)
         if cached:
             return cached
 
@@ -400,7 +371,7 @@ class UnlockService:
                 market_impact=market_impact,
             )
 
-            cache_service.set_sync(cache_key, overview, ttl=3600)
+            await cache_service.set_object(cache_key, overview, ttl=3600)
             logger.info(
                 "Market unlock overview fetched",
                 this_week=f"{this_week_value:.1f}亿",
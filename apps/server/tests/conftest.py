@@ -109,6 +109,15 @@ def async_client(override_get_session):
 # Mock 数据源
 # =============================================================================
 
+@pytest.fixture(autouse=True)
+def isolated_ohlcv_store(tmp_path, monkeypatch):
+    """本地日线存储写入临时目录，测试之间互不影响"""
+    from services.ohlcv_store import ohlcv_store
+
+    monkeypatch.setattr(ohlcv_store, "root", tmp_path / "ohlcv")
+    return ohlcv_store
+
+
 @pytest.fixture
 def mock_yfinance():
     """Mock yfinance 模块"""
@@ -139,7 +148,11 @@ def mock_akshare():
     """Mock akshare 模块"""
     import pandas as pd
 
-    with patch("services.data_router.ak") as mock_ak:
+    from services.market_snapshot import market_snapshot
+
+    market_snapshot.invalidate()
+    with patch("services.data_router.ak") as mock_ak, \
+            patch("services.market_snapshot.ak", mock_ak):
         # Mock A股实时数据
         mock_ak.stock_zh_a_spot_em.return_value = pd.DataFrame({
             "代码": ["600519", "000001"],
@@ -161,6 +174,7 @@ def mock_akshare():
         })
 
         yield mock_ak
+    market_snapshot.invalidate()
 
 
 @pytest.fixture
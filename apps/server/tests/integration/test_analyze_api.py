@@ -404,6 +404,50 @@ class TestSSEStream:
             )
 
 
+    def test_stream_resumes_from_last_event_id(self, client):
+        """携带 Last-Event-ID 重连时只接收之后的事件"""
+        import asyncio
+        from services.cache_service import cache_service
+
+        task_id = "test-sse-resume-001"
+
+        async def setup_events():
+            await cache_service.init_sse_task(task_id, "AAPL")
+            for node in ["Market Analyst", "News Analyst", "Bull Researcher"]:
+                await cache_service.push_sse_event(task_id, "stage_analyst", {
+                    "node": node,
+                    "stage": "stage_analyst",
+                    "status": "completed",
+                })
+            await cache_service.set_sse_status(task_id, "completed")
+
+        asyncio.get_event_loop().run_until_complete(setup_events())
+
+        try:
+            response = client.get(
+                f"/api/analyze/stream/{task_id}",
+                headers={"Last-Event-ID": "0"},
+            )
+            assert response.status_code == 200
+
+            ids = []
+            nodes = []
+            for line in response.iter_lines():
+                line_str = line.decode() if isinstance(line, bytes) else line
+                if line_str.startswith("id:"):
+                    ids.append(line_str[3:].strip())
+                elif line_str.startswith("data:"):
+                    nodes.append(json.loads(line_str[5:].strip())["node"])
+
+            assert ids == ["1", "2"]
+            assert nodes == ["News Analyst", "Bull Researcher"]
+
+        finally:
+            asyncio.get_event_loop().run_until_complete(
+                cache_service.cleanup_sse_task(task_id)
+            )
+
+
 class TestAnalysisIntegration:
     """端到端集成测试（需要 Mock LLM）"""
 
@@ -0,0 +1,135 @@
+"""
+CacheCompressor 单元测试
+
+覆盖:
+1. 压缩往返与阈值
+2. 旧值兼容与异常数据
+3. 压缩统计
+4. Redis 后端透明压缩
+"""
+import base64
+import json
+import random
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from services.cache_compression import HEADER, CacheCompressor
+from services.cache_service import RedisCacheBackend
+
+
+LARGE_VALUE = json.dumps([{"date": f"2024-01-{d % 28 + 1:02d}", "close": 100.0 + d} for d in range(500)])
+
+
+# =============================================================================
+# 编解码测试
+# =============================================================================
+
+class TestCacheCompressor:
+    """按阈值压缩与解压"""
+
+    @pytest.fixture
+    def compressor(self):
+        return CacheCompressor(threshold=1024, codec="zlib", enabled=True)
+
+    def test_round_trip(self, compressor):
+        """大值压缩后可还原"""
+        encoded = compressor.encode(LARGE_VALUE)
+
+        assert encoded.startswith(HEADER + "d")
+        assert len(encoded) < len(LARGE_VALUE)
+        assert compressor.decode(encoded) == LARGE_VALUE
+
+    def test_small_value_stored_plain(self, compressor):
+        """低于阈值的值不压缩"""
+        assert compressor.encode('{"a": 1}') == '{"a": 1}'
+        assert compressor.get_stats()["skipped"] == 1
+
+    def test_incompressible_value_stored_plain(self, compressor):
+        """压缩后不变小的值保持原样"""
+        rng = random.Random(0)
+        noise = "".join(chr(rng.randint(33, 126)) for _ in range(4096))
+
+        assert compressor.encode(noise) == noise
+
+    def test_disabled(self):
+        compressor = CacheCompressor(threshold=0, codec="zlib", enabled=False)
+
+        assert compressor.encode(LARGE_VALUE) == LARGE_VALUE
+
+    def test_legacy_plain_value_readable(self, compressor):
+        """升级前写入的未压缩值原样返回"""
+        assert compressor.decode(LARGE_VALUE) == LARGE_VALUE
+        assert compressor.decode(None) is None
+
+    def test_unknown_codec_tag_is_miss(self, compressor):
+        """无法识别的编解码器视为未命中"""
+        assert compressor.decode(HEADER + "?abc") is None
+
+    def test_corrupted_payload_is_miss(self, compressor):
+        assert compressor.decode(HEADER + "d" + base64.b64encode(b"garbage").decode()) is None
+
+    def test_unknown_codec_name_rejected(self):
+        with pytest.raises(ValueError):
+            CacheCompressor(codec="brotli")
+
+    def test_auto_selects_installed_codec(self):
+        """auto 总能选到可用的编解码器（至少 zlib）"""
+        assert CacheCompressor(codec="auto").codec in ("zstd", "lz4", "zlib")
+
+    def test_stats(self, compressor):
+        """统计压缩率与 CPU 耗时"""
+        compressor.decode(compressor.encode(LARGE_VALUE))
+
+        stats = compressor.get_stats()
+        assert stats["codec"] == "zlib"
+        assert stats["compressed"] == 1
+        assert stats["decompressed"] == 1
+        assert stats["bytes_in"] == len(LARGE_VALUE)
+        assert stats["ratio"] > 1
+        assert stats["compress_cpu_ms"] >= 0
+        assert stats["decompress_cpu_ms"] >= 0
+
+
+# =============================================================================
+# Redis 后端测试
+# =============================================================================
+
+class TestRedisBackendCompression:
+    """Redis 后端写入压缩、读取解压"""
+
+    @pytest.fixture
+    def backend(self):
+        backend = RedisCacheBackend("redis://localhost:6379")
+        backend._compressor = CacheCompressor(threshold=1024, codec="zlib", enabled=True)
+        return backend
+
+    @pytest.mark.asyncio
+    async def test_set_compresses_large_value(self, backend):
+        mock_client = AsyncMock()
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            await backend.set("market:history:AAPL", LARGE_VALUE, ttl=60)
+
+        stored = mock_client.setex.call_args[0][2]
+        assert stored.startswith(HEADER)
+        assert len(stored) < len(LARGE_VALUE)
+
+    @pytest.mark.asyncio
+    async def test_get_decompresses(self, backend):
+        mock_client = AsyncMock()
+        mock_client.get.return_value = backend._compressor.encode(LARGE_VALUE)
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            assert await backend.get("market:history:AAPL") == LARGE_VALUE
+
+    @pytest.mark.asyncio
+    async def test_get_many_mixes_plain_and_compressed(self, backend):
+        """批量读取同时处理旧值与压缩值"""
+        mock_client = AsyncMock()
+        mock_client.mget.return_value = ["plain", backend._compressor.encode(LARGE_VALUE), None]
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.get_many(["a", "b", "c"])
+
+        assert result == {"a": "plain", "b": LARGE_VALUE}
+
+    def test_stats_include_compression(self, backend):
+        assert backend.get_stats()["compression"]["codec"] == "zlib"
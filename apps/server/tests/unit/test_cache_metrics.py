@@ -0,0 +1,184 @@
+"""
+CacheMetricsService 单元测试
+
+覆盖:
+1. 键前缀提取
+2. 延迟直方图
+3. 按前缀记录命中、写入、字节数与淘汰
+4. CacheService 与内存后端的指标埋点
+"""
+import pytest
+
+from services.cache_metrics import (
+    CacheMetricsService,
+    LatencyHistogram,
+    MAX_PREFIXES,
+    OVERFLOW_PREFIX,
+    cache_metrics,
+    key_prefix,
+)
+from services.cache_service import CacheService, MemoryCacheBackend
+
+
+# =============================================================================
+# 键前缀测试
+# =============================================================================
+
+class TestKeyPrefix:
+    """键前缀提取"""
+
+    @pytest.mark.parametrize("key,expected", [
+        ("market:price:AAPL", "market:price"),
+        ("market:history:600519.SH", "market:history"),
+        ("sse_events:task_123_abc", "sse_events"),
+        ("sse_events:task_123_abc:log", "sse_events"),
+        ("task:task_123_abc", "task"),
+        ("lock:flight:market:price:AAPL", "lock:flight"),
+        ("daily_lhb_20240102", "daily_lhb"),
+        ("daily_lhb_latest", "daily_lhb_latest"),
+        ("north_money_history_30", "north_money_history"),
+        ("indices", "indices"),
+    ])
+    def test_key_prefix(self, key, expected):
+        assert key_prefix(key) == expected
+
+
+# =============================================================================
+# 延迟直方图测试
+# =============================================================================
+
+class TestLatencyHistogram:
+    """延迟直方图"""
+
+    def test_observe_and_percentiles(self):
+        """按桶上界估算分位数"""
+        hist = LatencyHistogram()
+        for _ in range(90):
+            hist.observe(0.3)
+        for _ in range(10):
+            hist.observe(80.0)
+
+        assert hist.count == 100
+        assert hist.percentile(50) == 0.5
+        assert hist.percentile(95) == 100.0
+        assert hist.max_ms == 80.0
+
+    def test_slow_bucket_uses_max(self):
+        """超出最大桶时分位数取最大值"""
+        hist = LatencyHistogram()
+        hist.observe(2000.0)
+
+        assert hist.percentile(99) == 2000.0
+        assert hist.to_dict()["buckets"]["le_inf"] == 1
+
+    def test_empty(self):
+        assert LatencyHistogram().to_dict()["p95_ms"] == 0.0
+
+
+# =============================================================================
+# 指标记录测试
+# =============================================================================
+
+class TestCacheMetricsService:
+    """按前缀记录指标"""
+
+    @pytest.fixture
+    def metrics(self):
+        return CacheMetricsService()
+
+    def test_hits_misses_by_prefix(self, metrics):
+        """不同前缀分别统计"""
+        metrics.record_get("market:price:AAPL", "x" * 10, 0.2)
+        metrics.record_get("market:price:MSFT", None, 0.1)
+        metrics.record_get("task:task_1", "{}", 0.1)
+
+        result = metrics.get_metrics()
+        price = result["by_prefix"]["market:price"]
+        assert price["hits"] == 1
+        assert price["misses"] == 1
+        assert price["hit_rate_pct"] == 50.0
+        assert price["bytes_read"] == 10
+        assert price["get_latency"]["count"] == 2
+        assert result["by_prefix"]["task"]["hits"] == 1
+        assert result["global"]["hits"] == 2
+
+    def test_set_counts_serialized_bytes(self, metrics):
+        """只统计字符串/字节负载的大小"""
+        metrics.record_set("market:history:AAPL", "中" * 4, 1.0)
+        metrics.record_set("market:history:MSFT", {"object": True}, 1.0)
+
+        history = metrics.get_metrics()["by_prefix"]["market:history"]
+        assert history["sets"] == 2
+        assert history["bytes_written"] == 12
+        assert history["set_latency"]["count"] == 2
+
+    def test_evictions_and_expirations(self, metrics):
+        metrics.record_eviction("market:price:AAPL")
+        metrics.record_expiration("market:price:AAPL")
+
+        price = metrics.get_metrics()["by_prefix"]["market:price"]
+        assert price["evictions"] == 1
+        assert price["expirations"] == 1
+
+    def test_prefix_cardinality_capped(self, metrics):
+        """前缀数量超限后归入溢出桶"""
+        for i in range(MAX_PREFIXES + 5):
+            metrics.record_get(f"p{'x' * (i + 1)}", None)
+
+        by_prefix = metrics.get_metrics()["by_prefix"]
+        assert len(by_prefix) == MAX_PREFIXES + 1
+        assert by_prefix[OVERFLOW_PREFIX]["misses"] == 5
+
+    def test_reset(self, metrics):
+        metrics.record_get("task:1", "x")
+        metrics.reset()
+
+        assert metrics.get_metrics()["by_prefix"] == {}
+
+
+# =============================================================================
+# 埋点测试
+# =============================================================================
+
+class TestCacheServiceInstrumentation:
+    """CacheService 与内存后端上报指标"""
+
+    @pytest.fixture
+    def service(self):
+        svc = CacheService()
+        svc._backend = MemoryCacheBackend(max_entries=2, max_bytes=0, sweep_interval=0)
+        svc._initialized = True
+        cache_metrics.reset()
+        yield svc
+        cache_metrics.reset()
+
+    @pytest.mark.asyncio
+    async def test_get_set_recorded(self, service):
+        await service.set_json("task:t1", {"status": "running"}, ttl=60)
+        await service.get_task("t1")
+        await service.get("task:t2")
+
+        task = cache_metrics.get_metrics()["by_prefix"]["task"]
+        assert task["sets"] == 1
+        assert task["hits"] == 1
+        assert task["misses"] == 1
+        assert task["bytes_written"] > 0
+
+    @pytest.mark.asyncio
+    async def test_batch_ops_recorded_per_key(self, service):
+        await service.set_many({"market:price:A": "1", "market:price:B": "2"})
+        await service.get_many(["market:price:A", "market:price:C"])
+
+        price = cache_metrics.get_metrics()["by_prefix"]["market:price"]
+        assert price["sets"] == 2
+        assert price["hits"] == 1
+        assert price["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_recorded(self, service):
+        """LRU 淘汰按被淘汰键的前缀计数"""
+        await service.set("market:history:A", "a")
+        await service.set("market:history:B", "b")
+        await service.set("task:t1", "c")
+
+        assert cache_metrics.get_metrics()["by_prefix"]["market:history"]["evictions"] == 1
@@ -0,0 +1,290 @@
+"""
+软过期缓存单元测试
+
+覆盖:
+1. 软过期缓存（stale-while-revalidate / refresh-ahead）
+2. 临时事件循环触发的刷新转交主循环
+3. 交易日历决定的新鲜期
+4. 跨进程单飞
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.exceptions import DataSourceError
+
+
+class TestRevalidatingCache:
+    """测试软过期缓存"""
+
+    @pytest.fixture
+    async def swr_key(self):
+        from services.cache_service import cache_service
+        key = "market:test:swr"
+        await cache_service.delete(key)
+        yield key
+        await cache_service.delete(key)
+
+    @pytest.fixture(autouse=True)
+    async def refresh_loop(self):
+        """以测试所在事件循环作为后台刷新的主循环"""
+        from services.cache_revalidate import set_refresh_loop
+        set_refresh_loop(asyncio.get_running_loop())
+        yield
+        set_refresh_loop(None)
+
+    @staticmethod
+    async def _seed(key, value, age):
+        """写入一个已缓存 age 秒的条目"""
+        from services.cache_service import cache_service
+        await cache_service.set_object(key, {"value": value, "fetched_at": time.time() - age}, ttl=600)
+
+    @staticmethod
+    async def _drain():
+        from services import cache_revalidate
+        if cache_revalidate._background_refreshes:
+            await asyncio.gather(*cache_revalidate._background_refreshes)
+
+    @pytest.mark.asyncio
+    async def test_miss_fetches_and_stores(self, swr_key):
+        """未命中时同步获取并写入"""
+        from services.cache_revalidate import get_revalidating, read_revalidating
+        fetch = AsyncMock(return_value=42)
+
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == 42
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == 42
+
+        fetch.assert_awaited_once()
+        value, age = await read_revalidating(swr_key)
+        assert value == 42
+        assert age < 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_and_refreshed_once(self, swr_key):
+        """过期后立即返回旧值，并发读取只触发一次后台刷新"""
+        from services.cache_revalidate import get_revalidating, read_revalidating
+        await self._seed(swr_key, "old", age=45)
+        fetch = AsyncMock(return_value="new")
+
+        results = await asyncio.gather(*[
+            get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) for _ in range(5)
+        ])
+        await self._drain()
+
+        assert results == ["old"] * 5
+        fetch.assert_awaited_once()
+        assert (await read_revalidating(swr_key))[0] == "new"
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_before_expiry(self, swr_key):
+        """临近过期时读取会提前刷新"""
+        from services.cache_revalidate import get_revalidating, read_revalidating
+        await self._seed(swr_key, "old", age=27)
+        fetch = AsyncMock(return_value="new")
+
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == "old"
+        await self._drain()
+
+        fetch.assert_awaited_once()
+        assert (await read_revalidating(swr_key))[0] == "new"
+
+    @pytest.mark.asyncio
+    async def test_fresh_value_not_refreshed(self, swr_key):
+        """新鲜期内不触发刷新"""
+        from services.cache_revalidate import get_revalidating
+        await self._seed(swr_key, "old", age=5)
+        fetch = AsyncMock(return_value="new")
+
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == "old"
+        await self._drain()
+
+        fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self, swr_key):
+        """后台刷新失败时保留旧值"""
+        from services.cache_revalidate import get_revalidating, read_revalidating
+        await self._seed(swr_key, "old", age=45)
+        fetch = AsyncMock(side_effect=DataSourceError("yfinance", "Failed"))
+
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == "old"
+        await self._drain()
+
+        value, age = await read_revalidating(swr_key)
+        assert value == "old"
+        assert age >= 45
+
+    @pytest.mark.asyncio
+    async def test_stale_fetched_synchronously_without_refresh_loop(self, swr_key):
+        """未登记主循环时，已过期的条目同步获取，临近过期的条目照常返回"""
+        from services.cache_revalidate import get_revalidating, set_refresh_loop
+        set_refresh_loop(None)
+        fetch = AsyncMock(return_value="new")
+
+        await self._seed(swr_key, "old", age=27)
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == "old"
+        fetch.assert_not_awaited()
+
+        await self._seed(swr_key, "old", age=45)
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60) == "new"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refresh_from_temporary_loop_runs_on_main_loop(self, swr_key):
+        """临时事件循环（asyncio.run）触发的刷新转交主循环，不随临时循环结束被取消"""
+        from services import cache_revalidate
+        from services.cache_revalidate import get_revalidating, read_revalidating
+        await self._seed(swr_key, "old", age=45)
+        main_loop = asyncio.get_running_loop()
+        fetch_loops = []
+
+        async def fetch():
+            fetch_loops.append(asyncio.get_running_loop())
+            return "new"
+
+        def call_from_tool_thread():
+            return asyncio.run(get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60))
+
+        assert await asyncio.to_thread(call_from_tool_thread) == "old"
+        # 让主循环执行转交过来的刷新
+        await asyncio.sleep(0)
+        await self._drain()
+
+        assert fetch_loops == [main_loop]
+        assert (await read_revalidating(swr_key))[0] == "new"
+        assert all(not pending for pending in cache_revalidate._pending_requests.values())
+
+    @pytest.mark.asyncio
+    async def test_closed_market_extends_freshness(self, swr_key):
+        """休市期间写入的条目新鲜期延长到下一次开盘"""
+        from services.cache_service import cache_service
+        from services.cache_revalidate import write_revalidating
+
+        with patch("services.cache_revalidate.trading_calendar.cache_ttl", return_value=3600) as mock_ttl:
+            await write_revalidating(swr_key, "closed", ttl=30, stale_ttl=60, market="CN")
+
+        mock_ttl.assert_called_once()
+        entry = await cache_service.get_object(swr_key)
+        assert entry["ttl"] == 3600
+
+    @pytest.mark.asyncio
+    async def test_stored_ttl_respected_on_read(self, swr_key):
+        """读取时按条目写入时记录的新鲜期判断，而不是调用方的常规 TTL"""
+        from services.cache_service import cache_service
+        from services.cache_revalidate import get_revalidating
+        await cache_service.set_object(
+            swr_key, {"value": "closed", "fetched_at": time.time() - 600, "ttl": 3600}, ttl=3660
+        )
+        fetch = AsyncMock(return_value="new")
+
+        assert await get_revalidating(swr_key, fetch, ttl=30, stale_ttl=60, market="CN") == "closed"
+        await self._drain()
+
+        fetch.assert_not_awaited()
+
+
+    @pytest.mark.asyncio
+    async def test_read_fresh_many_skips_stale(self, swr_key):
+        """批量读取只返回新鲜期内的条目"""
+        from services.cache_revalidate import read_fresh_many
+        await self._seed(swr_key, "old", age=45)
+        await self._seed(f"{swr_key}:fresh", "new", age=5)
+
+        try:
+            assert await read_fresh_many([swr_key, f"{swr_key}:fresh", f"{swr_key}:missing"], ttl=30) == {
+                f"{swr_key}:fresh": "new"
+            }
+        finally:
+            from services.cache_service import cache_service
+            await cache_service.delete(f"{swr_key}:fresh")
+
+
+class TestDistributedSingleFlight:
+    """测试跨进程单飞（其他进程以持有缓存锁模拟）"""
+
+    @pytest.fixture
+    async def flight_key(self):
+        from services.cache_service import cache_service
+        from services.cache_revalidate import _FLIGHT_LOCK_PREFIX
+        key = "market:test:flight"
+        await cache_service.delete(key)
+        yield key
+        await cache_service.delete(key)
+        await cache_service.release_lock(f"{_FLIGHT_LOCK_PREFIX}{key}", "other-process")
+
+    @staticmethod
+    async def _hold_lock(key):
+        from services.cache_service import cache_service
+        from services.cache_revalidate import _FLIGHT_LOCK_PREFIX
+        assert await cache_service.acquire_lock(f"{_FLIGHT_LOCK_PREFIX}{key}", "other-process", 30)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_result_from_lock_holder(self, flight_key):
+        """锁被其他进程持有时等待其结果，不访问数据源"""
+        from services.cache_revalidate import get_revalidating, write_revalidating
+        from services.cache_service import cache_service
+        await self._hold_lock(flight_key)
+        fetch = AsyncMock(return_value="mine")
+
+        async def other_process():
+            await asyncio.sleep(0.05)
+            await write_revalidating(flight_key, "theirs", 30, 60)
+            await cache_service.notify(flight_key)
+
+        result, _ = await asyncio.gather(
+            get_revalidating(flight_key, fetch, ttl=30, stale_ttl=60),
+            other_process(),
+        )
+
+        assert result == "theirs"
+        fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_takes_over_when_holder_releases_without_result(self, flight_key):
+        """持锁方失败释放锁后，等待方接手获取"""
+        from services.cache_revalidate import get_revalidating, _FLIGHT_LOCK_PREFIX
+        from services.cache_service import cache_service
+        await self._hold_lock(flight_key)
+        fetch = AsyncMock(return_value="mine")
+
+        async def other_process_fails():
+            await asyncio.sleep(0.05)
+            await cache_service.release_lock(f"{_FLIGHT_LOCK_PREFIX}{flight_key}", "other-process")
+            await cache_service.notify(flight_key)
+
+        result, _ = await asyncio.gather(
+            get_revalidating(flight_key, fetch, ttl=30, stale_ttl=60),
+            other_process_fails(),
+        )
+
+        assert result == "mine"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fetches_directly_after_wait_timeout(self, flight_key):
+        """等待超时后自行获取"""
+        from services.cache_revalidate import get_revalidating
+        await self._hold_lock(flight_key)
+        fetch = AsyncMock(return_value="mine")
+
+        with patch("services.cache_revalidate._FLIGHT_WAIT_TIMEOUT", 0.05):
+            result = await get_revalidating(flight_key, fetch, ttl=30, stale_ttl=60)
+
+        assert result == "mine"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lock_released_after_failed_fetch(self, flight_key):
+        """获取失败也会释放锁"""
+        from services.cache_revalidate import get_revalidating, _FLIGHT_LOCK_PREFIX
+        from services.cache_service import cache_service
+
+        with pytest.raises(DataSourceError):
+            await get_revalidating(
+                flight_key, AsyncMock(side_effect=DataSourceError("yfinance", "Failed")), ttl=30, stale_ttl=60
+            )
+
+        assert await cache_service.acquire_lock(f"{_FLIGHT_LOCK_PREFIX}{flight_key}", "probe", 1)
+        await cache_service.release_lock(f"{_FLIGHT_LOCK_PREFIX}{flight_key}", "probe")
@@ -0,0 +1,200 @@
+"""
+CacheSerializer 单元测试
+
+覆盖:
+1. Pydantic 模型 / dataclass / Enum 往返
+2. 容器与日期类型
+3. 类型解析与安全限制
+4. CacheService 对象缓存（非内存后端）
+"""
+import pytest
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+from unittest.mock import AsyncMock
+
+from services.cache_serializer import (
+    CacheSerializer,
+    CacheSerializationError,
+    cache_serializer,
+)
+from services.cache_service import CacheService, RedisCacheBackend
+from services.market_watcher import MarketIndex, MarketRegion, IndexStatus
+from services.north_money_service import NorthMoneyFlow, NorthMoneyHistory
+
+
+@dataclass
+class _Point:
+    x: int
+    when: date
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _Series:
+    name: str
+    points: List[_Point]
+    note: Optional[str] = None
+
+
+# =============================================================================
+# 往返测试
+# =============================================================================
+
+class TestRoundTrip:
+    """编码后解码得到等价对象"""
+
+    def test_pydantic_model(self):
+        """Pydantic 模型往返"""
+        flow = NorthMoneyFlow(
+            date=date(2024, 1, 2), sh_connect=10.5, sz_connect=-3.0, total=7.5, market_sentiment="Inflow"
+        )
+
+        result = cache_serializer.loads(cache_serializer.dumps(flow))
+
+        assert isinstance(result, NorthMoneyFlow)
+        assert result == flow
+
+    def test_list_of_models(self):
+        """模型列表往返"""
+        history = [
+            NorthMoneyHistory(date=date(2024, 1, d), total=d, sh_connect=d, sz_connect=0)
+            for d in range(1, 4)
+        ]
+
+        result = cache_serializer.loads(cache_serializer.dumps(history))
+
+        assert result == history
+
+    def test_dict_of_models_with_enums(self):
+        """字典值为含 Enum 字段的模型"""
+        index = MarketIndex(
+            code="000001.SH", name="上证指数", name_en="SSE", region=MarketRegion.CN,
+            current=3000.0, change=10.0, change_percent=0.33, status=IndexStatus.CLOSED,
+            updated_at=datetime(2024, 1, 2, 10, 30),
+        )
+
+        result = cache_serializer.loads(cache_serializer.dumps({index.code: index}))
+
+        assert result["000001.SH"] == index
+        assert result["000001.SH"].region is MarketRegion.CN
+
+    def test_enum_value(self):
+        """str 派生的 Enum 不会退化为字符串"""
+        result = cache_serializer.loads(cache_serializer.dumps([MarketRegion.US]))
+
+        assert result == [MarketRegion.US]
+        assert isinstance(result[0], MarketRegion)
+
+    def test_nested_dataclass(self):
+        """嵌套 dataclass 往返"""
+        serializer = CacheSerializer()
+        serializer.register(_Series)
+        serializer.register(_Point)
+        series = _Series(name="s", points=[_Point(1, date(2024, 1, 1), ["a"]), _Point(2, date(2024, 1, 2))])
+
+        result = serializer.loads(serializer.dumps(series))
+
+        assert result == series
+        assert isinstance(result.points[0], _Point)
+
+    def test_primitives_and_containers(self):
+        """基础类型、tuple、set、日期"""
+        value = {"a": 1, "b": [1.5, None, True], "t": (1, 2), "s": {"x"}, "d": datetime(2024, 1, 2, 3, 4)}
+
+        assert cache_serializer.loads(cache_serializer.dumps(value)) == value
+
+    def test_plain_json_readable(self):
+        """不带类型标签的普通 JSON 也可以读取"""
+        assert cache_serializer.loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+# =============================================================================
+# 类型解析测试
+# =============================================================================
+
+class TestTypeResolution:
+    """类型标签解析"""
+
+    def test_first_party_type_resolved_without_registration(self):
+        """未注册的第一方模型按模块路径导入（模拟另一个进程）"""
+        payload = cache_serializer.dumps(
+            NorthMoneyFlow(date=date(2024, 1, 2), sh_connect=1, sz_connect=1, total=2, market_sentiment="Inflow")
+        )
+
+        fresh = CacheSerializer()
+        result = fresh.loads(payload)
+
+        assert isinstance(result, NorthMoneyFlow)
+
+    def test_foreign_module_rejected(self):
+        """非第一方模块的类型标签被拒绝"""
+        payload = '{"__type__": "os.system", "__value__": "echo"}'
+
+        with pytest.raises(CacheSerializationError):
+            CacheSerializer().loads(payload)
+
+    def test_unsupported_value(self):
+        """不支持的值类型"""
+        with pytest.raises(CacheSerializationError):
+            cache_serializer.dumps(object())
+
+    def test_register_rejects_plain_class(self):
+        """只能注册模型、dataclass 或 Enum"""
+        with pytest.raises(TypeError):
+            CacheSerializer().register(object)
+
+
+# =============================================================================
+# CacheService 对象缓存测试
+# =============================================================================
+
+class TestCacheServiceObjects:
+    """非内存后端上的对象缓存"""
+
+    @pytest.fixture
+    def service(self):
+        """Redis 后端，存储替换为字典"""
+        store = {}
+        backend = RedisCacheBackend("redis://localhost:6379")
+        backend.get = AsyncMock(side_effect=lambda key: store.get(key))
+
+        async def _set(key, value, ttl=None):
+            store[key] = value
+            return True
+
+        backend.set = AsyncMock(side_effect=_set)
+        svc = CacheService()
+        svc._backend = backend
+        svc._initialized = True
+        svc.store = store
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_set_and_get_object(self, service):
+        """对象以字符串形式写入后端并还原"""
+        flow = NorthMoneyFlow(
+            date=date(2024, 1, 2), sh_connect=1, sz_connect=1, total=2, market_sentiment="Inflow"
+        )
+
+        assert await service.set_object("north_money_flow", flow, ttl=300) is True
+        assert isinstance(service.store["north_money_flow"], str)
+        assert await service.get_object("north_money_flow") == flow
+
+    @pytest.mark.asyncio
+    async def test_get_object_missing(self, service):
+        """不存在的键"""
+        assert await service.get_object("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_get_object_corrupted(self, service):
+        """损坏的数据返回 None"""
+        service.store["bad"] = "not json"
+
+        assert await service.get_object("bad") is None
+
+    @pytest.mark.asyncio
+    async def test_set_sync_still_memory_only(self, service):
+        """同步接口在 Redis 后端上保持不可用"""
+        assert service.set_sync("k", "v") is False
+        assert service.get_sync("k") is None
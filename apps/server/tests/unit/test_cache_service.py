@@ -9,16 +9,21 @@ CacheService 单元测试
 5. CacheService JSON 操作
 6. 任务状态管理
 7. SSE 事件管理
+8. 批量操作与 SCAN 键遍历
+9. 互斥锁
 """
 import pytest
 import asyncio
+import threading
+import time
 from datetime import datetime, timedelta
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock, PropertyMock
 
 from services.cache_service import (
     CacheBackend,
     MemoryCacheBackend,
     RedisCacheBackend,
+    TieredCacheBackend,
     CacheService,
     cache_service,
 )
@@ -167,6 +172,213 @@ class TestMemoryCacheBackend:
 
         assert len(backend._cache) == 0
 
+    @pytest.mark.asyncio
+    async def test_append_and_read_log(self, backend):
+        """事件日志追加与偏移读取"""
+        assert await backend.append_log("log", "e0") == 1
+        assert await backend.append_log("log", "e1") == 2
+        assert await backend.append_log("log", "e2") == 3
+
+        assert await backend.read_log("log") == ["e0", "e1", "e2"]
+        assert await backend.read_log("log", start=1) == ["e1", "e2"]
+        assert await backend.read_log("log", start=0, end=1) == ["e0", "e1"]
+        assert await backend.read_log("log", start=5) == []
+        assert await backend.log_length("log") == 3
+
+    @pytest.mark.asyncio
+    async def test_log_missing_key(self, backend):
+        """不存在的事件日志"""
+        assert await backend.read_log("missing") == []
+        assert await backend.log_length("missing") == 0
+
+    @pytest.mark.asyncio
+    async def test_log_ttl_expiry(self, backend):
+        """事件日志 TTL 过期"""
+        await backend.append_log("log_ttl", "e0", ttl=1)
+        await asyncio.sleep(1.1)
+
+        assert await backend.log_length("log_ttl") == 0
+        assert await backend.append_log("log_ttl", "e1") == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_log(self, backend):
+        """删除事件日志"""
+        await backend.append_log("log_del", "e0")
+
+        assert await backend.delete("log_del") is True
+        assert await backend.log_length("log_del") == 0
+
+    @pytest.mark.asyncio
+    async def test_keys_include_logs(self, backend):
+        """模式匹配同时返回事件日志键，可按模式删除"""
+        await backend.set("sse:meta:1", "v")
+        await backend.append_log("sse:log:1", "e0")
+
+        keys = await backend.keys("sse:*")
+        assert sorted(keys) == ["sse:log:1", "sse:meta:1"]
+        assert await backend.delete_many(keys) == 2
+        assert await backend.keys("sse:*") == []
+
+    @pytest.mark.asyncio
+    async def test_expire(self, backend):
+        """刷新 TTL"""
+        await backend.set("key_refresh", "value", ttl=1)
+
+        assert await backend.expire("key_refresh", 60) is True
+        await asyncio.sleep(1.1)
+        assert await backend.get("key_refresh") == "value"
+        assert await backend.expire("missing", 60) is False
+
+
+class TestMemoryCacheBackendBatch:
+    """内存后端批量操作"""
+
+    @pytest.fixture
+    def backend(self):
+        return MemoryCacheBackend()
+
+    @pytest.mark.asyncio
+    async def test_set_many_and_get_many(self, backend):
+        """批量写入后批量读取，只返回命中的键"""
+        await backend.set_many({"a": "1", "b": "2"}, ttl=60)
+
+        assert await backend.get_many(["a", "b", "c"]) == {"a": "1", "b": "2"}
+
+    @pytest.mark.asyncio
+    async def test_delete_many(self, backend):
+        """批量删除返回实际删除数"""
+        await backend.set_many({"a": "1", "b": "2"})
+
+        assert await backend.delete_many(["a", "b", "missing"]) == 2
+        assert await backend.get_many(["a", "b"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_scan_iter(self, backend):
+        """按前缀迭代键"""
+        await backend.set_many({"task:1": "x", "task:2": "y", "other": "z"})
+
+        keys = [key async for key in backend.scan_iter("task:*")]
+
+        assert sorted(keys) == ["task:1", "task:2"]
+
+
+class TestMemoryCacheBackendLock:
+    """内存后端互斥锁"""
+
+    @pytest.fixture
+    def backend(self):
+        return MemoryCacheBackend()
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive(self, backend):
+        """锁被持有时其他 token 无法获取，释放后可获取"""
+        assert await backend.acquire_lock("lock:a", "t1", ttl=30) is True
+        assert await backend.acquire_lock("lock:a", "t2", ttl=30) is False
+
+        assert await backend.release_lock("lock:a", "t1") is True
+        assert await backend.acquire_lock("lock:a", "t2", ttl=30) is True
+
+    @pytest.mark.asyncio
+    async def test_release_requires_owner(self, backend):
+        """只有持有者可以释放"""
+        await backend.acquire_lock("lock:a", "t1", ttl=30)
+
+        assert await backend.release_lock("lock:a", "t2") is False
+        assert await backend.acquire_lock("lock:a", "t2", ttl=30) is False
+
+    @pytest.mark.asyncio
+    async def test_lock_expires(self, backend):
+        """锁超时后自动失效"""
+        await backend.acquire_lock("lock:a", "t1", ttl=0.05)
+        await asyncio.sleep(0.1)
+
+        assert await backend.acquire_lock("lock:a", "t2", ttl=30) is True
+
+
+class TestMemoryCacheBackendBounds:
+    """内存缓存容量约束测试"""
+
+    def test_lru_eviction_by_entries(self):
+        """超出条目上限时淘汰最久未使用的键"""
+        backend = MemoryCacheBackend(max_entries=2, max_bytes=0, sweep_interval=0)
+        backend.set_sync("a", "1")
+        backend.set_sync("b", "2")
+        backend.get_sync("a")  # a 变为最近使用
+        backend.set_sync("c", "3")
+
+        assert backend.get_sync("b") is None
+        assert backend.get_sync("a") == "1"
+        assert backend.get_sync("c") == "3"
+        assert backend.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """超出字节预算时淘汰"""
+        backend = MemoryCacheBackend(max_entries=0, max_bytes=300, sweep_interval=0)
+        backend.set_sync("a", "x" * 100)
+        backend.set_sync("b", "y" * 100)
+        backend.set_sync("c", "z" * 100)
+
+        stats = backend.get_stats()
+        assert stats["bytes"] <= 300
+        assert stats["evictions"] >= 1
+        assert backend.get_sync("c") == "z" * 100
+
+    def test_oversized_value_not_cached(self):
+        """单个值超过预算时不缓存"""
+        backend = MemoryCacheBackend(max_entries=0, max_bytes=50, sweep_interval=0)
+
+        assert backend.set_sync("big", "x" * 1000) is False
+        assert backend.get_sync("big") is None
+
+    def test_object_size_estimated(self):
+        """对象图按深度估算大小"""
+        backend = MemoryCacheBackend(sweep_interval=0)
+        backend.set_sync("small", {"a": 1})
+        backend.set_sync("large", {"items": [{"name": "x" * 100} for _ in range(100)]})
+
+        assert backend._sizes["large"] > backend._sizes["small"] * 10
+
+    def test_overwrite_updates_bytes(self):
+        """覆盖写入时字节数不重复累计"""
+        backend = MemoryCacheBackend(sweep_interval=0)
+        backend.set_sync("k", "x" * 100)
+        first = backend.get_stats()["bytes"]
+        backend.set_sync("k", "x" * 100)
+
+        assert backend.get_stats()["bytes"] == first
+
+    @pytest.mark.asyncio
+    async def test_sweep_removes_expired(self):
+        """sweep 主动清理过期键"""
+        backend = MemoryCacheBackend(sweep_interval=0)
+        await backend.set("stale", "v", ttl=1)
+        await backend.append_log("stale_log", "e", ttl=1)
+        await backend.set("fresh", "v")
+        await asyncio.sleep(1.1)
+
+        assert backend.sweep() == 2
+        assert "stale" not in backend._cache
+        assert backend.get_stats()["expirations"] == 2
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper(self):
+        """后台线程定期清理过期键"""
+        backend = MemoryCacheBackend(sweep_interval=0.2)
+        await backend.set("stale", "v", ttl=1)
+        await asyncio.sleep(1.5)
+
+        assert "stale" not in backend._cache
+        await backend.close()
+
+    def test_sync_and_async_share_lock(self):
+        """同步与异步路径使用同一把锁"""
+        backend = MemoryCacheBackend(sweep_interval=0)
+
+        assert not hasattr(backend, "_sync_lock")
+        with backend._lock:
+            backend.set_sync("k", "v")  # 可重入
+        assert backend.get_sync("k") == "v"
+
 
 # =============================================================================
 # RedisCacheBackend 测试（Mock）
@@ -275,25 +487,383 @@ class TestRedisCacheBackend:
 
     @pytest.mark.asyncio
     async def test_keys_pattern(self, backend):
-        """模式匹配键"""
-        mock_client = AsyncMock()
-        mock_client.keys.return_value = ["task:1", "task:2"]
+        """模式匹配键（基于 SCAN，不调用 KEYS）"""
+        async def scan_iter(match, count):
+            for key in ["task:1", "task:2"]:
+                yield key
+
+        mock_client = MagicMock()
+        mock_client.scan_iter = MagicMock(side_effect=scan_iter)
 
         with patch.object(backend, '_get_client', return_value=mock_client):
             result = await backend.keys("task:*")
 
         assert result == ["task:1", "task:2"]
+        mock_client.scan_iter.assert_called_once_with(match="task:*", count=500)
+        mock_client.keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_many_uses_chunked_mget(self, backend):
+        """批量获取按批次使用 MGET，只返回命中的键"""
+        backend.BATCH_SIZE = 2
+        mock_client = AsyncMock()
+        mock_client.mget.side_effect = [["v1", None], ["v3"]]
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.get_many(["k1", "k2", "k3"])
+
+        assert result == {"k1": "v1", "k3": "v3"}
+        assert mock_client.mget.call_count == 2
+        assert backend.get_stats()["hits"] == 2
+        assert backend.get_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_set_many_uses_pipeline(self, backend):
+        """批量设置在一个 pipeline 中执行"""
+        mock_pipe = MagicMock()
+        mock_pipe.execute = AsyncMock(return_value=[True, True])
+        mock_pipe.__aenter__ = AsyncMock(return_value=mock_pipe)
+        mock_pipe.__aexit__ = AsyncMock(return_value=None)
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value = mock_pipe
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.set_many({"k1": "v1", "k2": "v2"}, ttl=60)
+
+        assert result is True
+        mock_pipe.set.assert_any_call("k1", "v1", ex=60)
+        mock_pipe.set.assert_any_call("k2", "v2", ex=60)
+        mock_pipe.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_delete_many(self, backend):
+        """批量删除使用单条 DEL"""
+        mock_client = AsyncMock()
+        mock_client.delete.return_value = 2
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.delete_many(["k1", "k2", "k3"])
+
+        assert result == 2
+        mock_client.delete.assert_called_once_with("k1", "k2", "k3")
+
+    @pytest.mark.asyncio
+    async def test_acquire_lock_uses_set_nx(self, backend):
+        """获取锁使用 SET NX PX"""
+        mock_client = AsyncMock()
+        mock_client.set.return_value = None
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.acquire_lock("lock:k", "token", ttl=30)
+
+        assert result is False
+        mock_client.set.assert_called_once_with("lock:k", "token", nx=True, px=30000)
+
+    @pytest.mark.asyncio
+    async def test_release_lock_checks_owner(self, backend):
+        """释放锁通过脚本比较 token 后删除"""
+        mock_client = AsyncMock()
+        mock_client.eval.return_value = 1
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.release_lock("lock:k", "token")
+
+        assert result is True
+        script, numkeys, key, token = mock_client.eval.call_args.args
+        assert numkeys == 1 and key == "lock:k" and token == "token"
+
+    @pytest.mark.asyncio
+    async def test_batch_ops_empty_input(self, backend):
+        """空输入不访问 Redis"""
+        with patch.object(backend, '_get_client') as mock_get_client:
+            assert await backend.get_many([]) == {}
+            assert await backend.set_many({}) is True
+            assert await backend.delete_many([]) == 0
+
+        mock_get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_append_log_uses_pipeline(self, backend):
+        """追加日志使用 RPUSH + EXPIRE pipeline"""
+        mock_pipe = MagicMock()
+        mock_pipe.execute = AsyncMock(return_value=[3, True])
+        mock_pipe.__aenter__ = AsyncMock(return_value=mock_pipe)
+        mock_pipe.__aexit__ = AsyncMock(return_value=None)
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value = mock_pipe
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.append_log("log", "event", ttl=60)
+
+        assert result == 3
+        mock_pipe.rpush.assert_called_once_with("log", "event")
+        mock_pipe.expire.assert_called_once_with("log", 60)
+
+    @pytest.mark.asyncio
+    async def test_read_log_uses_lrange(self, backend):
+        """按偏移读取日志"""
+        mock_client = AsyncMock()
+        mock_client.lrange.return_value = ["e1", "e2"]
+
+        with patch.object(backend, '_get_client', return_value=mock_client):
+            result = await backend.read_log("log", start=1)
+
+        assert result == ["e1", "e2"]
+        mock_client.lrange.assert_called_once_with("log", 1, -1)
 
     @pytest.mark.asyncio
     async def test_close(self, backend):
         """关闭连接"""
         mock_client = AsyncMock()
-        backend._client = mock_client
+        backend._clients[asyncio.get_running_loop()] = mock_client
 
         await backend.close()
 
         mock_client.close.assert_called_once()
-        assert backend._client is None
+        assert len(backend._clients) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_object_from_temporary_loops(self, backend):
+        """工具层临时事件循环上的 get_object 使用各自的客户端，已关闭循环的客户端被丢弃"""
+        from services.cache_serializer import cache_serializer
+
+        service = CacheService()
+        service._backend = backend
+        service._initialized = True
+        payload = cache_serializer.dumps({"net_inflow": 1.5})
+        created = []
+
+        def from_url(*args, **kwargs):
+            client = AsyncMock()
+            client.get.return_value = payload
+            created.append(client)
+            return client
+
+        loops = []
+
+        async def tool_call():
+            loops.append(asyncio.get_running_loop())
+            return await service.get_object("north_money:summary")
+
+        def run_in_thread():
+            results = []
+            thread = threading.Thread(target=lambda: results.append(asyncio.run(tool_call())))
+            thread.start()
+            thread.join(5)
+            return results[0]
+
+        with patch("redis.asyncio.from_url", side_effect=from_url):
+            assert await service.get_object("north_money:summary") == {"net_inflow": 1.5}
+            assert run_in_thread() == {"net_inflow": 1.5}
+            assert run_in_thread() == {"net_inflow": 1.5}
+            assert await service.get_object("north_money:summary") == {"net_inflow": 1.5}
+
+        assert len(created) == 3
+        assert [client.get.await_count for client in created] == [2, 1, 1]
+        assert loops[0] not in backend._clients
+        assert backend._clients[asyncio.get_running_loop()] is created[0]
+
+
+# =============================================================================
+# Redis 通知监听测试
+# =============================================================================
+
+def _pubsub_client():
+    """订阅后一直阻塞在 listen 上的 Mock 客户端，记录创建的 pubsub"""
+    client = MagicMock()
+    client.created = []
+
+    def pubsub():
+        ps = MagicMock()
+        ps.subscribe = AsyncMock()
+        ps.aclose = AsyncMock()
+
+        async def listen():
+            await asyncio.Event().wait()
+            yield {}
+
+        ps.listen = listen
+        client.created.append(ps)
+        return ps
+
+    client.pubsub.side_effect = pubsub
+    return client
+
+
+class TestRedisNotifyListener:
+    """通知监听任务只维护一份"""
+
+    @pytest.fixture
+    def app_loop(self):
+        """在后台线程中运行的应用主事件循环"""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        yield loop
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    def test_temporary_loops_share_app_loop_listener(self, app_loop):
+        """临时事件循环上的调用复用主循环上的监听任务，不重复订阅"""
+        backend = RedisCacheBackend("redis://localhost:6379")
+        backend.bind_loop(app_loop)
+        client = _pubsub_client()
+
+        async def call():
+            await backend._ensure_listener()
+            return backend.listener_active
+
+        with patch.object(backend, '_get_client', AsyncMock(return_value=client)):
+            assert asyncio.run(call()) is True
+            assert asyncio.run(call()) is True
+
+        assert len(client.created) == 1
+        assert backend._listener_task.get_loop() is app_loop
+        asyncio.run_coroutine_threadsafe(backend.close(), app_loop).result(5)
+
+    @pytest.mark.asyncio
+    async def test_replaced_listener_is_stopped(self):
+        """未登记主循环时，其他事件循环重新订阅前取消旧任务并关闭旧订阅"""
+        backend = RedisCacheBackend("redis://localhost:6379")
+        client = _pubsub_client()
+
+        with patch.object(backend, '_get_client', AsyncMock(return_value=client)):
+            await backend._ensure_listener()
+            first_task = backend._listener_task
+
+            thread = threading.Thread(target=lambda: asyncio.run(backend._ensure_listener()))
+            thread.start()
+            thread.join(5)
+            await asyncio.sleep(0.05)
+
+        assert len(client.created) == 2
+        assert first_task.cancelled()
+        client.created[0].aclose.assert_awaited_once()
+
+# =============================================================================
+
+class TestTieredCacheBackend:
+    """两级缓存后端测试"""
+
+    @pytest.fixture
+    def backend(self):
+        """L2 使用 Mock，监听任务视为已就绪"""
+        tiered = TieredCacheBackend(
+            "redis://localhost:6379", l1_max_entries=100, l1_max_bytes=0, l1_ttl=30, l1_prefixes=["market:"]
+        )
+        tiered.l2.get_with_ttl = AsyncMock(return_value=("cached", 20))
+        tiered.l2.get = AsyncMock(return_value="l2_only")
+        tiered.l2.set = AsyncMock(return_value=True)
+        tiered.l2.delete = AsyncMock(return_value=True)
+        tiered.l2._ensure_listener = AsyncMock()
+        self.mock_client = AsyncMock()
+        tiered.l2._get_client = AsyncMock(return_value=self.mock_client)
+        with patch.object(RedisCacheBackend, "listener_active", new_callable=PropertyMock, return_value=True):
+            yield tiered
+
+    @pytest.mark.asyncio
+    async def test_hot_key_served_from_l1(self, backend):
+        """L2 读取后回填 L1，后续命中不再访问 L2"""
+        assert await backend.get("market:price:AAPL") == "cached"
+        assert await backend.get("market:price:AAPL") == "cached"
+
+        backend.l2.get_with_ttl.assert_called_once()
+        assert backend.get_stats()["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_l1_ttl_capped_by_l2_remaining(self, backend):
+        """L1 TTL 不超过 L2 剩余 TTL"""
+        backend.l2.get_with_ttl.return_value = ("cached", 5)
+        await backend.get("market:price:AAPL")
+
+        _, expires_at = backend.l1._cache["market:price:AAPL"]
+        assert expires_at <= datetime.now() + timedelta(seconds=5)
+
+    @pytest.mark.asyncio
+    async def test_non_eligible_key_bypasses_l1(self, backend):
+        """不在前缀列表中的键直接读 L2"""
+        assert await backend.get("task:1") == "l2_only"
+        assert await backend.get("task:1") == "l2_only"
+
+        assert backend.l2.get.call_count == 2
+        assert len(backend.l1._cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_set_updates_l1_and_publishes(self, backend):
+        """写入同时更新本地 L1 并广播失效"""
+        await backend.set("market:price:AAPL", "new", ttl=30)
+
+        assert await backend.get("market:price:AAPL") == "new"
+        backend.l2.get_with_ttl.assert_not_called()
+        channel, message = self.mock_client.publish.call_args.args
+        assert channel == TieredCacheBackend.INVALIDATE_CHANNEL
+        assert message.endswith("|market:price:AAPL")
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_drops_l1(self, backend):
+        """其他进程的失效消息删除本地 L1"""
+        await backend.get("market:price:AAPL")
+        await backend._on_invalidate("other-process|market:price:AAPL")
+
+        assert "market:price:AAPL" not in backend.l1._cache
+        assert backend.get_stats()["invalidations_received"] == 1
+
+    @pytest.mark.asyncio
+    async def test_own_invalidation_ignored(self, backend):
+        """忽略自己发出的失效消息"""
+        await backend.set("market:price:AAPL", "new", ttl=30)
+        await backend._on_invalidate(f"{backend._origin}|market:price:AAPL")
+
+        assert await backend.l1.get("market:price:AAPL") == "new"
+
+    @pytest.mark.asyncio
+    async def test_delete_clears_l1(self, backend):
+        """删除同时清理 L1"""
+        await backend.get("market:price:AAPL")
+        await backend.delete("market:price:AAPL")
+
+        assert "market:price:AAPL" not in backend.l1._cache
+        backend.l2.delete.assert_called_once_with("market:price:AAPL")
+
+    @pytest.mark.asyncio
+    async def test_get_many_mixes_l1_and_l2(self, backend):
+        """L1 命中的键不再访问 L2，其余一次批量读取并回填 L1"""
+        await backend.get("market:price:AAPL")
+        backend.l2.get_many_with_ttl = AsyncMock(return_value={
+            "market:price:MSFT": ("msft", 10),
+            "task:1": ("task", None),
+        })
+
+        result = await backend.get_many(["market:price:AAPL", "market:price:MSFT", "task:1", "market:price:X"])
+
+        assert result == {"market:price:AAPL": "cached", "market:price:MSFT": "msft", "task:1": "task"}
+        backend.l2.get_many_with_ttl.assert_called_once_with(["market:price:MSFT", "task:1", "market:price:X"])
+        assert "market:price:MSFT" in backend.l1._cache
+        assert "task:1" not in backend.l1._cache
+
+    @pytest.mark.asyncio
+    async def test_set_many_and_delete_many_invalidate(self, backend):
+        """批量写入/删除同步 L1 并批量广播失效"""
+        backend.l2.set_many = AsyncMock(return_value=True)
+        backend.l2.delete_many = AsyncMock(return_value=2)
+        backend._publish_invalidations = AsyncMock()
+
+        await backend.set_many({"market:price:AAPL": "a", "task:1": "t"}, ttl=30)
+        assert await backend.l1.get("market:price:AAPL") == "a"
+        assert "task:1" not in backend.l1._cache
+        backend._publish_invalidations.assert_called_with(["market:price:AAPL"])
+
+        assert await backend.delete_many(["market:price:AAPL", "task:1"]) == 2
+        assert "market:price:AAPL" not in backend.l1._cache
+
+    @pytest.mark.asyncio
+    async def test_no_l1_fill_without_listener(self, backend):
+        """失效监听未就绪时不回填 L1"""
+        with patch.object(RedisCacheBackend, "listener_active", new_callable=PropertyMock, return_value=False):
+            await backend.get("market:price:AAPL")
+
+        assert len(backend.l1._cache) == 0
 
 
 # =============================================================================
@@ -462,6 +1032,19 @@ class TestTaskManagement:
         assert "task_1" in result
         assert "task_2" in result
 
+    @pytest.mark.asyncio
+    async def test_get_all_tasks_uses_scan_and_batch_read(self, service):
+        """任务列表通过 SCAN + 批量读取获取，不逐个 get"""
+        await service.set_task("task_1", {"status": "running"})
+        await service.set_task("task_2", {"status": "completed"})
+        await service.set("task:bad", "not json")
+
+        with patch.object(service._backend, "get", wraps=service._backend.get) as mock_get:
+            result = await service.get_all_tasks()
+
+        mock_get.assert_not_called()
+        assert result == {"task_1": {"status": "running"}, "task_2": {"status": "completed"}}
+
 
 # =============================================================================
 # SSE 事件管理测试
@@ -560,6 +1143,105 @@ class TestSSEEventManagement:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_push_appends_without_rewriting_metadata(self, service):
+        """推送事件只追加日志，不重写元数据"""
+        await service.init_sse_task("sse_append", "AAPL")
+
+        with patch.object(service, "set_json", wraps=service.set_json) as mock_set_json:
+            for i in range(5):
+                await service.push_sse_event("sse_append", "progress", {"i": i})
+
+        mock_set_json.assert_not_called()
+        assert await service.log_length("sse_events:sse_append:log") == 5
+
+    @pytest.mark.asyncio
+    async def test_init_sse_task_resets_events(self, service):
+        """重新初始化（任务重试）清空旧事件"""
+        await service.init_sse_task("sse_retry", "AAPL")
+        await service.push_sse_event("sse_retry", "progress", {"attempt": 1})
+        await service.init_sse_task("sse_retry", "AAPL")
+
+        data = await service.get_sse_events("sse_retry")
+        assert data["events"] == []
+        assert data["total_events"] == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_sse_events_wakes_on_push(self, service):
+        """推送事件即时唤醒等待方"""
+        await service.init_sse_task("sse_wait", "AAPL")
+        version = await service.watch_sse_events("sse_wait")
+
+        async def producer():
+            await asyncio.sleep(0.05)
+            await service.push_sse_event("sse_wait", "progress", {"stage": "analyst"})
+
+        producer_task = asyncio.create_task(producer())
+        notified = await service.wait_sse_events("sse_wait", version, timeout=2)
+        await producer_task
+
+        assert notified is True
+        data = await service.get_sse_events("sse_wait")
+        assert len(data["events"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_sse_events_wakes_on_status(self, service):
+        """状态变更同样唤醒等待方"""
+        await service.init_sse_task("sse_wait_status", "AAPL")
+        version = await service.watch_sse_events("sse_wait_status")
+        await service.set_sse_status("sse_wait_status", "completed")
+
+        assert await service.wait_sse_events("sse_wait_status", version, timeout=0.1) is True
+
+    @pytest.mark.asyncio
+    async def test_wait_sse_events_timeout(self, service):
+        """无事件时超时返回 False"""
+        await service.init_sse_task("sse_idle", "AAPL")
+        version = await service.watch_sse_events("sse_idle")
+
+        assert await service.wait_sse_events("sse_idle", version, timeout=0.05) is False
+
+    @pytest.mark.asyncio
+    async def test_wait_sse_events_wakes_on_push_from_other_loop(self, service):
+        """工作线程中临时事件循环的推送同样唤醒主循环上的等待方"""
+        await service.init_sse_task("sse_thread", "AAPL")
+        version = await service.watch_sse_events("sse_thread")
+
+        def producer():
+            time.sleep(0.05)
+            asyncio.run(service.notify(service._sse_log_key("sse_thread")))
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        notified = await service.wait_sse_events("sse_thread", version, timeout=2)
+        thread.join()
+
+        assert notified is True
+
+    @pytest.mark.asyncio
+    async def test_unwatch_sse_events_releases_version(self, service):
+        """流结束后不再保留键的版本号"""
+        await service.init_sse_task("sse_unwatch", "AAPL")
+        await service.watch_sse_events("sse_unwatch")
+        await service.unwatch_sse_events("sse_unwatch")
+
+        assert service._sse_log_key("sse_unwatch") not in service._backend._notifier._versions
+
+    @pytest.mark.asyncio
+    async def test_other_viewer_unwatch_keeps_notifications(self, service):
+        """另一个观看方断开时，处于读取与等待之间的观看方仍能收到通知"""
+        await service.init_sse_task("sse_viewers", "AAPL")
+        await service.watch_sse_events("sse_viewers")
+        await service.watch_sse_events("sse_viewers")
+
+        version = await service.get_sse_events_version("sse_viewers")
+        await service.unwatch_sse_events("sse_viewers")
+        await service.push_sse_event("sse_viewers", "progress", {"stage": "analyst"})
+
+        assert await service.wait_sse_events("sse_viewers", version, timeout=0.1) is True
+        await service.unwatch_sse_events("sse_viewers")
+        assert service._sse_log_key("sse_viewers") not in service._backend._notifier._versions
+
     @pytest.mark.asyncio
     async def test_cleanup_sse_task(self, service):
         """清理 SSE 任务"""
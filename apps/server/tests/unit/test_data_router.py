@@ -6,7 +6,13 @@ MarketRouter 单元测试
 2. 数据源优先级选择
 3. 价格获取与降级机制
 4. 缓存行为
+5. 价格软过期回退
+6. 批量报价
+7. 对冲请求
+8. 自适应数据源排序
 """
+import asyncio
+import time
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -134,22 +140,25 @@ class TestAkShareProvider:
         assert price.market == "CN"
 
     @pytest.mark.asyncio
-    async def test_get_price_akshare_not_found(self):
+    async def test_get_price_akshare_not_found(self, mock_akshare):
         """AkShare 股票代码不存在时抛出错误"""
-        with patch("services.data_router.ak") as mock_ak:
-            mock_ak.stock_zh_a_spot_em.return_value = pd.DataFrame({
-                "代码": ["600519"],
-                "最新价": [1800.0],
-                "涨跌额": [20.0],
-                "涨跌幅": [1.12],
-                "成交量": [5000000],
-            })
+        with pytest.raises(DataSourceError) as exc_info:
+            await MarketRouter._get_price_akshare("999999.SH")
 
-            with pytest.raises(DataSourceError) as exc_info:
-                await MarketRouter._get_price_akshare("999999.SH")
+        assert exc_info.value.source == "akshare"
+        assert "not found" in str(exc_info.value).lower()
+
+    @pytest.mark.asyncio
+    async def test_get_price_akshare_shares_snapshot(self, mock_akshare):
+        """多只 A 股并发查询只拉取一次全市场行情"""
+        prices = await asyncio.gather(
+            MarketRouter._get_price_akshare("600519.SH"),
+            MarketRouter._get_price_akshare("000001.SZ"),
+            MarketRouter._get_price_akshare("600519.SH"),
+        )
 
-            assert exc_info.value.source == "akshare"
-            assert "not found" in str(exc_info.value).lower()
+        assert [p.price for p in prices] == [1800.0, 10.5, 1800.0]
+        assert mock_akshare.stock_zh_a_spot_em.call_count == 1
 
 
 class TestAlphaVantageProvider:
@@ -260,6 +269,78 @@ class TestFallbackMechanism:
                     await MarketRouter.get_stock_price("AAPL")
 
 
+def _yf_download_frame(closes):
+    """构造 yf.download(group_by="ticker") 形式的多级列 DataFrame"""
+    index = pd.date_range(end=datetime.now(), periods=2)
+    return pd.concat(
+        {ticker: pd.DataFrame({"Close": values, "Volume": [1000, 2000]}, index=index)
+         for ticker, values in closes.items()},
+        axis=1,
+    )
+
+
+class TestBatchPrices:
+    """测试批量报价 get_stock_prices"""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_market_and_fills_cache(self, mock_akshare, mock_yfinance, clear_price_cache):
+        """A 股读取快照、港美股一次 yf.download，结果写入缓存"""
+        mock_yfinance.download.return_value = _yf_download_frame({
+            "AAPL": [148.0, 150.0],
+            "0700.HK": [300.0, 303.0],
+        })
+
+        batch = await MarketRouter.get_stock_prices(["600519.SH", "AAPL", "0700.HK", "AAPL"])
+
+        assert batch.errors == {}
+        assert batch.prices["600519.SH"].price == 1800.0
+        assert batch.prices["AAPL"].price == 150.0
+        assert batch.prices["AAPL"].change == pytest.approx(2.0)
+        assert batch.prices["0700.HK"].market == "HK"
+        mock_yfinance.download.assert_called_once()
+        assert sorted(mock_yfinance.download.call_args[0][0]) == ["0700.HK", "AAPL"]
+        mock_yfinance.Ticker.assert_not_called()
+
+        cached = await MarketRouter.get_cached_prices(["600519.SH", "AAPL", "0700.HK"])
+        assert set(cached) == {"600519.SH", "AAPL", "0700.HK"}
+
+    @pytest.mark.asyncio
+    async def test_fresh_cache_served_without_providers(self, sample_stock_price, clear_price_cache):
+        await MarketRouter._set_cached_price("AAPL", sample_stock_price)
+
+        with patch.object(MarketRouter, "_fetch_prices_batch", new_callable=AsyncMock) as mock_batch:
+            mock_batch.return_value = {}
+            batch = await MarketRouter.get_stock_prices(["AAPL"])
+
+        assert batch.prices["AAPL"].price == sample_stock_price.price
+        mock_batch.assert_called_once_with([])
+
+    @pytest.mark.asyncio
+    async def test_partial_results_with_per_symbol_errors(self, mock_akshare, mock_yfinance, clear_price_cache):
+        """批量未覆盖的股票逐只降级，失败记录在 errors 中"""
+        mock_yfinance.download.return_value = _yf_download_frame({"AAPL": [148.0, 150.0]})
+
+        with patch.object(
+            MarketRouter, "_fetch_stock_price_impl", side_effect=DataSourceError("all", "No data")
+        ) as mock_single:
+            batch = await MarketRouter.get_stock_prices(["AAPL", "999999.SH"])
+
+        assert set(batch.prices) == {"AAPL"}
+        assert "999999.SH" in batch.errors
+        mock_single.assert_called_once_with("999999.SH")
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_falls_back_per_symbol(self, mock_yfinance, sample_stock_price, clear_price_cache):
+        """yf.download 失败时逐只获取"""
+        mock_yfinance.download.side_effect = Exception("Rate limited")
+
+        with patch.object(MarketRouter, "_fetch_stock_price_impl", return_value=sample_stock_price) as mock_single:
+            batch = await MarketRouter.get_stock_prices(["AAPL"])
+
+        assert batch.prices["AAPL"].price == sample_stock_price.price
+        mock_single.assert_called_once_with("AAPL")
+
+
 class TestHistoryData:
     """测试历史 K 线数据获取"""
 
@@ -292,6 +373,16 @@ class TestHistoryData:
         assert len(klines) == 3
         mock_yfinance.Ticker.assert_called_with("AAPL")
 
+    @pytest.mark.asyncio
+    async def test_history_cache_key_includes_period(self):
+        """不同周期使用不同的缓存键"""
+        with patch("services.data_router.get_revalidating", new=AsyncMock(return_value=[])) as mock_get:
+            await MarketRouter.get_history("AAPL", "1mo")
+            await MarketRouter.get_history("AAPL", "1y")
+
+        keys = [c.args[0] for c in mock_get.call_args_list]
+        assert keys == ["market:history:AAPL:1mo", "market:history:AAPL:1y"]
+
 
 class TestFundamentals:
     """测试基本面数据获取"""
@@ -305,3 +396,243 @@ class TestFundamentals:
         assert fundamentals.name == "Apple Inc."
         assert fundamentals.sector == "Technology"
         assert fundamentals.pe_ratio == 25.5
+
+
+class TestStalePriceFallback:
+    """测试价格软过期回退"""
+
+    @pytest.fixture(autouse=True)
+    async def refresh_loop(self):
+        from services.cache_revalidate import set_refresh_loop
+        set_refresh_loop(asyncio.get_running_loop())
+        yield
+        set_refresh_loop(None)
+
+    @pytest.mark.asyncio
+    async def test_stock_price_served_stale_when_providers_fail(self, sample_stock_price, clear_price_cache):
+        """价格过期且数据源全部失败时返回旧价格"""
+        from services import cache_revalidate
+        from services.cache_service import cache_service
+        from services.data_router import CACHE_KEY_PRICE
+        await cache_service.set_object(
+            CACHE_KEY_PRICE.format(symbol="AAPL"),
+            {"value": sample_stock_price, "fetched_at": time.time() - 120},
+            ttl=600,
+        )
+
+        with patch.object(MarketRouter, "_get_price_yfinance", side_effect=DataSourceError("yfinance", "Failed")):
+            with patch.object(MarketRouter, "_get_price_alpha_vantage", side_effect=DataSourceError("alpha_vantage", "Failed")):
+                price = await MarketRouter.get_stock_price("AAPL")
+                if cache_revalidate._background_refreshes:
+                    await asyncio.gather(*cache_revalidate._background_refreshes)
+
+        assert price.price == sample_stock_price.price
+
+
+class TestHedgedFetch:
+    """测试对冲请求"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_stats(self, monkeypatch):
+        from services import data_router
+        from config.settings import settings
+        monkeypatch.setattr(data_router, "_provider_stats", {})
+        monkeypatch.setattr(settings, "PROVIDER_HEDGING_ENABLED", True)
+        monkeypatch.setattr(settings, "PROVIDER_HEDGE_DEFAULT_DELAY", 0.05)
+        monkeypatch.setattr(settings, "PROVIDER_HEDGE_MIN_DELAY", 0.01)
+
+    @staticmethod
+    def _provider(results, delays, started, cancelled):
+        """按数据源返回预设结果的请求函数，记录启动与取消"""
+        async def call(provider):
+            started.append(provider)
+            try:
+                await asyncio.sleep(delays.get(provider, 0))
+            except asyncio.CancelledError:
+                cancelled.append(provider)
+                raise
+            result = results[provider]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_not_hedged(self):
+        """主数据源在等待时间内返回，不发起对冲"""
+        from services.data_router import _hedged_fetch, _provider_stats
+        started, cancelled = [], []
+        call = self._provider({"yfinance": 1, "alpha_vantage": 2}, {}, started, cancelled)
+
+        assert await _hedged_fetch(["yfinance", "alpha_vantage"], call) == ("yfinance", 1)
+        assert started == ["yfinance"]
+        assert _provider_stats["yfinance"]["hedged_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_hedged_and_cancelled(self):
+        """主数据源超时未返回时请求下一个数据源，先返回者胜出，落选请求被取消"""
+        from services.data_router import MarketRouter, _hedged_fetch, _provider_stats
+        started, cancelled = [], []
+        call = self._provider({"yfinance": 1, "alpha_vantage": 2}, {"yfinance": 5}, started, cancelled)
+
+        assert await _hedged_fetch(["yfinance", "alpha_vantage"], call) == ("alpha_vantage", 2)
+        await asyncio.sleep(0)
+
+        assert started == ["yfinance", "alpha_vantage"]
+        assert cancelled == ["yfinance"]
+        assert _provider_stats["yfinance"]["hedged_requests"] == 1
+        assert _provider_stats["yfinance"]["failed_requests"] == 0
+        assert _provider_stats["alpha_vantage"]["hedge_wins"] == 1
+        assert MarketRouter.get_provider_status()["alpha_vantage"]["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_uses_observed_p90(self):
+        """有足够样本时按 p90 延迟决定对冲时机"""
+        from services.data_router import _hedge_delay, _record_provider_success
+        for latency in [0.1] * 9 + [0.3] * 11:
+            _record_provider_success("yfinance", latency)
+
+        assert _hedge_delay("yfinance") == 0.3
+        assert _hedge_delay("alpha_vantage") == 0.05  # 样本不足时使用默认值
+
+    @pytest.mark.asyncio
+    async def test_failure_starts_next_provider(self):
+        """请求失败时立即由下一个数据源接替"""
+        from services.data_router import _hedged_fetch, _provider_stats
+        started, cancelled = [], []
+        call = self._provider(
+            {"akshare": DataSourceError("akshare", "down"), "yfinance": 3}, {}, started, cancelled
+        )
+
+        assert await _hedged_fetch(["akshare", "yfinance"], call) == ("yfinance", 3)
+        assert _provider_stats["akshare"]["failed_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_all_failed_raises_last_error(self):
+        from services.data_router import _hedged_fetch
+        call = self._provider(
+            {"yfinance": DataSourceError("yfinance", "a"), "alpha_vantage": ValueError("b")}, {}, [], []
+        )
+
+        with pytest.raises(DataSourceError) as exc_info:
+            await _hedged_fetch(["yfinance", "alpha_vantage"], call)
+
+        assert exc_info.value.source == "alpha_vantage"
+
+    @pytest.mark.asyncio
+    async def test_stock_price_hedged(self, sample_stock_price, clear_price_cache):
+        """get_stock_price 在 yfinance 卡住时采用 Alpha Vantage 的结果"""
+        async def stalled(symbol, market):
+            await asyncio.sleep(5)
+
+        with patch.object(MarketRouter, "_get_price_yfinance", side_effect=stalled):
+            with patch.object(MarketRouter, "_get_price_alpha_vantage", return_value=sample_stock_price):
+                price = await asyncio.wait_for(MarketRouter.get_stock_price("AAPL"), timeout=2)
+
+        assert price.price == sample_stock_price.price
+
+
+class TestAdaptiveRanking:
+    """测试自适应数据源排序"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_stats(self, monkeypatch):
+        from services import data_router
+        from config.settings import settings
+        monkeypatch.setattr(data_router, "_provider_stats", {})
+        monkeypatch.setattr(data_router, "_route_stats", {})
+        monkeypatch.setattr(data_router, "_route_decisions", {})
+        monkeypatch.setattr(settings, "PROVIDER_RANKING_ENABLED", True)
+
+    @staticmethod
+    def _record(provider, route, latency, success=True, times=10):
+        from services.data_router import _record_provider_failure, _record_provider_success
+        for _ in range(times):
+            if success:
+                _record_provider_success(provider, latency, route)
+            else:
+                _record_provider_failure(provider, Exception("down"), latency, route)
+
+    def test_default_order_without_samples(self):
+        from services.data_router import _rank_providers
+        assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["akshare", "yfinance"]
+
+    def test_healthier_provider_promoted(self):
+        """评分明显更高的数据源排到前面，且只影响对应的 (市场, 操作)"""
+        from services.data_router import _rank_providers
+        self._record("akshare", ("CN", "price"), 3.0)
+        self._record("yfinance", ("CN", "price"), 0.2)
+
+        assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["yfinance", "akshare"]
+        assert _rank_providers(["akshare", "yfinance"], "CN", "history") == ["akshare", "yfinance"]
+
+        status = MarketRouter.get_provider_status()
+        assert status["yfinance"]["routes"]["CN:price"]["rank"] == 1
+        assert status["akshare"]["routes"]["CN:price"]["default_rank"] == 1
+
+    def test_small_difference_keeps_order(self):
+        """评分差距在阈值内时保持默认顺序"""
+        from services.data_router import _rank_providers
+        self._record("akshare", ("CN", "price"), 0.25)
+        self._record("yfinance", ("CN", "price"), 0.2)
+
+        assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["akshare", "yfinance"]
+
+    def test_error_rate_demotes(self):
+        from services.data_router import _rank_providers, _route_stats
+        self._record("akshare", ("CN", "price"), 0.1, success=False, times=4)
+        self._record("akshare", ("CN", "price"), 0.1, times=2)
+        self._record("yfinance", ("CN", "price"), 0.5)
+
+        assert _route_stats[("akshare", "CN", "price")]["ewma_error"] > 0.5
+        assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["yfinance", "akshare"]
+
+    @pytest.mark.asyncio
+    async def test_hedged_out_leader_records_latency(self, monkeypatch):
+        """被对冲取消的慢请求以已耗时计入延迟统计，不计为失败"""
+        from config.settings import settings
+        from services.data_router import _hedged_fetch, _route_stats
+        monkeypatch.setattr(settings, "PROVIDER_HEDGING_ENABLED", True)
+        monkeypatch.setattr(settings, "PROVIDER_HEDGE_DEFAULT_DELAY", 0.05)
+        monkeypatch.setattr(settings, "PROVIDER_HEDGE_MIN_DELAY", 0.01)
+
+        async def call(provider):
+            await asyncio.sleep(5 if provider == "akshare" else 0.02)
+            return provider
+
+        assert await _hedged_fetch(["akshare", "yfinance"], call, route=("CN", "price")) == ("yfinance", "yfinance")
+
+        slow = _route_stats[("akshare", "CN", "price")]
+        fast = _route_stats[("yfinance", "CN", "price")]
+        assert slow["samples"] == 1
+        assert slow["ewma_error"] == 0.0
+        assert slow["ewma_latency"] > fast["ewma_latency"]
+
+    def test_recovering_provider_ramps_back(self):
+        """熔断恢复的数据源按回切权重分流，回切结束后恢复正常排序"""
+        from services import data_router
+        from services.data_router import _provider_stats, _rank_providers, _recovery_weight
+        self._record("akshare", ("CN", "price"), 0.1, success=False, times=5)
+        self._record("yfinance", ("CN", "price"), 0.2)
+        _provider_stats["akshare"]["last_failure"] = datetime.now() - timedelta(seconds=61)
+
+        assert data_router._is_provider_available("akshare")
+        assert _recovery_weight("akshare") == pytest.approx(0.1, abs=0.01)
+
+        with patch("services.data_router.random.random", return_value=0.5):
+            assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["yfinance", "akshare"]
+        with patch("services.data_router.random.random", return_value=0.05):
+            assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["akshare", "yfinance"]
+
+        _provider_stats["akshare"]["recovered_at"] = datetime.now() - timedelta(seconds=121)
+        assert _recovery_weight("akshare") == 1.0
+        assert MarketRouter.get_provider_status()["akshare"]["recovery_weight"] == 1.0
+
+    def test_disabled_returns_default(self, monkeypatch):
+        from config.settings import settings
+        from services.data_router import _rank_providers
+        monkeypatch.setattr(settings, "PROVIDER_RANKING_ENABLED", False)
+        self._record("akshare", ("CN", "price"), 3.0)
+        self._record("yfinance", ("CN", "price"), 0.2)
+
+        assert _rank_providers(["akshare", "yfinance"], "CN", "price") == ["akshare", "yfinance"]
@@ -0,0 +1,115 @@
+"""
+frame_convert 单元测试
+
+覆盖:
+1. 列选择与类型转换
+2. 日期列与代码后缀
+3. 批量构建模型
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+
+from services.frame_convert import (
+    build_models,
+    build_records,
+    cn_symbols,
+    datetime_column,
+    numeric_column,
+    pick_column,
+    text_column,
+    to_dates,
+)
+
+
+class _Row(BaseModel):
+    symbol: str
+    value: float
+    day: date
+    weight: Optional[float] = None
+
+
+# =============================================================================
+# 列转换测试
+# =============================================================================
+
+class TestColumns:
+    """列选择与类型转换"""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            "代码": ["600519", "000001", "300750"],
+            "净买额": ["1.5e8", None, "bad"],
+            "名称": ["贵州茅台", np.nan, "宁德时代"],
+            "日期": ["2024-01-02", "bad", None],
+        })
+
+    def test_pick_column_first_existing(self, df):
+        assert pick_column(df, "股票代码", "代码") == "代码"
+        assert pick_column(df, "缺失") is None
+
+    def test_numeric_column_coerces_and_scales(self, df):
+        """无法解析的值取 default 后再缩放"""
+        values = numeric_column(df, "净买额", scale=1e-8)
+        assert values.tolist() == [1.5, 0.0, 0.0]
+
+    def test_numeric_column_missing_uses_default(self, df):
+        values = numeric_column(df, "不存在", default=2.0)
+        assert values.tolist() == [2.0, 2.0, 2.0]
+        assert values.index.equals(df.index)
+
+    def test_text_column_fills_missing(self, df):
+        assert text_column(df, "名称", default="未知").tolist() == ["贵州茅台", "未知", "宁德时代"]
+        assert text_column(df, "类型", default="未知").tolist() == ["未知"] * 3
+
+    def test_datetime_column_and_to_dates(self, df):
+        """无法解析的日期为 NaT，转换后为 None"""
+        dates = datetime_column(df, "日期")
+        assert dates.isna().tolist() == [False, True, True]
+        assert to_dates(dates).tolist() == [date(2024, 1, 2), None, None]
+
+    def test_datetime_column_filters_with_nat(self, df):
+        dates = datetime_column(df, "日期")
+        assert (dates >= pd.Timestamp("2024-01-01")).tolist() == [True, False, False]
+
+    def test_cn_symbols(self):
+        codes = pd.Series(["600519", "000001", "12345"])
+        assert cn_symbols(codes).tolist() == ["600519.SH", "000001.SZ", "12345.SZ"]
+        assert cn_symbols(codes, six_digit_only=True).tolist() == ["600519.SH", "000001.SZ", "12345"]
+
+
+# =============================================================================
+# 批量构建测试
+# =============================================================================
+
+class TestBuildModels:
+    """批量构建模型"""
+
+    def test_build_models(self):
+        frame = pd.DataFrame({
+            "symbol": ["600519.SH", "000001.SZ"],
+            "value": np.array([1.0, 2.5]),
+            "day": to_dates(pd.Series(pd.to_datetime(["2024-01-02", "2024-01-03"]))),
+            "weight": pd.Series([1.0, 0.0]).astype(object).where(lambda s: s != 0, None),
+        })
+
+        rows = build_models(_Row, frame)
+
+        assert rows == [
+            _Row(symbol="600519.SH", value=1.0, day=date(2024, 1, 2), weight=1.0),
+            _Row(symbol="000001.SZ", value=2.5, day=date(2024, 1, 3), weight=None),
+        ]
+
+    def test_build_models_empty(self):
+        assert build_models(_Row, pd.DataFrame(columns=["symbol", "value", "day"])) == []
+
+    def test_build_records_native_types(self):
+        """记录中的数值为 Python 原生类型，可直接序列化"""
+        records = build_records(pd.DataFrame({"a": np.array([1.5]), "b": ["x"]}))
+        assert records == [{"a": 1.5, "b": "x"}]
+        assert type(records[0]["a"]) is float
@@ -0,0 +1,138 @@
+"""
+共享 HTTP 连接池单元测试
+
+覆盖:
+1. 按主机复用客户端
+2. 同步包装与临时事件循环上的异步请求在后台事件循环上执行
+3. Alpha Vantage 请求经由连接池
+"""
+import httpx
+import pytest
+from unittest.mock import patch
+
+from tradingagents.dataflows import http_pool
+from tradingagents.dataflows.http_pool import HostPool
+
+
+def _mock_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+# =============================================================================
+# 连接池测试
+# =============================================================================
+
+class TestHostPool:
+    """按 (事件循环, 主机) 划分客户端"""
+
+    @pytest.mark.asyncio
+    async def test_same_host_reuses_client(self):
+        pool = HostPool()
+        first = pool.client_for("https://www.alphavantage.co/query?a=1")
+        second = pool.client_for("https://www.alphavantage.co/query?b=2")
+        other = pool.client_for("https://finnhub.io/api/v1/news")
+
+        assert first is second
+        assert first is not other
+        assert pool.hosts() == {"https://www.alphavantage.co": 1, "https://finnhub.io": 1}
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_recreated(self):
+        pool = HostPool()
+        client = pool.client_for("https://finnhub.io/api/v1/news")
+        await client.aclose()
+
+        assert pool.client_for("https://finnhub.io/api/v1/news") is not client
+        await pool.aclose()
+
+
+# =============================================================================
+# 同步包装测试
+# =============================================================================
+
+class TestSyncWrapper:
+    """同步调用方经由后台事件循环请求"""
+
+    def test_sync_get(self):
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, text="ok")
+
+        client = _mock_client(handler)
+        with patch.object(http_pool.host_pool, "client_for", return_value=client):
+            response = http_pool.get("https://example.com/a", params={"q": "x"})
+
+        assert response.text == "ok"
+        assert seen == ["https://example.com/a?q=x"]
+
+    @pytest.mark.asyncio
+    async def test_async_get(self):
+        client = _mock_client(lambda request: httpx.Response(200, json={"ok": True}))
+        with patch.object(http_pool.host_pool, "client_for", return_value=client):
+            response = await http_pool.aget("https://example.com/b")
+
+        assert response.json() == {"ok": True}
+
+    def test_temporary_loop_uses_shared_loop(self):
+        """临时事件循环（asyncio.run）上的异步请求转交后台循环，不在临时循环上建连接池"""
+        import asyncio
+
+        loops = []
+
+        def handler(request):
+            return httpx.Response(200, text="ok")
+
+        def client_for(url):
+            loops.append(asyncio.get_running_loop())
+            return _mock_client(handler)
+
+        async def call():
+            response = await http_pool.aget("https://example.com/c")
+            return response.text, asyncio.get_running_loop()
+
+        with patch.object(http_pool.host_pool, "client_for", side_effect=client_for):
+            text, caller_loop = asyncio.run(call())
+
+        assert text == "ok"
+        assert loops and loops[0] is not caller_loop
+        assert loops[0] is http_pool._sync_loop._ensure_loop()
+
+
+# =============================================================================
+# Alpha Vantage 集成
+# =============================================================================
+
+class TestAlphaVantageRequest:
+    """Alpha Vantage 请求经由共享连接池"""
+
+    def test_make_api_request_uses_pool(self, monkeypatch):
+        from tradingagents.dataflows import alpha_vantage_common
+
+        monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "demo")
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.params)
+            return httpx.Response(200, text="timestamp,close\n2024-01-02,1.0\n")
+
+        client = _mock_client(handler)
+        with patch.object(http_pool.host_pool, "client_for", return_value=client):
+            text = alpha_vantage_common._make_api_request("TIME_SERIES_DAILY", {"symbol": "IBM"})
+
+        assert text.startswith("timestamp")
+        assert seen[0]["function"] == "TIME_SERIES_DAILY"
+        assert seen[0]["apikey"] == "demo"
+
+    def test_rate_limit_detected(self, monkeypatch):
+        from tradingagents.dataflows import alpha_vantage_common
+
+        monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "demo")
+        client = _mock_client(
+            lambda request: httpx.Response(200, json={"Information": "API rate limit reached"})
+        )
+        with patch.object(http_pool.host_pool, "client_for", return_value=client):
+            with pytest.raises(alpha_vantage_common.AlphaVantageRateLimitError):
+                alpha_vantage_common._make_api_request("NEWS_SENTIMENT", {})
@@ -0,0 +1,125 @@
+"""
+技术指标引擎单元测试
+
+覆盖:
+1. 一次计算全部支持的指标
+2. 同一天内重复查询复用缓存，OHLCV 存储版本变化时重新计算
+3. 窗口查询为日期切片
+4. 非预计算指标按需补算
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.stockstats_utils import (
+    NOT_TRADING_DAY,
+    SUPPORTED_INDICATORS,
+    IndicatorEngine,
+)
+
+
+def _ohlcv(days=300):
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    close = 100 + np.cumsum(np.sin(np.arange(days) / 5))
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": close - 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Volume": np.full(days, 1_000_000.0),
+    })
+
+
+@pytest.fixture
+def engine():
+    with patch("tradingagents.dataflows.stockstats_utils._is_online", return_value=True):
+        with patch("tradingagents.dataflows.stockstats_utils._load_ohlcv", return_value=_ohlcv()) as mock_load:
+            yield IndicatorEngine(max_symbols=2), mock_load
+
+
+class TestIndicatorEngine:
+    """按股票按天缓存的指标表"""
+
+    def test_all_indicators_precomputed(self, engine):
+        engine, _ = engine
+        frame = engine.get_frame("AAPL")
+
+        assert list(frame.values.columns) == list(SUPPORTED_INDICATORS)
+        assert frame.values.index[0] == "2024-01-01"
+        assert not np.isnan(frame.values["close_200_sma"].iloc[-1])
+
+    def test_repeated_queries_compute_once(self, engine):
+        engine, mock_load = engine
+        engine.get_value("AAPL", "rsi", "2024-06-03")
+        engine.get_window("AAPL", "macd", "2024-05-01", "2024-06-03")
+        engine.get_value("aapl", "atr", "2024-06-03")
+
+        mock_load.assert_called_once()
+        assert engine.get_stats()["computes"] == 1
+        assert engine.get_stats()["hits"] == 2
+
+    def test_window_is_slice(self, engine):
+        engine, _ = engine
+        window = engine.get_window("AAPL", "close_10_ema", "2024-06-01", "2024-06-07")
+
+        # 2024-06-01/02 为周末
+        assert list(window) == ["2024-06-03", "2024-06-04", "2024-06-05", "2024-06-06", "2024-06-07"]
+        assert all(isinstance(v, str) for v in window.values())
+
+    def test_warmup_values_are_na(self, engine):
+        engine, _ = engine
+        window = engine.get_window("AAPL", "close_200_sma", "2024-01-01", "2024-01-03")
+
+        assert set(window.values()) == {"N/A"}
+
+    def test_non_trading_day(self, engine):
+        engine, _ = engine
+        assert engine.get_value("AAPL", "rsi", "2024-06-01") == NOT_TRADING_DAY
+
+    def test_extra_indicator_on_demand(self, engine):
+        engine, mock_load = engine
+        value = engine.get_value("AAPL", "close_5_sma", "2024-06-03")
+
+        assert isinstance(value, float)
+        assert "close_5_sma" in engine.get_frame("AAPL").values.columns
+        mock_load.assert_called_once()
+
+    def test_lru_eviction(self, engine):
+        engine, mock_load = engine
+        for symbol in ["AAPL", "MSFT", "NVDA", "AAPL"]:
+            engine.get_frame(symbol)
+
+        assert mock_load.call_count == 4
+        assert engine.get_stats()["cached_symbols"] == 2
+
+    def test_store_version_change_recomputes(self, engine):
+        """OHLCV 存储补齐新 K 线（版本变化）后当天即重新计算"""
+        engine, _ = engine
+        version = [(1, "2024-06-03")]
+        with patch(
+            "tradingagents.dataflows.stockstats_utils._data_version", side_effect=lambda *a: version[0]
+        ):
+            first = engine.get_frame("AAPL")
+            assert engine.get_frame("AAPL") is first
+
+            version[0] = (2, "2024-06-04")
+            second = engine.get_frame("AAPL")
+
+        assert second is not first
+        assert second.version == (2, "2024-06-04")
+        assert engine.get_stats()["computes"] == 2
+
+    def test_unchanged_version_reused_next_day(self, engine):
+        """跨天后重新同步存储，版本未变时复用已计算的表"""
+        engine, mock_load = engine
+        with patch("tradingagents.dataflows.stockstats_utils._data_version", return_value=(1, "2024-06-03")):
+            first = engine.get_frame("AAPL")
+            engine._synced[("AAPL", True)] = pd.Timestamp("2024-06-03").date()
+
+            assert engine.get_frame("AAPL") is first
+
+        assert mock_load.call_count == 2
+        assert engine.get_stats()["computes"] == 1
@@ -265,6 +265,18 @@ class TestGetDailyLHB:
 
         assert result == []
 
+    @pytest.mark.asyncio
+    async def test_get_daily_lhb_empty_not_cached(self, service):
+        """空数据不写入缓存，随后发布的龙虎榜可立即获取"""
+        from services.cache_service import cache_service
+        await cache_service.delete("daily_lhb_20260203")
+
+        with patch("services.lhb_service.ak.stock_lhb_detail_em", return_value=pd.DataFrame()) as mock_api:
+            assert await service.get_daily_lhb(trade_date="20260203") == []
+            assert await service.get_daily_lhb(trade_date="20260203") == []
+
+        assert mock_api.call_count == 2
+
     @pytest.mark.asyncio
     async def test_get_daily_lhb_error(self, service):
         """异常返回空列表"""
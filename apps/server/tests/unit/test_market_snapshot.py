@@ -0,0 +1,128 @@
+"""
+MarketSnapshotService 单元测试
+
+覆盖:
+1. DataFrame 转列式快照与代码索引
+2. 单只 / 批量报价
+3. 刷新周期与并发共享
+4. 拉取失败
+"""
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.exceptions import DataSourceError
+from services.market_snapshot import MarketSnapshotService, SpotSnapshot
+
+
+def _spot_df():
+    return pd.DataFrame({
+        "代码": ["600519", "000001", "300750"],
+        "名称": ["贵州茅台", "平安银行", "宁德时代"],
+        "最新价": [1800.0, 10.5, np.nan],
+        "涨跌额": [20.0, 0.15, np.nan],
+        "涨跌幅": [1.12, 1.45, np.nan],
+        "成交量": [5000000, 80000000, np.nan],
+    })
+
+
+# =============================================================================
+# 快照结构测试
+# =============================================================================
+
+class TestSpotSnapshot:
+    """列式快照"""
+
+    def test_from_dataframe(self):
+        snapshot = SpotSnapshot.from_dataframe(_spot_df())
+
+        assert len(snapshot) == 3
+        assert snapshot.index["000001"] == 1
+        assert isinstance(snapshot.columns["price"], np.ndarray)
+
+    def test_quote_strips_exchange_suffix(self):
+        price = SpotSnapshot.from_dataframe(_spot_df()).quote("600519.SH")
+
+        assert price.symbol == "600519.SH"
+        assert price.price == 1800.0
+        assert price.volume == 5000000
+        assert price.market == "CN"
+
+    def test_quote_missing_or_suspended(self):
+        """不存在的代码与停牌（无最新价）返回 None"""
+        snapshot = SpotSnapshot.from_dataframe(_spot_df())
+
+        assert snapshot.quote("999999.SH") is None
+        assert snapshot.quote("300750.SZ") is None
+
+
+# =============================================================================
+# 服务测试
+# =============================================================================
+
+class TestMarketSnapshotService:
+    """刷新与查询"""
+
+    @pytest.fixture
+    def mock_ak(self):
+        with patch("services.market_snapshot.ak") as mock_ak:
+            mock_ak.stock_zh_a_spot_em.return_value = _spot_df()
+            yield mock_ak
+
+    @pytest.mark.asyncio
+    async def test_get_quotes_batch(self, mock_ak):
+        """批量查询只返回有报价的股票"""
+        service = MarketSnapshotService(interval=30)
+
+        quotes = await service.get_quotes(["600519.SH", "000001.SZ", "300750.SZ", "999999.SH"])
+
+        assert set(quotes) == {"600519.SH", "000001.SZ"}
+        assert mock_ak.stock_zh_a_spot_em.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_quote_not_found(self, mock_ak):
+        with pytest.raises(DataSourceError) as exc_info:
+            await MarketSnapshotService(interval=30).get_quote("999999.SH")
+
+        assert exc_info.value.source == "akshare"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_refresh(self, mock_ak):
+        service = MarketSnapshotService(interval=30)
+
+        await asyncio.gather(*[service.get_quote("600519.SH") for _ in range(20)])
+
+        assert mock_ak.stock_zh_a_spot_em.call_count == 1
+        assert service.get_stats()["refresh_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_after_interval(self, mock_ak):
+        """超过刷新周期后重新拉取"""
+        service = MarketSnapshotService(interval=0)
+
+        await service.get_quote("600519.SH")
+        await service.get_quote("600519.SH")
+
+        assert mock_ak.stock_zh_a_spot_em.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, mock_ak):
+        service = MarketSnapshotService(interval=30)
+
+        await service.get_snapshot()
+        service.invalidate()
+        await service.get_snapshot()
+
+        assert mock_ak.stock_zh_a_spot_em.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_failure_raises_data_source_error(self, mock_ak):
+        mock_ak.stock_zh_a_spot_em.side_effect = Exception("Network error")
+
+        with pytest.raises(DataSourceError) as exc_info:
+            await MarketSnapshotService(interval=30).get_snapshot()
+
+        assert "Network error" in str(exc_info.value)
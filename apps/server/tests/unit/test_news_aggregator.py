@@ -244,7 +244,7 @@ class TestFetchFinnhubNews:
     @pytest.mark.asyncio
     async def test_fetch_finnhub_success(self, service):
         """成功获取 Finnhub 新闻"""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.general_news.return_value = [
             {
                 "headline": "Test Headline",
@@ -268,7 +268,7 @@ class TestFetchFinnhubNews:
     @pytest.mark.asyncio
     async def test_fetch_finnhub_sentiment_mapping(self, service):
         """Finnhub 情感映射"""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.general_news.return_value = [
             {
                 "headline": "Positive",
@@ -300,7 +300,7 @@ class TestFetchFinnhubNews:
     @pytest.mark.asyncio
     async def test_fetch_finnhub_error(self, service):
         """Finnhub 获取失败"""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.general_news.side_effect = Exception("API Error")
         service._finnhub_client = mock_client
 
@@ -336,7 +336,7 @@ class TestFetchStockNews:
     @pytest.mark.asyncio
     async def test_fetch_stock_news_success(self, service):
         """成功获取股票新闻"""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.company_news.return_value = [
             {
                 "headline": "AAPL News",
@@ -14,7 +14,8 @@ NorthMoneyService 单元测试
 10. 缓存机制
 """
 import pytest
-from datetime import date, datetime, time
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
 from unittest.mock import patch, AsyncMock, MagicMock
 import pandas as pd
 
@@ -38,6 +39,8 @@ from services.north_money_service import (
     HistoryQueryResult,
 )
 
+_CN_TZ = ZoneInfo("Asia/Shanghai")
+
 
 # =============================================================================
 # 数据模型测试
@@ -579,50 +582,23 @@ class TestTradingHours:
 
     def test_trading_hours_morning(self, service):
         """上午盘时段"""
-        with patch("services.north_money_service.datetime") as mock_dt:
-            mock_now = MagicMock()
-            mock_now.weekday.return_value = 1  # 周二
-            mock_now.time.return_value = time(10, 30)  # 10:30
-            mock_dt.now.return_value = mock_now
-
-            result = service._is_trading_hours()
-
-        assert result is True
+        assert service._is_trading_hours(datetime(2026, 2, 3, 10, 30, tzinfo=_CN_TZ)) is True  # 周二
 
     def test_trading_hours_afternoon(self, service):
         """下午盘时段"""
-        with patch("services.north_money_service.datetime") as mock_dt:
-            mock_now = MagicMock()
-            mock_now.weekday.return_value = 3  # 周四
-            mock_now.time.return_value = time(14, 0)  # 14:00
-            mock_dt.now.return_value = mock_now
-
-            result = service._is_trading_hours()
-
-        assert result is True
+        assert service._is_trading_hours(datetime(2026, 2, 5, 14, 0, tzinfo=_CN_TZ)) is True  # 周四
 
     def test_non_trading_hours_weekend(self, service):
         """周末非交易时段"""
-        with patch("services.north_money_service.datetime") as mock_dt:
-            mock_now = MagicMock()
-            mock_now.weekday.return_value = 5  # 周六
-            mock_dt.now.return_value = mock_now
-
-            result = service._is_trading_hours()
-
-        assert result is False
+        assert service._is_trading_hours(datetime(2026, 2, 7, 10, 30, tzinfo=_CN_TZ)) is False  # 周六
 
     def test_non_trading_hours_lunch(self, service):
         """午休非交易时段"""
-        with patch("services.north_money_service.datetime") as mock_dt:
-            mock_now = MagicMock()
-            mock_now.weekday.return_value = 2  # 周三
-            mock_now.time.return_value = time(12, 30)  # 12:30
-            mock_dt.now.return_value = mock_now
-
-            result = service._is_trading_hours()
+        assert service._is_trading_hours(datetime(2026, 2, 4, 12, 30, tzinfo=_CN_TZ)) is False  # 周三
 
-        assert result is False
+    def test_non_trading_hours_holiday(self, service):
+        """节假日非交易时段"""
+        assert service._is_trading_hours(datetime(2026, 2, 18, 10, 30, tzinfo=_CN_TZ)) is False  # 春节
 
 
 # =============================================================================
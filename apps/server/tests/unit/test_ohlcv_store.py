@@ -0,0 +1,347 @@
+"""
+OhlcvStore 单元测试
+
+覆盖:
+1. 首次获取与覆盖区间
+2. 只补齐缺失的日期段（向前 / 向后）
+3. 内存映射零拷贝切片
+4. 复权变化检测、当天数据刷新（按交易日历，收盘定型后不再刷新）
+5. 数据源失败与空结果
+"""
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.ohlcv_store import OhlcvStore
+
+
+class FakeSource:
+    """按日期生成确定性日线的数据源"""
+
+    def __init__(self):
+        self.calls = []
+        self.scale = 1.0
+        self.error = None
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        if self.error:
+            raise self.error
+        index = pd.bdate_range(start, end)
+        close = (100.0 + index.dayofyear.to_numpy()) * self.scale
+        return pd.DataFrame({
+            "Open": close - 1,
+            "High": close + 1,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": np.full(len(index), 1000.0),
+        }, index=index)
+
+
+@pytest.fixture
+def source():
+    return FakeSource()
+
+
+@pytest.fixture
+def store(tmp_path, source):
+    return OhlcvStore(root=str(tmp_path), fetcher=source)
+
+
+# =============================================================================
+# 增量获取测试
+# =============================================================================
+
+class TestIncrementalFetch:
+    """只获取缺失的日期段"""
+
+    def test_first_fetch_records_coverage(self, store, source):
+        frame = store.get_range("AAPL", "2024-01-01", "2024-01-31")
+
+        assert len(frame) == 23
+        assert list(frame.columns) == ["Open", "High", "Low", "Close", "Volume"]
+        assert frame.index.name == "Date"
+        assert source.calls == [("AAPL", date(2024, 1, 1), date(2024, 1, 31))]
+        coverage = store.coverage("AAPL")
+        assert coverage["start"] == "2024-01-01"
+        assert coverage["end"] == "2024-01-31"
+        assert coverage["rows"] == 23
+
+    def test_covered_range_served_locally(self, store, source):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+
+        frame = store.get_range("AAPL", "2024-01-10", "2024-01-20")
+
+        assert len(source.calls) == 1
+        assert frame.index[0] == pd.Timestamp("2024-01-10")
+        assert frame.index[-1] == pd.Timestamp("2024-01-19")
+        assert store.get_stats()["hits"] == 1
+
+    def test_forward_extension_fetches_tail_only(self, store, source):
+        """向后扩展只从最后一根已存 K 线开始获取"""
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+
+        frame = store.get_range("AAPL", "2024-01-01", "2024-02-29")
+
+        assert source.calls[-1] == ("AAPL", date(2024, 1, 31), date(2024, 2, 29))
+        assert len(frame) == 44
+        assert frame.index.is_monotonic_increasing
+        assert store.coverage("AAPL")["end"] == "2024-02-29"
+
+    def test_backward_extension_fetches_head_only(self, store, source):
+        store.get_range("AAPL", "2024-02-01", "2024-02-29")
+
+        store.get_range("AAPL", "2024-01-01", "2024-02-15")
+
+        assert source.calls[-1] == ("AAPL", date(2024, 1, 1), date(2024, 1, 31))
+        assert store.coverage("AAPL")["start"] == "2024-01-01"
+
+    def test_symbols_partitioned(self, store, tmp_path):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        store.get_range("600519.SH", "2024-01-01", "2024-01-31")
+
+        assert (tmp_path / "AAPL" / "meta.json").exists()
+        assert (tmp_path / "600519.SH" / "meta.json").exists()
+
+    def test_old_versions_removed(self, store, tmp_path):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        store.get_range("AAPL", "2024-01-01", "2024-02-29")
+
+        assert len(list((tmp_path / "AAPL").glob("v*"))) == 1
+
+    def test_write_only_removes_replaced_version(self, store, tmp_path):
+        """只删除被替换的版本，其他进程刚写入的版本目录不受影响"""
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        other = tmp_path / "AAPL" / "v1-other"
+        other.mkdir()
+
+        store.get_range("AAPL", "2024-01-01", "2024-02-29")
+
+        assert other.exists()
+        assert len(list((tmp_path / "AAPL").glob("v*"))) == 2
+
+    def test_stores_share_file_lock(self, tmp_path, source):
+        """两个实例（模拟两个进程）交替写入同一股票，数据始终可读"""
+        first = OhlcvStore(root=str(tmp_path), fetcher=source)
+        second = OhlcvStore(root=str(tmp_path), fetcher=source)
+
+        first.get_range("AAPL", "2024-01-01", "2024-01-31")
+        second.get_range("AAPL", "2024-01-01", "2024-02-29")
+        frame = first.get_range("AAPL", "2024-01-01", "2024-03-29")
+
+        assert len(frame) == 65
+        assert (tmp_path / ".locks" / "AAPL.lock").exists()
+        assert len(list((tmp_path / "AAPL").glob("v*"))) == 1
+
+
+# =============================================================================
+# 零拷贝读取测试
+# =============================================================================
+
+class TestZeroCopySlices:
+    """切片直接引用内存映射文件"""
+
+    def test_slice_is_memory_mapped(self, store):
+        store.get_range("AAPL", "2024-01-01", "2024-03-31")
+
+        data = store.get_slice("AAPL", "2024-02-01", "2024-02-29")
+
+        assert isinstance(data.columns["close"], np.memmap)
+        assert data.dates[0] == np.datetime64("2024-02-01")
+        assert len(data) == 21
+
+
+# =============================================================================
+# 数据刷新测试
+# =============================================================================
+
+class TestRefresh:
+    """复权变化与当天数据"""
+
+    def test_adjustment_change_triggers_full_refetch(self, store, source):
+        """重叠交易日收盘价变化时整段重新获取"""
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        source.scale = 0.5
+
+        frame = store.get_range("AAPL", "2024-01-01", "2024-02-29")
+
+        assert source.calls[-1] == ("AAPL", date(2024, 1, 1), date(2024, 2, 29))
+        assert frame.loc["2024-01-02", "Close"] == pytest.approx((100 + 2) * 0.5)
+        assert store.get_stats()["full_refetches"] == 1
+
+    @staticmethod
+    def _age_today(store, source, seconds):
+        """写入当天数据，并把最近更新时间回拨 seconds 秒"""
+        start = date.today() - timedelta(days=10)
+        store.get_range("AAPL", start)
+        meta_path = store._symbol_dir("AAPL") / "meta.json"
+        meta = store.coverage("AAPL")
+        meta["updated_at"] = time.time() - seconds
+        meta_path.write_text(json.dumps(meta))
+        return start
+
+    def test_today_refreshed_after_interval(self, store, source):
+        """交易时段内当天数据超过刷新间隔后重新获取"""
+        with patch("services.ohlcv_store.trading_calendar.is_open", return_value=True):
+            start = date.today() - timedelta(days=10)
+            store.get_range("AAPL", start)
+            store.get_range("AAPL", start)
+            assert len(source.calls) == 1
+
+            self._age_today(store, source, 3600)
+            store.get_range("AAPL", start)
+
+        assert len(source.calls) == 2
+        assert source.calls[-1][2] == date.today()
+
+    def test_settled_bar_not_refreshed(self, store, source):
+        """收盘结算后写入的当天数据在下一次开盘前不再刷新（周末、节假日同理）"""
+        next_open = datetime.now().astimezone() + timedelta(hours=12)
+        with patch("services.ohlcv_store.trading_calendar.is_open", return_value=False), \
+                patch("services.ohlcv_store.trading_calendar.next_open", return_value=next_open):
+            start = self._age_today(store, source, 3600)
+            version = store.coverage("AAPL")["version"]
+            store.get_range("AAPL", start)
+
+        assert len(source.calls) == 1
+        assert store.coverage("AAPL")["version"] == version
+
+    def test_bar_written_before_session_refreshed(self, store, source):
+        """开盘前写入、之后经历过交易时段的当天数据在收盘后重新获取一次"""
+        session_start = datetime.now().astimezone() - timedelta(minutes=30)
+        with patch("services.ohlcv_store.trading_calendar.is_open", return_value=False), \
+                patch("services.ohlcv_store.trading_calendar.next_open", return_value=session_start):
+            start = self._age_today(store, source, 3600)
+            store.get_range("AAPL", start)
+
+        assert len(source.calls) == 2
+
+    def test_future_end_clipped_to_today(self, store, source):
+        store.get_range("AAPL", date.today() - timedelta(days=5), date.today() + timedelta(days=30))
+
+        assert source.calls[0][2] == date.today()
+
+
+# =============================================================================
+# 异常测试
+# =============================================================================
+
+class TestFailures:
+    """数据源失败与空结果"""
+
+    def test_failure_without_local_data_raises(self, store, source):
+        source.error = RuntimeError("Network error")
+
+        with pytest.raises(RuntimeError):
+            store.get_range("AAPL", "2024-01-01", "2024-01-31")
+
+    def test_failure_serves_stored_bars(self, store, source):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        source.error = RuntimeError("Network error")
+
+        frame = store.get_range("AAPL", "2024-01-01", "2024-02-29")
+
+        assert len(frame) == 23
+        assert store.coverage("AAPL")["end"] == "2024-01-31"
+
+    def test_empty_result_not_recorded(self, tmp_path):
+        """数据源返回空结果时不记录覆盖区间"""
+        store = OhlcvStore(root=str(tmp_path), fetcher=lambda symbol, start, end: pd.DataFrame())
+
+        assert store.get_range("INVALID", "2024-01-01", "2024-01-31").empty
+        assert store.coverage("INVALID") is None
+
+
+# =============================================================================
+# 容量回收测试
+# =============================================================================
+
+class TestGarbageCollection:
+    """按最近访问时间淘汰"""
+
+    @staticmethod
+    def _age(tmp_path, symbol, seconds):
+        meta = tmp_path / symbol / "meta.json"
+        past = time.time() - seconds
+        os.utime(meta, (past, past))
+
+    def test_least_recently_used_evicted(self, store, tmp_path):
+        for symbol in ["AAPL", "MSFT", "NVDA"]:
+            store.get_range(symbol, "2024-01-01", "2024-12-31")
+        self._age(tmp_path, "AAPL", 300)
+        self._age(tmp_path, "MSFT", 200)
+        self._age(tmp_path, "NVDA", 100)
+        size = store._dir_size(tmp_path / "NVDA")
+
+        result = store.gc(max_bytes=size * 2)
+
+        assert result["evicted"] == ["AAPL"]
+        assert store.coverage("AAPL") is None
+        assert store.coverage("MSFT") is not None
+        assert store.get_stats()["evictions"] == 1
+
+    def test_read_refreshes_access_time(self, store, tmp_path):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        store.get_range("MSFT", "2024-01-01", "2024-01-31")
+        self._age(tmp_path, "AAPL", 2 * 3600)
+        self._age(tmp_path, "MSFT", 3600 + 60)
+
+        # 命中本地数据，更新最近访问时间
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        result = store.gc(max_bytes=store._dir_size(tmp_path / "AAPL"))
+
+        assert result["evicted"] == ["MSFT"]
+
+    def test_stale_tmp_dirs_removed(self, store, tmp_path):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        tmp_dir = tmp_path / "AAPL" / ".tmp-interrupted"
+        tmp_dir.mkdir()
+        past = time.time() - 2 * 3600
+        os.utime(tmp_dir, (past, past))
+
+        store.gc()
+
+        assert not tmp_dir.exists()
+        assert store.coverage("AAPL") is not None
+
+    def test_stale_unreferenced_versions_removed(self, store, tmp_path):
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        orphan = tmp_path / "AAPL" / "v1-orphan"
+        orphan.mkdir()
+        past = time.time() - 2 * 3600
+        os.utime(orphan, (past, past))
+        current = tmp_path / "AAPL" / f"v{store.coverage('AAPL')['version']}"
+        os.utime(current, (past, past))
+
+        store.gc()
+
+        assert not orphan.exists()
+        assert current.exists()
+
+    def test_locked_symbol_skipped(self, store, tmp_path):
+        """被其他进程持有文件锁的股票不淘汰（按目录名加锁，含需转义字符的代码）"""
+        store.get_range("BRK/B", "2024-01-01", "2024-01-31")
+        other = OhlcvStore(root=str(tmp_path), fetcher=store._fetcher)
+
+        with other._symbol_lock(other._key("BRK/B")):
+            result = store.gc(max_bytes=0)
+
+        assert result["evicted"] == []
+        assert store.coverage("BRK/B") is not None
+        assert store.gc(max_bytes=0)["evicted"] == ["BRK_B"]
+
+    def test_gc_after_write_keeps_current_symbol(self, tmp_path, source):
+        store = OhlcvStore(root=str(tmp_path), fetcher=source, max_bytes=1)
+
+        store.get_range("AAPL", "2024-01-01", "2024-01-31")
+        store._last_gc = 0.0
+        store.get_range("MSFT", "2024-01-01", "2024-01-31")
+
+        assert store.coverage("AAPL") is None
+        assert store.coverage("MSFT") is not None
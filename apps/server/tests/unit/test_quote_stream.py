@@ -0,0 +1,174 @@
+"""
+QuoteStream 单元测试
+
+覆盖:
+1. tick 差量计算
+2. 共享刷新只推送变化字段
+3. 新订阅者先收到快照
+4. 积压溢出后重发快照
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from services.models import StockPrice, StockPriceBatch
+from services.quote_stream import QuoteStream, diff_tick
+
+
+def _price(symbol="AAPL", price=150.0, volume=1000):
+    return StockPrice(
+        symbol=symbol,
+        price=price,
+        change=1.0,
+        change_percent=0.67,
+        volume=volume,
+        timestamp=datetime.now(),
+        market="US",
+    )
+
+
+def _batch(*prices):
+    return StockPriceBatch(prices={p.symbol: p for p in prices})
+
+
+# =============================================================================
+# 差量计算
+# =============================================================================
+
+class TestDiffTick:
+    """tick 差量"""
+
+    def test_first_tick_is_full(self):
+        assert diff_tick(None, {"price": 1.0, "volume": 10}) == {"price": 1.0, "volume": 10}
+
+    def test_only_changed_fields(self):
+        assert diff_tick({"price": 1.0, "volume": 10}, {"price": 1.0, "volume": 12}) == {"volume": 12}
+
+    def test_unchanged_is_empty(self):
+        assert diff_tick({"price": 1.0}, {"price": 1.0}) == {}
+
+
+# =============================================================================
+# 刷新与分发
+# =============================================================================
+
+class TestQuoteStream:
+    """共享刷新循环与推送"""
+
+    @pytest.fixture
+    async def stream(self):
+        stream = QuoteStream(interval=3600, queue_size=2)
+        # 由测试显式调用 refresh()，不启动后台循环
+        stream._run = AsyncMock()
+        yield stream
+        await stream.stop()
+
+    @pytest.mark.asyncio
+    async def test_delta_pushed_to_subscribers(self, stream):
+        subscription = stream.subscribe(["aapl"])
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            side_effect=[_batch(_price()), _batch(_price(volume=2000))],
+        ) as mock_prices:
+            await stream.refresh()
+            await stream.refresh()
+
+        mock_prices.assert_called_with(["AAPL"])
+        first = subscription.queue.get_nowait()
+        second = subscription.queue.get_nowait()
+        assert first["type"] == "delta"
+        assert first["quotes"]["AAPL"]["price"] == 150.0
+        assert "timestamp" not in first["quotes"]["AAPL"]
+        assert second["quotes"] == {"AAPL": {"volume": 2000}}
+
+    @pytest.mark.asyncio
+    async def test_unchanged_quotes_not_pushed(self, stream):
+        subscription = stream.subscribe(["AAPL"])
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            return_value=_batch(_price()),
+        ):
+            await stream.refresh()
+            await stream.refresh()
+
+        assert subscription.queue.qsize() == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_fetch_and_routing(self, stream):
+        apple = stream.subscribe(["AAPL"])
+        both = stream.subscribe(["AAPL", "MSFT"])
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            return_value=_batch(_price(), _price("MSFT", 400.0)),
+        ) as mock_prices:
+            await stream.refresh()
+
+        mock_prices.assert_called_once_with(["AAPL", "MSFT"])
+        assert set(apple.queue.get_nowait()["quotes"]) == {"AAPL"}
+        assert set(both.queue.get_nowait()["quotes"]) == {"AAPL", "MSFT"}
+
+    @pytest.mark.asyncio
+    async def test_new_subscriber_gets_snapshot(self, stream):
+        stream.subscribe(["AAPL"])
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            return_value=_batch(_price()),
+        ):
+            await stream.refresh()
+
+        late = stream.subscribe(["AAPL"])
+        message = await stream.listen(late).__anext__()
+
+        assert message["type"] == "snapshot"
+        assert message["quotes"]["AAPL"]["price"] == 150.0
+
+    @pytest.mark.asyncio
+    async def test_overflow_triggers_resync(self, stream):
+        subscription = stream.subscribe(["AAPL"])
+        prices = [_batch(_price(price=100.0 + i)) for i in range(4)]
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            side_effect=prices,
+        ):
+            for _ in prices:
+                await stream.refresh()
+
+        assert subscription.resync
+        assert subscription.queue.empty()
+
+        listener = stream.listen(subscription)
+        await listener.__anext__()
+        resync = await listener.__anext__()
+        assert resync["type"] == "snapshot"
+        assert resync["quotes"]["AAPL"]["price"] == 103.0
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_drops_unused_ticks(self, stream):
+        apple = stream.subscribe(["AAPL"])
+        stream.subscribe(["MSFT"])
+        with patch(
+            "services.quote_stream.MarketRouter.get_stock_prices",
+            new_callable=AsyncMock,
+            return_value=_batch(_price(), _price("MSFT", 400.0)),
+        ):
+            await stream.refresh()
+
+        stream.unsubscribe(apple)
+
+        assert set(stream._last) == {"MSFT"}
+        assert stream.get_stats()["subscribers"] == 1
+
+    @pytest.mark.asyncio
+    async def test_loop_exits_without_subscribers(self):
+        stream = QuoteStream(interval=0.01)
+        with patch.object(stream, "refresh", new_callable=AsyncMock) as mock_refresh:
+            await asyncio.wait_for(stream._run(), timeout=1)
+
+        mock_refresh.assert_not_called()
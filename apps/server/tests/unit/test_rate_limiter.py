@@ -0,0 +1,122 @@
+"""
+限流器单元测试
+
+覆盖:
+1. 进程内令牌桶与等待指标
+2. Redis 令牌桶（原子脚本调用）
+3. Redis 不可用时退回进程内令牌桶
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from tradingagents.dataflows.retry_utils import (
+    DistributedRateLimiter,
+    RateLimiter,
+    get_limiter_stats,
+    get_vendor_limiter,
+)
+
+
+# =============================================================================
+# 进程内令牌桶
+# =============================================================================
+
+class TestLocalRateLimiter:
+    """进程内令牌桶"""
+
+    def test_acquire_until_empty(self):
+        limiter = RateLimiter(rate=2, per=60.0, name="test")
+
+        assert limiter.acquire(block=False)
+        assert limiter.acquire(block=False)
+        assert not limiter.acquire(block=False)
+
+        stats = limiter.get_stats()
+        assert stats["acquired"] == 2
+        assert stats["rejected"] == 1
+        assert stats["backend"] == "local"
+
+    def test_wait_recorded(self):
+        limiter = RateLimiter(rate=20, per=1.0, name="test")
+        for _ in range(20):
+            limiter.acquire(block=False)
+
+        assert limiter.acquire(block=True, timeout=1.0)
+
+        stats = limiter.get_stats()
+        assert stats["waited"] == 1
+        assert stats["max_wait_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_async(self):
+        limiter = RateLimiter(rate=1, per=60.0, name="test")
+
+        assert await limiter.acquire_async(timeout=0.1)
+        assert not await limiter.acquire_async(timeout=0.05)
+
+
+# =============================================================================
+# Redis 令牌桶
+# =============================================================================
+
+class TestDistributedRateLimiter:
+    """跨进程令牌桶"""
+
+    @staticmethod
+    def _limiter(client):
+        limiter = DistributedRateLimiter(rate=5, per=60.0, name="alpha_vantage", redis_url="redis://test")
+        limiter._client = client
+        return limiter
+
+    def test_uses_redis_script(self):
+        client = MagicMock()
+        client.eval.return_value = b"0"
+        limiter = self._limiter(client)
+
+        assert limiter.acquire(block=False)
+
+        args = client.eval.call_args.args
+        assert args[1:] == (1, "ratelimit:alpha_vantage", 5, 60.0, 1)
+        assert limiter.get_stats()["backend"] == "redis"
+
+    def test_redis_wait_respected(self):
+        client = MagicMock()
+        client.eval.return_value = b"12.0"
+        limiter = self._limiter(client)
+
+        assert not limiter.acquire(block=False)
+        assert not limiter.acquire(block=True, timeout=0.05)
+
+    def test_fallback_to_local_bucket(self):
+        client = MagicMock()
+        client.eval.side_effect = ConnectionError("redis down")
+        limiter = self._limiter(client)
+
+        assert limiter.acquire(block=False)
+        assert limiter.get_stats()["backend"] == "local"
+
+        # 冷却期内不再访问 Redis
+        limiter.acquire(block=False)
+        assert client.eval.call_count == 1
+
+    def test_no_redis_url_uses_local(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        limiter = DistributedRateLimiter(rate=1, per=60.0, name="test")
+
+        assert limiter.acquire(block=False)
+        assert not limiter.acquire(block=False)
+
+
+class TestVendorLimiters:
+    """预配置的数据源限流器"""
+
+    def test_vendor_limiters_registered(self):
+        for vendor in ["akshare", "yfinance", "alpha_vantage", "duckduckgo"]:
+            assert isinstance(get_vendor_limiter(vendor), DistributedRateLimiter)
+        assert get_vendor_limiter("unknown") is None
+
+    def test_limiter_stats(self):
+        stats = get_limiter_stats()
+
+        assert set(stats) == {"akshare", "yfinance", "alpha_vantage", "duckduckgo"}
+        assert "avg_wait_ms" in stats["alpha_vantage"]
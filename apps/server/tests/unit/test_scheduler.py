@@ -14,6 +14,7 @@ import pytest
 from datetime import datetime
 from unittest.mock import patch, MagicMock, AsyncMock
 
+from services.models import StockPriceBatch
 from services.scheduler import WatchlistScheduler, watchlist_scheduler
 
 
@@ -49,6 +50,12 @@ class TestUpdateMarketIndices:
         """创建调度器实例"""
         return WatchlistScheduler()
 
+    @pytest.fixture(autouse=True)
+    def market_open(self):
+        """固定为开市状态，避免结果依赖运行时间"""
+        with patch("services.scheduler.trading_calendar.is_open", return_value=True):
+            yield
+
     @pytest.mark.asyncio
     async def test_update_market_indices_success(self, scheduler):
         """成功更新市场指数"""
@@ -73,6 +80,18 @@ class TestUpdateMarketIndices:
             # 不应抛出异常
             await scheduler.update_market_indices()
 
+    @pytest.mark.asyncio
+    async def test_all_markets_closed_uses_cache(self, scheduler):
+        """全部市场休市时不强制刷新"""
+        mock_watcher = MagicMock()
+        mock_watcher.get_all_indices = AsyncMock(return_value=[])
+
+        with patch("services.market_watcher.market_watcher", mock_watcher):
+            with patch("services.scheduler.trading_calendar.is_open", return_value=False):
+                await scheduler.update_market_indices()
+
+        mock_watcher.get_all_indices.assert_called_once_with(force_refresh=False)
+
 
 # =============================================================================
 # 关注列表价格更新测试
@@ -85,6 +104,20 @@ class TestUpdateWatchlistPrices:
     def scheduler(self):
         return WatchlistScheduler()
 
+    @pytest.fixture(autouse=True)
+    def market_open(self):
+        """固定为开市状态，避免结果依赖运行时间"""
+        with patch("services.scheduler.trading_calendar.is_open", return_value=True):
+            yield
+
+    @staticmethod
+    def _session(symbols):
+        mock_session = MagicMock()
+        mock_session.__enter__ = MagicMock(return_value=mock_session)
+        mock_session.__exit__ = MagicMock(return_value=False)
+        mock_session.exec.return_value.all.return_value = [MagicMock(symbol=s) for s in symbols]
+        return mock_session
+
     @pytest.mark.asyncio
     async def test_update_watchlist_prices_empty(self, scheduler):
         """空关注列表"""
@@ -111,12 +144,13 @@ class TestUpdateWatchlistPrices:
         mock_price_info.price = 150.0
 
         with patch("services.scheduler.Session", return_value=mock_session):
-            with patch("services.scheduler.MarketRouter.get_stock_price", new_callable=AsyncMock) as mock_get_price:
-                mock_get_price.return_value = mock_price_info
-                with patch("asyncio.sleep", new_callable=AsyncMock):
-                    await scheduler.update_watchlist_prices()
+            with patch("services.scheduler.MarketRouter.get_stock_prices", new_callable=AsyncMock) as mock_get_prices:
+                mock_get_prices.return_value = StockPriceBatch.model_construct(
+                    prices={"AAPL": mock_price_info}, errors={}
+                )
+                await scheduler.update_watchlist_prices()
 
-        mock_get_price.assert_called_once_with("AAPL")
+        mock_get_prices.assert_called_once_with(["AAPL"])
 
     @pytest.mark.asyncio
     async def test_update_watchlist_prices_error_handling(self, scheduler):
@@ -130,12 +164,35 @@ class TestUpdateWatchlistPrices:
         mock_session.exec.return_value.all.return_value = [mock_item]
 
         with patch("services.scheduler.Session", return_value=mock_session):
-            with patch("services.scheduler.MarketRouter.get_stock_price", new_callable=AsyncMock) as mock_get_price:
-                mock_get_price.side_effect = Exception("Price fetch error")
-                with patch("asyncio.sleep", new_callable=AsyncMock):
-                    # 不应抛出异常
+            with patch("services.scheduler.MarketRouter.get_stock_prices", new_callable=AsyncMock) as mock_get_prices:
+                mock_get_prices.return_value = StockPriceBatch(errors={"INVALID": "Price fetch error"})
+                # 不应抛出异常
+                await scheduler.update_watchlist_prices()
+
+    @pytest.mark.asyncio
+    async def test_closed_markets_skipped(self, scheduler):
+        """只刷新开市市场的股票"""
+        with patch("services.scheduler.Session", return_value=self._session(["AAPL", "600519.SH"])):
+            with patch(
+                "services.scheduler.trading_calendar.is_open",
+                side_effect=lambda market, settle=None: market == "CN",
+            ):
+                with patch("services.scheduler.MarketRouter.get_stock_prices", new_callable=AsyncMock) as mock_get_prices:
+                    mock_get_prices.return_value = StockPriceBatch(errors={})
                     await scheduler.update_watchlist_prices()
 
+        mock_get_prices.assert_called_once_with(["600519.SH"])
+
+    @pytest.mark.asyncio
+    async def test_all_markets_closed(self, scheduler):
+        """全部休市时不请求价格"""
+        with patch("services.scheduler.Session", return_value=self._session(["AAPL"])):
+            with patch("services.scheduler.trading_calendar.is_open", return_value=False):
+                with patch("services.scheduler.MarketRouter.get_stock_prices", new_callable=AsyncMock) as mock_get_prices:
+                    await scheduler.update_watchlist_prices()
+
+        mock_get_prices.assert_not_called()
+
 
 # =============================================================================
 # 每日分析测试
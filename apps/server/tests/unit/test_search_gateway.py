@@ -0,0 +1,233 @@
+"""
+搜索网关单元测试
+
+覆盖:
+1. 规范化查询命中缓存
+2. 并发的相同查询只执行一次
+3. 请求间隔以异步等待实现，并计入限流指标
+4. 批量查询中单个失败不影响其他查询
+5. 网关状态只存在于共享后台事件循环，DDGS 客户端按工作线程创建
+6. Google News 分页并行获取
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tradingagents.dataflows import googlenews_utils, http_pool, search_gateway
+from tradingagents.dataflows.search_gateway import EnginePolicy, _Engine
+
+
+@pytest.fixture(autouse=True)
+def gateway(monkeypatch):
+    """无间隔、无跨进程配额的引擎，并清空结果缓存"""
+    for name in ("duckduckgo", "google_news"):
+        monkeypatch.setitem(search_gateway._engines, name, _Engine(name, EnginePolicy(concurrency=4, min_interval=0)))
+    search_gateway.clear_cache()
+    yield
+    search_gateway.clear_cache()
+
+
+@pytest.fixture
+def ddgs(monkeypatch):
+    """安装模拟 DDGS 客户端，记录创建客户端的线程"""
+    def install(results=None, delay=0.0, error=None):
+        client = MagicMock()
+        client.threads = []
+
+        def text(query, **kwargs):
+            if delay:
+                time.sleep(delay)
+            if error and error in query:
+                raise RuntimeError("search failed")
+            return results if results is not None else [{"title": query}]
+
+        def ddgs_client():
+            client.threads.append(threading.current_thread())
+            return client
+
+        client.text.side_effect = text
+        client.news.side_effect = text
+        monkeypatch.setattr(search_gateway, "ddgs_client", ddgs_client)
+        return client
+
+    return install
+
+
+# =============================================================================
+# 缓存
+# =============================================================================
+
+class TestCache:
+    """结果缓存与并发合并"""
+
+    async def test_normalized_query_hits_cache(self, ddgs):
+        client = ddgs()
+        await search_gateway.asearch("text", "NVDA  Earnings")
+        await search_gateway.asearch("text", "nvda earnings")
+
+        assert client.text.call_count == 1
+        assert search_gateway.get_search_stats()["engines"]["duckduckgo"]["cache_hits"] == 1
+
+    async def test_params_are_part_of_key(self, ddgs):
+        client = ddgs()
+        await search_gateway.asearch("text", "nvda", timelimit="w")
+        await search_gateway.asearch("text", "nvda", timelimit="d")
+        await search_gateway.asearch("news", "nvda", timelimit="d")
+
+        assert client.text.call_count == 2
+        assert client.news.call_count == 1
+
+    async def test_concurrent_identical_queries_coalesced(self, ddgs):
+        client = ddgs(delay=0.1)
+        results = await asyncio.gather(*(search_gateway.asearch("text", "aapl") for _ in range(3)))
+
+        assert client.text.call_count == 1
+        assert results[0] == results[1] == results[2]
+
+    async def test_failures_not_cached(self, ddgs):
+        client = ddgs(error="aapl")
+        with pytest.raises(RuntimeError):
+            await search_gateway.asearch("text", "aapl")
+        with pytest.raises(RuntimeError):
+            await search_gateway.asearch("text", "aapl")
+
+        assert client.text.call_count == 2
+
+
+# =============================================================================
+# 限流
+# =============================================================================
+
+class TestThrottle:
+    """请求间隔与并发上限"""
+
+    async def test_min_interval_spaces_requests(self, monkeypatch, ddgs):
+        monkeypatch.setitem(
+            search_gateway._engines, "duckduckgo",
+            _Engine("duckduckgo", EnginePolicy(concurrency=4, min_interval=0.1)),
+        )
+        ddgs()
+
+        start = time.monotonic()
+        await asyncio.gather(*(search_gateway.asearch("text", f"q{i}") for i in range(3)))
+
+        assert time.monotonic() - start >= 0.2
+        stats = search_gateway.get_search_stats()["engines"]["duckduckgo"]
+        assert stats["requests"] == 3
+        assert stats["throttled"] == 2
+        assert stats["max_wait_ms"] >= 150
+
+    async def test_waiting_does_not_block_loop(self, monkeypatch, ddgs):
+        monkeypatch.setitem(
+            search_gateway._engines, "duckduckgo",
+            _Engine("duckduckgo", EnginePolicy(concurrency=1, min_interval=0.2)),
+        )
+        ddgs()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        await asyncio.gather(
+            search_gateway.asearch("text", "a"),
+            search_gateway.asearch("text", "b"),
+            ticker(),
+        )
+        assert ticks == 10
+
+    async def test_search_many_isolates_failures(self, ddgs):
+        ddgs(error="bad")
+        results = await search_gateway.asearch_many("text", ["good", "bad query", "other"])
+
+        assert results == [[{"title": "good"}], [], [{"title": "other"}]]
+
+    def test_sync_search(self, ddgs):
+        client = ddgs()
+        assert search_gateway.search("text", "msft") == [{"title": "msft"}]
+        assert search_gateway.search("text", "MSFT") == [{"title": "msft"}]
+        assert client.text.call_count == 1
+
+
+# =============================================================================
+# 事件循环与线程
+# =============================================================================
+
+class TestSharedLoop:
+    """网关协程在共享后台事件循环上执行"""
+
+    async def test_state_lives_on_shared_loop(self, ddgs):
+        client = ddgs()
+        await search_gateway.asearch("text", "amd")
+
+        loop, _ = search_gateway._engines["duckduckgo"]._semaphore
+        assert loop is http_pool._sync_loop._ensure_loop()
+        assert loop is not asyncio.get_running_loop()
+        assert client.text.call_count == 1
+
+    def test_temporary_loops_share_cache(self, ddgs):
+        """工具层每次 asyncio.run 创建新循环，结果缓存与限流状态仍然共享"""
+        client = ddgs()
+        assert asyncio.run(search_gateway.asearch("text", "tsla")) == [{"title": "tsla"}]
+        assert asyncio.run(search_gateway.asearch("text", "TSLA")) == [{"title": "tsla"}]
+        assert client.text.call_count == 1
+
+    async def test_client_resolved_in_worker_thread(self, ddgs):
+        """DDGS 非线程安全：客户端在执行搜索的工作线程内获取"""
+        client = ddgs()
+        await search_gateway.asearch_many("text", ["a", "b", "c"])
+
+        assert len(client.threads) == 3
+        assert threading.current_thread() not in client.threads
+
+
+# =============================================================================
+# Google News
+# =============================================================================
+
+def _page(titles, has_next):
+    items = "".join(
+        f'<div class="SoaBEf"><a href="https://example.com/{t}"></a>'
+        f'<div class="MBeuO">{t}</div><div class="GI74Re">snippet</div>'
+        f'<div class="LfVVr">1 day ago</div><div class="NUnG9d"><span>src</span></div></div>'
+        for t in titles
+    )
+    nav = '<a id="pnnext" href="#">Next</a>' if has_next else ""
+    return f"<html><body>{items}{nav}</body></html>".encode()
+
+
+class TestGoogleNews:
+    """分页抓取"""
+
+    async def test_pages_fetched_until_no_next(self):
+        pages = {0: _page(["a"], True), 10: _page(["b"], True), 20: _page(["c"], True), 30: _page(["d"], False)}
+        requested = []
+
+        async def fake_get(url, **kwargs):
+            offset = int(url.rsplit("start=", 1)[1])
+            requested.append(offset)
+            return MagicMock(status_code=200, content=pages.get(offset, _page([], False)))
+
+        with patch.object(search_gateway.http_pool, "aget", side_effect=fake_get):
+            results = await googlenews_utils.agetNewsData("nvda", "2025-01-01", "2025-01-07")
+
+        assert [r["title"] for r in results] == ["a", "b", "c", "d"]
+        assert sorted(requested)[:4] == [0, 10, 20, 30]
+
+    async def test_rate_limited_page_retried(self, monkeypatch):
+        monkeypatch.setattr(search_gateway, "_BACKOFF_MIN", 0.01)
+        responses = [
+            MagicMock(status_code=429, content=b""),
+            MagicMock(status_code=200, content=_page(["a"], False)),
+        ]
+
+        with patch.object(search_gateway.http_pool, "aget", side_effect=responses):
+            results = await googlenews_utils.agetNewsData("nvda", "2025-01-01", "2025-01-07")
+
+        assert [r["title"] for r in results] == ["a"]
+        assert search_gateway.get_search_stats()["engines"]["google_news"]["rate_limited"] == 1
@@ -11,11 +11,24 @@ from unittest.mock import patch, MagicMock
 class TestSearchRetailSentiment:
     """测试散户情绪搜索"""
 
+    @pytest.fixture(autouse=True)
+    def gateway(self, monkeypatch):
+        """搜索网关不做请求间隔，并清空结果缓存"""
+        from tradingagents.dataflows import search_gateway
+
+        monkeypatch.setitem(
+            search_gateway._engines, "duckduckgo",
+            search_gateway._Engine("duckduckgo", search_gateway.EnginePolicy(concurrency=2, min_interval=0)),
+        )
+        search_gateway.clear_cache()
+        yield
+        search_gateway.clear_cache()
+
     def test_returns_json_string(self):
         """应返回有效的 JSON 字符串"""
         from tradingagents.dataflows.sentiment_data import search_retail_sentiment
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
+        with patch("tradingagents.dataflows.search_gateway.ddgs_client") as mock_ddgs:
             mock_instance = MagicMock()
             mock_instance.text.return_value = [
                 {"title": "Test", "body": "Test body", "href": "https://example.com"}
@@ -33,7 +46,7 @@ class TestSearchRetailSentiment:
         """A股应使用中文搜索查询"""
         from tradingagents.dataflows.sentiment_data import search_retail_sentiment
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
+        with patch("tradingagents.dataflows.search_gateway.ddgs_client") as mock_ddgs:
             mock_instance = MagicMock()
             mock_instance.text.return_value = []
             mock_ddgs.return_value = mock_instance
@@ -50,7 +63,7 @@ class TestSearchRetailSentiment:
         """应支持平台筛选"""
         from tradingagents.dataflows.sentiment_data import search_retail_sentiment
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
+        with patch("tradingagents.dataflows.search_gateway.ddgs_client") as mock_ddgs:
             mock_instance = MagicMock()
             mock_instance.text.return_value = []
             mock_ddgs.return_value = mock_instance
@@ -63,7 +76,7 @@ class TestSearchRetailSentiment:
         """应去重搜索结果"""
         from tradingagents.dataflows.sentiment_data import search_retail_sentiment
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
+        with patch("tradingagents.dataflows.search_gateway.ddgs_client") as mock_ddgs:
             mock_instance = MagicMock()
             mock_instance.text.return_value = [
                 {"title": "Test", "body": "Body", "href": "https://example.com/1"},
@@ -80,8 +93,8 @@ class TestSearchRetailSentiment:
         """搜索失败应返回错误 JSON"""
         from tradingagents.dataflows.sentiment_data import search_retail_sentiment
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
-            mock_ddgs.side_effect = Exception("Search failed")
+        with patch("tradingagents.dataflows.search_gateway.search_many") as mock_search:
+            mock_search.side_effect = Exception("Search failed")
 
             result = search_retail_sentiment("AAPL")
             data = json.loads(result)
@@ -97,7 +110,7 @@ class TestSearchRetailSentiment:
         # 清除缓存
         _cache.clear()
 
-        with patch("tradingagents.dataflows.sentiment_data._get_ddgs") as mock_ddgs:
+        with patch("tradingagents.dataflows.search_gateway.ddgs_client") as mock_ddgs:
             mock_instance = MagicMock()
             mock_instance.text.return_value = [
                 {"title": "Test", "body": "Body", "href": "https://example.com"}
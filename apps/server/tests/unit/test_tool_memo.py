@@ -0,0 +1,137 @@
+"""
+ToolMemo 单元测试
+
+覆盖:
+1. 相同参数（含规范化与默认值）只执行一次
+2. 并发的相同调用合并
+3. 失败不缓存
+4. 新运行清空结果与统计
+5. 包装后的工具保留名称与参数 schema
+"""
+import threading
+import time
+
+import pytest
+from langchain_core.tools import tool
+from langgraph.prebuilt import ToolNode
+
+from tradingagents.graph.tool_memo import ToolMemo, normalize_args
+
+
+def _counting_tool(calls, delay=0.0):
+    @tool
+    def get_quote(symbol: str, look_back_days: int = 7) -> str:
+        """Get a quote for a symbol."""
+        calls.append((symbol, look_back_days))
+        if delay:
+            time.sleep(delay)
+        return f"{symbol}:{look_back_days}"
+
+    return get_quote
+
+
+@pytest.fixture
+def memo():
+    memo = ToolMemo()
+    memo.begin_run("AAPL", "2025-01-10")
+    return memo
+
+
+class TestNormalizeArgs:
+    def test_symbol_case_and_whitespace(self):
+        assert normalize_args({"symbol": " aapl ", "query": "Earnings"}) == normalize_args(
+            {"query": "Earnings ", "symbol": "AAPL"}
+        )
+
+    def test_other_strings_keep_case(self):
+        assert normalize_args({"query": "AI"}) != normalize_args({"query": "ai"})
+
+
+class TestToolMemo:
+    """运行内结果复用"""
+
+    def test_identical_calls_execute_once(self, memo):
+        calls = []
+        wrapped = memo.wrap(_counting_tool(calls))
+
+        assert wrapped.invoke({"symbol": "AAPL"}) == "AAPL:7"
+        assert wrapped.invoke({"symbol": "aapl", "look_back_days": 7}) == "AAPL:7"
+        assert wrapped.invoke({"symbol": "AAPL", "look_back_days": 30}) == "AAPL:30"
+
+        assert calls == [("AAPL", 7), ("AAPL", 30)]
+        stats = memo.get_stats()["tools"]["get_quote"]
+        assert stats == {"calls": 3, "hits": 1, "coalesced": 0, "errors": 0}
+
+    def test_concurrent_calls_coalesced(self, memo):
+        calls = []
+        wrapped = memo.wrap(_counting_tool(calls, delay=0.2))
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(wrapped.invoke({"symbol": "NVDA"})))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["NVDA:7"] * 4
+        assert memo.get_stats()["tools"]["get_quote"]["coalesced"] == 3
+
+    def test_failures_not_cached(self, memo):
+        attempts = []
+
+        @tool
+        def flaky(symbol: str) -> str:
+            """Fails on the first call."""
+            attempts.append(symbol)
+            if len(attempts) == 1:
+                raise RuntimeError("vendor down")
+            return "ok"
+
+        wrapped = memo.wrap(flaky)
+
+        with pytest.raises(RuntimeError):
+            wrapped.func(symbol="AAPL")
+        assert wrapped.func(symbol="AAPL") == "ok"
+        assert len(attempts) == 2
+        assert memo.get_stats()["tools"]["flaky"]["errors"] == 1
+
+    def test_begin_run_resets(self, memo):
+        calls = []
+        wrapped = memo.wrap(_counting_tool(calls))
+        wrapped.invoke({"symbol": "AAPL"})
+
+        memo.begin_run("AAPL", "2025-01-11")
+        wrapped.invoke({"symbol": "AAPL"})
+
+        assert len(calls) == 2
+        stats = memo.get_stats()
+        assert stats["trade_date"] == "2025-01-11"
+        assert stats["calls"] == 1
+
+    def test_wrapped_tool_keeps_schema(self, memo):
+        original = _counting_tool([])
+        wrapped = memo.wrap(original)
+
+        assert wrapped.name == original.name
+        assert wrapped.description == original.description
+        assert wrapped.args == original.args
+
+    def test_tool_node_shares_memo(self, memo):
+        calls = []
+        get_quote = _counting_tool(calls)
+        market = memo.tool_node([get_quote])
+        social = memo.wrap_node(ToolNode([get_quote]))
+
+        market.tools_by_name["get_quote"].invoke({"symbol": "AAPL"})
+        social.tools_by_name["get_quote"].invoke({"symbol": "AAPL"})
+
+        assert len(calls) == 1
+        assert memo.get_stats()["hit_rate"] == 0.5
+
+    def test_wrap_is_idempotent(self, memo):
+        wrapped = memo.wrap(_counting_tool([]))
+        assert memo.wrap(wrapped) is wrapped
@@ -0,0 +1,163 @@
+"""
+交易日历单元测试
+
+覆盖:
+1. 交易时段（含午休、结算窗口）
+2. 周末与节假日
+3. 下一次开盘时间
+4. 交易日历感知的缓存 TTL
+5. 临时休市配置
+6. 超出休市日表覆盖年份时告警
+"""
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from services.trading_calendar import TradingCalendar, _parse_extra_holidays
+
+_CN = ZoneInfo("Asia/Shanghai")
+_NY = ZoneInfo("America/New_York")
+
+
+# =============================================================================
+# 交易时段
+# =============================================================================
+
+class TestSessions:
+    """交易时段判断"""
+
+    def test_cn_sessions(self):
+        calendar = TradingCalendar()
+        # 2026-03-10 为周二
+        assert calendar.is_open("CN", datetime(2026, 3, 10, 10, 0, tzinfo=_CN))
+        assert not calendar.is_open("CN", datetime(2026, 3, 10, 12, 0, tzinfo=_CN))
+        assert calendar.is_open("CN", datetime(2026, 3, 10, 14, 59, tzinfo=_CN))
+        assert not calendar.is_open("CN", datetime(2026, 3, 10, 15, 0, tzinfo=_CN))
+        assert not calendar.is_open("CN", datetime(2026, 3, 10, 9, 0, tzinfo=_CN))
+
+    def test_settle_window(self):
+        calendar = TradingCalendar()
+        at = datetime(2026, 3, 10, 15, 3, tzinfo=_CN)
+
+        assert not calendar.is_open("CN", at)
+        assert calendar.is_open("CN", at, settle=timedelta(minutes=5))
+
+    def test_us_session_across_timezones(self):
+        calendar = TradingCalendar()
+        # 纽约 10:00 = 北京时间 22:00（夏令时）
+        at = datetime(2026, 6, 2, 22, 0, tzinfo=_CN)
+
+        assert calendar.is_open("US", at)
+        assert not calendar.is_open("CN", at)
+
+    def test_unknown_market_always_open(self):
+        calendar = TradingCalendar()
+        assert calendar.is_open("XX", datetime(2026, 3, 7, 3, 0, tzinfo=_CN))
+        assert calendar.next_open("XX") is None
+
+
+# =============================================================================
+# 休市日
+# =============================================================================
+
+class TestHolidays:
+    """周末与节假日"""
+
+    def test_weekend(self):
+        calendar = TradingCalendar()
+        assert not calendar.is_trading_day("CN", date(2026, 3, 7))
+        assert not calendar.is_open("US", datetime(2026, 3, 7, 11, 0, tzinfo=_NY))
+
+    def test_exchange_holidays(self):
+        calendar = TradingCalendar()
+        assert not calendar.is_trading_day("CN", date(2026, 2, 18))
+        assert not calendar.is_trading_day("US", date(2026, 11, 26))
+        assert calendar.is_trading_day("HK", date(2026, 2, 16))
+
+    def test_2027_holidays(self):
+        calendar = TradingCalendar()
+        assert not calendar.is_trading_day("CN", date(2027, 10, 4))
+        assert not calendar.is_trading_day("HK", date(2027, 2, 8))
+        assert not calendar.is_trading_day("US", date(2027, 7, 5))
+        assert calendar.is_trading_day("US", date(2027, 7, 6))
+
+    def test_year_past_table_warns_once(self):
+        calendar = TradingCalendar()
+        with patch("services.trading_calendar.logger") as mock_logger:
+            calendar.is_trading_day("US", date(2027, 12, 24))
+            mock_logger.warning.assert_not_called()
+
+            assert calendar.is_trading_day("US", date(2028, 3, 1))
+            calendar.is_trading_day("US", date(2028, 3, 2))
+            calendar.is_trading_day("us", date(2029, 1, 2))
+
+        mock_logger.warning.assert_called_once()
+        assert mock_logger.warning.call_args.kwargs["last_listed_year"] == 2027
+
+    def test_extra_holidays(self):
+        calendar = TradingCalendar("CN:2026-03-10, us:2026-03-11")
+
+        assert not calendar.is_trading_day("CN", date(2026, 3, 10))
+        assert not calendar.is_trading_day("US", date(2026, 3, 11))
+        assert calendar.is_trading_day("HK", date(2026, 3, 10))
+
+    def test_invalid_extra_holidays_ignored(self):
+        assert _parse_extra_holidays("CN:2026-03-10,bad,US:not-a-date") == {"CN": {date(2026, 3, 10)}}
+
+
+# =============================================================================
+# 下一次开盘与缓存 TTL
+# =============================================================================
+
+class TestCacheTTL:
+    """下一次开盘时间与缓存有效期"""
+
+    def test_next_open_after_lunch(self):
+        calendar = TradingCalendar()
+        at = datetime(2026, 3, 10, 12, 0, tzinfo=_CN)
+
+        assert calendar.next_open("CN", at) == datetime(2026, 3, 10, 13, 0, tzinfo=_CN)
+        assert calendar.seconds_until_open("CN", at) == 3600
+
+    def test_next_open_over_weekend(self):
+        calendar = TradingCalendar()
+        # 周五收盘后 -> 下周一开盘
+        at = datetime(2026, 3, 6, 16, 0, tzinfo=_CN)
+
+        assert calendar.next_open("CN", at) == datetime(2026, 3, 9, 9, 30, tzinfo=_CN)
+
+    def test_next_open_over_holiday(self):
+        calendar = TradingCalendar()
+        # 春节休市（2026-02-16 ~ 02-23），节前最后一个交易日收盘后
+        at = datetime(2026, 2, 13, 16, 0, tzinfo=_CN)
+
+        assert calendar.next_open("CN", at) == datetime(2026, 2, 24, 9, 30, tzinfo=_CN)
+
+    def test_open_uses_regular_ttl(self):
+        calendar = TradingCalendar()
+        assert calendar.cache_ttl("CN", 60, at=datetime(2026, 3, 10, 10, 0, tzinfo=_CN)) == 60
+
+    def test_settle_uses_regular_ttl(self):
+        calendar = TradingCalendar()
+        at = datetime(2026, 3, 10, 15, 3, tzinfo=_CN)
+
+        assert calendar.cache_ttl("CN", 60, at=at) == 60
+        assert calendar.cache_ttl("CN", 60, at=at, settle=timedelta(0)) > 60
+
+    def test_closed_extends_to_next_open(self):
+        calendar = TradingCalendar()
+        at = datetime(2026, 3, 10, 12, 0, tzinfo=_CN)
+
+        assert calendar.cache_ttl("CN", 60, at=at) == 3600
+
+    def test_ttl_never_below_open_ttl(self):
+        calendar = TradingCalendar()
+        # 距午后开盘仅 10 秒
+        at = datetime(2026, 3, 10, 12, 59, 50, tzinfo=_CN)
+
+        assert calendar.cache_ttl("CN", 60, at=at) == 60
+
+    def test_any_open(self):
+        calendar = TradingCalendar()
+        assert calendar.any_open(["CN", "US"], at=datetime(2026, 3, 10, 10, 0, tzinfo=_CN))
+        assert not calendar.any_open(["CN", "HK", "US"], at=datetime(2026, 3, 7, 12, 0, tzinfo=_CN))
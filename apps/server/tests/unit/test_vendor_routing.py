@@ -0,0 +1,199 @@
+"""
+route_to_vendor 并发执行单元测试
+
+覆盖:
+1. 单数据源配置：首个成功的数据源胜出，失败或超时后启动下一个，整条回退链受总时限约束
+2. 多数据源配置：并发收集全部结果，按数据源顺序拼接，超时后取消尚未开始的调用
+3. 单个数据源的多个实现并发执行
+4. 顺序模式保持原有行为
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tradingagents.dataflows import interface
+
+
+def _impl(name, result=None, delay=0.0, error=None, calls=None):
+    def func(*args, **kwargs):
+        if calls is not None:
+            calls.append(name)
+        if delay:
+            time.sleep(delay)
+        if error:
+            raise error
+        return result
+    func.__name__ = name
+    return func
+
+
+@pytest.fixture
+def routing():
+    """注册测试方法并配置执行模式"""
+    def configure(methods, vendors, mode="concurrent", timeout=1.0, total_timeout=10.0):
+        config = {
+            "data_vendors": {"news_data": vendors},
+            "tool_vendors": {},
+            "vendor_execution": {
+                "mode": mode, "max_workers": 4, "vendor_timeout": timeout, "total_timeout": total_timeout,
+            },
+        }
+        patches = [
+            patch.dict(interface.VENDOR_METHODS, {"get_news": methods}),
+            patch.object(interface, "get_config", return_value=config),
+        ]
+        for p in patches:
+            p.start()
+        return patches
+
+    started = []
+
+    def setup(*args, **kwargs):
+        started.extend(configure(*args, **kwargs))
+
+    yield setup
+    for p in started:
+        p.stop()
+
+
+# =============================================================================
+# 首个成功
+# =============================================================================
+
+class TestFirstSuccess:
+    """单数据源配置"""
+
+    def test_primary_wins_without_starting_fallback(self, routing):
+        calls = []
+        routing({
+            "fast": _impl("fast", "primary", calls=calls),
+            "slow": _impl("slow", "fallback", calls=calls),
+        }, "fast")
+
+        assert interface.route_to_vendor("get_news", "AAPL") == "primary"
+        assert calls == ["fast"]
+
+    def test_failure_starts_next_vendor(self, routing):
+        routing({
+            "broken": _impl("broken", error=ValueError("bad request")),
+            "backup": _impl("backup", "fallback"),
+        }, "broken")
+
+        assert interface.route_to_vendor("get_news", "AAPL") == "fallback"
+
+    def test_deadline_starts_next_vendor(self, routing):
+        routing({
+            "hung": _impl("hung", "late", delay=1.0),
+            "backup": _impl("backup", "fallback"),
+        }, "hung", timeout=0.1)
+
+        start = time.monotonic()
+        assert interface.route_to_vendor("get_news", "AAPL") == "fallback"
+        assert time.monotonic() - start < 0.8
+
+    def test_total_deadline_bounds_fallback_chain(self, routing):
+        calls = []
+        routing({
+            "a": _impl("a", "late", delay=0.4, calls=calls),
+            "b": _impl("b", "late", delay=0.4, calls=calls),
+            "c": _impl("c", "late", delay=0.4, calls=calls),
+        }, "a", timeout=0.1, total_timeout=0.15)
+
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            interface.route_to_vendor("get_news", "AAPL")
+
+        assert time.monotonic() - start < 0.35
+        assert calls == ["a", "b"]
+        time.sleep(0.4)  # 等待后台调用结束，释放线程池
+
+    def test_all_failed_raises(self, routing):
+        routing({
+            "a": _impl("a", error=ValueError("bad")),
+            "b": _impl("b", error=ValueError("bad")),
+        }, "a")
+
+        with pytest.raises(RuntimeError):
+            interface.route_to_vendor("get_news", "AAPL")
+
+
+# =============================================================================
+# 聚合
+# =============================================================================
+
+class TestGather:
+    """多数据源配置与多实现数据源"""
+
+    def test_vendors_run_concurrently(self, routing):
+        routing({
+            "a": _impl("a", "from-a", delay=0.3),
+            "b": _impl("b", "from-b", delay=0.3),
+        }, "a,b")
+
+        start = time.monotonic()
+        result = interface.route_to_vendor("get_news", "AAPL")
+
+        assert result == "from-a\nfrom-b"
+        assert time.monotonic() - start < 0.55
+
+    def test_slow_vendor_dropped_at_deadline(self, routing):
+        routing({
+            "a": _impl("a", "from-a"),
+            "b": _impl("b", "from-b", delay=1.0),
+        }, "a,b", timeout=0.1)
+
+        assert interface.route_to_vendor("get_news", "AAPL") == "from-a"
+
+    def test_unstarted_calls_cancelled_at_deadline(self, routing):
+        """超时返回后，尚未开始执行的实现被取消，不再占用线程池"""
+        calls = []
+        routing({
+            "fast": _impl("fast", "from-fast"),
+            "slow": [_impl(f"slow{i}", "late", delay=0.3, calls=calls) for i in range(6)],
+        }, "fast,slow", timeout=0.1)
+
+        assert interface.route_to_vendor("get_news", "AAPL") == "from-fast"
+        time.sleep(0.8)
+
+        assert len(calls) == 4  # max_workers=4，排队的实现已取消
+
+    def test_list_implementations_run_concurrently(self, routing):
+        threads = set()
+
+        def impl(name):
+            def func(*args, **kwargs):
+                threads.add(threading.current_thread().name)
+                time.sleep(0.2)
+                return name
+            func.__name__ = name
+            return func
+
+        routing({"local": [impl("finnhub"), impl("reddit"), impl("google")]}, "local")
+
+        start = time.monotonic()
+        result = interface.route_to_vendor("get_news", "AAPL")
+
+        assert result == "finnhub\nreddit\ngoogle"
+        assert len(threads) == 3
+        assert time.monotonic() - start < 0.5
+
+
+# =============================================================================
+# 顺序模式
+# =============================================================================
+
+class TestSequentialMode:
+    """关闭并发时逐个尝试"""
+
+    def test_sequential_fallback(self, routing):
+        calls = []
+        routing({
+            "broken": _impl("broken", error=ValueError("bad"), calls=calls),
+            "backup": _impl("backup", "fallback", calls=calls),
+            "unused": _impl("unused", "never", calls=calls),
+        }, "broken", mode="sequential")
+
+        assert interface.route_to_vendor("get_news", "AAPL") == "fallback"
+        assert calls == ["broken", "backup"]
@@ -19,17 +19,16 @@ logger = structlog.get_logger(__name__)
 def _search_with_duckduckgo(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
     """使用 DuckDuckGo 搜索"""
     try:
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            return [
-                {
-                    "title": r.get("title", ""),
-                    "body": r.get("body", ""),
-                    "href": r.get("href", ""),
-                }
-                for r in results
-            ]
+        from tradingagents.dataflows import search_gateway
+        results = search_gateway.search("text", query, max_results=max_results)
+        return [
+            {
+                "title": r.get("title", ""),
+                "body": r.get("body", ""),
+                "href": r.get("href", ""),
+            }
+            for r in results
+        ]
     except Exception as e:
         logger.warning("DuckDuckGo search failed", query=query, error=str(e))
         return []
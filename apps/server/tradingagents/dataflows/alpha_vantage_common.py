@@ -1,10 +1,11 @@
 import os
-import requests
 import pandas as pd
 import json
 from datetime import datetime
 from io import StringIO
 
+from . import http_pool
+
 API_BASE_URL = "https://www.alphavantage.co/query"
 
 def get_api_key() -> str:
@@ -39,12 +40,8 @@ class AlphaVantageRateLimitError(Exception):
     """Exception raised when Alpha Vantage API rate limit is exceeded."""
     pass
 
-def _make_api_request(function_name: str, params: dict) -> dict | str:
-    """Helper function to make API requests and handle responses.
-    
-    Raises:
-        AlphaVantageRateLimitError: When API rate limit is exceeded
-    """
+def _build_api_params(function_name: str, params: dict) -> dict:
+    """Build the query parameters for an Alpha Vantage API call."""
     # Create a copy of params to avoid modifying the original
     api_params = params.copy()
     api_params.update({
@@ -62,8 +59,10 @@ def _make_api_request(function_name: str, params: dict) -> dict | str:
     elif "entitlement" in api_params:
         # Remove entitlement if it's None or empty
         api_params.pop("entitlement", None)
-    
-    response = requests.get(API_BASE_URL, params=api_params)
+    return api_params
+
+def _parse_api_response(response) -> dict | str:
+    """Check an Alpha Vantage response for errors and return its body text."""
     response.raise_for_status()
 
     response_text = response.text
@@ -82,6 +81,18 @@ def _make_api_request(function_name: str, params: dict) -> dict | str:
 
     return response_text
 
+def _make_api_request(function_name: str, params: dict) -> dict | str:
+    """Helper function to make API requests and handle responses.
+
+    Uses the shared keep-alive connection pool, so consecutive calls reuse the
+    TLS connection to Alpha Vantage instead of opening a new one each time.
+    
+    Raises:
+        AlphaVantageRateLimitError: When API rate limit is exceeded
+    """
+    response = http_pool.get(API_BASE_URL, params=_build_api_params(function_name, params))
+    return _parse_api_response(response)
+
 
 
 def _filter_csv_by_date_range(csv_data: str, start_date: str, end_date: str) -> str:
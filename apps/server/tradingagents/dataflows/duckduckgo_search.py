@@ -8,23 +8,9 @@ import time
 from typing import List, Dict, Any, Optional
 import structlog
 
-logger = structlog.get_logger(__name__)
-
-# 延迟导入以避免启动时的依赖问题
-_ddgs = None
+from . import search_gateway
 
-
-def _get_ddgs():
-    """延迟加载 DDGS 客户端"""
-    global _ddgs
-    if _ddgs is None:
-        try:
-            from duckduckgo_search import DDGS
-            _ddgs = DDGS()
-        except ImportError:
-            logger.error("duckduckgo-search not installed. Run: pip install duckduckgo-search")
-            raise
-    return _ddgs
+logger = structlog.get_logger(__name__)
 
 
 def search_market_news(query: str, limit: int = 5, timeout: int = 10) -> str:
@@ -39,16 +25,14 @@ def search_market_news(query: str, limit: int = 5, timeout: int = 10) -> str:
         JSON 格式的搜索结果字符串
     """
     try:
-        ddgs = _get_ddgs()
-
         # 构建搜索查询，添加股票/市场相关关键词
         search_query = f"{query} stock market finance"
 
         logger.info("Searching market news", query=search_query, limit=limit)
         start_time = time.time()
 
-        # 执行新闻搜索
-        results = list(ddgs.news(search_query, max_results=limit * 2, timelimit="w"))
+        # 执行新闻搜索（限流与缓存由搜索网关负责）
+        results = search_gateway.search("news", search_query, max_results=limit * 2, timelimit="w", timeout=timeout)
 
         elapsed = time.time() - start_time
         logger.info("Search completed", results_count=len(results), elapsed_ms=int(elapsed * 1000))
@@ -83,8 +67,6 @@ def search_stock_info(query: str, limit: int = 5, timeout: int = 10) -> str:
         JSON 格式的搜索结果字符串
     """
     try:
-        ddgs = _get_ddgs()
-
         # 构建搜索查询
         search_query = f"{query} stock ticker symbol"
 
@@ -92,7 +74,7 @@ def search_stock_info(query: str, limit: int = 5, timeout: int = 10) -> str:
         start_time = time.time()
 
         # 执行通用搜索
-        results = list(ddgs.text(search_query, max_results=limit * 2, timelimit="m"))
+        results = search_gateway.search("text", search_query, max_results=limit * 2, timelimit="m", timeout=timeout)
 
         elapsed = time.time() - start_time
         logger.info("Search completed", results_count=len(results), elapsed_ms=int(elapsed * 1000))
@@ -124,8 +106,6 @@ def search_trending_stocks(market: str = "US", limit: int = 10) -> str:
         JSON 格式的搜索结果字符串
     """
     try:
-        ddgs = _get_ddgs()
-
         # 根据市场构建查询
         market_queries = {
             "US": "trending stocks today US market",
@@ -137,7 +117,7 @@ def search_trending_stocks(market: str = "US", limit: int = 10) -> str:
         logger.info("Searching trending stocks", market=market, query=search_query)
         start_time = time.time()
 
-        results = list(ddgs.news(search_query, max_results=limit, timelimit="d"))
+        results = search_gateway.search("news", search_query, max_results=limit, timelimit="d")
 
         elapsed = time.time() - start_time
         logger.info("Search completed", results_count=len(results), elapsed_ms=int(elapsed * 1000))
@@ -1,42 +1,107 @@
-import json
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 from datetime import datetime
-import time
-import random
 import structlog
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    retry_if_result,
-)
+
+from . import search_gateway
 
 logger = structlog.get_logger(__name__)
 
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/101.0.4951.54 Safari/537.36"
+    )
+}
 
-def is_rate_limited(response):
-    """Check if the response indicates rate limiting (status code 429)"""
-    return response.status_code == 429
+# Upper bound on result pages per query (10 results per page)
+MAX_PAGES = 10
 
 
-@retry(
-    retry=(retry_if_result(is_rate_limited)),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    stop=stop_after_attempt(5),
-)
-def make_request(url, headers):
-    """Make a request with retry logic for rate limiting.
+def _to_google_date(value):
+    if "-" in value:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%m/%d/%Y")
+    return value
 
-    NOTE: This uses blocking time.sleep() and requests.get() for compatibility
-    with the synchronous dataflow pipeline. Consider converting to async with
-    httpx + asyncio.sleep() when the entire dataflow is migrated to async.
-    """
-    # Random delay before each request to avoid detection
-    time.sleep(random.uniform(2, 6))
-    response = requests.get(url, headers=headers)
-    return response
+
+def _page_url(query, start_date, end_date, page):
+    return (
+        f"https://www.google.com/search?q={query}"
+        f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
+        f"&tbm=nws&start={page * 10}"
+    )
+
+
+def parse_page(content):
+    """Parse one Google News result page into (results, has_next_page)."""
+    soup = BeautifulSoup(content, "html.parser")
+    results = []
+    for el in soup.select("div.SoaBEf"):
+        try:
+            results.append(
+                {
+                    "link": el.find("a")["href"],
+                    "title": el.select_one("div.MBeuO").get_text(),
+                    "snippet": el.select_one(".GI74Re").get_text(),
+                    "date": el.select_one(".LfVVr").get_text(),
+                    "source": el.select_one(".NUnG9d span").get_text(),
+                }
+            )
+        except Exception as e:
+            # If one of the fields is not found, skip this result
+            logger.debug("Error processing news result", error=str(e))
+    has_next = bool(results) and soup.find("a", id="pnnext") is not None
+    return results, has_next
+
+
+async def _fetch_page(query, start_date, end_date, page):
+    response = await search_gateway.afetch(
+        "google_news", _page_url(query, start_date, end_date, page), headers=HEADERS
+    )
+    return parse_page(response.content)
+
+
+async def _scrape(query, start_date, end_date, max_pages):
+    news_results, has_next = await _fetch_page(query, start_date, end_date, 0)
+
+    # Later pages are fetched concurrently in batches of the engine's
+    # concurrency limit; the gateway still spaces out request starts.
+    batch_size = search_gateway.ENGINE_POLICIES["google_news"].concurrency
+    page = 1
+    while has_next and page < max_pages:
+        batch = range(page, min(page + batch_size, max_pages))
+        pages = await asyncio.gather(
+            *(_fetch_page(query, start_date, end_date, p) for p in batch),
+            return_exceptions=True,
+        )
+        for outcome in pages:
+            if isinstance(outcome, BaseException):
+                logger.warning("Google News page fetch failed", error=str(outcome))
+                has_next = False
+                break
+            results, has_next = outcome
+            news_results.extend(results)
+            if not has_next:
+                break
+        page += len(batch)
+
+    return news_results
+
+
+async def agetNewsData(query, start_date, end_date, max_pages=MAX_PAGES):
+    """Async version of getNewsData."""
+    start_date = _to_google_date(start_date)
+    end_date = _to_google_date(end_date)
+    params = {"start": start_date, "end": end_date, "max_pages": max_pages}
+    try:
+        return await search_gateway.arun(
+            "google_news", "news", query, params,
+            lambda: _scrape(query, start_date, end_date, max_pages),
+        )
+    except Exception as e:
+        logger.warning("Google News scraping failed after retries", error=str(e))
+        return []
 
 
 def getNewsData(query, start_date, end_date):
@@ -46,71 +111,4 @@ def getNewsData(query, start_date, end_date):
     start_date: str - start date in the format yyyy-mm-dd or mm/dd/yyyy
     end_date: str - end date in the format yyyy-mm-dd or mm/dd/yyyy
     """
-    if "-" in start_date:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d")
-        start_date = start_date.strftime("%m/%d/%Y")
-    if "-" in end_date:
-        end_date = datetime.strptime(end_date, "%Y-%m-%d")
-        end_date = end_date.strftime("%m/%d/%Y")
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/101.0.4951.54 Safari/537.36"
-        )
-    }
-
-    news_results = []
-    page = 0
-    while True:
-        offset = page * 10
-        url = (
-            f"https://www.google.com/search?q={query}"
-            f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
-            f"&tbm=nws&start={offset}"
-        )
-
-        try:
-            response = make_request(url, headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            results_on_page = soup.select("div.SoaBEf")
-
-            if not results_on_page:
-                break  # No more results found
-
-            for el in results_on_page:
-                try:
-                    link = el.find("a")["href"]
-                    title = el.select_one("div.MBeuO").get_text()
-                    snippet = el.select_one(".GI74Re").get_text()
-                    date = el.select_one(".LfVVr").get_text()
-                    source = el.select_one(".NUnG9d span").get_text()
-                    news_results.append(
-                        {
-                            "link": link,
-                            "title": title,
-                            "snippet": snippet,
-                            "date": date,
-                            "source": source,
-                        }
-                    )
-                except Exception as e:
-                    logger.debug("Error processing news result", error=str(e))
-                    # If one of the fields is not found, skip this result
-                    continue
-
-            # Update the progress bar with the current count of results scraped
-
-            # Check for the "Next" link (pagination)
-            next_link = soup.find("a", id="pnnext")
-            if not next_link:
-                break
-
-            page += 1
-
-        except Exception as e:
-            logger.warning("Google News scraping failed after retries", error=str(e))
-            break
-
-    return news_results
+    return search_gateway.run_sync(agetNewsData(query, start_date, end_date))
@@ -0,0 +1,205 @@
+"""
+共享 HTTP 连接池
+
+为基于 HTTP 的数据流（Alpha Vantage、Google News、Finnhub 等）提供统一的 httpx 客户端：
+- 每个主机一个连接池，keep-alive 复用 TLS 连接，避免每次请求重新握手
+- 安装 h2 时启用 HTTP/2（pip install h2）
+- 异步接口 aget/arequest 在登记过的长生命周期事件循环（应用主循环）上直接执行；
+  在临时事件循环（如工具层 asyncio.run）上调用时转交共享后台循环，
+  避免每个临时循环各建一套连接池且随循环泄漏
+- 同步接口 get/request 供 LangChain 工具等同步调用方使用：请求在共享的后台事件循环上执行，
+  调用线程只等待结果，连接池跨调用复用
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+_POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+
+class HostPool:
+    """
+    按主机划分的 httpx.AsyncClient 集合
+
+    AsyncClient 的连接绑定在创建它的事件循环上，因此按 (事件循环, 主机) 分别维护。
+    客户端的连接反向引用事件循环，弱引用键并不能让循环被回收，
+    因此只应在长生命周期的事件循环上创建（见 bind_loop），退出前调用 aclose 释放。
+    """
+
+    def __init__(self):
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """获取当前事件循环上该 URL 所属主机的客户端（不存在或已关闭时创建）"""
+        loop = asyncio.get_running_loop()
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            client = clients.get(host)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=_POOL_LIMITS,
+                    timeout=httpx.Timeout(DEFAULT_TIMEOUT),
+                    follow_redirects=True,
+                )
+                clients[host] = client
+                logger.debug("HTTP pool created", host=host, http2=HTTP2_AVAILABLE)
+        return client
+
+    async def aclose(self):
+        """关闭当前事件循环上的所有客户端"""
+        with self._lock:
+            clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def hosts(self) -> Dict[str, int]:
+        """各主机在多少个事件循环上持有连接池（诊断用）"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for clients in self._clients.values():
+                for host, client in clients.items():
+                    if not client.is_closed:
+                        counts[host] = counts.get(host, 0) + 1
+        return counts
+
+
+class _LoopThread:
+    """承载同步调用的后台事件循环（守护线程，首次使用时启动）"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                _bound_loops.add(self._loop)
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="http-pool-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def is_current(self) -> bool:
+        """当前线程是否为后台事件循环线程"""
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro) -> "concurrent.futures.Future":
+        """将协程提交到后台事件循环，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """在后台事件循环上执行协程并阻塞等待结果"""
+        self._ensure_loop()
+        if self.is_current():
+            coro.close()
+            raise RuntimeError("Synchronous HTTP call from the HTTP pool loop would deadlock; use arequest")
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        """关闭后台事件循环上的连接池并停止线程"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(host_pool.aclose(), loop).result(DEFAULT_TIMEOUT)
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(DEFAULT_TIMEOUT)
+        loop.close()
+
+
+# 可直接持有连接池的长生命周期事件循环：后台同步循环，以及 bind_loop 登记的应用主循环
+_bound_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+host_pool = HostPool()
+_sync_loop = _LoopThread()
+
+
+def bind_loop(loop: asyncio.AbstractEventLoop):
+    """登记长生命周期事件循环（应用启动时调用）：其上的异步请求直接使用本循环的连接池"""
+    _bound_loops.add(loop)
+
+
+async def _pooled_request(method: str, url: str, **kwargs) -> httpx.Response:
+    return await host_pool.client_for(url).request(method, url, **kwargs)
+
+
+async def arequest(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    通过共享连接池发起异步请求
+
+    在未登记的事件循环上调用时，请求转交共享后台循环执行，调用方只等待结果；
+    取消调用方会一并取消后台请求。
+
+    Args:
+        method: HTTP 方法
+        url: 完整 URL
+        **kwargs: 透传给 httpx.AsyncClient.request（params、headers、timeout 等）
+    """
+    if asyncio.get_running_loop() in _bound_loops:
+        return await _pooled_request(method, url, **kwargs)
+    return await run_shared(_pooled_request(method, url, **kwargs))
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    """异步 GET"""
+    return await arequest("GET", url, **kwargs)
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """同步请求：在共享后台事件循环上执行，供同步数据流与 LangChain 工具使用"""
+    timeout = kwargs.get("timeout", DEFAULT_TIMEOUT)
+    # 额外留出排队余量，由 httpx 自身的超时先行触发
+    wait = timeout + 5.0 if isinstance(timeout, (int, float)) else None
+    return _sync_loop.run(_pooled_request(method, url, **kwargs), wait)
+
+
+def get(url: str, **kwargs) -> httpx.Response:
+    """同步 GET"""
+    return request("GET", url, **kwargs)
+
+
+def run_sync(coro, timeout: Optional[float] = None) -> Any:
+    """在共享后台事件循环上执行任意协程（如由多个请求组成的抓取流程）"""
+    return _sync_loop.run(coro, timeout)
+
+
+async def run_shared(coro) -> Any:
+    """异步等待协程在共享后台事件循环上的执行结果（已在该循环上时直接执行），取消会一并传递"""
+    if _sync_loop.is_current():
+        return await coro
+    return await asyncio.wrap_future(_sync_loop.submit(coro))
+
+
+async def aclose():
+    """关闭连接池（应用退出时调用）：当前事件循环与同步调用的后台循环"""
+    _bound_loops.discard(asyncio.get_running_loop())
+    await host_pool.aclose()
+    await asyncio.to_thread(_sync_loop.stop)
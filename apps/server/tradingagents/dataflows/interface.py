@@ -1,5 +1,7 @@
-from typing import Annotated, Optional, Callable, Any
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Annotated, Optional, Callable, Any, List, Tuple
 import structlog
+import threading
 import time
 import random
 
@@ -284,6 +286,219 @@ def get_vendor(category: str, method: str = None) -> str:
     # Fall back to category-level configuration
     return config.get("data_vendors", {}).get(category, "default")
 
+# Sentinel for a failed vendor implementation call
+_FAILED = object()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Shared bounded pool for concurrent vendor calls (recreated if the size changes)."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vendor")
+            _executor_workers = max_workers
+        return _executor
+
+
+def _get_execution_config() -> dict:
+    execution = get_config().get("vendor_execution", {})
+    return {
+        "mode": execution.get("mode", "sequential"),
+        "max_workers": max(1, int(execution.get("max_workers", 8))),
+        "vendor_timeout": float(execution.get("vendor_timeout", 20.0)),
+        "total_timeout": float(execution.get("total_timeout", 45.0)),
+    }
+
+
+def _vendor_impls(method: str, vendor: str) -> list:
+    vendor_impl = VENDOR_METHODS[method][vendor]
+    if isinstance(vendor_impl, list):
+        logger.debug("Vendor has multiple implementations", vendor=vendor, count=len(vendor_impl))
+        return list(vendor_impl)
+    return [vendor_impl]
+
+
+def _invoke(impl_func: Callable[..., Any], vendor: str, args: tuple, kwargs: dict) -> Any:
+    """Call one vendor implementation with retry support; returns _FAILED instead of raising."""
+    try:
+        logger.debug("Calling vendor function", function=impl_func.__name__, vendor=vendor)
+        # Use retry wrapper for robustness
+        result = _call_with_retry(impl_func, vendor, 3, 1.0, *args, **kwargs)
+        logger.info("Vendor function succeeded", function=impl_func.__name__, vendor=vendor)
+        return result
+
+    except CircuitBreakerOpenError as e:
+        logger.warning(
+            "Circuit breaker open, skipping vendor",
+            vendor=vendor,
+            error=str(e)
+        )
+    except RateLimitExceededError as e:
+        logger.warning(
+            "Rate limit exceeded, skipping vendor",
+            vendor=vendor,
+            error=str(e)
+        )
+    except AlphaVantageRateLimitError as e:
+        if vendor == "alpha_vantage":
+            logger.warning(
+                "Alpha Vantage rate limit exceeded, falling back",
+                error=str(e)
+            )
+    except Exception as e:
+        # Log error but continue with other implementations
+        logger.warning(
+            "Vendor function failed",
+            function=impl_func.__name__,
+            vendor=vendor,
+            error=str(e)
+        )
+    return _FAILED
+
+
+def _run_sequential(method: str, vendors: list, stop_after_first: bool, args: tuple, kwargs: dict) -> list:
+    """Walk vendors one at a time, running each vendor's implementations in order."""
+    results = []
+    for vendor in vendors:
+        vendor_results = [
+            r for r in (_invoke(impl, vendor, args, kwargs) for impl in _vendor_impls(method, vendor))
+            if r is not _FAILED
+        ]
+        if vendor_results:
+            results.extend(vendor_results)
+            logger.info("Vendor succeeded", vendor=vendor, result_count=len(vendor_results))
+            # Stop after first successful vendor for single-vendor configs
+            if stop_after_first:
+                logger.debug("Stopping after successful vendor (single-vendor config)", vendor=vendor)
+                break
+        else:
+            logger.debug("Vendor produced no results", vendor=vendor)
+    return results
+
+
+def _submit_vendor(executor: ThreadPoolExecutor, method: str, vendor: str, args: tuple, kwargs: dict) -> List[Future]:
+    """Submit all implementations of a vendor to the pool."""
+    return [executor.submit(_invoke, impl, vendor, args, kwargs) for impl in _vendor_impls(method, vendor)]
+
+
+def _collect(futures: List[Future]) -> list:
+    return [r for r in (f.result() for f in futures if f.done()) if r is not _FAILED]
+
+
+def _cancel(futures: List[Future]):
+    """Cancel calls that have not started yet so abandoned vendors do not hold pool slots.
+
+    Calls already running cannot be interrupted; they finish in the background and are ignored.
+    """
+    for f in futures:
+        f.cancel()
+
+
+def _run_first_success(
+    executor: ThreadPoolExecutor,
+    method: str,
+    vendors: list,
+    timeout: float,
+    args: tuple,
+    kwargs: dict,
+    total_timeout: Optional[float] = None,
+) -> list:
+    """
+    First-success policy for single-source methods.
+
+    Vendors start in fallback order; the next vendor starts as soon as the current one fails
+    or misses its deadline. A vendor that missed its deadline can still win if it finishes
+    before the next one. No vendor is started or awaited past total_timeout.
+    """
+    queue = list(vendors)
+    running: List[Tuple[str, List[Future], float]] = []
+    overall = time.monotonic() + (total_timeout if total_timeout is not None else timeout * len(vendors))
+
+    try:
+        while True:
+            for entry in list(running):
+                vendor, futures, _ = entry
+                if all(f.done() for f in futures):
+                    running.remove(entry)
+                    vendor_results = _collect(futures)
+                    if vendor_results:
+                        logger.info("Vendor succeeded", vendor=vendor, result_count=len(vendor_results))
+                        return vendor_results
+                    logger.debug("Vendor produced no results", vendor=vendor)
+
+            now = time.monotonic()
+            if now >= overall:
+                logger.warning(
+                    "Vendor routing deadline exceeded",
+                    method=method,
+                    total_timeout=total_timeout,
+                    pending_vendors=[vendor for vendor, _, _ in running],
+                    skipped_vendors=queue,
+                )
+                return []
+
+            active = [deadline for _, _, deadline in running if deadline > now]
+            if not active:
+                if not queue:
+                    for vendor, _, _ in running:
+                        logger.warning("Vendor deadline exceeded", vendor=vendor, method=method, timeout=timeout)
+                    return []
+                if running:
+                    logger.warning(
+                        "Vendor deadline exceeded, starting next vendor",
+                        vendor=running[-1][0],
+                        next_vendor=queue[0],
+                        method=method,
+                    )
+                vendor = queue.pop(0)
+                futures = _submit_vendor(executor, method, vendor, args, kwargs)
+                running.append((vendor, futures, min(now + timeout, overall)))
+                continue
+
+            pending = [f for _, futures, _ in running for f in futures if not f.done()]
+            wait(pending, timeout=min(active) - now, return_when=FIRST_COMPLETED)
+    finally:
+        for _, futures, _ in running:
+            _cancel(futures)
+
+
+def _run_gather(
+    executor: ThreadPoolExecutor, method: str, vendors: list, timeout: float, args: tuple, kwargs: dict
+) -> list:
+    """Gather policy for aggregate methods: run every vendor at once, keep results in vendor order."""
+    submitted = [(vendor, _submit_vendor(executor, method, vendor, args, kwargs)) for vendor in vendors]
+    deadline = time.monotonic() + timeout
+
+    results = []
+    try:
+        for vendor, futures in submitted:
+            _, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            if not_done:
+                logger.warning(
+                    "Vendor deadline exceeded",
+                    vendor=vendor,
+                    method=method,
+                    timeout=timeout,
+                    pending=len(not_done),
+                )
+            vendor_results = _collect(futures)
+            if vendor_results:
+                results.extend(vendor_results)
+                logger.info("Vendor succeeded", vendor=vendor, result_count=len(vendor_results))
+            else:
+                logger.debug("Vendor produced no results", vendor=vendor)
+    finally:
+        for _, futures in submitted:
+            _cancel(futures)
+    return results
+
+
 def route_to_vendor(method: str, *args, **kwargs):
     """Route method calls to appropriate vendor implementation with fallback support."""
     category = get_category_for_method(method)
@@ -312,12 +527,7 @@ def route_to_vendor(method: str, *args, **kwargs):
         fallback_order=fallback_vendors
     )
 
-    # Track results and execution state
-    results = []
-    vendor_attempt_count = 0
-    any_primary_vendor_attempted = False
-    successful_vendor = None
-
+    vendors = []
     for vendor in fallback_vendors:
         if vendor not in VENDOR_METHODS[method]:
             if vendor in primary_vendors:
@@ -327,96 +537,31 @@ def route_to_vendor(method: str, *args, **kwargs):
                     method=method
                 )
             continue
-
-        vendor_impl = VENDOR_METHODS[method][vendor]
-        is_primary_vendor = vendor in primary_vendors
-        vendor_attempt_count += 1
-
-        # Track if we attempted any primary vendor
-        if is_primary_vendor:
-            any_primary_vendor_attempted = True
-
-        logger.debug(
-            "Attempting vendor",
-            vendor=vendor,
-            method=method,
-            vendor_type="primary" if is_primary_vendor else "fallback",
-            attempt_number=vendor_attempt_count
-        )
-
-        # Handle list of methods for a vendor
-        if isinstance(vendor_impl, list):
-            vendor_methods = [(impl, vendor) for impl in vendor_impl]
-            logger.debug("Vendor has multiple implementations", vendor=vendor, count=len(vendor_methods))
-        else:
-            vendor_methods = [(vendor_impl, vendor)]
-
-        # Run methods for this vendor with retry support
-        vendor_results = []
-        for impl_func, vendor_name in vendor_methods:
-            try:
-                logger.debug("Calling vendor function", function=impl_func.__name__, vendor=vendor_name)
-                # Use retry wrapper for robustness
-                result = _call_with_retry(impl_func, vendor_name, 3, 1.0, *args, **kwargs)
-                vendor_results.append(result)
-                logger.info("Vendor function succeeded", function=impl_func.__name__, vendor=vendor_name)
-
-            except CircuitBreakerOpenError as e:
-                logger.warning(
-                    "Circuit breaker open, skipping vendor",
-                    vendor=vendor_name,
-                    error=str(e)
-                )
-                continue
-            except RateLimitExceededError as e:
-                logger.warning(
-                    "Rate limit exceeded, skipping vendor",
-                    vendor=vendor_name,
-                    error=str(e)
-                )
-                continue
-            except AlphaVantageRateLimitError as e:
-                if vendor == "alpha_vantage":
-                    logger.warning(
-                        "Alpha Vantage rate limit exceeded, falling back",
-                        error=str(e)
-                    )
-                # Continue to next vendor for fallback
-                continue
-            except Exception as e:
-                # Log error but continue with other implementations
-                logger.warning(
-                    "Vendor function failed",
-                    function=impl_func.__name__,
-                    vendor=vendor_name,
-                    error=str(e)
-                )
-                continue
-
-        # Add this vendor's results
-        if vendor_results:
-            results.extend(vendor_results)
-            successful_vendor = vendor
-            logger.info(
-                "Vendor succeeded",
-                vendor=vendor,
-                result_count=len(vendor_results)
+        vendors.append(vendor)
+
+    # Single-vendor configs stop at the first successful vendor;
+    # multiple vendor configs (comma-separated) collect from every source
+    single_source = len(primary_vendors) == 1
+    execution = _get_execution_config()
+
+    if execution["mode"] == "concurrent":
+        executor = _get_executor(execution["max_workers"])
+        if single_source:
+            results = _run_first_success(
+                executor, method, vendors, execution["vendor_timeout"], args, kwargs,
+                total_timeout=execution["total_timeout"],
             )
-
-            # Stopping logic: Stop after first successful vendor for single-vendor configs
-            # Multiple vendor configs (comma-separated) may want to collect from multiple sources
-            if len(primary_vendors) == 1:
-                logger.debug("Stopping after successful vendor (single-vendor config)", vendor=vendor)
-                break
         else:
-            logger.debug("Vendor produced no results", vendor=vendor)
+            results = _run_gather(executor, method, vendors, execution["vendor_timeout"], args, kwargs)
+    else:
+        results = _run_sequential(method, vendors, single_source, args, kwargs)
 
     # Final result summary
     if not results:
         logger.error(
             "All vendor attempts failed",
             method=method,
-            attempts=vendor_attempt_count
+            attempts=len(vendors)
         )
         raise RuntimeError(f"All vendor implementations failed for method '{method}'")
     else:
@@ -424,7 +569,8 @@ def route_to_vendor(method: str, *args, **kwargs):
             "Method completed",
             method=method,
             result_count=len(results),
-            vendor_attempts=vendor_attempt_count
+            vendor_attempts=len(vendors),
+            mode=execution["mode"],
         )
 
     # Return single result if only one, otherwise concatenate as string
@@ -432,4 +578,4 @@ def route_to_vendor(method: str, *args, **kwargs):
         return results[0]
     else:
         # Convert all results to strings and concatenate
-        return '\n'.join(str(result) for result in results)
\ No newline at end of file
+        return '\n'.join(str(result) for result in results)
@@ -3,10 +3,12 @@
 
 提供数据源调用的鲁棒性保障：
 - CircuitBreaker: 熔断器，连续失败后短路
-- RateLimiter: 令牌桶限流器
+- RateLimiter: 令牌桶限流器（进程内）
+- DistributedRateLimiter: 基于 Redis 的跨进程令牌桶限流器
 - retry_with_backoff: 指数退避重试装饰器
 """
 
+import os
 import time
 import asyncio
 import functools
@@ -189,7 +191,7 @@ class CircuitBreakerOpenError(Exception):
 @dataclass
 class RateLimiter:
     """
-    令牌桶限流器
+    令牌桶限流器（进程内）
 
     Usage:
         limiter = RateLimiter(rate=10, per=60)  # 每 60 秒最多 10 次请求
@@ -204,14 +206,20 @@ class RateLimiter:
     """
     rate: int                           # 令牌数量
     per: float = 60.0                   # 时间窗口（秒）
+    name: str = ""                      # 数据源名称（用于日志与指标）
 
     _tokens: float = field(init=False)
     _last_update: float = field(init=False)
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _stats: "LimiterStats" = field(init=False)
+
+    # 等待令牌时的最长单次休眠（秒）
+    _poll_interval = 0.1
 
     def __post_init__(self) -> None:
         self._tokens = float(self.rate)
         self._last_update = time.monotonic()
+        self._stats = LimiterStats()
 
     def _refill(self) -> None:
         """补充令牌（需在锁内调用）"""
@@ -221,6 +229,25 @@ class RateLimiter:
         self._tokens = min(self.rate, self._tokens + refill_amount)
         self._last_update = now
 
+    def _try_acquire(self, tokens: int) -> float:
+        """
+        尝试取走令牌
+
+        Returns:
+            0 表示已获取；否则为令牌补足还需等待的秒数
+        """
+        with self._lock:
+            self._refill()
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+
+            return (tokens - self._tokens) * (self.per / self.rate)
+
+    async def _try_acquire_async(self, tokens: int) -> float:
+        return self._try_acquire(tokens)
+
     def acquire(self, tokens: int = 1, block: bool = True, timeout: Optional[float] = None) -> bool:
         """
         获取令牌
@@ -233,45 +260,43 @@ class RateLimiter:
         Returns:
             是否成功获取令牌
         """
-        deadline = time.monotonic() + (timeout or float('inf')) if block else time.monotonic()
+        start = time.monotonic()
+        deadline = start + (timeout or float('inf')) if block else start
 
         while True:
-            with self._lock:
-                self._refill()
-
-                if self._tokens >= tokens:
-                    self._tokens -= tokens
-                    return True
-
-                if not block or time.monotonic() >= deadline:
-                    return False
+            wait_time = self._try_acquire(tokens)
+            now = time.monotonic()
+            if wait_time <= 0:
+                self._stats.record(now - start, acquired=True)
+                return True
 
-                # 计算需要等待的时间
-                tokens_needed = tokens - self._tokens
-                wait_time = tokens_needed * (self.per / self.rate)
+            if not block or now >= deadline:
+                self._stats.record(now - start, acquired=False)
+                return False
 
-            # 在锁外等待
-            time.sleep(min(wait_time, 0.1))
+            time.sleep(min(wait_time, self._poll_interval, deadline - now))
 
     async def acquire_async(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
         """异步获取令牌"""
-        deadline = time.monotonic() + (timeout or float('inf'))
+        start = time.monotonic()
+        deadline = start + (timeout or float('inf'))
 
         while True:
-            with self._lock:
-                self._refill()
-
-                if self._tokens >= tokens:
-                    self._tokens -= tokens
-                    return True
+            wait_time = await self._try_acquire_async(tokens)
+            now = time.monotonic()
+            if wait_time <= 0:
+                self._stats.record(now - start, acquired=True)
+                return True
 
-                if time.monotonic() >= deadline:
-                    return False
+            if now >= deadline:
+                self._stats.record(now - start, acquired=False)
+                return False
 
-                tokens_needed = tokens - self._tokens
-                wait_time = tokens_needed * (self.per / self.rate)
+            await asyncio.sleep(min(wait_time, self._poll_interval, deadline - now))
 
-            await asyncio.sleep(min(wait_time, 0.1))
+    def get_stats(self) -> dict:
+        """等待时间指标"""
+        return {"name": self.name, "rate": self.rate, "per": self.per, "backend": "local", **self._stats.to_dict()}
 
     def __call__(self, func: Callable[..., T]) -> Callable[..., T]:
         """装饰器模式"""
@@ -292,6 +317,132 @@ class RateLimiter:
         return wrapper
 
 
+@dataclass
+class LimiterStats:
+    """限流等待指标"""
+    acquired: int = 0                   # 成功获取次数
+    rejected: int = 0                   # 超时/非阻塞未获取次数
+    waited: int = 0                     # 需要等待才获取的次数
+    total_wait: float = 0.0             # 成功获取前的累计等待（秒）
+    max_wait: float = 0.0               # 单次最长等待（秒）
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, wait: float, acquired: bool) -> None:
+        with self._lock:
+            if not acquired:
+                self.rejected += 1
+                return
+            self.acquired += 1
+            # 首次尝试即获取的等待只是调用开销，不计入等待
+            if wait >= 0.001:
+                self.waited += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "waited": self.waited,
+                "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "total_wait_seconds": round(self.total_wait, 3),
+            }
+
+
+# 原子令牌桶：按 Redis 服务器时间补充令牌，令牌足够则扣减并返回 0，否则返回需等待的秒数
+# （以字符串返回，避免 Lua 数字转为整数丢失精度）
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local per = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call("TIME")
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or rate
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(rate, tokens + math.max(0, now - ts) * rate / per)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) * per / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil(per * 2000))
+return tostring(wait)
+"""
+
+
+@dataclass
+class DistributedRateLimiter(RateLimiter):
+    """
+    跨进程令牌桶限流器（Redis）
+
+    所有 API / 分析 worker 共享同一个数据源预算，令牌的补充与扣减在 Lua 脚本中原子完成。
+    未配置 REDIS_URL、未安装 redis 或 Redis 不可用时退回进程内令牌桶，
+    Redis 故障后每 _REDIS_RETRY_INTERVAL 秒重试一次。
+    """
+    key_prefix: str = "ratelimit:"
+    redis_url: Optional[str] = None     # 默认读取 REDIS_URL 环境变量
+
+    _client: Any = field(default=None, init=False, repr=False)
+    _redis_down_until: float = field(default=0.0, init=False, repr=False)
+    _using_redis: bool = field(default=False, init=False, repr=False)
+
+    _poll_interval = 0.5
+    _REDIS_RETRY_INTERVAL = 30.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.key_prefix}{self.name}"
+
+    def _get_client(self) -> Any:
+        """惰性创建同步 Redis 客户端，不可用时返回 None"""
+        if self._client is not None:
+            return self._client
+        redis_url = self.redis_url or os.getenv("REDIS_URL")
+        if not redis_url:
+            return None
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed, using local rate limiter", name=self.name)
+            self._redis_down_until = float("inf")
+            return None
+        self._client = redis.Redis.from_url(redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        return self._client
+
+    def _try_acquire(self, tokens: int) -> float:
+        if time.monotonic() >= self._redis_down_until:
+            client = self._get_client()
+            if client is not None:
+                try:
+                    wait = float(client.eval(_TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.per, tokens))
+                    if not self._using_redis:
+                        self._using_redis = True
+                        logger.info("Distributed rate limiter active", name=self.name, key=self.key)
+                    return wait
+                except Exception as e:
+                    self._redis_down_until = time.monotonic() + self._REDIS_RETRY_INTERVAL
+                    self._using_redis = False
+                    logger.warning(
+                        "Redis rate limiter unavailable, falling back to local bucket",
+                        name=self.name,
+                        retry_in=self._REDIS_RETRY_INTERVAL,
+                        error=str(e),
+                    )
+        return super()._try_acquire(tokens)
+
+    async def _try_acquire_async(self, tokens: int) -> float:
+        # Redis 往返在线程中执行，不阻塞事件循环
+        return await asyncio.to_thread(self._try_acquire, tokens)
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "backend": "redis" if self._using_redis else "local"}
+
+
 class RateLimitExceededError(Exception):
     """限流超出异常"""
     pass
@@ -427,8 +578,8 @@ akshare_breaker = CircuitBreaker(
     recovery_timeout=60.0
 )
 
-# AkShare 限流器（每分钟最多 30 次请求）
-akshare_limiter = RateLimiter(rate=30, per=60.0)
+# AkShare 限流器（所有进程合计每分钟最多 30 次请求）
+akshare_limiter = DistributedRateLimiter(rate=30, per=60.0, name="akshare")
 
 # yfinance 熔断器
 yfinance_breaker = CircuitBreaker(
@@ -437,11 +588,14 @@ yfinance_breaker = CircuitBreaker(
     recovery_timeout=60.0
 )
 
-# yfinance 限流器（每分钟最多 60 次请求）
-yfinance_limiter = RateLimiter(rate=60, per=60.0)
+# yfinance 限流器（所有进程合计每分钟最多 60 次请求）
+yfinance_limiter = DistributedRateLimiter(rate=60, per=60.0, name="yfinance")
+
+# Alpha Vantage 限流器（免费版：所有进程合计每分钟 5 次）
+alpha_vantage_limiter = DistributedRateLimiter(rate=5, per=60.0, name="alpha_vantage")
 
-# Alpha Vantage 限流器（免费版：每分钟 5 次）
-alpha_vantage_limiter = RateLimiter(rate=5, per=60.0)
+# DuckDuckGo 限流器（所有进程合计每分钟最多 20 次搜索）
+duckduckgo_limiter = DistributedRateLimiter(rate=20, per=60.0, name="duckduckgo")
 
 # Alpha Vantage 熔断器
 alpha_vantage_breaker = CircuitBreaker(
@@ -461,14 +615,22 @@ def get_vendor_breaker(vendor: str) -> Optional[CircuitBreaker]:
     return breakers.get(vendor)
 
 
+_VENDOR_LIMITERS = {
+    "akshare": akshare_limiter,
+    "yfinance": yfinance_limiter,
+    "alpha_vantage": alpha_vantage_limiter,
+    "duckduckgo": duckduckgo_limiter,
+}
+
+
 def get_vendor_limiter(vendor: str) -> Optional[RateLimiter]:
     """根据 vendor 名称获取对应的限流器"""
-    limiters = {
-        "akshare": akshare_limiter,
-        "yfinance": yfinance_limiter,
-        "alpha_vantage": alpha_vantage_limiter,
-    }
-    return limiters.get(vendor)
+    return _VENDOR_LIMITERS.get(vendor)
+
+
+def get_limiter_stats() -> dict:
+    """各数据源限流器的等待时间指标"""
+    return {vendor: limiter.get_stats() for vendor, limiter in _VENDOR_LIMITERS.items()}
 
 
 # ============ 组合装饰器 ============
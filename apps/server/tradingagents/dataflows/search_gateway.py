@@ -0,0 +1,401 @@
+"""
+异步搜索网关
+
+Google News 抓取与 DuckDuckGo（DDGS）搜索统一经由本模块：
+
+- 每个搜索引擎一组礼貌策略：并发上限、相邻请求的最小间隔（含随机抖动）、跨进程配额，
+  等待均为 asyncio.sleep，不占用线程
+- 结果按 (引擎, 类型, 规范化查询, 参数) 缓存，并发的相同查询只执行一次
+- 分页结果并行获取（受并发上限与请求间隔约束）
+- 按引擎统计请求数、缓存命中与限流等待时间，见 get_search_stats()
+
+网关协程统一在 http_pool 的共享后台事件循环上执行：异步调用方经 http_pool.run_shared 等待结果，
+同步调用方（LangChain 工具、同步数据流）通过 search / search_many / run_sync 阻塞等待。
+因此所有线程与事件循环共享同一套限流状态，临时事件循环（asyncio.run）也不会留下信号量等状态。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import structlog
+
+from . import http_pool
+from .retry_utils import RateLimiter, RateLimitExceededError, duckduckgo_limiter
+
+logger = structlog.get_logger(__name__)
+
+# 结果缓存
+_CACHE_TTL = 1800.0
+_CACHE_MAX_ENTRIES = 512
+
+# 单次搜索（含限流等待）的默认超时（秒）
+DEFAULT_TIMEOUT = 30.0
+
+# HTTP 429 的退避重试
+_MAX_RATE_LIMIT_RETRIES = 4
+_BACKOFF_MIN = 4.0
+_BACKOFF_MAX = 60.0
+
+
+@dataclass(frozen=True)
+class EnginePolicy:
+    """单个搜索引擎的礼貌策略"""
+    concurrency: int          # 同时进行的请求数
+    min_interval: float       # 相邻请求开始的最小间隔（秒）
+    jitter: float = 0.0       # 间隔上追加的随机抖动上限（秒）
+    limiter: Optional[RateLimiter] = None  # 跨进程配额
+
+
+ENGINE_POLICIES: Dict[str, EnginePolicy] = {
+    "duckduckgo": EnginePolicy(concurrency=2, min_interval=1.0, jitter=0.5, limiter=duckduckgo_limiter),
+    # 与原先每页请求前随机等待 2-6 秒的节奏一致
+    "google_news": EnginePolicy(concurrency=3, min_interval=2.0, jitter=4.0),
+}
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询：小写、合并空白"""
+    return " ".join(query.lower().split())
+
+
+class _EngineStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "total_wait_ms": round(self.total_wait * 1000, 1),
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 1) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class _Engine:
+    """搜索引擎的限流状态（按进程共享，只在共享后台事件循环上使用）"""
+
+    def __init__(self, name: str, policy: EnginePolicy):
+        self.name = name
+        self.policy = policy
+        self.stats = _EngineStats()
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """并发信号量；后台事件循环重建（连接池关闭后再次使用）时随之重建"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._semaphore is None or self._semaphore[0] is not loop:
+                self._semaphore = (loop, asyncio.Semaphore(self.policy.concurrency))
+            return self._semaphore[1]
+
+    def _reserve_slot(self) -> float:
+        """预约下一个请求时间点，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.policy.min_interval + random.uniform(0, self.policy.jitter)
+            return start - now
+
+    async def throttle(self, timeout: float):
+        """等待配额与请求间隔（不阻塞线程），超时抛出 RateLimitExceededError"""
+        started = time.monotonic()
+        limiter = self.policy.limiter
+        if limiter is not None and not await limiter.acquire_async(timeout=timeout):
+            self._record_wait(time.monotonic() - started)
+            raise RateLimitExceededError(f"{self.name} rate limit exceeded")
+
+        delay = self._reserve_slot()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._record_wait(time.monotonic() - started)
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.total_wait += waited
+            self.stats.max_wait = max(self.stats.max_wait, waited)
+            if waited > 0.001:
+                self.stats.throttled += 1
+
+    def record(self, field: str):
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+
+_engines: Dict[str, _Engine] = {name: _Engine(name, policy) for name, policy in ENGINE_POLICIES.items()}
+
+
+def _engine(name: str) -> _Engine:
+    try:
+        return _engines[name]
+    except KeyError:
+        raise ValueError(f"Unknown search engine: {name}") from None
+
+
+class _ResultCache:
+    """TTL + LRU 结果缓存（线程安全）"""
+
+    def __init__(self, ttl: float = _CACHE_TTL, max_entries: int = _CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache = _ResultCache()
+_inflight: Dict[Tuple, asyncio.Future] = {}
+
+
+async def arun(
+    engine: str,
+    kind: str,
+    query: str,
+    params: Dict[str, Any],
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    带缓存与并发合并的搜索执行
+
+    Args:
+        engine: 引擎名（ENGINE_POLICIES 的键）
+        kind: 搜索类型（text / news 等）
+        query: 原始查询，缓存键使用规范化后的形式
+        params: 影响结果的其他参数（参与缓存键）
+        call: 实际执行搜索的协程工厂，只在缓存未命中时调用（在共享后台事件循环上执行）
+    """
+    return await http_pool.run_shared(_arun(engine, kind, query, params, call))
+
+
+async def _arun(
+    engine: str,
+    kind: str,
+    query: str,
+    params: Dict[str, Any],
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    state = _engine(engine)
+    key = (engine, kind, normalize_query(query), tuple(sorted(params.items())))
+
+    hit, value = _cache.get(key)
+    if hit:
+        state.record("cache_hits")
+        return value
+
+    # 相同查询合并为一次请求
+    pending = _inflight.get(key)
+    if pending is not None:
+        state.record("coalesced")
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        value = await call()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        state.record("errors")
+        future.set_exception(e)
+        # 没有等待者时避免 "exception was never retrieved" 警告
+        future.exception()
+        raise
+    else:
+        _cache.set(key, value)
+        future.set_result(value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+async def afetch(engine: str, url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> httpx.Response:
+    """
+    按引擎礼貌策略发起 GET 请求（经由共享连接池），HTTP 429 时指数退避重试
+
+    Args:
+        engine: 引擎名
+        url: 完整 URL
+        **kwargs: 透传给 httpx（headers、params 等）
+    """
+    return await http_pool.run_shared(_afetch(engine, url, timeout, **kwargs))
+
+
+async def _afetch(engine: str, url: str, timeout: float, **kwargs) -> httpx.Response:
+    state = _engine(engine)
+    async with state.semaphore():
+        for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+            await state.throttle(timeout)
+            response = await http_pool.aget(url, timeout=timeout, **kwargs)
+            if response.status_code != 429 or attempt == _MAX_RATE_LIMIT_RETRIES:
+                return response
+            state.record("rate_limited")
+            delay = min(_BACKOFF_MAX, _BACKOFF_MIN * (2 ** attempt))
+            logger.warning("Search engine rate limited, backing off", engine=engine, delay=delay)
+            await asyncio.sleep(delay)
+    return response
+
+
+# =============================================================================
+# DuckDuckGo
+# =============================================================================
+
+_ddgs_local = threading.local()
+
+
+def ddgs_client():
+    """当前线程的 DDGS 客户端（DDGS 为同步客户端且非线程安全，按线程复用）"""
+    client = getattr(_ddgs_local, "client", None)
+    if client is None:
+        try:
+            from duckduckgo_search import DDGS
+        except ImportError:
+            logger.error("duckduckgo-search not installed. Run: pip install duckduckgo-search")
+            raise
+        client = _ddgs_local.client = DDGS()
+    return client
+
+
+async def asearch(
+    kind: str,
+    query: str,
+    max_results: int = 10,
+    timelimit: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[Dict[str, Any]]:
+    """
+    DuckDuckGo 搜索
+
+    搜索在工作线程中执行，使用该线程自己的 DDGS 客户端（见 ddgs_client）。
+
+    Args:
+        kind: "text" 或 "news"
+        query: 搜索查询
+        max_results: 最多返回条数
+        timelimit: 时间范围（d / w / m / y）
+        timeout: 等待配额的超时（秒）
+    """
+    if kind not in ("text", "news"):
+        raise ValueError(f"Unsupported DuckDuckGo search kind: {kind}")
+    state = _engine("duckduckgo")
+
+    async def call() -> List[Dict[str, Any]]:
+        async with state.semaphore():
+            await state.throttle(timeout)
+
+            def run():
+                ddgs = ddgs_client()
+                kwargs = {"max_results": max_results}
+                if timelimit:
+                    kwargs["timelimit"] = timelimit
+                return list(getattr(ddgs, kind)(query, **kwargs))
+
+            return await asyncio.to_thread(run)
+
+    params = {"max_results": max_results, "timelimit": timelimit}
+    return await arun("duckduckgo", kind, query, params, call)
+
+
+async def asearch_many(
+    kind: str,
+    queries: Sequence[str],
+    max_results: int = 10,
+    timelimit: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[List[Dict[str, Any]]]:
+    """并行执行多个查询，单个查询失败时记录日志并返回空列表"""
+    outcomes = await asyncio.gather(
+        *(asearch(kind, q, max_results, timelimit, timeout) for q in queries),
+        return_exceptions=True,
+    )
+    results = []
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning("Search query failed", query=query, error=str(outcome))
+            results.append([])
+        else:
+            results.append(outcome)
+    return results
+
+
+# =============================================================================
+# 同步接口
+# =============================================================================
+
+def run_sync(coro, timeout: Optional[float] = None) -> Any:
+    """在共享后台事件循环上执行网关协程（同步调用方使用）"""
+    return http_pool.run_sync(coro, timeout)
+
+
+def search(kind: str, query: str, max_results: int = 10, timelimit: Optional[str] = None,
+           timeout: float = DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+    """asearch 的同步版本"""
+    return run_sync(asearch(kind, query, max_results, timelimit, timeout))
+
+
+def search_many(kind: str, queries: Sequence[str], max_results: int = 10, timelimit: Optional[str] = None,
+                timeout: float = DEFAULT_TIMEOUT) -> List[List[Dict[str, Any]]]:
+    """asearch_many 的同步版本"""
+    return run_sync(asearch_many(kind, queries, max_results, timelimit, timeout))
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def get_search_stats() -> Dict[str, Any]:
+    """各搜索引擎的请求、缓存与限流等待指标"""
+    engines = {}
+    for name, state in _engines.items():
+        with state._lock:
+            engines[name] = {
+                "concurrency": state.policy.concurrency,
+                "min_interval_s": state.policy.min_interval,
+                **state.stats.to_dict(),
+            }
+    return {"engines": engines, "cache_entries": len(_cache)}
@@ -11,6 +11,8 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import structlog
 
+from . import search_gateway
+
 logger = structlog.get_logger(__name__)
 
 # ============ 简单内存缓存 ============
@@ -42,18 +44,6 @@ def _cache_key(*args) -> str:
     return hashlib.md5(raw.encode()).hexdigest()
 
 
-# ============ DuckDuckGo 搜索复用 ============
-
-def _get_ddgs():
-    """延迟加载 DDGS 客户端"""
-    try:
-        from duckduckgo_search import DDGS
-        return DDGS()
-    except ImportError:
-        logger.error("duckduckgo-search not installed")
-        raise
-
-
 # ============ 散户情绪搜索 ============
 
 def search_retail_sentiment(query: str, platform: str = "all", limit: int = 8) -> str:
@@ -75,8 +65,6 @@ def search_retail_sentiment(query: str, platform: str = "all", limit: int = 8) -
         return cached
 
     try:
-        ddgs = _get_ddgs()
-
         # 根据平台构建搜索查询
         platform_keywords = {
             "reddit": "site:reddit.com",
@@ -106,13 +94,12 @@ def search_retail_sentiment(query: str, platform: str = "all", limit: int = 8) -
         logger.info("Searching retail sentiment", query=query, platform=platform)
         start_time = time.time()
 
+        # 多个查询并行执行，单个查询失败时返回空结果
         all_results = []
-        for sq in search_queries:
-            try:
-                results = list(ddgs.text(sq, max_results=limit, timelimit="w"))
-                all_results.extend(results)
-            except Exception as e:
-                logger.warning("Search query failed", query=sq, error=str(e))
+        for results in search_gateway.search_many(
+            "text", search_queries, max_results=limit, timelimit="w"
+        ):
+            all_results.extend(results)
 
         elapsed = time.time() - start_time
         logger.info("Sentiment search completed",
@@ -438,14 +425,12 @@ def _get_us_fear_greed() -> Optional[Dict[str, Any]]:
 def _get_fear_greed_via_search(market: str) -> Dict[str, Any]:
     """通过搜索获取恐惧贪婪指数（降级方案）"""
     try:
-        ddgs = _get_ddgs()
-
         if market.upper() in ("CN", "AUTO"):
             query = "A股 市场情绪 恐惧贪婪 今日"
         else:
             query = "fear greed index today stock market"
 
-        results = list(ddgs.text(query, max_results=5, timelimit="d"))
+        results = search_gateway.search("text", query, max_results=5, timelimit="d")
 
         return {
             "source": "search_fallback",
@@ -1,10 +1,222 @@
+"""
+技术指标计算引擎
+
+每个股票一次性计算全部支持的指标，结果以 日期字符串 -> 指标列 的列式表缓存在进程内，
+并记录计算所用 OHLCV 的存储版本：存储被补齐新 K 线（本进程、其他进程或行情路由）后重新计算，
+版本未变时复用；每个自然日最多同步一次 OHLCV 存储。
+
+- 单日查询为按日期索引的 O(1) 查找
+- 回看窗口查询为对同一张表的切片，不再按天重复读取与计算
+- 不在预计算集合中的 stockstats 指标在首次请求时按需补算并加入同一张表
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Annotated, Dict, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
-import os
+
 from .config import get_config, DATA_DIR
 
+# 预计算的指标集合（与 get_stock_stats_indicators_window 支持的指标一致）
+SUPPORTED_INDICATORS: Tuple[str, ...] = (
+    "close_50_sma",
+    "close_200_sma",
+    "close_10_ema",
+    "macd",
+    "macds",
+    "macdh",
+    "rsi",
+    "boll",
+    "boll_ub",
+    "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+)
+
+# 进程内缓存的股票数上限（LRU）
+_MAX_CACHED_SYMBOLS = 32
+
+_LOCAL_CSV = "{symbol}-YFin-data-2015-01-01-2025-03-25.csv"
+
+NOT_TRADING_DAY = "N/A: Not a trading day (weekend or holiday)"
+
+
+def _is_online() -> bool:
+    return get_config()["data_vendors"]["technical_indicators"] != "local"
+
+
+def _load_ohlcv(symbol: str, online: bool) -> pd.DataFrame:
+    """读取约 15 年日线，返回含 Date 列的 DataFrame"""
+    if not online:
+        config = get_config()
+        for directory in (DATA_DIR, config.get("data_cache_dir", "data")):
+            path = os.path.join(directory or "", _LOCAL_CSV.format(symbol=symbol))
+            if os.path.exists(path):
+                return pd.read_csv(path)
+        raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+
+    # Served from the local OHLCV store, which only downloads missing bars
+    from services.ohlcv_store import ohlcv_store
+
+    today = pd.Timestamp.today()
+    start = today - pd.DateOffset(years=15)
+    return ohlcv_store.get_range(symbol, start, today).reset_index()
+
+
+def _data_version(symbol: str, online: bool) -> Optional[Tuple[int, str]]:
+    """OHLCV 数据版本：在线模式为存储的 (版本号, 覆盖结束日)；本地 CSV 不会变化，返回 None"""
+    if not online:
+        return None
+    from services.ohlcv_store import ohlcv_store
+
+    meta = ohlcv_store.coverage(symbol)
+    return (meta["version"], meta["end"]) if meta else None
+
+
+@dataclass
+class IndicatorFrame:
+    """单个股票的指标表：按日期升序，索引为 YYYY-mm-dd 字符串"""
+    symbol: str
+    values: pd.DataFrame
+    stats: pd.DataFrame = field(repr=False)
+    rows: np.ndarray = field(repr=False)  # stats 中保留的行（同一日期只保留最后一行）
+    version: Optional[Tuple[int, str]] = None  # 计算所用 OHLCV 的存储版本
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def compute(cls, symbol: str, data: pd.DataFrame, version: Optional[Tuple[int, str]] = None) -> "IndicatorFrame":
+        stats = wrap(data)
+        # 逐个访问触发 stockstats 计算，结果作为列保留在 stats 中
+        for name in SUPPORTED_INDICATORS:
+            stats[name]
+        dates = stats["date"] if "date" in stats.columns else stats.index
+        index = pd.DatetimeIndex(pd.to_datetime(dates)).strftime("%Y-%m-%d")
+        rows = ~index.duplicated(keep="last")
+        values = pd.DataFrame(
+            {name: stats[name].to_numpy(dtype=float)[rows] for name in SUPPORTED_INDICATORS},
+            index=index[rows],
+        )
+        return cls(symbol=symbol, values=values, stats=stats, rows=rows, version=version)
+
+    def column(self, indicator: str) -> pd.Series:
+        """指标列；不在预计算集合中的指标按需补算"""
+        values = self.values
+        if indicator not in values.columns:
+            with self.lock:
+                values = self.values
+                if indicator not in values.columns:
+                    values = values.assign(**{indicator: self.stats[indicator].to_numpy(dtype=float)[self.rows]})
+                    self.values = values
+        return values[indicator]
+
+    def value(self, indicator: str, day: str):
+        """单日指标值；非交易日返回 NOT_TRADING_DAY"""
+        column = self.column(indicator)
+        if day not in column.index:
+            return NOT_TRADING_DAY
+        return column[day]
+
+    def window(self, indicator: str, start: str, end: str) -> Dict[str, str]:
+        """闭区间 [start, end] 内各交易日的指标值（字符串，缺失值为 "N/A"）"""
+        column = self.column(indicator)
+        sliced = column.loc[(column.index >= start) & (column.index <= end)]
+        return {day: "N/A" if pd.isna(v) else str(v) for day, v in sliced.items()}
+
+
+class IndicatorEngine:
+    """按 (股票, 数据源模式) 缓存指标表，OHLCV 存储版本变化时重新计算"""
+
+    def __init__(self, max_symbols: int = _MAX_CACHED_SYMBOLS):
+        self.max_symbols = max_symbols
+        self._frames: "OrderedDict[Tuple[str, bool], IndicatorFrame]" = OrderedDict()
+        self._synced: Dict[Tuple[str, bool], date] = {}  # 最近一次同步 OHLCV 存储的日期
+        self._locks: Dict[Tuple[str, bool], threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.computes = 0
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _cached(self, key, version) -> Optional[IndicatorFrame]:
+        """当天已同步且数据版本未变的缓存表（调用方持有 _guard）"""
+        frame = self._frames.get(key)
+        if frame is None or frame.version != version or self._synced.get(key) != date.today():
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def get_frame(self, symbol: str) -> IndicatorFrame:
+        online = _is_online()
+        key = (symbol.upper(), online)
+
+        version = _data_version(symbol, online)
+        with self._guard:
+            frame = self._cached(key, version)
+            if frame is not None:
+                return frame
+
+        # 同一股票的并发请求只计算一次
+        with self._key_lock(key):
+            version = _data_version(symbol, online)
+            with self._guard:
+                frame = self._cached(key, version)
+                if frame is not None:
+                    return frame
+
+            # 读取时只补齐缺失的 K 线；补齐后版本未变则复用已有的表
+            data = _load_ohlcv(symbol, online)
+            version = _data_version(symbol, online)
+            with self._guard:
+                frame = self._frames.get(key)
+            if frame is None or frame.version != version:
+                frame = IndicatorFrame.compute(symbol, data, version)
+                with self._guard:
+                    self.computes += 1
+
+            with self._guard:
+                self._frames[key] = frame
+                self._frames.move_to_end(key)
+                self._synced[key] = date.today()
+                while len(self._frames) > self.max_symbols:
+                    evicted, _ = self._frames.popitem(last=False)
+                    self._synced.pop(evicted, None)
+                    self._locks.pop(evicted, None)
+            return frame
+
+    def get_value(self, symbol: str, indicator: str, curr_date: str):
+        return self.get_frame(symbol).value(indicator, curr_date)
+
+    def get_window(self, symbol: str, indicator: str, start: str, end: str) -> Dict[str, str]:
+        return self.get_frame(symbol).window(indicator, start, end)
+
+    def clear(self):
+        with self._guard:
+            self._frames.clear()
+            self._synced.clear()
+            self._locks.clear()
+
+    def get_stats(self) -> dict:
+        with self._guard:
+            return {
+                "cached_symbols": len(self._frames),
+                "max_symbols": self.max_symbols,
+                "hits": self.hits,
+                "computes": self.computes,
+            }
+
+
+# 全局单例
+indicator_engine = IndicatorEngine()
+
 
 class StockstatsUtils:
     @staticmethod
@@ -17,66 +229,5 @@ class StockstatsUtils:
             str, "curr date for retrieving stock price data, YYYY-mm-dd"
         ],
     ):
-        # Get config and set up data directory path
-        config = get_config()
-        online = config["data_vendors"]["technical_indicators"] != "local"
-
-        df = None
-        data = None
-
-        if not online:
-            try:
-                data = pd.read_csv(
-                    os.path.join(
-                        DATA_DIR,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
-            except FileNotFoundError:
-                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
-        else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
-
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
-
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
-
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
-
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        return indicator_engine.get_value(symbol, indicator, curr_date)
@@ -46,4 +46,13 @@ DEFAULT_CONFIG = {
         # Example: "get_stock_data": "alpha_vantage",  # Override category default
         # Example: "get_news": "openai",               # Override category default
     },
+    # Vendor execution: "concurrent" runs vendor implementations in a bounded thread pool
+    # (first success for single-vendor configs, gather for comma-separated configs);
+    # "sequential" keeps the one-at-a-time fallback walk
+    "vendor_execution": {
+        "mode": "concurrent",
+        "max_workers": 8,
+        "vendor_timeout": 20.0,  # per-vendor deadline (seconds), including retries
+        "total_timeout": 45.0,  # overall deadline for single-source fallback chains (seconds)
+    },
 }
@@ -249,7 +249,10 @@ class GraphSetup:
                 if self.enable_resilience else node
             )
             delete_nodes["sentiment"] = create_msg_delete()
-            tool_nodes["sentiment"] = create_sentiment_tools_node(self.quick_thinking_llm)
+            tool_nodes["sentiment"] = (
+                self.tool_nodes["sentiment"] if "sentiment" in self.tool_nodes
+                else create_sentiment_tools_node(self.quick_thinking_llm)
+            )
 
         if "policy" in selected_analysts:
             node = create_policy_agent(self.quick_thinking_llm)
@@ -258,7 +261,10 @@ class GraphSetup:
                 if self.enable_resilience else node
             )
             delete_nodes["policy"] = create_msg_delete()
-            tool_nodes["policy"] = create_policy_tools_node(self.quick_thinking_llm)
+            tool_nodes["policy"] = (
+                self.tool_nodes["policy"] if "policy" in self.tool_nodes
+                else create_policy_tools_node(self.quick_thinking_llm)
+            )
 
         # 资金流向分析师（北向资金 + 龙虎榜）
         if "fund_flow" in selected_analysts:
@@ -268,7 +274,10 @@ class GraphSetup:
                 if self.enable_resilience else node
             )
             delete_nodes["fund_flow"] = create_msg_delete()
-            tool_nodes["fund_flow"] = create_fund_flow_tools_node(self.quick_thinking_llm)
+            tool_nodes["fund_flow"] = (
+                self.tool_nodes["fund_flow"] if "fund_flow" in self.tool_nodes
+                else create_fund_flow_tools_node(self.quick_thinking_llm)
+            )
 
         # Macro 分析师（现在可以并行执行）
         if "macro" in selected_analysts:
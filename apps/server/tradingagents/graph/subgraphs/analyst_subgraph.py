@@ -272,10 +272,11 @@ class AnalystSubGraph:
             delete_nodes[analyst_type] = creator["delete"]()
 
             # 获取工具节点
-            if "tools_factory" in creator:
-                tool_nodes[analyst_type] = creator["tools_factory"](self.llm)
-            elif self.tool_nodes and analyst_type in self.tool_nodes:
+            # 优先使用传入的工具节点（运行内共享工具结果），否则由分析师自带的工厂创建
+            if self.tool_nodes and analyst_type in self.tool_nodes:
                 tool_nodes[analyst_type] = self.tool_nodes[analyst_type]
+            elif "tools_factory" in creator:
+                tool_nodes[analyst_type] = creator["tools_factory"](self.llm)
             elif self.tool_nodes and analyst_type == "macro" and "news" in self.tool_nodes:
                 # Macro 使用 news 工具
                 tool_nodes[analyst_type] = self.tool_nodes["news"]
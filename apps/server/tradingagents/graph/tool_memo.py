@@ -0,0 +1,164 @@
+# TradingAgents/graph/tool_memo.py
+
+"""分析运行内的工具结果复用
+
+同一次分析中多个分析师常以相同参数调用同一工具（get_stock_data、get_news、get_indicators、
+北向资金与龙虎榜工具等）。ToolMemo 包装 ToolNode 中的工具：
+
+1. 按 (工具名, 规范化参数, trade_date) 缓存结果，运行结束即随图实例释放
+2. 并发的相同调用只执行一次，其余调用等待同一结果
+3. 按工具统计调用、命中与并发合并次数，运行结束时上报
+"""
+
+import inspect
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import structlog
+from langchain_core.tools import BaseTool, StructuredTool
+from langgraph.prebuilt import ToolNode
+
+logger = structlog.get_logger(__name__)
+
+# 按股票代码语义规范化（大小写不敏感）的参数名
+_SYMBOL_ARGS = frozenset({"symbol", "ticker", "stock_code"})
+
+
+def normalize_args(arguments: Dict[str, Any]) -> str:
+    """规范化工具参数：字符串去除首尾空白，股票代码统一大写，按参数名排序序列化"""
+    normalized = {}
+    for name, value in arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if name in _SYMBOL_ARGS:
+                value = value.upper()
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+
+class ToolMemo:
+    """单次分析运行的工具结果缓存"""
+
+    def __init__(self):
+        self.symbol: Optional[str] = None
+        self.trade_date: Optional[str] = None
+        self._results: Dict[Tuple[str, str, Optional[str]], Future] = {}
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def begin_run(self, symbol: Optional[str] = None, trade_date: Optional[str] = None):
+        """开始新的分析运行：清空上一次运行的结果与统计"""
+        with self._lock:
+            self.symbol = symbol
+            self.trade_date = str(trade_date) if trade_date is not None else None
+            self._results.clear()
+            self._stats.clear()
+
+    def call(self, tool_name: str, arguments: Dict[str, Any], func: Callable[[], Any]) -> Any:
+        """执行工具调用；相同调用复用已有结果或等待进行中的调用"""
+        key = (tool_name, normalize_args(arguments), self.trade_date)
+
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, _ToolStats())
+            stats.calls += 1
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+            elif future.done():
+                stats.hits += 1
+            else:
+                stats.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            # 失败不缓存，后续调用重新执行
+            with self._lock:
+                stats.errors += 1
+                self._results.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def wrap(self, tool: BaseTool) -> BaseTool:
+        """返回带结果复用的工具副本（名称、描述与参数 schema 不变）"""
+        func = getattr(tool, "func", None)
+        if func is None or getattr(func, "__tool_memo__", None) is self:
+            return tool
+        signature = inspect.signature(func)
+        name = tool.name
+
+        def memoized(**kwargs):
+            # 补全默认值，使省略参数与显式传入默认值的调用命中同一结果
+            bound = signature.bind_partial(**kwargs)
+            bound.apply_defaults()
+            return self.call(name, dict(bound.arguments), lambda: func(**kwargs))
+
+        memoized.__tool_memo__ = self
+        return StructuredTool.from_function(
+            func=memoized,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            return_direct=tool.return_direct,
+        )
+
+    def tool_node(self, tools: Iterable[BaseTool]) -> ToolNode:
+        """创建工具均经过结果复用的 ToolNode"""
+        return ToolNode([self.wrap(t) for t in tools])
+
+    def wrap_node(self, node: ToolNode) -> ToolNode:
+        """包装已有 ToolNode 中的全部工具"""
+        return self.tool_node(node.tools_by_name.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """本次运行的工具调用统计"""
+        with self._lock:
+            tools = {name: stats.to_dict() for name, stats in self._stats.items()}
+        calls = sum(s["calls"] for s in tools.values())
+        reused = sum(s["hits"] + s["coalesced"] for s in tools.values())
+        return {
+            "symbol": self.symbol,
+            "trade_date": self.trade_date,
+            "calls": calls,
+            "reused": reused,
+            "hit_rate": round(reused / calls, 3) if calls else 0.0,
+            "tools": tools,
+        }
+
+    def log_stats(self):
+        """记录本次运行的复用统计"""
+        stats = self.get_stats()
+        if stats["calls"]:
+            logger.info(
+                "Tool memo stats",
+                symbol=stats["symbol"],
+                trade_date=stats["trade_date"],
+                calls=stats["calls"],
+                reused=stats["reused"],
+                hit_rate=stats["hit_rate"],
+                tools=stats["tools"],
+            )
@@ -18,6 +18,9 @@ from tradingagents.agents import *
 from tradingagents.agents.analysts.scout_agent import create_scout_agent
 from tradingagents.agents.analysts.macro_analyst import create_macro_analyst
 from tradingagents.agents.analysts.portfolio_agent import create_portfolio_agent
+from tradingagents.agents.analysts.sentiment_agent import create_sentiment_tools_node
+from tradingagents.agents.analysts.policy_agent import create_policy_tools_node
+from tradingagents.agents.analysts.fund_flow_agent import create_fund_flow_tools_node
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.agents.utils.memory import FinancialSituationMemory
 from tradingagents.agents.utils.agent_states import (
@@ -46,6 +49,7 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .tool_memo import ToolMemo
 
 logger = structlog.get_logger(__name__)
 
@@ -105,7 +109,8 @@ class TradingAgentsGraph:
         self.invest_judge_memory = FinancialSituationMemory("invest_judge_memory", self.config)
         self.risk_manager_memory = FinancialSituationMemory("risk_manager_memory", self.config)
 
-        # Create tool nodes
+        # Create tool nodes (tool results are shared across analysts within a run)
+        self.tool_memo = ToolMemo()
         self.tool_nodes = self._create_tool_nodes()
 
         # Initialize components
@@ -216,9 +221,14 @@ class TradingAgentsGraph:
                 return base_analysts
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
-        """Create tool nodes for different data sources using abstract methods."""
+        """Create tool nodes for different data sources using abstract methods.
+
+        Every node goes through self.tool_memo, so identical tool calls made by
+        different analysts in the same run are executed once.
+        """
+        memo = self.tool_memo
         return {
-            "market": ToolNode(
+            "market": memo.tool_node(
                 [
                     # Core stock data tools
                     get_stock_data,
@@ -226,13 +236,13 @@ class TradingAgentsGraph:
                     get_indicators,
                 ]
             ),
-            "social": ToolNode(
+            "social": memo.tool_node(
                 [
                     # News tools for social media analysis
                     get_news,
                 ]
             ),
-            "news": ToolNode(
+            "news": memo.tool_node(
                 [
                     # News and insider information
                     get_news,
@@ -241,7 +251,7 @@ class TradingAgentsGraph:
                     get_insider_transactions,
                 ]
             ),
-            "fundamentals": ToolNode(
+            "fundamentals": memo.tool_node(
                 [
                     # Fundamental analysis tools
                     get_fundamentals,
@@ -250,6 +260,10 @@ class TradingAgentsGraph:
                     get_income_statement,
                 ]
             ),
+            # A-share analysts (retail sentiment, policy, north money + LHB)
+            "sentiment": memo.wrap_node(create_sentiment_tools_node(self.quick_thinking_llm)),
+            "policy": memo.wrap_node(create_policy_tools_node(self.quick_thinking_llm)),
+            "fund_flow": memo.wrap_node(create_fund_flow_tools_node(self.quick_thinking_llm)),
         }
 
     def propagate(self, company_name, trade_date):
@@ -264,6 +278,7 @@ class TradingAgentsGraph:
         """
         self.ticker = company_name
         start_time = time.time()
+        self.tool_memo.begin_run(company_name, trade_date)
 
         logger.info("Starting analysis", symbol=company_name, date=trade_date)
 
@@ -303,6 +318,7 @@ class TradingAgentsGraph:
             symbol=company_name,
             elapsed_seconds=round(elapsed, 2),
         )
+        self.tool_memo.log_stats()
 
         # Return decision and processed signal
         return final_state, self.process_signal(final_state["final_trade_decision"])